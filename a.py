@@ -154,6 +154,7 @@ def create_tables(conn):
     CREATE TRIGGER IF NOT EXISTS update_users_updated_at
     AFTER UPDATE ON users
     FOR EACH ROW
+    WHEN NEW.updated_at IS OLD.updated_at
     BEGIN
         UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
     END;
@@ -162,6 +163,7 @@ def create_tables(conn):
     CREATE TRIGGER IF NOT EXISTS update_friendships_updated_at
     AFTER UPDATE ON friendships
     FOR EACH ROW
+    WHEN NEW.updated_at IS OLD.updated_at
     BEGIN
         UPDATE friendships SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
     END;
@@ -170,6 +172,7 @@ def create_tables(conn):
     CREATE TRIGGER IF NOT EXISTS update_posts_updated_at
     AFTER UPDATE ON posts
     FOR EACH ROW
+    WHEN NEW.updated_at IS OLD.updated_at
     BEGIN
         UPDATE posts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
     END;
@@ -178,6 +181,7 @@ def create_tables(conn):
     CREATE TRIGGER IF NOT EXISTS update_comments_updated_at
     AFTER UPDATE ON comments
     FOR EACH ROW
+    WHEN NEW.updated_at IS OLD.updated_at
     BEGIN
         UPDATE comments SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id;
     END;
@@ -1,6 +1,6 @@
 // src/app/api/chat/rooms/[roomId]/messages/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth } from '@/lib/authUtils';
 import fs from 'fs/promises';
 import path from 'path';
@@ -102,8 +102,8 @@ export async function POST(request: NextRequest, context: { params: Promise<{ ro
     }
 
     const insertMsgStmt = db.prepare(
-      `INSERT INTO chat_messages (chat_room_id, sender_id, message_content, attachment_url, attachment_type, created_at) 
-       VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)`
+      `INSERT INTO chat_messages (chat_room_id, sender_id, message_content, attachment_url, attachment_type) 
+       VALUES (?, ?, ?, ?, ?)`
     );
     const info = insertMsgStmt.run(chatRoomId, senderId, messageContent, attachmentUrlDb, attachmentTypeDb);
 
@@ -169,7 +169,7 @@ export async function GET(request: NextRequest, context: { params: Promise<{ roo
         cm.attachment_url, cm.attachment_type, cm.created_at,
         u.username AS sender_username, u.profile_picture_url AS sender_profile_picture_url
       FROM chat_messages cm JOIN users u ON cm.sender_id = u.id
-      WHERE cm.chat_room_id = ? ORDER BY cm.created_at DESC LIMIT ? OFFSET ?`);
+      WHERE cm.chat_room_id = ? ORDER BY cm.${timeColumn(db, 'chat_messages')} DESC LIMIT ? OFFSET ?`);
     const messagesFromDb = messagesStmt.all(chatRoomId, limit, offset);
     
     // Pesan diambil dalam urutan DESC (terbaru dulu), lalu dibalik agar urutan di client menjadi ASC (pesan lama di atas)
@@ -1,6 +1,6 @@
 // src/app/api/chat/rooms/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth } from '@/lib/authUtils';
 
 // Tipe untuk body request saat memulai chat
@@ -67,7 +67,7 @@ export async function POST(request: NextRequest) {
         if (roomForResponse) {
             chatRoomId = roomForResponse.id;
         } else {
-            const insertRoomStmt = db.prepare('INSERT INTO chat_rooms (user1_id, user2_id, created_at, last_message_at) VALUES (?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)');
+            const insertRoomStmt = db.prepare('INSERT INTO chat_rooms (user1_id, user2_id) VALUES (?, ?)');
             const info = insertRoomStmt.run(user1Id, user2Id);
             if (info.changes > 0 && info.lastInsertRowid) {
                 isNewRoom = true;
@@ -147,7 +147,7 @@ export async function GET(request: NextRequest) {
       JOIN users u1 ON cr.user1_id = u1.id
       JOIN users u2 ON cr.user2_id = u2.id
       WHERE cr.user1_id = ? OR cr.user2_id = ?
-      ORDER BY cr.last_message_at DESC
+      ORDER BY cr.${timeColumn(db, 'chat_rooms', 'last_message_at')} DESC
     `;
     
     const roomsStmt = db.prepare<[number, number, number, number, number], ChatRoomData>(sqlQuery);
@@ -1,6 +1,6 @@
 // src/app/api/comments/[commentId]/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, touchTimestamp } from '@/lib/db';
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils';
 
 interface RouteParams {
@@ -63,7 +63,7 @@ export async function PUT(request: NextRequest, context: { params: Promise<Route
 
     // 2. Update konten komentar
     const updateStmt = db.prepare(
-      'UPDATE comments SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND user_id = ?'
+      `UPDATE comments SET content = ?, ${touchTimestamp(db, 'comments')} WHERE id = ? AND user_id = ?`
     );
     const info = updateStmt.run(content, commentIdParsed, loggedInUserId);
 
@@ -1,6 +1,6 @@
 // src/app/api/feed/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth } from '@/lib/authUtils'; // Pastikan path ini benar
 
 // Tipe data untuk FeedPost (pastikan sesuai dengan yang Anda gunakan di frontend)
@@ -18,6 +18,10 @@ interface FeedPost {
   like_count: number;
   comment_count: number;
   is_liked_by_me: boolean;
+  image_feed_url: string | null;
+  image_width: number | null;
+  image_height: number | null;
+  image_placeholder: string | null;
 }
 
 export async function GET(request: NextRequest) {
@@ -66,20 +70,55 @@ export async function GET(request: NextRequest) {
     const limit = parseInt(request.nextUrl.searchParams.get('limit') || '10', 10);
     const offset = (page - 1) * limit;
 
-    // 6. Ambil postingan
-    const feedPostsStmt = db.prepare<unknown[], FeedPost>(`
-      SELECT
+    // 6. Kolom kartu post, dipakai feed kronologis maupun berperingkat
+    const postColumns = `
         p.id, p.content, p.image_url, p.video_url, p.created_at, p.updated_at,
         u.id as author_id, u.username as author_username,
         COALESCE(u.full_name, '') as author_full_name,
         u.profile_picture_url as author_profile_picture_url,
         (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id) as like_count,
         (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id) as comment_count,
-        EXISTS(SELECT 1 FROM likes l_me WHERE l_me.post_id = p.id AND l_me.user_id = ?) as is_liked_by_me
+        EXISTS(SELECT 1 FROM likes l_me WHERE l_me.post_id = p.id AND l_me.user_id = ?) as is_liked_by_me,
+        COALESCE(mv.url, p.image_url) as image_feed_url,
+        mi.width as image_width, mi.height as image_height, mi.placeholder as image_placeholder`;
+    // Varian gambar dari media_pipeline.py; jika belum diproses kartu tetap memakai file asli
+    const mediaJoins = `
+      LEFT JOIN media_urls mu ON mu.url = p.image_url
+      LEFT JOIN media mi ON mi.content_hash = mu.content_hash AND mi.status = 'READY'
+      LEFT JOIN media_variants mv ON mv.content_hash = mi.content_hash AND mv.variant = 'feed'`;
+
+    // 7. Feed berperingkat (?sort=ranked) dari cache yang diisi feed_ranking.py.
+    //    Cache bisa memuat post trending di luar teman, jadi blokir dan visibilitas dicek ulang saat dibaca.
+    //    Jika cache pengguna belum ada, jatuh ke urutan kronologis di bawah.
+    if (request.nextUrl.searchParams.get('sort') === 'ranked'
+        && db.prepare('SELECT 1 FROM ranked_feed WHERE user_id = ? LIMIT 1').get(loggedInUserId)) {
+      const rankedPostsStmt = db.prepare<unknown[], FeedPost>(`
+        SELECT ${postColumns}
+        FROM ranked_feed rf
+        JOIN posts p ON p.id = rf.post_id
+        JOIN users u ON p.user_id = u.id
+        ${mediaJoins}
+        WHERE rf.user_id = ?
+          AND (p.visibility_status IS NULL OR p.visibility_status = 'VISIBLE')
+          AND p.user_id NOT IN (SELECT blocked_user_id FROM user_blocks WHERE blocker_id = ?)
+          AND p.user_id NOT IN (SELECT blocker_id FROM user_blocks WHERE blocked_user_id = ?)
+        ORDER BY rf.rank
+        LIMIT ? OFFSET ?
+      `);
+      const rankedPosts = rankedPostsStmt.all(
+        loggedInUserId, loggedInUserId, loggedInUserId, loggedInUserId, limit, offset
+      );
+      return NextResponse.json(rankedPosts, { status: 200 });
+    }
+
+    // 8. Ambil postingan (kronologis)
+    const feedPostsStmt = db.prepare<unknown[], FeedPost>(`
+      SELECT ${postColumns}
       FROM posts p
       JOIN users u ON p.user_id = u.id
+      ${mediaJoins}
       WHERE p.user_id IN (${placeholders})
-      ORDER BY p.created_at DESC
+      ORDER BY p.${timeColumn(db, 'posts')} DESC
       LIMIT ? OFFSET ?
     `);
 
@@ -1,6 +1,6 @@
 // src/app/api/friend-requests/[requestId]/accept/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db'; // Pastikan path ini benar
+import { getDbConnection, touchTimestamp } from '@/lib/db'; // Pastikan path ini benar
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils'; // Pastikan path ini benar
 
 interface RouteParams {
@@ -69,7 +69,7 @@ export async function PUT(request: NextRequest, context: { params: Promise<Route
 
     // 4. Update status permintaan menjadi 'ACCEPTED'
     const updateStmt = db.prepare(
-      "UPDATE friendships SET status = 'ACCEPTED', updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+      `UPDATE friendships SET status = 'ACCEPTED', ${touchTimestamp(db, 'friendships')} WHERE id = ?`
     );
     const info = updateStmt.run(requestIdParsed);
 
@@ -1,6 +1,6 @@
 // src/app/api/notifications/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils';
 
 // Tipe data untuk notifikasi yang dikembalikan ke klien
@@ -51,7 +51,7 @@ export async function GET(request: NextRequest) {
       FROM notifications n
       LEFT JOIN users u_actor ON n.actor_user_id = u_actor.id -- LEFT JOIN karena actor_user_id bisa NULL
       WHERE n.recipient_user_id = ?
-      ORDER BY n.is_read ASC, n.created_at DESC
+      ORDER BY n.is_read ASC, n.${timeColumn(db, 'notifications')} DESC
       LIMIT ? OFFSET ?
     `);
 
@@ -24,6 +24,8 @@ interface CommentWithAuthor {
   updated_at: string;
   author_username: string;
   author_profile_picture_url: string | null;
+  depth?: number;
+  reply_count?: number;
 }
 
 // Fungsi helper untuk membuat notifikasi
@@ -58,7 +60,7 @@ async function createNotification(db: sqlite3.Database, params: {
 // Fungsi helper untuk cek blokir
 function checkBlockStatus(db: sqlite3.Database, userId1: number, userId2: number): boolean {
   const blockCheckStmt = db.prepare(`
-    SELECT id FROM user_blocks
+    SELECT 1 FROM user_blocks
     WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?)
   `);
   const block = blockCheckStmt.get(userId1, userId2, userId2, userId1);
@@ -135,7 +137,7 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
     }
 
     const insertCommentStmt = db.prepare(
-      'INSERT INTO comments (user_id, post_id, parent_comment_id, content, created_at, updated_at) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)'
+      'INSERT INTO comments (user_id, post_id, parent_comment_id, content) VALUES (?, ?, ?, ?)'
     );
     const info = insertCommentStmt.run(commenterId, postIdNum, parentCommentId || null, commentContent);
 
@@ -214,6 +216,7 @@ export async function GET(request: NextRequest, context: { params: Promise<Route
 
     let commentsQuery = `
       SELECT c.id, c.post_id, c.user_id, c.parent_comment_id, c.content, c.created_at, c.updated_at,
+             c.depth, c.reply_count,
              u.username as author_username, COALESCE(u.profile_picture_url, '') as author_profile_picture_url
       FROM comments c JOIN users u ON c.user_id = u.id
       WHERE c.post_id = ? `;
@@ -225,7 +228,8 @@ export async function GET(request: NextRequest, context: { params: Promise<Route
             AND c.user_id NOT IN (SELECT blocker_id FROM user_blocks WHERE blocked_user_id = ?) `;
       queryParams.push(currentUserId, currentUserId);
     }
-    commentsQuery += ` ORDER BY c.created_at ASC`;
+    // Urutan thread (induk lalu balasannya) langsung dari indeks (post_id, path)
+    commentsQuery += ` ORDER BY c.path ASC`;
 
     const commentsStmt = db.prepare(commentsQuery);
     const comments = commentsStmt.all(...queryParams) as CommentWithAuthor[];
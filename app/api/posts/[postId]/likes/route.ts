@@ -33,7 +33,7 @@ async function createNotification(db: ReturnType<typeof getDbConnection>, params
 // Fungsi helper untuk cek blokir (jika belum diimpor, definisikan atau impor)
 function checkBlockStatus(db: ReturnType<typeof getDbConnection>, userId1: number, userId2: number): boolean {
   const blockCheckStmt = db.prepare(`
-    SELECT id FROM user_blocks
+    SELECT 1 FROM user_blocks
     WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?)
   `);
   const block = blockCheckStmt.get(userId1, userId2, userId2, userId1);
@@ -90,7 +90,7 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
     }
 
     // 3. Cek apakah pengguna sudah menyukai postingan ini sebelumnya
-    const likeCheckStmt = db.prepare('SELECT id FROM likes WHERE user_id = ? AND post_id = ?');
+    const likeCheckStmt = db.prepare('SELECT 1 FROM likes WHERE user_id = ? AND post_id = ?');
     const existingLike = likeCheckStmt.get(interactorId, postIdInt);
 
     if (existingLike) {
@@ -98,11 +98,10 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
     }
 
     // 4. Tambahkan like ke database
-    const insertLikeStmt = db.prepare('INSERT INTO likes (user_id, post_id, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)');
+    const insertLikeStmt = db.prepare('INSERT INTO likes (user_id, post_id) VALUES (?, ?)');
     const info = insertLikeStmt.run(interactorId, postIdInt);
 
     if (info.changes > 0) {
-      const likeId = info.lastInsertRowid as number;
       // Hitung jumlah total like untuk postingan ini
       const countStmt = db.prepare('SELECT COUNT(*) as likeCount FROM likes WHERE post_id = ?');
       const result = countStmt.get(postIdInt) as { likeCount: number };
@@ -123,7 +122,6 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
 
       return NextResponse.json({ 
         message: 'Postingan berhasil disukai', 
-        likeId: likeId, 
         totalLikes: result ? result.likeCount : 0 
       }, { status: 201 });
     } else {
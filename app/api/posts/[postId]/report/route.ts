@@ -1,6 +1,6 @@
 // src/app/api/posts/[postId]/report/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db'; // Pastikan path ini benar
+import { getDbConnection, touchTimestamp } from '@/lib/db'; // Pastikan path ini benar
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils'; // Pastikan path ini benar
 
 interface RouteParams {
@@ -68,7 +68,7 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
 
     try {
       // 3. Cek apakah pengguna sudah pernah melaporkan postingan ini
-      const existingReportStmt = db.prepare('SELECT id FROM post_reports WHERE post_id = ? AND reporter_user_id = ?');
+      const existingReportStmt = db.prepare('SELECT 1 FROM post_reports WHERE post_id = ? AND reporter_user_id = ?');
       const existingReport = existingReportStmt.get(postId, reporterUserId);
 
       if (existingReport) {
@@ -92,7 +92,7 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
       // 6. Jika jumlah laporan mencapai batas, sembunyikan postingan
       let postHidden = false;
       if (currentReportCount >= MAX_REPORTS_TO_HIDE) {
-        const hidePostStmt = db.prepare("UPDATE posts SET visibility_status = 'HIDDEN_BY_REPORTS', updated_at = CURRENT_TIMESTAMP WHERE id = ? AND visibility_status = 'VISIBLE'");
+        const hidePostStmt = db.prepare(`UPDATE posts SET visibility_status = 'HIDDEN_BY_REPORTS', ${touchTimestamp(db, 'posts')} WHERE id = ? AND visibility_status = 'VISIBLE'`);
         const hideInfo = hidePostStmt.run(postId);
         if (hideInfo.changes > 0) {
             console.log(`Post ID ${postId} disembunyikan karena mencapai ${MAX_REPORTS_TO_HIDE} laporan.`);
@@ -1,7 +1,7 @@
 // src/app/api/posts/[postId]/route.ts
 
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, touchTimestamp } from '@/lib/db';
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils'; // Pastikan AuthenticatedUserPayload diimpor jika digunakan
 
 // Interface untuk parameter dinamis dari URL
@@ -75,7 +75,7 @@ export async function GET(request: NextRequest, context: { params: Promise<Route
     // Pengecekan blokir antara viewer dan author post
     if (loggedInUserId && postDetail.author_id !== loggedInUserId) {
         const blockCheckStmt = db.prepare(`
-            SELECT id FROM user_blocks
+            SELECT 1 FROM user_blocks
             WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?)
         `);
         const blockExists = blockCheckStmt.get(loggedInUserId, postDetail.author_id, postDetail.author_id, loggedInUserId);
@@ -153,7 +153,7 @@ export async function PUT(request: NextRequest, context: { params: Promise<Route
     updateParams.push(postIdInt); 
     updateParams.push(loggedInUserId); 
 
-    const updateQuery = `UPDATE posts SET ${setClauses}, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND user_id = ?`;
+    const updateQuery = `UPDATE posts SET ${setClauses}, ${touchTimestamp(db, 'posts')} WHERE id = ? AND user_id = ?`;
     const updateStmt = db.prepare(updateQuery);
     const info = updateStmt.run(...updateParams);
 
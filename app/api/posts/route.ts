@@ -1,6 +1,6 @@
 // src/app/api/posts/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, getReadDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils';
 import fs from 'fs/promises';
 import path from 'path';
@@ -140,7 +140,7 @@ export async function POST(request: NextRequest) {
     
     // Pastikan visibility_status ada di tabel posts Anda
      const insertStmt = db.prepare(
-      "INSERT INTO posts (user_id, content, image_url, video_url, created_at, updated_at, visibility_status) VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 'VISIBLE')" // Perhatikan 'VISIBLE' dengan kutip tunggal
+      "INSERT INTO posts (user_id, content, image_url, video_url, visibility_status) VALUES (?, ?, ?, ?, 'VISIBLE')" // Perhatikan 'VISIBLE' dengan kutip tunggal
     );
     const info = insertStmt.run(userId, postContent, imageUrl, videoUrl);
 
@@ -203,7 +203,7 @@ export async function GET(request: NextRequest) {
   try {
     await request.text(); 
 
-    const db = getDbConnection();
+    const db = getReadDbConnection();
     const loggedInUser = verifyAuth(request);
     const loggedInUserId = loggedInUser ? loggedInUser.userId : null;
     const page = parseInt(request.nextUrl.searchParams.get('page') || '1', 10);
@@ -239,7 +239,7 @@ export async function GET(request: NextRequest) {
 
     postsQuery += " WHERE " + whereClauses.join(" AND ");
     
-    postsQuery += ` ORDER BY p.created_at DESC LIMIT ? OFFSET ?`;
+    postsQuery += ` ORDER BY p.${timeColumn(db, 'posts')} DESC LIMIT ? OFFSET ?`;
     queryParams.push(limit, offset);
 
     const postsStmt = db.prepare(postsQuery);
@@ -1,6 +1,6 @@
 // src/app/api/posts/trending/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db'; // Pastikan path ini benar
+import { getReadDbConnection, timeColumn } from '@/lib/db'; // Pastikan path ini benar
 import { verifyAuth } from '@/lib/authUtils'; // Untuk is_liked_by_me dan filter blokir
 
 // Tipe data untuk respons (mirip FeedPost atau PostData)
@@ -32,7 +32,7 @@ export async function GET(request: NextRequest) {
     // "Selesaikan" request sebelum mengakses searchParams (best practice Next.js baru)
     await request.text();
 
-    const db = getDbConnection();
+    const db = getReadDbConnection();
     const loggedInUser = verifyAuth(request);
     const loggedInUserId = loggedInUser ? loggedInUser.userId : null;
 
@@ -77,7 +77,7 @@ export async function GET(request: NextRequest) {
       trendingQuery += " WHERE " + whereClauses.join(" AND ");
     }
 
-    trendingQuery += ` ORDER BY trending_score DESC, p.created_at DESC LIMIT ? OFFSET ?`;
+    trendingQuery += ` ORDER BY trending_score DESC, p.${timeColumn(db, 'posts')} DESC LIMIT ? OFFSET ?`;
     queryParams.push(limit, offset);
 
     const trendingPostsStmt = db.prepare(trendingQuery);
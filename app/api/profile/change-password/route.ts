@@ -1,6 +1,6 @@
 // src/app/api/profile/change-password/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db'; // Pastikan path ini benar
+import { getDbConnection, touchTimestamp } from '@/lib/db'; // Pastikan path ini benar
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils'; // Pastikan path ini benar
 import bcrypt from 'bcryptjs';
 
@@ -69,7 +69,7 @@ export async function PUT(request: NextRequest) {
 
     // 5. Update password_hash di database
     const updateStmt = db.prepare(
-      'UPDATE users SET password_hash = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?'
+      `UPDATE users SET password_hash = ?, ${touchTimestamp(db, 'users')} WHERE id = ?`
     );
     const info = updateStmt.run(newPasswordHash, loggedInUserId);
 
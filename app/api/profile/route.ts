@@ -1,6 +1,6 @@
 // src/app/api/profile/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getDbConnection, touchTimestamp } from '@/lib/db';
 import { verifyAuth } from '@/lib/authUtils';
 import fs from 'fs/promises'; // Untuk operasi file system
 import path from 'path';   // Untuk manipulasi path
@@ -128,7 +128,7 @@ export async function PUT(request: NextRequest) {
 
     paramsForUpdateQuery.push(loggedInUserId); // Untuk klausa WHERE
 
-    const updateQuery = `UPDATE users SET ${setClauses}, updated_at = CURRENT_TIMESTAMP WHERE id = ?`;
+    const updateQuery = `UPDATE users SET ${setClauses}, ${touchTimestamp(db, 'users')} WHERE id = ?`;
     const updateStmt = db.prepare(updateQuery);
     const info = updateStmt.run(...paramsForUpdateQuery);
 
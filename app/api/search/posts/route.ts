@@ -1,6 +1,6 @@
 // src/app/api/search/posts/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getReadDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth, AuthenticatedUserPayload } from '@/lib/authUtils';
 
 // Menggunakan kembali atau mendefinisikan ulang tipe FeedPost (atau SearchResultPost)
@@ -28,7 +28,7 @@ export async function GET(request: NextRequest) {
       return NextResponse.json({ message: 'Query pencarian minimal 2 karakter.' }, { status: 400 });
     }
 
-    const db = getDbConnection();
+    const db = getReadDbConnection();
     const loggedInUser = verifyAuth(request);
     const loggedInUserId = loggedInUser ? loggedInUser.userId : null;
 
@@ -76,7 +76,7 @@ export async function GET(request: NextRequest) {
       queryParams.push(loggedInUserId);
     }
 
-    baseQuery += ` ORDER BY p.created_at DESC LIMIT ? OFFSET ?;`;
+    baseQuery += ` ORDER BY p.${timeColumn(db, 'posts')} DESC LIMIT ? OFFSET ?;`;
     queryParams.push(limit, offset);
 
     const searchStmt = db.prepare(baseQuery);
@@ -1,6 +1,6 @@
 // src/app/api/search/users/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db'; // Pastikan path ini benar
+import { getReadDbConnection } from '@/lib/db'; // Pastikan path ini benar
 import { verifyAuth } from '@/lib/authUtils'; // Untuk konteks pengguna yang login (filter blokir)
 
 // Tipe data untuk hasil pencarian pengguna
@@ -23,7 +23,7 @@ export async function GET(request: NextRequest) {
       return NextResponse.json({ message: 'Query pencarian minimal 2 karakter.' }, { status: 400 });
     }
 
-    const db = getDbConnection();
+    const db = getReadDbConnection();
     const loggedInUser = verifyAuth(request); // Dapatkan info pengguna yang login
     const loggedInUserId = loggedInUser ? loggedInUser.userId : null;
 
@@ -46,7 +46,7 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
     }
 
     // 2. Cek apakah sudah ada blokir sebelumnya
-    const existingBlockStmt = db.prepare('SELECT id FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
+    const existingBlockStmt = db.prepare('SELECT 1 FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
     const existingBlock = existingBlockStmt.get(blockerId, blockedUserId);
 
     if (existingBlock) {
@@ -83,8 +83,7 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
 
             db.exec('COMMIT');
             return NextResponse.json({
-                message: 'Pengguna berhasil diblokir',
-                blockId: info.lastInsertRowid
+                message: 'Pengguna berhasil diblokir'
             }, { status: 201 }); // 201 Created
         } else {
             db.exec('ROLLBACK');
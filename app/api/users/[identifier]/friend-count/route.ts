@@ -12,30 +12,23 @@ export async function GET(request: NextRequest, context: { params: Promise<Route
     await request.text(); // "Selesaikan" request sebelum mengakses params
 
     const identifier = params.identifier;
-    let userIdToQuery: number | null = null;
     const db = getDbConnection();
 
+    // friend_count dijaga oleh trigger pada friendships, jadi cukup satu pembacaan baris users
+    let result: { friendCount: number } | undefined;
     if (!isNaN(parseInt(identifier, 10))) {
-      userIdToQuery = parseInt(identifier, 10);
+      const stmt = db.prepare('SELECT friend_count as friendCount FROM users WHERE id = ?');
+      result = stmt.get(parseInt(identifier, 10)) as { friendCount: number } | undefined;
     } else {
-      const userStmt = db.prepare('SELECT id FROM users WHERE LOWER(username) = LOWER(?)');
-      const user = userStmt.get(identifier) as { id: number } | undefined;
-      if (user) {
-        userIdToQuery = user.id;
-      }
+      const stmt = db.prepare('SELECT friend_count as friendCount FROM users WHERE LOWER(username) = LOWER(?)');
+      result = stmt.get(identifier) as { friendCount: number } | undefined;
     }
 
-    if (userIdToQuery === null) {
+    if (!result) {
       return NextResponse.json({ message: 'Pengguna tidak ditemukan dari identifier' }, { status: 404 });
     }
 
-    const stmt = db.prepare(`
-      SELECT COUNT(*) as friendCount
-      FROM friendships
-      WHERE (sender_id = ? OR receiver_id = ?) AND status = 'ACCEPTED'
-    `);
-    const result = stmt.get(userIdToQuery, userIdToQuery) as { friendCount: number } | undefined;
-    const friendCount = result ? result.friendCount : 0;
+    const friendCount = result.friendCount ?? 0;
 
     return NextResponse.json({ friendCount }, { status: 200 });
 
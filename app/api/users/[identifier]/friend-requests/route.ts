@@ -90,11 +90,11 @@ export async function POST(request: NextRequest, context: { params: Promise<Rout
       return NextResponse.json({ message: 'Anda tidak bisa mengirim permintaan pertemanan ke diri sendiri' }, { status: 400 });
     }
     
-    const senderBlockedReceiverStmt = db.prepare('SELECT id FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
+    const senderBlockedReceiverStmt = db.prepare('SELECT 1 FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
     if (senderBlockedReceiverStmt.get(senderId, receiverId)) {
       return NextResponse.json({ message: 'Anda tidak dapat mengirim permintaan pertemanan kepada pengguna yang telah Anda blokir.' }, { status: 403 });
     }
-    const receiverBlockedSenderStmt = db.prepare('SELECT id FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
+    const receiverBlockedSenderStmt = db.prepare('SELECT 1 FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
     if (receiverBlockedSenderStmt.get(receiverId, senderId)) {
       return NextResponse.json({ message: 'Pengguna ini tidak menerima permintaan pertemanan dari Anda.' }, { status: 403 });
     }
@@ -1,6 +1,6 @@
 // src/app/api/users/[identifier]/route.ts
 import { NextResponse, NextRequest } from 'next/server';
-import { getDbConnection } from '@/lib/db';
+import { getReadDbConnection, timeColumn } from '@/lib/db';
 import { verifyAuth } from '@/lib/authUtils';
 
 // Interface untuk respons API
@@ -11,6 +11,8 @@ interface UserProfileAPIResponse {
   profile_picture_url: string | null;
   bio: string | null;
   created_at: string;
+  friend_count: number;
+  post_count: number;
   posts: PostForProfileAPI[];
   friendship_status?: 'NOT_FRIENDS' | 'FRIENDS' | 'PENDING_SENT_BY_VIEWER' | 'PENDING_RECEIVED_BY_VIEWER' | 'SELF' | 'BLOCKED_BY_PROFILE_USER' | 'PROFILE_USER_BLOCKED_BY_VIEWER';
   friendship_id?: number | null;
@@ -24,6 +26,8 @@ interface UserDbRecord {
   profile_picture_url: string | null;
   bio: string | null;
   created_at: string;
+  friend_count: number;
+  post_count: number;
 }
 
 // Interface untuk data postingan
@@ -49,7 +53,7 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ide
     // =============================================
 
     const identifier = params.identifier;
-    const db = getDbConnection();
+    const db = getReadDbConnection();
     const viewingUser = verifyAuth(request);
     const viewingUserId = viewingUser ? viewingUser.userId : null;
 
@@ -57,10 +61,10 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ide
     let queryParam: string | number = '';
 
     if (!isNaN(parseInt(identifier, 10))) {
-      userQuery = 'SELECT id, username, COALESCE(full_name, NULL) as full_name, profile_picture_url, COALESCE(bio, NULL) as bio, created_at FROM users WHERE id = ?';
+      userQuery = 'SELECT id, username, COALESCE(full_name, NULL) as full_name, profile_picture_url, COALESCE(bio, NULL) as bio, created_at, friend_count, post_count FROM users WHERE id = ?';
       queryParam = parseInt(identifier, 10);
     } else {
-      userQuery = 'SELECT id, username, COALESCE(full_name, NULL) as full_name, profile_picture_url, COALESCE(bio, NULL) as bio, created_at FROM users WHERE LOWER(username) = LOWER(?)';
+      userQuery = 'SELECT id, username, COALESCE(full_name, NULL) as full_name, profile_picture_url, COALESCE(bio, NULL) as bio, created_at, friend_count, post_count FROM users WHERE LOWER(username) = LOWER(?)';
       queryParam = identifier;
     }
 
@@ -74,7 +78,7 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ide
     // Pengecekan blokir DUA ARAH
     if (viewingUserId && viewingUserId !== user.id) {
         const blockCheckStmt = db.prepare(
-            `SELECT id FROM user_blocks WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?)`
+            `SELECT 1 FROM user_blocks WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?)`
         );
         const blockExists = blockCheckStmt.get(viewingUserId, user.id, user.id, viewingUserId);
         if (blockExists) {
@@ -95,7 +99,7 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ide
         ${viewingUserId ? ", EXISTS(SELECT 1 FROM likes WHERE post_id = p.id AND user_id = ?)" : ", FALSE"} as is_liked_by_me
       FROM posts p
       WHERE p.user_id = ?
-      ORDER BY p.created_at DESC
+      ORDER BY p.${timeColumn(db, 'posts')} DESC
       LIMIT 20`
     );
 
@@ -114,6 +118,8 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ide
       profile_picture_url: user.profile_picture_url,
       bio: user.bio,
       created_at: user.created_at,
+      friend_count: user.friend_count ?? 0,
+      post_count: user.post_count ?? 0,
       posts: userPosts,
       // friendship_status dan friendship_id akan diisi di bawah
     };
@@ -121,7 +127,7 @@ export async function GET(request: NextRequest, context: { params: Promise<{ ide
     // Logika untuk status pertemanan
     if (viewingUserId && viewingUserId !== user.id) {
       // Cek dulu apakah viewer memblokir pemilik profil
-      const viewerBlockedProfileStmt = db.prepare('SELECT id FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
+      const viewerBlockedProfileStmt = db.prepare('SELECT 1 FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
       if (viewerBlockedProfileStmt.get(viewingUserId, user.id)) {
          responseData.friendship_status = 'PROFILE_USER_BLOCKED_BY_VIEWER';
          responseData.friendship_id = null;
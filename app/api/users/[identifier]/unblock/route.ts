@@ -46,17 +46,17 @@ export async function DELETE(request: NextRequest, context: { params: Promise<Ro
 
     // 1. Cari entri blokir di database
     const findBlockStmt = db.prepare(
-      'SELECT id FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?'
+      'SELECT 1 FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?'
     );
-    const existingBlock = findBlockStmt.get(blockerId, blockedUserId) as { id: number } | undefined;
+    const existingBlock = findBlockStmt.get(blockerId, blockedUserId);
 
     if (!existingBlock) {
       return NextResponse.json({ message: 'Pengguna ini tidak Anda blokir atau blokir tidak ditemukan' }, { status: 404 });
     }
 
     // 2. Hapus entri blokir dari database
-    const deleteBlockStmt = db.prepare('DELETE FROM user_blocks WHERE id = ?');
-    const info = deleteBlockStmt.run(existingBlock.id);
+    const deleteBlockStmt = db.prepare('DELETE FROM user_blocks WHERE blocker_id = ? AND blocked_user_id = ?');
+    const info = deleteBlockStmt.run(blockerId, blockedUserId);
 
     if (info.changes > 0) {
       return NextResponse.json({ message: 'Blokir pengguna berhasil dicabut' }, { status: 200 });
@@ -4,10 +4,138 @@
 
 import sqlite3
 import os
+import re
 
 # Nama file database SQLite
 DB_FILE = "social_media_app.db"
 
+# Tabel yang perubahannya dicatat ke changelog (CDC):
+# nama tabel -> (kolom kunci yang disimpan di payload, kolom yang perubahannya dicatat saat UPDATE).
+# updated_at dan kolom pembukuan (path, reply_count, dll.) sengaja tidak dicatat agar
+# satu perubahan tidak menghasilkan beberapa baris changelog.
+CHANGELOG_TABLES = {
+    "users": (("username",), ("username", "full_name", "profile_picture_url")),
+    "posts": (("user_id", "visibility_status"),
+              ("content", "image_url", "video_url", "is_live", "live_status", "stream_playback_url", "visibility_status")),
+    "likes": (("user_id", "post_id"), ("user_id", "post_id")),
+    "comments": (("post_id", "user_id", "parent_comment_id"), ("content",)),
+    "friendships": (("sender_id", "receiver_id", "status"), ("status",)),
+    "user_blocks": (("blocker_id", "blocked_user_id"), ("blocker_id", "blocked_user_id")),
+    "chat_messages": (("chat_room_id", "sender_id"), ("message_content", "attachment_url", "attachment_type"))
+}
+
+# Tata letak ringkas (dimigrasikan oleh compact_tables.py): tabel penghubung menjadi WITHOUT ROWID dengan
+# primary key pasangan alaminya (kolom id dibuang) -> (primary key, indeks yang menjadi redundan karenanya).
+WITHOUT_ROWID_TABLES = {
+    "likes": (("post_id", "user_id"), ("idx_likes_post_id",)),
+    "user_blocks": (("blocker_id", "blocked_user_id"), ("idx_user_blocks_blocker_id",)),
+    "post_reports": (("post_id", "reporter_user_id"), ("idx_post_reports_post_id",))
+}
+# Tabel append-heavy yang id-nya boleh dipakai ulang setelah baris terakhir dihapus (tanpa AUTOINCREMENT)
+NO_AUTOINCREMENT_TABLES = ("notifications", "chat_messages")
+
+def changelog_triggers_sql(without_rowid=()):
+    """ Membuat definisi trigger AFTER INSERT/UPDATE/DELETE yang menulis ke tabel changelog.
+    Args:
+        without_rowid (set): Tabel yang sudah WITHOUT ROWID (tanpa kolom id); row_id diisi kolom pertama
+            primary key-nya, kunci lengkapnya tetap ada di data.
+    Returns:
+        list: String SQL CREATE TRIGGER untuk setiap tabel di CHANGELOG_TABLES.
+    """
+    triggers = []
+    for table, (key_columns, update_columns) in CHANGELOG_TABLES.items():
+        id_column = WITHOUT_ROWID_TABLES[table][0][0] if table in without_rowid else "id"
+        for op, event, row in (("I", "INSERT", "NEW"), ("U", "UPDATE OF " + ", ".join(update_columns), "NEW"), ("D", "DELETE", "OLD")):
+            payload = ", ".join(f"'{column}', {row}.{column}" for column in key_columns)
+            triggers.append(f"""CREATE TRIGGER IF NOT EXISTS changelog_{table}_{op.lower()}
+           AFTER {event} ON {table} FOR EACH ROW BEGIN
+           INSERT INTO changelog (table_name, op, row_id, data)
+           VALUES ('{table}', '{op}', {row}.{id_column}, json_object({payload})); END;""")
+    return triggers
+
+def without_rowid_tables(cursor):
+    """ Tabel di WITHOUT_ROWID_TABLES yang sudah memakai tata letak ringkas (tidak punya kolom id).
+    Args:
+        cursor (sqlite3.Cursor): Cursor database.
+    Returns:
+        set: Nama tabel.
+    """
+    compacted = set()
+    for table in WITHOUT_ROWID_TABLES:
+        columns = [info[1] for info in cursor.execute(f"PRAGMA table_info({table});")]
+        if columns and "id" not in columns:
+            compacted.add(table)
+    return compacted
+
+# Skema timestamp epoch (dimigrasikan oleh epoch_timestamps.py): setiap kolom di bawah disimpan sebagai
+# <kolom>_ms INTEGER (Unix epoch milidetik) dan kolom lamanya tetap ada sebagai generated column VIRTUAL
+# berformat sama dengan CURRENT_TIMESTAMP, sehingga query yang membaca created_at/updated_at tidak berubah.
+# Urutan tabel = urutan migrasi (chat_messages sebelum chat_rooms, lihat trigger last_message_at).
+EPOCH_MS_COLUMNS = {
+    "users": ("created_at", "updated_at"),
+    "friendships": ("created_at", "updated_at"),
+    "posts": ("created_at", "updated_at"),
+    "likes": ("created_at",),
+    "comments": ("created_at", "updated_at"),
+    "shares": ("created_at",),
+    "user_blocks": ("created_at",),
+    "post_reports": ("created_at",),
+    "notifications": ("created_at",),
+    "chat_messages": ("created_at",),
+    "chat_rooms": ("created_at", "last_message_at")
+}
+
+def epoch_ms_expr(value):
+    """ Ekspresi SQL yang mengubah timestamp (teks atau 'now') menjadi epoch milidetik.
+    Args:
+        value (str): Ekspresi SQL timestamp, mis. "NEW.created_at" atau "'now'".
+    Returns:
+        str: Ekspresi SQL INTEGER (NULL jika value NULL).
+    """
+    return f"CAST(round((julianday({value}) - 2440587.5) * 86400000) AS INTEGER)"
+
+NOW_MS_SQL = epoch_ms_expr("'now'")
+
+def epoch_ms_tables(cursor):
+    """ Tabel di EPOCH_MS_COLUMNS yang sudah memakai skema timestamp epoch.
+    Args:
+        cursor (sqlite3.Cursor): Cursor database.
+    Returns:
+        set: Nama tabel yang punya kolom <kolom>_ms.
+    """
+    converted = set()
+    for table, columns in EPOCH_MS_COLUMNS.items():
+        if any(info[1] == f"{columns[0]}_ms" for info in cursor.execute(f"PRAGMA table_info({table});")):
+            converted.add(table)
+    return converted
+
+def epoch_ms_sql(sql, converted):
+    """ Menyesuaikan definisi trigger/indeks dengan tabel yang sudah memakai timestamp epoch:
+        indeks memakai kolom <kolom>_ms dan trigger menulis ke <kolom>_ms (generated column tidak bisa ditulis).
+    Args:
+        sql (str): CREATE TRIGGER atau CREATE INDEX.
+        converted (set): Hasil epoch_ms_tables().
+    Returns:
+        str: SQL yang sudah disesuaikan (sama persis jika tidak ada yang perlu diubah).
+    """
+    index_match = re.match(r"\s*CREATE\s+(?:UNIQUE\s+)?INDEX\b.*?\bON\s+\"?(\w+)\"?\s*\(", sql, re.IGNORECASE | re.DOTALL)
+    if index_match:
+        table = index_match.group(1)
+        if table in converted:
+            for column in EPOCH_MS_COLUMNS[table]:
+                sql = re.sub(rf"\b{column}\b", f"{column}_ms", sql)
+        return sql
+    for table in converted:
+        for column in EPOCH_MS_COLUMNS[table]:
+            sql = sql.replace(f"UPDATE {table} SET {column} = CURRENT_TIMESTAMP",
+                              f"UPDATE {table} SET {column}_ms = {NOW_MS_SQL}")
+            sql = sql.replace(f"WHEN NEW.{column} IS OLD.{column}", f"WHEN NEW.{column}_ms IS OLD.{column}_ms")
+    if "chat_rooms" in converted:
+        source = "NEW.created_at_ms" if "chat_messages" in converted else epoch_ms_expr("NEW.created_at")
+        sql = sql.replace("UPDATE chat_rooms SET last_message_at = NEW.created_at",
+                          f"UPDATE chat_rooms SET last_message_at_ms = {source}")
+    return sql
+
 def create_connection(db_file):
     """ Membuat koneksi ke database SQLite.
         Akan membuat file database jika belum ada.
@@ -25,6 +153,21 @@ def create_connection(db_file):
         print(f"Error saat menghubungkan ke database: {e}")
     return conn
 
+def add_column_if_not_exists(cursor, table, column, definition):
+    """ Menambahkan kolom ke tabel yang sudah ada jika kolom tersebut belum ada.
+        Dipakai agar database lama ikut mendapatkan kolom baru tanpa dibuat ulang.
+    Args:
+        cursor (sqlite3.Cursor): Cursor database.
+        table (str): Nama tabel.
+        column (str): Nama kolom.
+        definition (str): Tipe dan default kolom, mis. "INTEGER DEFAULT 0".
+    """
+    cursor.execute(f"PRAGMA table_info({table});")
+    columns = [info[1] for info in cursor.fetchall()]
+    if column not in columns:
+        print(f"Menambahkan kolom '{column}' ke tabel '{table}'...")
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+
 def create_tables(conn):
     """ Membuat tabel-tabel yang dibutuhkan dalam database.
     Args:
@@ -48,7 +191,10 @@ def create_tables(conn):
         profile_picture_url TEXT,
         bio TEXT,
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        friend_count INTEGER DEFAULT 0,           -- Pertemanan ACCEPTED (dijaga trigger)
+        post_count INTEGER DEFAULT 0,             -- Jumlah postingan (dijaga trigger)
+        pending_request_count INTEGER DEFAULT 0   -- Permintaan pertemanan PENDING yang diterima (dijaga trigger)
     );
     """
 
@@ -104,6 +250,9 @@ def create_tables(conn):
         content TEXT NOT NULL,
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
         updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        path TEXT,                           -- Materialized path, mis. '0000000012/0000000045/' (diisi trigger)
+        depth INTEGER DEFAULT 0,             -- Kedalaman balasan (0 = komentar utama)
+        reply_count INTEGER DEFAULT 0,       -- Jumlah balasan langsung (dijaga trigger)
         FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
         FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE,
         FOREIGN KEY (parent_comment_id) REFERENCES comments(id) ON DELETE CASCADE
@@ -191,28 +340,250 @@ def create_tables(conn):
     );
     """
 
+    # Sesi live stream (satu per postingan live); viewer_count di-flush berkala oleh live_viewers.py
+    sql_create_live_sessions_table = """
+    CREATE TABLE IF NOT EXISTS live_sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        post_id INTEGER NOT NULL UNIQUE,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL CHECK(status IN ('PENDING', 'LIVE', 'ENDED')) DEFAULT 'PENDING',
+        stream_playback_url TEXT,
+        viewer_count INTEGER DEFAULT 0,
+        peak_viewer_count INTEGER DEFAULT 0,
+        viewer_count_updated_at DATETIME,
+        started_at DATETIME,
+        ended_at DATETIME,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    );
+    """
+
+    # Hasil batch "orang yang mungkin Anda kenal" (diisi oleh friend_suggestions.py)
+    sql_create_friend_suggestions_table = """
+    CREATE TABLE IF NOT EXISTS friend_suggestions (
+        user_id INTEGER NOT NULL,
+        suggested_user_id INTEGER NOT NULL,
+        mutual_count INTEGER NOT NULL,
+        computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, suggested_user_id),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (suggested_user_id) REFERENCES users(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """
+
+    # Indeks near-duplicate post (diisi oleh near_duplicates.py): signature MinHash per post
+    # dan bucket LSH per band; post yang berbagi bucket di salah satu band adalah kandidat duplikat.
+    sql_create_post_minhash_table = """
+    CREATE TABLE IF NOT EXISTS post_minhash (
+        post_id INTEGER PRIMARY KEY,
+        signature BLOB NOT NULL,             -- uint32 little-endian x jumlah permutasi
+        indexed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+    );
+    """
+
+    sql_create_post_lsh_buckets_table = """
+    CREATE TABLE IF NOT EXISTS post_lsh_buckets (
+        band INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,             -- hash 64-bit baris signature di band ini
+        post_id INTEGER NOT NULL,
+        PRIMARY KEY (band, bucket, post_id),
+        FOREIGN KEY (post_id) REFERENCES post_minhash(post_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """
+
+    # Halaman feed berperingkat per pengguna (diisi oleh feed_ranking.py); dibaca /api/feed?sort=ranked
+    sql_create_ranked_feed_table = """
+    CREATE TABLE IF NOT EXISTS ranked_feed (
+        user_id INTEGER NOT NULL,
+        rank INTEGER NOT NULL,               -- 0 = paling atas
+        post_id INTEGER NOT NULL,
+        score REAL NOT NULL,
+        computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, rank),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (post_id) REFERENCES posts(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """
+
+    # Rollup aktivitas harian per pengguna (dipelihara user_daily_stats.py dari changelog): statistik profil
+    # dan dashboard membaca paling banyak satu baris per hari, bukan mengagregasi posts/likes/chat_messages.
+    sql_create_user_daily_stats_table = """
+    CREATE TABLE IF NOT EXISTS user_daily_stats (
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,                   -- 'YYYY-MM-DD' (UTC, sama dengan CURRENT_TIMESTAMP)
+        posts INTEGER NOT NULL DEFAULT 0,
+        likes_given INTEGER NOT NULL DEFAULT 0,
+        likes_received INTEGER NOT NULL DEFAULT 0,
+        comments INTEGER NOT NULL DEFAULT 0,
+        messages INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day),
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """
+
+    # Metadata gambar unggahan (diisi oleh media_pipeline.py). Kunci media adalah hash isi file sehingga
+    # file identik di beberapa URL hanya diproses sekali; kolom URL di posts/users/chat_messages tetap
+    # string biasa dan dipetakan ke media lewat media_urls.
+    sql_create_media_table = """
+    CREATE TABLE IF NOT EXISTS media (
+        content_hash TEXT PRIMARY KEY,       -- SHA-256 (hex) isi file asli
+        original_url TEXT NOT NULL,          -- URL publik pertama yang ditemukan untuk isi ini
+        mime_type TEXT,
+        byte_size INTEGER NOT NULL,
+        width INTEGER,                       -- Setelah orientasi EXIF diterapkan
+        height INTEGER,
+        placeholder TEXT,                    -- Data URI WebP sangat kecil untuk efek blur-up
+        status TEXT NOT NULL DEFAULT 'PENDING' CHECK(status IN ('PENDING', 'READY', 'FAILED')),
+        error TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        processed_at DATETIME
+    ) WITHOUT ROWID;
+    """
+
+    sql_create_media_variants_table = """
+    CREATE TABLE IF NOT EXISTS media_variants (
+        content_hash TEXT NOT NULL,
+        variant TEXT NOT NULL,               -- 'thumb', 'feed', ...
+        url TEXT NOT NULL,
+        width INTEGER NOT NULL,
+        height INTEGER NOT NULL,
+        byte_size INTEGER NOT NULL,
+        PRIMARY KEY (content_hash, variant),
+        FOREIGN KEY (content_hash) REFERENCES media(content_hash) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """
+
+    sql_create_media_urls_table = """
+    CREATE TABLE IF NOT EXISTS media_urls (
+        url TEXT PRIMARY KEY,                -- Nilai seperti di posts.image_url, mis. '/uploads/posts/x.jpg'
+        content_hash TEXT NOT NULL,
+        file_size INTEGER NOT NULL,          -- Ukuran dan mtime saat di-hash; file yang tidak berubah
+        file_mtime_ns INTEGER NOT NULL,      -- tidak di-hash ulang
+        FOREIGN KEY (content_hash) REFERENCES media(content_hash) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+    """
+
+    # Trigger yang definisinya pernah berubah; di-drop dulu agar database lama ikut versi terbaru
+    triggers_to_replace = [
+        "update_users_updated_at",
+        "update_friendships_updated_at",
+        "update_posts_updated_at",
+        "update_comments_updated_at"
+    ]
+
+    # Change data capture: id AUTOINCREMENT agar id selalu naik dan tidak pernah dipakai ulang
+    # walaupun baris lama sudah di-prune; offset tiap consumer disimpan di changelog_consumers.
+    sql_create_changelog_table = """
+    CREATE TABLE IF NOT EXISTS changelog (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        op TEXT NOT NULL CHECK(op IN ('I', 'U', 'D')),
+        row_id INTEGER NOT NULL,
+        data TEXT,                           -- JSON ringkas berisi kolom kunci baris
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+
+    sql_create_changelog_consumers_table = """
+    CREATE TABLE IF NOT EXISTS changelog_consumers (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL DEFAULT 0,  -- id changelog terakhir yang sudah diproses (ack)
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """
+
     # Definisi Trigger
+    # Trigger updated_at hanya bereaksi pada kolom yang diubah pengguna (bukan counter/pembukuan),
+    # dan hanya jika statement aslinya belum mengisi updated_at sendiri (WHEN ... IS ...),
+    # sehingga UPDATE dari route yang sudah menulis updated_at tidak ditulis dua kali.
     triggers_sql = [
         """CREATE TRIGGER IF NOT EXISTS update_users_updated_at
-           AFTER UPDATE ON users FOR EACH ROW BEGIN
+           AFTER UPDATE OF username, email, password_hash, full_name, profile_picture_url, bio ON users FOR EACH ROW
+           WHEN NEW.updated_at IS OLD.updated_at BEGIN
            UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
         """CREATE TRIGGER IF NOT EXISTS update_friendships_updated_at
-           AFTER UPDATE ON friendships FOR EACH ROW BEGIN
+           AFTER UPDATE OF status ON friendships FOR EACH ROW
+           WHEN NEW.updated_at IS OLD.updated_at BEGIN
            UPDATE friendships SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
         """CREATE TRIGGER IF NOT EXISTS update_posts_updated_at
-           AFTER UPDATE ON posts FOR EACH ROW BEGIN
+           AFTER UPDATE OF content, image_url, video_url, is_live, live_status, stream_playback_url, visibility_status ON posts FOR EACH ROW
+           WHEN NEW.updated_at IS OLD.updated_at BEGIN
            UPDATE posts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
         """CREATE TRIGGER IF NOT EXISTS update_comments_updated_at
-           AFTER UPDATE ON comments FOR EACH ROW BEGIN
+           AFTER UPDATE OF content ON comments FOR EACH ROW
+           WHEN NEW.updated_at IS OLD.updated_at BEGIN
            UPDATE comments SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
         """CREATE TRIGGER IF NOT EXISTS update_chat_room_last_message_at
            AFTER INSERT ON chat_messages FOR EACH ROW BEGIN
-           UPDATE chat_rooms SET last_message_at = NEW.created_at WHERE id = NEW.chat_room_id; END;"""
+           UPDATE chat_rooms SET last_message_at = NEW.created_at WHERE id = NEW.chat_room_id; END;""",
+        # Thread komentar: isi path/depth untuk komentar baru dan jaga reply_count induknya
+        """CREATE TRIGGER IF NOT EXISTS comments_thread_after_insert
+           AFTER INSERT ON comments FOR EACH ROW BEGIN
+           UPDATE comments SET
+               path = COALESCE((SELECT p.path FROM comments p WHERE p.id = NEW.parent_comment_id), '') || printf('%010d/', NEW.id),
+               depth = COALESCE((SELECT p.depth + 1 FROM comments p WHERE p.id = NEW.parent_comment_id), 0)
+           WHERE id = NEW.id;
+           UPDATE comments SET reply_count = reply_count + 1 WHERE id = NEW.parent_comment_id; END;""",
+        """CREATE TRIGGER IF NOT EXISTS comments_thread_after_delete
+           AFTER DELETE ON comments FOR EACH ROW WHEN OLD.parent_comment_id IS NOT NULL BEGIN
+           UPDATE comments SET reply_count = reply_count - 1
+           WHERE id = OLD.parent_comment_id AND reply_count > 0; END;""",
+        # Counter profil di users: friend_count, pending_request_count (friendships) dan post_count (posts)
+        """CREATE TRIGGER IF NOT EXISTS users_counters_friendship_insert
+           AFTER INSERT ON friendships FOR EACH ROW BEGIN
+           UPDATE users SET friend_count = friend_count + 1
+           WHERE NEW.status = 'ACCEPTED' AND id IN (NEW.sender_id, NEW.receiver_id);
+           UPDATE users SET pending_request_count = pending_request_count + 1
+           WHERE NEW.status = 'PENDING' AND id = NEW.receiver_id; END;""",
+        """CREATE TRIGGER IF NOT EXISTS users_counters_friendship_update
+           AFTER UPDATE OF status, sender_id, receiver_id ON friendships FOR EACH ROW
+           WHEN OLD.status IS NOT NEW.status OR OLD.sender_id IS NOT NEW.sender_id OR OLD.receiver_id IS NOT NEW.receiver_id BEGIN
+           UPDATE users SET friend_count = friend_count - 1
+           WHERE OLD.status = 'ACCEPTED' AND id IN (OLD.sender_id, OLD.receiver_id);
+           UPDATE users SET pending_request_count = pending_request_count - 1
+           WHERE OLD.status = 'PENDING' AND id = OLD.receiver_id;
+           UPDATE users SET friend_count = friend_count + 1
+           WHERE NEW.status = 'ACCEPTED' AND id IN (NEW.sender_id, NEW.receiver_id);
+           UPDATE users SET pending_request_count = pending_request_count + 1
+           WHERE NEW.status = 'PENDING' AND id = NEW.receiver_id; END;""",
+        """CREATE TRIGGER IF NOT EXISTS users_counters_friendship_delete
+           AFTER DELETE ON friendships FOR EACH ROW BEGIN
+           UPDATE users SET friend_count = friend_count - 1
+           WHERE OLD.status = 'ACCEPTED' AND id IN (OLD.sender_id, OLD.receiver_id);
+           UPDATE users SET pending_request_count = pending_request_count - 1
+           WHERE OLD.status = 'PENDING' AND id = OLD.receiver_id; END;""",
+        """CREATE TRIGGER IF NOT EXISTS users_counters_post_insert
+           AFTER INSERT ON posts FOR EACH ROW BEGIN
+           UPDATE users SET post_count = post_count + 1 WHERE id = NEW.user_id; END;""",
+        """CREATE TRIGGER IF NOT EXISTS users_counters_post_delete
+           AFTER DELETE ON posts FOR EACH ROW BEGIN
+           UPDATE users SET post_count = post_count - 1 WHERE id = OLD.user_id; END;""",
+        # Kolom live di posts tetap menjadi sumber; live_sessions disinkronkan saat kolom tersebut berubah
+        """CREATE TRIGGER IF NOT EXISTS live_sessions_sync_post_insert
+           AFTER INSERT ON posts FOR EACH ROW WHEN NEW.is_live BEGIN
+           INSERT INTO live_sessions (post_id, user_id, status, stream_playback_url, started_at, ended_at)
+           VALUES (NEW.id, NEW.user_id, COALESCE(NEW.live_status, 'PENDING'), NEW.stream_playback_url,
+                   CASE WHEN NEW.live_status IN ('LIVE', 'ENDED') THEN CURRENT_TIMESTAMP END,
+                   CASE WHEN NEW.live_status = 'ENDED' THEN CURRENT_TIMESTAMP END)
+           ON CONFLICT(post_id) DO NOTHING; END;""",
+        """CREATE TRIGGER IF NOT EXISTS live_sessions_sync_post_update
+           AFTER UPDATE OF is_live, live_status, stream_playback_url ON posts FOR EACH ROW WHEN NEW.is_live BEGIN
+           INSERT INTO live_sessions (post_id, user_id, status, stream_playback_url)
+           VALUES (NEW.id, NEW.user_id, COALESCE(NEW.live_status, 'PENDING'), NEW.stream_playback_url)
+           ON CONFLICT(post_id) DO UPDATE SET
+               status = excluded.status,
+               stream_playback_url = excluded.stream_playback_url;
+           UPDATE live_sessions SET
+               started_at = CASE WHEN status IN ('LIVE', 'ENDED') THEN COALESCE(started_at, CURRENT_TIMESTAMP) END,
+               ended_at = CASE WHEN status = 'ENDED' THEN COALESCE(ended_at, CURRENT_TIMESTAMP) END,
+               viewer_count = CASE WHEN status = 'LIVE' THEN viewer_count ELSE 0 END
+           WHERE post_id = NEW.id; END;"""
     ]
 
     # Definisi Indeks
     indexes_sql = [
-        "CREATE INDEX IF NOT EXISTS idx_friendships_sender_id ON friendships(sender_id);",
         "CREATE INDEX IF NOT EXISTS idx_friendships_receiver_id ON friendships(receiver_id);",
         "CREATE INDEX IF NOT EXISTS idx_posts_user_id ON posts(user_id);",
         "CREATE INDEX IF NOT EXISTS idx_posts_visibility_status ON posts(visibility_status, created_at DESC);", # Indeks untuk filter visibility
@@ -220,6 +591,8 @@ def create_tables(conn):
         "CREATE INDEX IF NOT EXISTS idx_likes_user_id ON likes(user_id);", # Tambahan
         "CREATE INDEX IF NOT EXISTS idx_comments_post_id ON comments(post_id);",
         "CREATE INDEX IF NOT EXISTS idx_comments_user_id ON comments(user_id);", # Tambahan
+        "CREATE INDEX IF NOT EXISTS idx_comments_parent_id ON comments(parent_comment_id);", # Untuk cascade & backfill thread
+        "CREATE INDEX IF NOT EXISTS idx_comments_post_path ON comments(post_id, path);", # Thread urut tampilan via range scan
         "CREATE INDEX IF NOT EXISTS idx_shares_original_post_id ON shares(original_post_id);",
         "CREATE INDEX IF NOT EXISTS idx_user_blocks_blocker_id ON user_blocks(blocker_id);",
         "CREATE INDEX IF NOT EXISTS idx_user_blocks_blocked_user_id ON user_blocks(blocked_user_id);",
@@ -230,7 +603,14 @@ def create_tables(conn):
         "CREATE INDEX IF NOT EXISTS idx_chat_rooms_users ON chat_rooms(user1_id, user2_id);",
         "CREATE INDEX IF NOT EXISTS idx_chat_rooms_last_message ON chat_rooms(last_message_at DESC);",
         "CREATE INDEX IF NOT EXISTS idx_chat_messages_room_time ON chat_messages(chat_room_id, created_at DESC);",
-        "CREATE INDEX IF NOT EXISTS idx_chat_messages_sender_id ON chat_messages(sender_id);"
+        "CREATE INDEX IF NOT EXISTS idx_chat_messages_sender_id ON chat_messages(sender_id);",
+        "CREATE INDEX IF NOT EXISTS idx_live_sessions_active ON live_sessions(started_at DESC) WHERE status = 'LIVE';", # Hanya sesi yang sedang live
+        "CREATE INDEX IF NOT EXISTS idx_live_sessions_user_id ON live_sessions(user_id);",
+        "CREATE INDEX IF NOT EXISTS idx_friend_suggestions_suggested ON friend_suggestions(suggested_user_id);", # Untuk cascade saat user dihapus
+        "CREATE INDEX IF NOT EXISTS idx_post_lsh_buckets_post_id ON post_lsh_buckets(post_id);", # Untuk cascade saat post dihapus
+        "CREATE INDEX IF NOT EXISTS idx_media_pending ON media(status) WHERE status != 'READY';", # Antrean pipeline
+        "CREATE INDEX IF NOT EXISTS idx_media_urls_content_hash ON media_urls(content_hash);",
+        "CREATE INDEX IF NOT EXISTS idx_ranked_feed_post_id ON ranked_feed(post_id);" # Untuk cascade saat post dihapus
     ]
 
     try:
@@ -247,20 +627,55 @@ def create_tables(conn):
             ("post_reports", sql_create_post_reports_table),
             ("notifications", sql_create_notifications_table), 
             ("chat_rooms", sql_create_chat_rooms_table),
-            ("chat_messages", sql_create_chat_messages_table)
+            ("chat_messages", sql_create_chat_messages_table),
+            ("live_sessions", sql_create_live_sessions_table),
+            ("changelog", sql_create_changelog_table),
+            ("changelog_consumers", sql_create_changelog_consumers_table),
+            ("friend_suggestions", sql_create_friend_suggestions_table),
+            ("post_minhash", sql_create_post_minhash_table),
+            ("post_lsh_buckets", sql_create_post_lsh_buckets_table),
+            ("ranked_feed", sql_create_ranked_feed_table),
+            ("user_daily_stats", sql_create_user_daily_stats_table),
+            ("media", sql_create_media_table),
+            ("media_variants", sql_create_media_variants_table),
+            ("media_urls", sql_create_media_urls_table)
+        ]
+
+        # Kolom yang ditambahkan setelah skema awal (agar database lama ikut diperbarui)
+        columns_to_add = [
+            ("comments", "path", "TEXT"),
+            ("comments", "depth", "INTEGER DEFAULT 0"),
+            ("comments", "reply_count", "INTEGER DEFAULT 0"),
+            ("users", "friend_count", "INTEGER DEFAULT 0"),
+            ("users", "post_count", "INTEGER DEFAULT 0"),
+            ("users", "pending_request_count", "INTEGER DEFAULT 0")
         ]
 
         for name, sql in tables_to_create:
             print(f"Membuat tabel {name}...")
             cursor.execute(sql)
+
+        for table, column, definition in columns_to_add:
+            add_column_if_not_exists(cursor, table, column, definition)
+
+        # Database yang sudah dimigrasikan ke timestamp epoch memakai versi trigger/indeks untuk kolom _ms
+        converted = epoch_ms_tables(cursor)
+        # Tabel WITHOUT ROWID: changelog tanpa kolom id dan tanpa indeks yang sudah dicakup primary key
+        compacted = without_rowid_tables(cursor)
+        redundant_indexes = {name for table in compacted for name in WITHOUT_ROWID_TABLES[table][1]}
         
         print("Membuat trigger...")
-        for sql in triggers_sql: 
-            cursor.execute(sql)
+        for name in triggers_to_replace:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name};")
+        for sql in triggers_sql + changelog_triggers_sql(compacted): 
+            cursor.execute(epoch_ms_sql(sql, converted))
 
         print("Membuat indeks...")
+        # UNIQUE (sender_id, receiver_id) sudah melayani pencarian per sender_id
+        cursor.execute("DROP INDEX IF EXISTS idx_friendships_sender_id;")
         for sql in indexes_sql: 
-            cursor.execute(sql)
+            if re.search(r"\bEXISTS\s+(\w+)", sql).group(1) not in redundant_indexes:
+                cursor.execute(epoch_ms_sql(sql, converted))
 
         conn.commit()
         print("Semua tabel, trigger, dan indeks berhasil dibuat atau sudah ada.")
@@ -0,0 +1,192 @@
+# changelog_consumer.py
+# Library consumer untuk tabel changelog (change data capture).
+# Trigger di c.py menambahkan satu baris ringkas per INSERT/UPDATE/DELETE pada users (profil), posts,
+# likes, comments, friendships, user_blocks dan chat_messages. Consumer membaca changelog per batch
+# berdasarkan id, menyimpan offset-nya di changelog_consumers, dan baris yang sudah di-ack oleh
+# SEMUA consumer bisa di-prune.
+# Retensi: trigger menulis changelog di setiap database, walaupun belum ada consumer. Agar tabel tidak
+# tumbuh tanpa batas, prune juga menghapus entri yang lebih tua dari RETENTION_DAYS hari atau di luar
+# RETENTION_ROWS entri terbaru, walaupun belum di-ack (tidak ada consumer, atau consumer macet).
+# Consumer yang tertinggal di belakang batas itu kehilangan entri dan dilaporkan saat prune; consumer
+# tersebut harus membangun ulang state-nya dari tabel asli. Jalankan prune secara berkala (mis. cron).
+#
+# Pemakaian:
+#   python changelog_consumer.py tail --name debug [--from-start]   -> cetak perubahan secara live
+#   python changelog_consumer.py status                             -> offset dan lag tiap consumer
+#   python changelog_consumer.py prune [--max-age-days 7] [--max-rows 1000000]
+#                                                                   -> hapus entri yang sudah di-ack semua consumer
+#                                                                      atau di luar batas retensi
+
+import argparse
+import json
+import time
+from collections import namedtuple
+
+from c import DB_FILE, create_connection, create_tables
+
+RETENTION_DAYS = 7
+RETENTION_ROWS = 1000000
+
+ChangeRecord = namedtuple("ChangeRecord", ["id", "table_name", "op", "row_id", "data", "created_at"])
+
+class ChangelogConsumer:
+    """ Membaca changelog secara berurutan dan menyimpan offset consumer.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database (dipakai oleh satu thread).
+        name (str): Nama unik consumer.
+        batch_size (int): Jumlah entri maksimum per poll.
+        from_start (bool): Consumer baru mulai dari entri paling awal; jika False, dari entri terbaru.
+    """
+
+    def __init__(self, conn, name, batch_size=1000, from_start=False):
+        self.conn = conn
+        self.name = name
+        self.batch_size = batch_size
+        self._last_data_version = None
+        with conn:
+            conn.execute(
+                """INSERT INTO changelog_consumers (name, last_id)
+                   VALUES (?, CASE WHEN ? THEN 0 ELSE (SELECT COALESCE(MAX(id), 0) FROM changelog) END)
+                   ON CONFLICT(name) DO NOTHING;""",
+                (name, from_start)
+            )
+        self.last_id = conn.execute(
+            "SELECT last_id FROM changelog_consumers WHERE name = ?;", (name,)
+        ).fetchone()[0]
+
+    def poll(self):
+        """ Mengambil batch entri berikutnya setelah offset saat ini (belum di-ack).
+        Returns:
+            list: ChangeRecord terurut berdasarkan id; kosong jika tidak ada perubahan baru.
+        """
+        rows = self.conn.execute(
+            """SELECT id, table_name, op, row_id, data, created_at FROM changelog
+               WHERE id > ? ORDER BY id LIMIT ?;""",
+            (self.last_id, self.batch_size)
+        ).fetchall()
+        return [ChangeRecord(row[0], row[1], row[2], row[3], json.loads(row[4]) if row[4] else None, row[5])
+                for row in rows]
+
+    def ack(self, last_id):
+        """ Menyimpan offset: semua entri sampai last_id dianggap sudah diproses. """
+        with self.conn:
+            self.conn.execute(
+                """UPDATE changelog_consumers SET last_id = ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE name = ? AND last_id < ?;""",
+                (last_id, self.name, last_id)
+            )
+        self.last_id = max(self.last_id, last_id)
+
+    def _has_new_commits(self):
+        """ PRAGMA data_version berubah jika koneksi LAIN meng-commit sesuatu; jauh lebih murah daripada query. """
+        data_version = self.conn.execute("PRAGMA data_version;").fetchone()[0]
+        changed = data_version != self._last_data_version
+        self._last_data_version = data_version
+        return changed
+
+    def tail(self, handler, poll_interval=0.2, stop_event=None):
+        """ Memproses perubahan terus-menerus: poll -> handler(batch) -> ack.
+            Jika handler melempar exception, offset tidak maju sehingga batch akan diproses ulang.
+        Args:
+            handler (callable): Fungsi yang menerima list ChangeRecord.
+            poll_interval (float): Jeda saat tidak ada perubahan (detik).
+            stop_event (threading.Event): Opsional, untuk menghentikan loop dari thread lain.
+        """
+        caught_up = False
+        while stop_event is None or not stop_event.is_set():
+            if caught_up and not self._has_new_commits():
+                time.sleep(poll_interval)
+                continue
+            batch = self.poll()
+            if not batch:
+                caught_up = True
+                self._has_new_commits()
+                continue
+            handler(batch)
+            self.ack(batch[-1].id)
+            caught_up = len(batch) < self.batch_size
+
+def consumer_status(conn):
+    """ Mengembalikan offset dan lag (jumlah entri tertunda) tiap consumer.
+    Returns:
+        list: (name, last_id, lag, updated_at)
+    """
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM changelog;").fetchone()[0]
+    return [(name, last_id, max_id - last_id, updated_at) for name, last_id, updated_at in
+            conn.execute("SELECT name, last_id, updated_at FROM changelog_consumers ORDER BY name;")]
+
+def prune_changelog(conn, batch_size=10000, max_age_days=RETENTION_DAYS, max_rows=RETENTION_ROWS):
+    """ Menghapus entri yang sudah di-ack oleh semua consumer atau berada di luar batas retensi,
+        per batch agar transaksi tetap pendek.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        batch_size (int): Jumlah id per transaksi DELETE.
+        max_age_days (int): Entri yang lebih tua dari ini dihapus walaupun belum di-ack.
+        max_rows (int): Jumlah entri terbaru yang selalu disimpan paling banyak.
+    Returns:
+        int: Jumlah entri yang dihapus.
+    """
+    min_id, max_id = conn.execute("SELECT MIN(id), COALESCE(MAX(id), 0) FROM changelog;").fetchone()
+    # id naik seiring waktu, jadi entri tertua yang masih dalam batas umur menandai batas retensi
+    first_recent = conn.execute("SELECT id FROM changelog WHERE created_at >= datetime('now', ?) ORDER BY id LIMIT 1;",
+                                (f"-{max_age_days} days",)).fetchone()
+    retention_id = max(first_recent[0] - 1 if first_recent else max_id, max_id - max_rows)
+    acked_id = conn.execute("SELECT MIN(last_id) FROM changelog_consumers;").fetchone()[0]
+    safe_id = retention_id if acked_id is None else max(acked_id, retention_id)
+    # Hanya entri yang benar-benar dihapus sekarang (id min_id..safe_id) yang bisa hilang dari consumer
+    overtaken = [] if min_id is None or min_id > safe_id else [name for name, last_id in conn.execute(
+        "SELECT name, last_id FROM changelog_consumers WHERE last_id < ? ORDER BY name;", (safe_id,))]
+    if overtaken:
+        print(f"Peringatan: consumer {', '.join(overtaken)} tertinggal di belakang batas retensi dan "
+              f"kehilangan entri sampai id {safe_id}.")
+    deleted = 0
+    if min_id is not None:
+        for start in range(min_id, safe_id + 1, batch_size):
+            with conn:
+                deleted += conn.execute(
+                    "DELETE FROM changelog WHERE id >= ? AND id < ? AND id <= ?;",
+                    (start, start + batch_size, safe_id)
+                ).rowcount
+    print(f"{deleted} entri changelog di-prune (sampai id {safe_id}).")
+    return deleted
+
+def _print_batch(batch):
+    for record in batch:
+        print(f"#{record.id} {record.op} {record.table_name}:{record.row_id} {record.data}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Consumer changelog (change data capture).")
+    parser.add_argument("--db", default=DB_FILE)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    tail_parser = subparsers.add_parser("tail", help="Cetak perubahan secara live.")
+    tail_parser.add_argument("--name", required=True)
+    tail_parser.add_argument("--from-start", action="store_true")
+    subparsers.add_parser("status", help="Tampilkan offset dan lag consumer.")
+    prune_parser = subparsers.add_parser("prune", help="Hapus entri yang sudah di-ack semua consumer atau di luar batas retensi.")
+    prune_parser.add_argument("--max-age-days", type=int, default=RETENTION_DAYS)
+    prune_parser.add_argument("--max-rows", type=int, default=RETENTION_ROWS)
+    args = parser.parse_args()
+
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    create_tables(conn)
+    try:
+        if args.command == "tail":
+            consumer = ChangelogConsumer(conn, args.name, from_start=args.from_start)
+            print(f"Consumer '{args.name}' mulai dari id {consumer.last_id}. Tekan Ctrl+C untuk berhenti.")
+            consumer.tail(_print_batch)
+        elif args.command == "status":
+            for name, last_id, lag, updated_at in consumer_status(conn):
+                print(f"{name:<24} last_id={last_id:<10} lag={lag:<10} diperbarui={updated_at}")
+        else:
+            prune_changelog(conn, max_age_days=args.max_age_days, max_rows=args.max_rows)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        conn.close()
+        print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
@@ -132,10 +132,10 @@ def create_tables(conn):
     # highlight-end
 
     # ... (definisi trigger tetap sama) ...
-    trigger_update_users = "CREATE TRIGGER IF NOT EXISTS update_users_updated_at AFTER UPDATE ON users FOR EACH ROW BEGIN UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
-    trigger_update_friendships = "CREATE TRIGGER IF NOT EXISTS update_friendships_updated_at AFTER UPDATE ON friendships FOR EACH ROW BEGIN UPDATE friendships SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
-    trigger_update_posts = "CREATE TRIGGER IF NOT EXISTS update_posts_updated_at AFTER UPDATE ON posts FOR EACH ROW BEGIN UPDATE posts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
-    trigger_update_comments = "CREATE TRIGGER IF NOT EXISTS update_comments_updated_at AFTER UPDATE ON comments FOR EACH ROW BEGIN UPDATE comments SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
+    trigger_update_users = "CREATE TRIGGER IF NOT EXISTS update_users_updated_at AFTER UPDATE ON users FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
+    trigger_update_friendships = "CREATE TRIGGER IF NOT EXISTS update_friendships_updated_at AFTER UPDATE ON friendships FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN UPDATE friendships SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
+    trigger_update_posts = "CREATE TRIGGER IF NOT EXISTS update_posts_updated_at AFTER UPDATE ON posts FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN UPDATE posts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
+    trigger_update_comments = "CREATE TRIGGER IF NOT EXISTS update_comments_updated_at AFTER UPDATE ON comments FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at BEGIN UPDATE comments SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;"
     # highlight-start
     # Trigger untuk mengupdate last_message_at di chat_rooms saat ada pesan baru
     trigger_update_chat_room_last_message_at = """
@@ -0,0 +1,153 @@
+# columnar_export.py
+# Snapshot kolumnar untuk analitik: likes, comments, posts, shares dan friendships diekspor ke
+# file kolom NumPy bertipe (.npy, bisa di-mmap) dengan id integer dan timestamp epoch (detik, UTC).
+# Laporan (engagement_analytics.py) membaca file ini, bukan database produksi.
+#
+# Semua tabel dibaca dalam satu transaksi baca sehingga snapshot konsisten, ditulis ke direktori
+# sementara lalu diganti secara atomik. Baris dialirkan per batch ke file .npy yang sudah
+# dialokasikan (open_memmap), jadi memori tetap kecil berapa pun ukuran tabelnya.
+#
+# Butuh NumPy: pip install numpy
+#
+# Pemakaian:
+#   python columnar_export.py [--db social_media_app.db] [--out analytics_snapshot] [--batch-size 100000]
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from c import DB_FILE
+
+# Kode kategori untuk kolom teks
+VISIBILITY_CODES = {"VISIBLE": 0, "HIDDEN_BY_REPORTS": 1, "ARCHIVED": 2, "DELETED_BY_USER": 3}
+FRIENDSHIP_STATUS_CODES = {"PENDING": 0, "ACCEPTED": 1}
+
+def _epoch(column):
+    return f"CAST(strftime('%s', {column}) AS INTEGER)"
+
+def _code(column, codes):
+    cases = " ".join(f"WHEN '{value}' THEN {code}" for value, code in codes.items())
+    return f"CASE {column} {cases} ELSE -1 END"
+
+# tabel -> daftar (nama kolom file, ekspresi SQL, dtype). NULL ditulis sebagai -1.
+SNAPSHOT_TABLES = {
+    "posts": [
+        ("id", "id", np.int64),
+        ("user_id", "user_id", np.int64),
+        ("created_at", _epoch("created_at"), np.int64),
+        ("has_image", "image_url IS NOT NULL AND image_url != ''", np.int8),
+        ("has_video", "video_url IS NOT NULL AND video_url != ''", np.int8),
+        ("is_live", "COALESCE(is_live, 0)", np.int8),
+        ("visibility", _code("visibility_status", VISIBILITY_CODES), np.int8),
+    ],
+    # Tanpa id: likes bisa berupa tabel WITHOUT ROWID (compact_tables.py), diurutkan (post_id, user_id)
+    "likes": [
+        ("post_id", "post_id", np.int64),
+        ("user_id", "user_id", np.int64),
+        ("created_at", _epoch("created_at"), np.int64),
+    ],
+    "comments": [
+        ("id", "id", np.int64),
+        ("user_id", "user_id", np.int64),
+        ("post_id", "post_id", np.int64),
+        ("parent_comment_id", "COALESCE(parent_comment_id, -1)", np.int64),
+        ("created_at", _epoch("created_at"), np.int64),
+    ],
+    "shares": [
+        ("id", "id", np.int64),
+        ("user_id", "user_id", np.int64),
+        ("original_post_id", "original_post_id", np.int64),
+        ("created_at", _epoch("created_at"), np.int64),
+    ],
+    "friendships": [
+        ("id", "id", np.int64),
+        ("sender_id", "sender_id", np.int64),
+        ("receiver_id", "receiver_id", np.int64),
+        ("status", _code("status", FRIENDSHIP_STATUS_CODES), np.int8),
+        ("created_at", _epoch("created_at"), np.int64),
+        ("updated_at", _epoch("updated_at"), np.int64),
+    ],
+}
+
+def _export_table(conn, table, columns, table_dir, batch_size):
+    """ Mengalirkan satu tabel ke file kolom .npy (diurutkan berdasarkan id, atau kunci untuk likes). """
+    os.makedirs(table_dir)
+    n_rows = conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+    arrays = [np.lib.format.open_memmap(os.path.join(table_dir, f"{name}.npy"), mode="w+", dtype=dtype, shape=(n_rows,))
+              for name, _, dtype in columns]
+    select_sql = ", ".join(f"COALESCE({expression}, -1)" for _, expression, _ in columns)
+    order = "post_id, user_id" if table == "likes" else "id"
+    cursor = conn.execute(f"SELECT {select_sql} FROM {table} ORDER BY {order};")
+    offset = 0
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        block = np.array(rows, dtype=np.int64)
+        for i, array in enumerate(arrays):
+            array[offset:offset + len(rows)] = block[:, i]
+        offset += len(rows)
+    for array in arrays:
+        array.flush()
+    return n_rows
+
+def export_snapshot(db_path, out_dir, batch_size=100000):
+    """ Membuat snapshot kolumnar di out_dir (menggantikan snapshot lama secara atomik).
+    Args:
+        db_path (str): Database sumber (dibuka read-only).
+        out_dir (str): Direktori snapshot.
+        batch_size (int): Jumlah baris per fetchmany.
+    Returns:
+        dict: Manifest snapshot (jumlah baris per tabel, waktu export).
+    """
+    start_time = time.perf_counter()
+    staging_dir = out_dir.rstrip("/\\") + ".staging"
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    os.makedirs(staging_dir)
+
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, isolation_level=None)
+    manifest = {"exported_at": datetime.now(timezone.utc).isoformat(), "source": os.path.abspath(db_path), "tables": {}}
+    # Satu transaksi baca untuk semua tabel: jumlah baris dan isinya konsisten satu sama lain
+    conn.execute("BEGIN;")
+    for table, columns in SNAPSHOT_TABLES.items():
+        n_rows = _export_table(conn, table, columns, os.path.join(staging_dir, table), batch_size)
+        manifest["tables"][table] = {"rows": n_rows, "columns": {name: np.dtype(dtype).name for name, _, dtype in columns}}
+        print(f"{table}: {n_rows} baris.")
+    conn.execute("COMMIT;")
+    conn.close()
+    manifest["codes"] = {"visibility": VISIBILITY_CODES, "friendship_status": FRIENDSHIP_STATUS_CODES}
+    with open(os.path.join(staging_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(out_dir):
+        old_dir = out_dir.rstrip("/\\") + ".old"
+        if os.path.exists(old_dir):
+            shutil.rmtree(old_dir)
+        os.replace(out_dir, old_dir)
+        os.replace(staging_dir, out_dir)
+        shutil.rmtree(old_dir)
+    else:
+        os.replace(staging_dir, out_dir)
+    print(f"Snapshot kolumnar ditulis ke {out_dir} dalam {time.perf_counter() - start_time:.2f} s.")
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Export snapshot kolumnar (NumPy) untuk analitik.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--out", default="analytics_snapshot")
+    parser.add_argument("--batch-size", type=int, default=100000)
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"Database '{args.db}' tidak ditemukan.")
+        return
+    export_snapshot(args.db, args.out, args.batch_size)
+
+if __name__ == '__main__':
+    main()
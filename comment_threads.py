@@ -0,0 +1,238 @@
+# comment_threads.py
+# Thread komentar berbasis materialized path.
+# Setiap komentar menyimpan `path` (gabungan id leluhur, masing-masing 10 digit + '/'),
+# `depth` dan `reply_count`. Kolom-kolom ini dijaga oleh trigger di c.py, sehingga
+# satu range scan pada indeks (post_id, path) sudah mengembalikan thread dalam urutan tampil.
+#
+# Pemakaian:
+#   python comment_threads.py migrate            -> pasang kolom/trigger/indeks + backfill komentar lama
+#   python comment_threads.py bench [--comments N]
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from c import DB_FILE, create_connection, create_tables
+
+# Batas atas untuk range scan subtree: semua karakter path ('0'-'9' dan '/') lebih kecil dari '~'
+PATH_UPPER_SENTINEL = "~"
+
+THREAD_COLUMNS = "id, post_id, user_id, parent_comment_id, content, created_at, updated_at, path, depth, reply_count"
+
+def migrate(conn, batch_posts=500):
+    """ Memasang skema thread komentar pada database yang sudah ada lalu mengisi data lama.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        batch_posts (int): Jumlah postingan yang diproses per transaksi backfill.
+    """
+    # create_tables juga mengganti trigger updated_at lama dengan versi yang hanya bereaksi
+    # pada perubahan konten, sehingga backfill tidak mengubah updated_at.
+    create_tables(conn)
+    backfill_comment_paths(conn, batch_posts)
+
+def backfill_comment_paths(conn, batch_posts=500):
+    """ Mengisi path, depth dan reply_count untuk komentar yang belum memiliki path.
+        Diproses per rentang post_id agar setiap transaksi tetap pendek.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        batch_posts (int): Jumlah post_id per transaksi.
+    Returns:
+        int: Jumlah komentar yang diperbarui.
+    """
+    row = conn.execute("SELECT MIN(post_id), MAX(post_id) FROM comments WHERE path IS NULL;").fetchone()
+    if row is None or row[0] is None:
+        print("Semua komentar sudah memiliki path. Tidak ada backfill.")
+        return 0
+
+    min_post_id, max_post_id = row
+    total_updated = 0
+    for start in range(min_post_id, max_post_id + 1, batch_posts):
+        end = start + batch_posts
+        changes_before = conn.total_changes
+        with conn:
+            conn.execute("""
+                WITH RECURSIVE tree(id, path, depth) AS (
+                    SELECT id, printf('%010d/', id), 0 FROM comments
+                    WHERE parent_comment_id IS NULL AND post_id >= ? AND post_id < ?
+                    UNION ALL
+                    SELECT c.id, t.path || printf('%010d/', c.id), t.depth + 1
+                    FROM comments c JOIN tree t ON c.parent_comment_id = t.id
+                )
+                UPDATE comments SET
+                    path = tree.path,
+                    depth = tree.depth,
+                    reply_count = (SELECT COUNT(*) FROM comments r WHERE r.parent_comment_id = comments.id)
+                FROM tree
+                WHERE comments.id = tree.id;
+            """, (start, end))
+        # rowcount tidak terisi untuk statement yang diawali WITH, jadi pakai total_changes
+        total_updated += conn.total_changes - changes_before
+        print(f"Backfill post_id {start}-{end - 1}: total {total_updated} komentar diperbarui.")
+    return total_updated
+
+def fetch_thread_page(conn, post_id, after_path="", limit=50):
+    """ Mengambil satu halaman thread komentar sebuah postingan dalam urutan tampil.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        post_id (int): ID postingan.
+        after_path (str): Path komentar terakhir dari halaman sebelumnya ('' untuk halaman pertama).
+        limit (int): Jumlah komentar per halaman.
+    Returns:
+        list: Baris komentar (lihat THREAD_COLUMNS).
+    """
+    return conn.execute(
+        f"SELECT {THREAD_COLUMNS} FROM comments WHERE post_id = ? AND path > ? ORDER BY path LIMIT ?;",
+        (post_id, after_path, limit)
+    ).fetchall()
+
+def fetch_subtree_page(conn, comment_id, after_path=None, limit=50):
+    """ Mengambil satu halaman balasan (semua turunan) dari sebuah komentar dalam urutan tampil.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        comment_id (int): ID komentar akar subtree.
+        after_path (str): Path balasan terakhir dari halaman sebelumnya (None untuk halaman pertama).
+        limit (int): Jumlah balasan per halaman.
+    Returns:
+        list: Baris komentar, atau list kosong jika komentar tidak ditemukan.
+    """
+    root = conn.execute("SELECT post_id, path FROM comments WHERE id = ?;", (comment_id,)).fetchone()
+    if root is None or root[1] is None:
+        return []
+    post_id, root_path = root
+    lower = max(root_path, after_path) if after_path else root_path
+    return conn.execute(
+        f"""SELECT {THREAD_COLUMNS} FROM comments
+            WHERE post_id = ? AND path > ? AND path < ?
+            ORDER BY path LIMIT ?;""",
+        (post_id, lower, root_path + PATH_UPPER_SENTINEL, limit)
+    ).fetchall()
+
+def _seed_comments(conn, n_comments, reply_ratio=0.5, seed=42):
+    """ Mengisi database benchmark dengan satu pengguna, satu postingan dan n_comments komentar acak. """
+    rng = random.Random(seed)
+    conn.execute("INSERT INTO users (username, email, password_hash) VALUES ('bench', 'bench@example.com', 'x');")
+    conn.execute("INSERT INTO posts (user_id, content) VALUES (1, 'bench');")
+    rows = []
+    for comment_id in range(1, n_comments + 1):
+        parent_id = rng.randint(1, comment_id - 1) if comment_id > 1 and rng.random() < reply_ratio else None
+        rows.append((1, 1, parent_id, f"komentar {comment_id}"))
+    with conn:
+        conn.executemany(
+            "INSERT INTO comments (user_id, post_id, parent_comment_id, content) VALUES (?, ?, ?, ?);", rows
+        )
+
+def _load_all_and_build_tree(conn, post_id, limit):
+    """ Cara lama: muat semua komentar postingan lalu susun pohon di memori. """
+    rows = conn.execute(
+        "SELECT id, parent_comment_id, content, created_at FROM comments WHERE post_id = ? ORDER BY created_at ASC, id ASC;",
+        (post_id,)
+    ).fetchall()
+    children = {}
+    for row in rows:
+        children.setdefault(row[1], []).append(row)
+    page = []
+    stack = list(reversed(children.get(None, [])))
+    while stack and len(page) < limit:
+        row = stack.pop()
+        page.append(row)
+        stack.extend(reversed(children.get(row[0], [])))
+    return page
+
+def _recursive_cte_page(conn, post_id, limit):
+    """ Alternatif: recursive CTE yang menyusun urutan thread saat query. """
+    return conn.execute("""
+        WITH RECURSIVE tree(id, sort_key) AS (
+            SELECT id, printf('%010d/', id) FROM comments WHERE post_id = ? AND parent_comment_id IS NULL
+            UNION ALL
+            SELECT c.id, t.sort_key || printf('%010d/', c.id)
+            FROM comments c JOIN tree t ON c.parent_comment_id = t.id
+        )
+        SELECT id FROM tree ORDER BY sort_key LIMIT ?;
+    """, (post_id, limit)).fetchall()
+
+def _time_it(func, repeat):
+    """ Menjalankan func sebanyak repeat kali dan mengembalikan rata-rata durasi dalam milidetik. """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+def benchmark(n_comments=100000, page_size=50, repeat=5):
+    """ Membandingkan cara mengambil halaman thread pada satu postingan dengan banyak komentar.
+    Args:
+        n_comments (int): Jumlah komentar pada postingan benchmark.
+        page_size (int): Ukuran halaman.
+        repeat (int): Jumlah pengulangan per skenario.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench_comments.db")
+        conn = sqlite3.connect(db_path)
+        create_tables(conn)
+
+        start = time.perf_counter()
+        _seed_comments(conn, n_comments)
+        seed_ms = (time.perf_counter() - start) * 1000
+        conn.execute("ANALYZE;")
+
+        middle_path = conn.execute(
+            "SELECT path FROM comments WHERE post_id = 1 ORDER BY path LIMIT 1 OFFSET ?;", (n_comments // 2,)
+        ).fetchone()[0]
+        busiest_root = conn.execute(
+            "SELECT id FROM comments WHERE parent_comment_id IS NULL ORDER BY reply_count DESC LIMIT 1;"
+        ).fetchone()[0]
+
+        # Sanity check: urutan path harus sama dengan urutan DFS di memori
+        expected = [row[0] for row in _load_all_and_build_tree(conn, 1, page_size)]
+        actual = [row[0] for row in fetch_thread_page(conn, 1, limit=page_size)]
+        assert expected == actual, "Urutan path tidak sama dengan urutan thread di memori"
+
+        results = [
+            ("Muat semua + susun pohon di memori", _time_it(lambda: _load_all_and_build_tree(conn, 1, page_size), repeat)),
+            ("Recursive CTE", _time_it(lambda: _recursive_cte_page(conn, 1, page_size), repeat)),
+            ("Path range: halaman pertama", _time_it(lambda: fetch_thread_page(conn, 1, "", page_size), repeat * 20)),
+            ("Path range: halaman tengah", _time_it(lambda: fetch_thread_page(conn, 1, middle_path, page_size), repeat * 20)),
+            ("Path range: subtree komentar tersibuk", _time_it(lambda: fetch_subtree_page(conn, busiest_root, None, page_size), repeat * 20)),
+        ]
+
+        # Ukur juga biaya backfill dari nol
+        with conn:
+            conn.execute("UPDATE comments SET path = NULL, depth = 0, reply_count = 0;")
+        start = time.perf_counter()
+        backfill_comment_paths(conn, batch_posts=1)
+        backfill_ms = (time.perf_counter() - start) * 1000
+        conn.close()
+
+    print()
+    print(f"Benchmark thread komentar: {n_comments} komentar pada satu postingan, halaman {page_size}")
+    print(f"  Insert dengan trigger thread : {seed_ms:10.1f} ms total ({seed_ms * 1000 / n_comments:.1f} us/komentar)")
+    print(f"  Backfill dari nol            : {backfill_ms:10.1f} ms")
+    for label, ms in results:
+        print(f"  {label:<38}: {ms:10.3f} ms/halaman")
+
+def main():
+    parser = argparse.ArgumentParser(description="Thread komentar berbasis materialized path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="Pasang skema thread dan backfill komentar lama.")
+    migrate_parser.add_argument("--db", default=DB_FILE)
+    migrate_parser.add_argument("--batch-posts", type=int, default=500)
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pengambilan thread.")
+    bench_parser.add_argument("--comments", type=int, default=100000)
+    bench_parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        conn = create_connection(args.db)
+        if conn is None:
+            print("Gagal membuat koneksi ke database.")
+            return
+        migrate(conn, args.batch_posts)
+        conn.close()
+        print("Koneksi database ditutup.")
+    else:
+        benchmark(args.comments, args.page_size)
+
+if __name__ == '__main__':
+    main()
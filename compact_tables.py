@@ -0,0 +1,317 @@
+# compact_tables.py
+# Tata letak ringkas untuk tabel penghubung dan tabel append-heavy (lihat WITHOUT_ROWID_TABLES dan
+# NO_AUTOINCREMENT_TABLES di c.py):
+#   - likes, user_blocks, post_reports: id AUTOINCREMENT + UNIQUE(pasangan) menyimpan setiap pasangan dua kali
+#     (tabel + indeks unik) dan setiap insert juga menulis sqlite_sequence. Dibangun ulang sebagai
+#     WITHOUT ROWID dengan PRIMARY KEY pasangan alaminya; indeks yang sudah dicakup primary key dibuang.
+#   - notifications, chat_messages: AUTOINCREMENT dilepas (id = max(id) + 1; hanya id dari baris terakhir
+#     yang sudah dihapus yang bisa dipakai ulang, dan tidak ada yang menyimpan id tersebut).
+#   - friendships tetap punya id AUTOINCREMENT: id-nya dipakai sebagai requestId di API dan target
+#     notifikasi, jadi tidak boleh hilang atau dipakai ulang. Indeks idx_friendships_sender_id yang
+#     redundan dengan UNIQUE (sender_id, receiver_id) dibuang oleh create_tables.
+# Setiap tabel dibangun ulang di tempat dalam satu transaksi (prosedur ALTER TABLE 12 langkah SQLite):
+# tabel baru, salin terurut primary key, DROP, RENAME, lalu indeks dan trigger dibuat ulang. Penulis
+# lain tertahan selama penyalinan satu tabel.
+# Urutan dengan epoch_timestamps.py bebas: kolom generated (created_at pada skema epoch) tidak disalin dan
+# nilai _ms ikut apa adanya; epoch_timestamps.py menyalin tabel yang sudah ringkas per primary key.
+# Jangan dijalankan pada shard shard_router.py: shard memakai blok id AUTOINCREMENT per shard.
+#
+# Pemakaian:
+#   python compact_tables.py status [--db social_media_app.db]
+#   python compact_tables.py migrate [--db social_media_app.db] [--tables likes,notifications]
+#   python compact_tables.py benchmark [--rows 200000] [--inserts 20000]
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from c import (DB_FILE, NO_AUTOINCREMENT_TABLES, WITHOUT_ROWID_TABLES, changelog_triggers_sql, create_tables,
+               without_rowid_tables)
+
+NEW_SUFFIX = "__compact"
+
+class CompactionError(Exception):
+    """ Definisi tabel tidak sesuai dengan yang diharapkan sehingga tidak bisa dibangun ulang. """
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    return conn
+
+def _has_autoincrement(conn, table):
+    sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)).fetchone()
+    return bool(sql) and re.search(r"\bAUTOINCREMENT\b", sql[0], re.IGNORECASE) is not None
+
+def compact_table_sql(create_sql, table):
+    """ Mengubah CREATE TABLE menjadi versi ringkas dengan nama <tabel>__compact.
+    Args:
+        create_sql (str): SQL tabel dari sqlite_master.
+        table (str): Tabel di WITHOUT_ROWID_TABLES atau NO_AUTOINCREMENT_TABLES.
+    Returns:
+        str: CREATE TABLE untuk tabel baru.
+    """
+    sql, replaced = re.subn(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[\"`]?\w+[\"`]?\s*\(",
+                            f'CREATE TABLE "{table}{NEW_SUFFIX}" (', create_sql, count=1, flags=re.IGNORECASE)
+    if not replaced:
+        raise CompactionError(f"Definisi tabel {table} tidak dikenali.")
+    if table in NO_AUTOINCREMENT_TABLES:
+        sql, replaced = re.subn(r"(\bid\s+INTEGER\s+PRIMARY\s+KEY)\s+AUTOINCREMENT\b", r"\1", sql, count=1, flags=re.IGNORECASE)
+        if not replaced:
+            raise CompactionError(f"{table}.id bukan INTEGER PRIMARY KEY AUTOINCREMENT.")
+        return sql
+    key = WITHOUT_ROWID_TABLES[table][0]
+    sql, replaced = re.subn(r"\bid\s+INTEGER\s+PRIMARY\s+KEY(?:\s+AUTOINCREMENT)?\s*,\s*", "", sql, count=1, flags=re.IGNORECASE)
+    if not replaced:
+        raise CompactionError(f"{table}.id bukan INTEGER PRIMARY KEY.")
+    # UNIQUE (a, b) dalam urutan apa pun menjadi PRIMARY KEY dengan urutan dari c.py
+    pair = r"\s*,\s*".join(rf"\"?{column}\"?" for column in key)
+    pair_reversed = r"\s*,\s*".join(rf"\"?{column}\"?" for column in reversed(key))
+    sql, replaced = re.subn(rf"\bUNIQUE\s*\(\s*(?:{pair}|{pair_reversed})\s*\)", f"PRIMARY KEY ({', '.join(key)})",
+                            sql, count=1, flags=re.IGNORECASE)
+    if not replaced:
+        raise CompactionError(f"{table} tidak punya UNIQUE ({', '.join(key)}).")
+    return sql.rstrip().rstrip(";").rstrip() + " WITHOUT ROWID"
+
+def rebuild_table(conn, table):
+    """ Membangun ulang satu tabel ke tata letak ringkas dalam satu transaksi.
+    Args:
+        conn (sqlite3.Connection): Koneksi autocommit (isolation_level=None).
+        table (str): Nama tabel.
+    Returns:
+        int: Jumlah baris yang disalin.
+    """
+    without_rowid = table in WITHOUT_ROWID_TABLES
+    # Hanya bisa diubah di luar transaksi; legacy_alter_table: RENAME tidak mem-parse ulang trigger tabel
+    # lain yang sementara menunjuk ke tabel yang sudah di-DROP.
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("PRAGMA legacy_alter_table = ON;")
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        create_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)).fetchone()[0]
+        objects = conn.execute(
+            """SELECT type, name, sql FROM sqlite_master
+               WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL ORDER BY type;""", (table,)).fetchall()
+        # Kolom generated (mis. created_at pada skema epoch) tidak disalin
+        columns = [info[1] for info in conn.execute(f"PRAGMA table_info({table});") if not (without_rowid and info[1] == "id")]
+        column_list = ", ".join(columns)
+        order = ", ".join(WITHOUT_ROWID_TABLES[table][0]) if without_rowid else "id"
+
+        conn.execute(compact_table_sql(create_sql, table))
+        copied = conn.execute(f'INSERT INTO "{table}{NEW_SUFFIX}" ({column_list}) SELECT {column_list} FROM {table} ORDER BY {order};').rowcount
+        conn.execute(f"DROP TABLE {table};")
+        conn.execute(f'ALTER TABLE "{table}{NEW_SUFFIX}" RENAME TO {table};')
+
+        compacted = without_rowid_tables(conn.cursor())
+        redundant = set(WITHOUT_ROWID_TABLES[table][1]) if without_rowid else set()
+        changelog = {re.search(r"\bEXISTS\s+(\w+)", sql).group(1): sql for sql in changelog_triggers_sql(compacted)}
+        for object_type, name, sql in objects:
+            if name in redundant:
+                continue
+            # Trigger changelog ditulis ulang (tabel WITHOUT ROWID tidak punya NEW.id)
+            conn.execute(changelog.get(name, sql) if object_type == "trigger" else sql)
+
+        violations = conn.execute(f"PRAGMA foreign_key_check({table});").fetchall()
+        if violations:
+            raise CompactionError(f"{len(violations)} pelanggaran foreign key di {table} setelah dibangun ulang.")
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+    return copied
+
+def compaction_status(conn):
+    """ Status tata letak per tabel.
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+    Returns:
+        dict: tabel -> 'without rowid', 'tanpa autoincrement', 'lama' atau 'tidak ada'.
+    """
+    compacted = without_rowid_tables(conn.cursor())
+    status = {}
+    for table in list(WITHOUT_ROWID_TABLES) + list(NO_AUTOINCREMENT_TABLES):
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)).fetchone():
+            status[table] = "tidak ada"
+        elif table in compacted:
+            status[table] = "without rowid"
+        elif table in NO_AUTOINCREMENT_TABLES and not _has_autoincrement(conn, table):
+            status[table] = "tanpa autoincrement"
+        else:
+            status[table] = "lama"
+    return status
+
+def migrate(db_path, tables=None):
+    """ Membangun ulang tabel yang belum memakai tata letak ringkas.
+    Args:
+        db_path (str): Path database.
+        tables (list): Subset tabel; None = semua.
+    Returns:
+        dict: tabel -> (baris, durasi detik) untuk tabel yang dibangun ulang pada pemanggilan ini.
+    """
+    conn = _connect(db_path)
+    done = {}
+    try:
+        for table, state in compaction_status(conn).items():
+            if (tables and table not in tables) or state != "lama":
+                continue
+            print(f"Membangun ulang {table}...")
+            start = time.perf_counter()
+            rows = rebuild_table(conn, table)
+            done[table] = (rows, time.perf_counter() - start)
+            print(f"  {rows} baris dalam {done[table][1]:.2f} s.")
+        conn.execute("DROP INDEX IF EXISTS idx_friendships_sender_id;")
+    finally:
+        conn.close()
+    return done
+
+def _btree_sizes(conn):
+    """ Ukuran (byte) tabel beserta semua indeksnya, per tabel yang dibandingkan. """
+    tables = list(WITHOUT_ROWID_TABLES) + list(NO_AUTOINCREMENT_TABLES) + ["friendships", "sqlite_sequence"]
+    return {table: size or 0 for table, size in (
+        (table, conn.execute(
+            """SELECT sum(pgsize) FROM dbstat
+               WHERE name IN (SELECT name FROM sqlite_master WHERE tbl_name = ? AND type IN ('table', 'index'));""",
+            (table,)).fetchone()[0]) for table in tables)}
+
+def _seed(db_path, n_rows):
+    """ Database sintetis tata letak lama: n_rows like, n_rows/2 notifikasi dan pesan chat. """
+    conn = sqlite3.connect(db_path)
+    with redirect_stdout(StringIO()):
+        create_tables(conn)
+    # Indeks lama yang sekarang dibuang create_tables, agar perbandingan mencakupnya
+    conn.execute("CREATE INDEX idx_friendships_sender_id ON friendships(sender_id);")
+    rng = random.Random(3)
+    n_users = max(n_rows // 100, 20)
+    n_posts = max(n_rows // 20, 10)
+    conn.executemany("INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x');",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(n_users)))
+    conn.executemany("INSERT INTO posts (user_id, content) VALUES (?, 'post');", ((rng.randint(1, n_users),) for _ in range(n_posts)))
+    conn.executemany("INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);",
+                     ((rng.randint(1, n_users), rng.randint(1, n_posts)) for _ in range(n_rows)))
+    conn.executemany("INSERT OR IGNORE INTO user_blocks (blocker_id, blocked_user_id) VALUES (?, ?);",
+                     ((rng.randint(1, n_users), rng.randint(1, n_users)) for _ in range(n_rows // 50)))
+    conn.executemany("INSERT OR IGNORE INTO post_reports (post_id, reporter_user_id, reason) VALUES (?, ?, 'spam');",
+                     ((rng.randint(1, n_posts), rng.randint(1, n_users)) for _ in range(n_rows // 50)))
+    conn.executemany("INSERT OR IGNORE INTO friendships (sender_id, receiver_id, status) VALUES (?, ?, 'ACCEPTED');",
+                     ((rng.randint(1, n_users), rng.randint(1, n_users)) for _ in range(n_rows // 10)))
+    conn.executemany(
+        "INSERT INTO notifications (recipient_user_id, actor_user_id, type, target_entity_type, target_entity_id) VALUES (?, ?, 'POST_LIKED', 'POST', ?);",
+        ((rng.randint(1, n_users), rng.randint(1, n_users), rng.randint(1, n_posts)) for _ in range(n_rows // 2)))
+    conn.execute("INSERT INTO chat_rooms (user1_id, user2_id) VALUES (1, 2);")
+    conn.executemany("INSERT INTO chat_messages (chat_room_id, sender_id, message_content) VALUES (1, ?, 'halo');",
+                     ((rng.choice((1, 2)),) for _ in range(n_rows // 2)))
+    conn.commit()
+    conn.close()
+    return n_users, n_posts
+
+def _insert_rates(db_path, n_users, n_posts, n_inserts):
+    """ Insert per baris dengan commit per statement (seperti route), dalam baris per detik. """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = NORMAL;")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    workloads = {
+        "likes": ("INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);",
+                  lambda rng: (rng.randint(1, n_users), rng.randint(1, n_posts))),
+        "notifications": ("INSERT INTO notifications (recipient_user_id, actor_user_id, type, target_entity_type, target_entity_id) VALUES (?, ?, 'POST_LIKED', 'POST', ?);",
+                          lambda rng: (rng.randint(1, n_users), rng.randint(1, n_users), rng.randint(1, n_posts))),
+        "chat_messages": ("INSERT INTO chat_messages (chat_room_id, sender_id, message_content) VALUES (1, ?, 'halo');",
+                          lambda rng: (rng.choice((1, 2)),)),
+    }
+    rates = {}
+    for table, (sql, make_params) in workloads.items():
+        rng = random.Random(11)
+        params = [make_params(rng) for _ in range(n_inserts)]
+        start = time.perf_counter()
+        for p in params:
+            conn.execute(sql, p)
+        rates[table] = n_inserts / (time.perf_counter() - start)
+    conn.close()
+    return rates
+
+def benchmark(n_rows=200000, n_inserts=20000):
+    """ Membandingkan ukuran file/b-tree dan laju insert tata letak lama dengan tata letak ringkas.
+    Args:
+        n_rows (int): Jumlah like sintetis (tabel lain proporsional).
+        n_inserts (int): Jumlah insert per tabel untuk laju insert.
+    Returns:
+        dict: Hasil per tata letak dan durasi migrasi.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        old_path, new_path = os.path.join(tmp_dir, "lama.db"), os.path.join(tmp_dir, "ringkas.db")
+        n_users, n_posts = _seed(old_path, n_rows)
+        shutil.copyfile(old_path, new_path)
+        with redirect_stdout(StringIO()):
+            migrated = migrate(new_path)
+        result = {"migration": {table: seconds for table, (_, seconds) in migrated.items()}}
+        for label, path in (("lama", old_path), ("ringkas", new_path)):
+            conn = sqlite3.connect(path)
+            conn.execute("VACUUM;")
+            result[label] = {"file_bytes": os.path.getsize(path), "btree_bytes": _btree_sizes(conn)}
+            conn.close()
+            result[label]["inserts_per_second"] = _insert_rates(path, n_users, n_posts, n_inserts)
+    return result
+
+def print_benchmark(result):
+    old, new = result["lama"], result["ringkas"]
+    print(f"{'Tabel + indeks':<20}{'lama (KiB)':>12}{'ringkas (KiB)':>15}{'hemat':>8}")
+    for table, size in old["btree_bytes"].items():
+        compact = new["btree_bytes"][table]
+        print(f"{table:<20}{size / 1024:>12.0f}{compact / 1024:>15.0f}{(1 - compact / size) * 100 if size else 0:>7.0f}%")
+    print(f"{'File database':<20}{old['file_bytes'] / 1024:>12.0f}{new['file_bytes'] / 1024:>15.0f}"
+          f"{(1 - new['file_bytes'] / old['file_bytes']) * 100:>7.0f}%")
+    print()
+    print(f"{'Insert (baris/s)':<20}{'lama':>12}{'ringkas':>15}")
+    for table, rate in old["inserts_per_second"].items():
+        print(f"{table:<20}{rate:>12.0f}{new['inserts_per_second'][table]:>15.0f}")
+    print()
+    print("Durasi migrasi: " + ", ".join(f"{table} {seconds:.2f} s" for table, seconds in result["migration"].items()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Tata letak ringkas (WITHOUT ROWID / tanpa AUTOINCREMENT).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    status_parser = subparsers.add_parser("status", help="Tata letak per tabel.")
+    status_parser.add_argument("--db", default=DB_FILE)
+    migrate_parser = subparsers.add_parser("migrate", help="Bangun ulang tabel yang belum ringkas.")
+    migrate_parser.add_argument("--db", default=DB_FILE)
+    migrate_parser.add_argument("--tables", help="Daftar tabel dipisah koma (default semua)")
+    bench_parser = subparsers.add_parser("benchmark", help="Ukuran file dan laju insert lama vs ringkas.")
+    bench_parser.add_argument("--rows", type=int, default=200000)
+    bench_parser.add_argument("--inserts", type=int, default=20000)
+    bench_parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        result = benchmark(args.rows, args.inserts)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_benchmark(result)
+        return
+    if not os.path.exists(args.db):
+        print(f"Database '{args.db}' tidak ditemukan.")
+        return
+    if args.command == "status":
+        conn = _connect(args.db)
+        for table, state in compaction_status(conn).items():
+            print(f"{table:<16}{state}")
+        conn.close()
+    else:
+        tables = [t.strip() for t in args.tables.split(",")] if args.tables else None
+        try:
+            migrate(args.db, tables)
+        except CompactionError as e:
+            print(f"Migrasi dihentikan: {e}")
+
+if __name__ == '__main__':
+    main()
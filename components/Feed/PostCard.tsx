@@ -21,6 +21,10 @@ interface FeedPost {
   comment_count: number;
   is_liked_by_me: boolean;
   visibility_status?: string | null;
+  image_feed_url?: string | null;    // Varian WebP yang diperkecil (media_pipeline.py)
+  image_width?: number | null;
+  image_height?: number | null;
+  image_placeholder?: string | null; // Data URI kecil untuk blur-up
 }
 
 interface PostCardProps {
@@ -321,12 +325,13 @@ export default function PostCard({ post, loggedInUserId, onPostDeleted, onPostEd
           {post.image_url && (
             <div className="mb-4 rounded-lg overflow-hidden border">
               <Image 
-                src={post.image_url} 
+                src={post.image_feed_url || post.image_url} 
                 alt="Gambar postingan" 
-                width={700}
-                height={500}
+                width={post.image_width || 700}
+                height={post.image_height || 500}
                 className="object-contain w-full max-h-[500px] bg-gray-100"
                 priority={false}
+                {...(post.image_placeholder ? { placeholder: 'blur' as const, blurDataURL: post.image_placeholder } : {})}
               />
             </div>
           )}
@@ -0,0 +1,399 @@
+# db_access.py
+# Lapisan akses database bersama untuk worker Python (fan-out, agregator, maintenance).
+# Menggantikan pola "create_connection per skrip/per panggilan":
+#   - ReadPool   : pool koneksi baca yang thread-safe (query_only), dipinjam per query
+#   - Writer     : satu koneksi penulis di thread khusus dengan antrean permintaan. Permintaan yang
+#                  menumpuk di antrean dijalankan dalam satu transaksi (group commit); tiap permintaan
+#                  dibungkus SAVEPOINT sehingga kegagalan satu permintaan tidak membatalkan yang lain.
+#   - Database   : gabungan ReadPool + Writer
+#   - AsyncDatabase: fasad asyncio; query dijalankan di thread pool, tulis menunggu Future dari Writer
+# Profil koneksi (PRAGMA) dan ukuran cache statement diterapkan sekali saat koneksi dibuat.
+#
+# Pemakaian sebagai modul:
+#   from db_access import Database
+#   db = Database("social_media_app.db", readers=4)
+#   rows = db.query("SELECT id, content FROM posts WHERE user_id = ? LIMIT 20;", (user_id,))
+#   db.execute("INSERT INTO likes (user_id, post_id) VALUES (?, ?);", (user_id, post_id))
+#   db.close()
+#
+# Pemakaian CLI:
+#   python db_access.py benchmark [--threads 8] [--ops 2000] [--readers 4]
+
+import argparse
+import asyncio
+import os
+import queue
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from c import create_tables
+
+# Profil koneksi bawaan, sama untuk semua koneksi (reader menambahkan query_only)
+DEFAULT_PROFILE = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("foreign_keys", "ON"),
+    ("busy_timeout", "5000"),
+    ("cache_size", "-16000"),       # ~16 MB per koneksi
+    ("temp_store", "MEMORY"),
+    ("mmap_size", "268435456"),     # 256 MB
+)
+DEFAULT_CACHED_STATEMENTS = 256
+
+WriteResult = namedtuple("WriteResult", ["lastrowid", "rowcount"])
+
+def apply_profile(conn, profile=DEFAULT_PROFILE):
+    """ Menerapkan daftar PRAGMA ke koneksi.
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+        profile (tuple): Pasangan (nama pragma, nilai).
+    """
+    for name, value in profile:
+        conn.execute(f"PRAGMA {name} = {value};").fetchall()
+
+def open_connection(db_path, profile=DEFAULT_PROFILE, cached_statements=DEFAULT_CACHED_STATEMENTS, read_only=False):
+    """ Membuka satu koneksi dengan profil dan cache statement yang sudah diatur.
+    Args:
+        db_path (str): Path database.
+        profile (tuple): Pasangan (nama pragma, nilai).
+        cached_statements (int): Jumlah prepared statement yang disimpan per koneksi.
+        read_only (bool): Jika True, koneksi menolak semua penulisan (PRAGMA query_only).
+    Returns:
+        sqlite3.Connection: Koneksi dalam mode autocommit (transaksi diatur eksplisit).
+    """
+    conn = sqlite3.connect(db_path, timeout=5, isolation_level=None, check_same_thread=False,
+                           cached_statements=cached_statements)
+    apply_profile(conn, profile)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON;")
+    return conn
+
+class ReadPool:
+    """ Pool koneksi baca thread-safe. Koneksi dibuat saat dibutuhkan (maksimal `size`)
+        lalu dipakai ulang; satu koneksi hanya dipegang satu thread dalam satu waktu.
+    """
+
+    def __init__(self, db_path, size=4, profile=DEFAULT_PROFILE, cached_statements=DEFAULT_CACHED_STATEMENTS, row_factory=None):
+        self.db_path = db_path
+        self.size = size
+        self.profile = profile
+        self.cached_statements = cached_statements
+        self.row_factory = row_factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _acquire(self, timeout):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("ReadPool sudah ditutup.")
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    conn = open_connection(self.db_path, self.profile, self.cached_statements, read_only=True)
+                except sqlite3.Error:
+                    self._created -= 1
+                    raise
+                conn.row_factory = self.row_factory
+                return conn
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"Tidak ada koneksi baca yang bebas dalam {timeout} detik.")
+
+    @contextmanager
+    def connection(self, timeout=30):
+        """ Meminjam satu koneksi baca; dikembalikan ke pool setelah blok `with` selesai. """
+        conn = self._acquire(timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def query(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    def close(self):
+        """ Menutup koneksi yang sedang idle; koneksi yang masih dipinjam ditutup saat dikembalikan. """
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+class Writer:
+    """ Satu koneksi penulis yang dimiliki thread khusus. Semua penulisan masuk antrean dan
+        dijalankan berurutan, jadi tidak ada SQLITE_BUSY antar penulis dalam satu proses.
+    """
+
+    def __init__(self, db_path, profile=DEFAULT_PROFILE, cached_statements=DEFAULT_CACHED_STATEMENTS, max_batch=64, max_queue=10000):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.conn = open_connection(db_path, profile, cached_statements)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn):
+        """ Menjadwalkan fn(conn) di thread penulis.
+            fn dijalankan di dalam transaksi yang sudah dibuka; jangan memanggil BEGIN/COMMIT sendiri.
+        Args:
+            fn (callable): Fungsi yang menerima sqlite3.Connection.
+        Returns:
+            concurrent.futures.Future: Selesai dengan nilai kembalian fn setelah transaksi di-commit.
+        """
+        if not self._thread.is_alive():
+            raise sqlite3.ProgrammingError("Writer sudah ditutup.")
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def execute(self, sql, params=()):
+        def run(conn):
+            cursor = conn.execute(sql, params)
+            return WriteResult(cursor.lastrowid, cursor.rowcount)
+        return self.submit(run)
+
+    def executemany(self, sql, seq_of_params):
+        def run(conn):
+            return conn.executemany(sql, seq_of_params).rowcount
+        return self.submit(run)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                break
+            batch = [request]
+            while len(batch) < self.max_batch:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+            self._run_batch(batch)
+        self.conn.close()
+
+    def _run_batch(self, batch):
+        """ Menjalankan beberapa permintaan dalam satu transaksi, masing-masing di SAVEPOINT sendiri. """
+        batch = [(fn, future) for fn, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            self.conn.execute("BEGIN IMMEDIATE;")
+        except sqlite3.Error as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        outcomes = []
+        aborted = None
+        for fn, future in batch:
+            if aborted is not None:
+                outcomes.append((future, None, aborted))
+                continue
+            done = len(outcomes)
+            try:
+                self.conn.execute("SAVEPOINT request;")
+                try:
+                    result = fn(self.conn)
+                except BaseException as e:
+                    outcomes.append((future, None, e))
+                    # Pada SQLITE_FULL, IOERR atau RAISE(ROLLBACK) SQLite sudah membatalkan seluruh transaksi
+                    # dan savepoint ikut hilang; ROLLBACK TO lalu gagal dengan "no such savepoint"
+                    self.conn.execute("ROLLBACK TO request;")
+                else:
+                    outcomes.append((future, result, None))
+                self.conn.execute("RELEASE request;")
+            except sqlite3.Error as e:
+                if len(outcomes) == done:
+                    outcomes.append((future, None, e))
+                cause = outcomes[-1][2] or e
+                aborted = sqlite3.OperationalError(f"Transaksi batch dibatalkan oleh SQLite: {cause}")
+        if aborted is None and self.conn.in_transaction:
+            try:
+                self.conn.execute("COMMIT;")
+            except sqlite3.Error as e:
+                aborted = e
+        else:
+            aborted = aborted or sqlite3.OperationalError("Transaksi batch dibatalkan oleh SQLite.")
+        if aborted is not None:
+            # Transaksi batal: hasil permintaan yang sempat sukses juga ikut hilang
+            if self.conn.in_transaction:
+                try:
+                    self.conn.execute("ROLLBACK;")
+                except sqlite3.Error:
+                    pass
+            outcomes = [(future, None, error or aborted) for future, _, error in outcomes]
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self):
+        """ Menunggu antrean habis lalu menutup koneksi penulis. """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+class Database:
+    """ Titik akses tunggal: baca lewat ReadPool, tulis lewat Writer. """
+
+    def __init__(self, db_path, readers=4, profile=DEFAULT_PROFILE, cached_statements=DEFAULT_CACHED_STATEMENTS, row_factory=None):
+        # Writer dibuka lebih dulu agar journal_mode WAL sudah aktif sebelum reader pertama terhubung
+        self.writer = Writer(db_path, profile, cached_statements)
+        self.read_pool = ReadPool(db_path, readers, profile, cached_statements, row_factory)
+
+    def query(self, sql, params=()):
+        return self.read_pool.query(sql, params)
+
+    def query_one(self, sql, params=()):
+        return self.read_pool.query_one(sql, params)
+
+    def execute(self, sql, params=()):
+        return self.writer.execute(sql, params).result()
+
+    def executemany(self, sql, seq_of_params):
+        return self.writer.executemany(sql, seq_of_params).result()
+
+    def transaction(self, fn):
+        """ Menjalankan fn(conn) sebagai satu unit atomik di thread penulis dan menunggu hasilnya. """
+        return self.writer.submit(fn).result()
+
+    def close(self):
+        self.writer.close()
+        self.read_pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AsyncDatabase:
+    """ Fasad asyncio untuk Database. Query (blocking) dijalankan di thread pool;
+        penulisan sudah asinkron lewat antrean Writer sehingga cukup menunggu Future-nya.
+    """
+
+    def __init__(self, db, max_workers=None):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or db.read_pool.size, thread_name_prefix="db-read")
+
+    async def query(self, sql, params=()):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.db.query, sql, params)
+
+    async def query_one(self, sql, params=()):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.db.query_one, sql, params)
+
+    async def execute(self, sql, params=()):
+        return await asyncio.wrap_future(self.db.writer.execute(sql, params))
+
+    async def executemany(self, sql, seq_of_params):
+        return await asyncio.wrap_future(self.db.writer.executemany(sql, seq_of_params))
+
+    async def transaction(self, fn):
+        return await asyncio.wrap_future(self.db.writer.submit(fn))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.db.close()
+
+# =============================================
+# Benchmark: pool/writer vs koneksi baru per panggilan
+# =============================================
+
+FEED_SQL = "SELECT id, user_id, content, created_at FROM posts WHERE user_id = ? ORDER BY created_at DESC LIMIT 20;"
+LIKE_SQL = "INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);"
+
+def _seed_benchmark_db(db_path, n_users, n_posts):
+    conn = sqlite3.connect(db_path)
+    create_tables(conn)
+    with conn:
+        conn.executemany("INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x');",
+                         ((f"user{i}", f"user{i}@example.com") for i in range(n_users)))
+        conn.executemany("INSERT INTO posts (user_id, content) VALUES (?, ?);",
+                         ((random.randint(1, n_users), f"post {i}") for i in range(n_posts)))
+    conn.close()
+
+def _run_threads(n_threads, n_ops, op):
+    """ Menjalankan op(rng) n_ops kali di n_threads thread; mengembalikan operasi per detik. """
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(n_ops):
+            op(rng)
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(n_threads)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return n_threads * n_ops / (time.perf_counter() - start_time)
+
+def benchmark(n_threads=8, n_ops=2000, readers=4, n_users=2000, n_posts=50000):
+    """ Membandingkan throughput baca (query feed) dan tulis (like) antara koneksi baru per
+        panggilan (pola create_connection) dan Database (ReadPool + Writer).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        _seed_benchmark_db(db_path, n_users, n_posts)
+
+        def read_per_call(rng):
+            conn = open_connection(db_path)
+            conn.execute(FEED_SQL, (rng.randint(1, n_users),)).fetchall()
+            conn.close()
+
+        def write_per_call(rng):
+            conn = open_connection(db_path)
+            conn.execute(LIKE_SQL, (rng.randint(1, n_users), rng.randint(1, n_posts)))
+            conn.close()
+
+        per_call_read = _run_threads(n_threads, n_ops, read_per_call)
+        per_call_write = _run_threads(n_threads, n_ops // 4, write_per_call)
+
+        with Database(db_path, readers=readers) as db:
+            pooled_read = _run_threads(n_threads, n_ops, lambda rng: db.query(FEED_SQL, (rng.randint(1, n_users),)))
+            pooled_write = _run_threads(n_threads, n_ops // 4,
+                                        lambda rng: db.execute(LIKE_SQL, (rng.randint(1, n_users), rng.randint(1, n_posts))))
+
+    print(f"{'':18} {'per panggilan':>14} {'pool/writer':>12} {'speedup':>8}")
+    print(f"{'baca (query/s)':18} {per_call_read:14.0f} {pooled_read:12.0f} {pooled_read / per_call_read:7.1f}x")
+    print(f"{'tulis (tx/s)':18} {per_call_write:14.0f} {pooled_write:12.0f} {pooled_write / per_call_write:7.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Lapisan akses database: pool baca, writer tunggal, fasad asyncio.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    bench_parser = subparsers.add_parser("benchmark", help="Bandingkan dengan koneksi baru per panggilan.")
+    bench_parser.add_argument("--threads", type=int, default=8)
+    bench_parser.add_argument("--ops", type=int, default=2000, help="Operasi baca per thread (tulis: seperempatnya)")
+    bench_parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    benchmark(args.threads, args.ops, args.readers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,309 @@
+# db_fixtures.py
+# Fixture database instan untuk pengujian dan benchmark berbasis database template.
+# Alih-alih menjalankan create_tables (dan mengisi ulang data) di setiap pengujian, template dibangun
+# sekali lalu disimpan di direktori cache:
+#   - template skema saja (scale 0)
+#   - template berisi data sintetis deterministik pada beberapa faktor skala (scale 1 ~ 50 ribu baris)
+# Nama file template memuat hash skema (sqlite_master hasil create_tables) sehingga template otomatis
+# dibangun ulang saat c.py berubah. Setiap pengujian mendapat salinan baru: lewat backup() ke :memory:
+# atau salinan file biasa (template selalu journal_mode DELETE, jadi satu file sudah lengkap).
+# Direktori cache: $DB_FIXTURE_DIR atau <tempdir>/social_media_fixtures.
+#
+# Pemakaian sebagai modul:
+#   from db_fixtures import fixture
+#   with fixture(scale=1) as conn:          # :memory: baru, berisi data skala 1
+#       conn.execute("INSERT INTO likes (user_id, post_id) VALUES (1, 2);")
+#   with fixture(scale=20, in_memory=False) as conn:   # salinan file (~1 juta baris)
+#       ...
+#
+# Pemakaian CLI:
+#   python db_fixtures.py build [--scales 0,1,10]
+#   python db_fixtures.py list
+#   python db_fixtures.py clean
+#   python db_fixtures.py benchmark [--scale 20]
+
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager, redirect_stdout
+from io import StringIO
+
+from c import create_tables
+
+# Naikkan jika isi data sintetis berubah agar template lama tidak dipakai lagi
+SEED_VERSION = 1
+# Jumlah baris per satu faktor skala
+SCALE_UNIT = {
+    "users": 1000,
+    "friendships": 5000,
+    "posts": 10000,
+    "likes": 20000,
+    "comments": 5000,
+    "notifications": 8000,
+    "chat_rooms": 400,
+    "chat_messages": 2000,
+}
+# Semua timestamp data sintetis dihitung dari titik tetap agar template deterministik
+BASE_TIME = "2025-01-01 00:00:00"
+
+_schema_hash = None
+_sources = {}
+
+def fixture_dir():
+    """ Direktori cache template ($DB_FIXTURE_DIR atau <tempdir>/social_media_fixtures). """
+    path = os.environ.get("DB_FIXTURE_DIR") or os.path.join(tempfile.gettempdir(), "social_media_fixtures")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def schema_hash():
+    """ Hash skema yang dihasilkan create_tables (tabel, indeks, trigger), dihitung sekali per proses.
+    Returns:
+        str: 16 karakter heksadesimal pertama SHA-256.
+    """
+    global _schema_hash
+    if _schema_hash is None:
+        conn = sqlite3.connect(":memory:")
+        with redirect_stdout(StringIO()):
+            create_tables(conn)
+        rows = conn.execute("SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY type, name;").fetchall()
+        conn.close()
+        digest = hashlib.sha256(f"seed-v{SEED_VERSION}\n".encode())
+        for row in rows:
+            digest.update("\x1f".join(row).encode() + b"\n")
+        _schema_hash = digest.hexdigest()[:16]
+    return _schema_hash
+
+def template_path(scale=0):
+    """ Path file template untuk skema saat ini (belum tentu sudah ada). """
+    return os.path.join(fixture_dir(), f"template-{schema_hash()}-s{scale}.db")
+
+def seed(conn, scale):
+    """ Mengisi database berskema kosong dengan data sintetis deterministik. Semua baris dibuat
+        dengan INSERT ... SELECT dari CTE rekursif (tanpa loop Python) dan melewati trigger,
+        sehingga counter, path komentar, dan last_message_at konsisten seperti data asli.
+    Args:
+        conn (sqlite3.Connection): Koneksi database berskema kosong.
+        scale (int): Faktor skala (jumlah baris = SCALE_UNIT x scale).
+    """
+    n = {table: count * scale for table, count in SCALE_UNIT.items()}
+    seq = "WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < ?) "
+    ts = f"datetime('{BASE_TIME}', '+' || (%s) || ' seconds')"
+    conn.execute(seq + f"""INSERT INTO users (username, email, password_hash, full_name, created_at, updated_at)
+        SELECT 'user' || x, 'user' || x || '@example.com', 'x', 'Pengguna ' || x, {ts % 'x * 60'}, {ts % 'x * 60'}
+        FROM seq;""", (n["users"],))
+    # Pertemanan: setiap pengguna mengirim ke beberapa pengguna lain dengan jarak acak semu; 1 dari 5 PENDING
+    conn.execute(seq + f"""INSERT OR IGNORE INTO friendships (sender_id, receiver_id, status, created_at, updated_at)
+        SELECT (x - 1) % ?2 + 1, ((x - 1) % ?2 + (x * 7919) % (?2 - 1) + 1) % ?2 + 1,
+               CASE WHEN x % 5 = 0 THEN 'PENDING' ELSE 'ACCEPTED' END, {ts % 'x * 17'}, {ts % 'x * 17'}
+        FROM seq;""", (n["friendships"], n["users"]))
+    conn.execute(seq + f"""INSERT INTO posts (user_id, content, created_at, updated_at)
+        SELECT (x * 7919) % ?2 + 1, 'Postingan sintetis nomor ' || x, {ts % 'x * 30'}, {ts % 'x * 30'}
+        FROM seq;""", (n["posts"], n["users"]))
+    # Like unik per (user, post): pengguna ke-u menyukai post (u * 31 + k * 997) mod n_posts untuk k = 0, 1, ...
+    conn.execute(seq + f"""INSERT OR IGNORE INTO likes (user_id, post_id, created_at)
+        SELECT (x - 1) % ?2 + 1, (((x - 1) % ?2) * 31 + ((x - 1) / ?2) * 997) % ?3 + 1, {ts % 'x * 15'}
+        FROM seq;""", (n["likes"], n["users"], n["posts"]))
+    # Komentar: berkelompok empat per post; yang keempat membalas komentar sebelumnya
+    conn.execute(seq + f"""INSERT INTO comments (user_id, post_id, parent_comment_id, content, created_at, updated_at)
+        SELECT (x * 104729) % ?2 + 1, ((x - 1) / 4) % ?3 + 1,
+               CASE WHEN x % 4 = 0 THEN x - 1 END, 'Komentar sintetis ' || x, {ts % 'x * 45'}, {ts % 'x * 45'}
+        FROM seq;""", (n["comments"], n["users"], n["posts"]))
+    conn.execute(seq + f"""INSERT INTO notifications (recipient_user_id, actor_user_id, type, target_entity_type,
+                                                     target_entity_id, is_read, message, created_at)
+        SELECT (x * 7) % ?2 + 1, (x * 13) % ?2 + 1, 'POST_LIKED', 'POST', x % ?3 + 1, x % 3 = 0,
+               'Seseorang menyukai postingan Anda.', {ts % 'x * 20'}
+        FROM seq;""", (n["notifications"], n["users"], n["posts"]))
+    conn.execute(seq + f"""INSERT OR IGNORE INTO chat_rooms (user1_id, user2_id, created_at, last_message_at)
+        SELECT x, x + 1 + x % 7, {ts % 'x * 90'}, {ts % 'x * 90'}
+        FROM seq WHERE x + 1 + x % 7 <= ?2;""", (n["chat_rooms"], n["users"]))
+    conn.execute(seq + f"""INSERT INTO chat_messages (chat_room_id, sender_id, message_content, created_at)
+        SELECT r.id, CASE WHEN x % 2 = 0 THEN r.user1_id ELSE r.user2_id END, 'Pesan sintetis ' || x, {ts % 'x * 40'}
+        FROM seq JOIN chat_rooms r ON r.id = (x - 1) % ?2 + 1;""", (n["chat_messages"], n["chat_rooms"]))
+    # Template berisi keadaan awal, bukan riwayat pengisian
+    conn.execute("DELETE FROM changelog;")
+
+def build_template(scale=0, force=False):
+    """ Membangun template untuk skala tertentu jika belum ada di cache. Template ditulis ke file
+        sementara lalu di-rename, sehingga proses lain tidak pernah melihat template setengah jadi
+        (dua proses yang membangun bersamaan hanya membuang kerja, bukan merusak cache).
+    Args:
+        scale (int): 0 untuk skema saja, selain itu faktor skala data sintetis.
+        force (bool): Bangun ulang walaupun sudah ada.
+    Returns:
+        str: Path template.
+    """
+    path = template_path(scale)
+    if os.path.exists(path) and not force:
+        return path
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        conn = sqlite3.connect(tmp_path)
+        conn.execute("PRAGMA journal_mode = OFF;")
+        conn.execute("PRAGMA synchronous = OFF;")
+        with redirect_stdout(StringIO()):
+            create_tables(conn)
+        if scale:
+            with conn:
+                seed(conn, scale)
+            conn.execute("ANALYZE;")
+            conn.execute("VACUUM;")
+        conn.execute("PRAGMA journal_mode = DELETE;")
+        conn.close()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+def _source(scale):
+    """ Koneksi baca-saja ke template, dibuka sekali per proses dan dipakai ulang sebagai sumber backup(). """
+    path = build_template(scale)
+    conn = _sources.get(path)
+    if conn is None:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        _sources[path] = conn
+    return conn
+
+def clone(scale=0, path=None):
+    """ Membuat salinan baru dari template.
+    Args:
+        scale (int): Skala template.
+        path (str): Tujuan salinan file; None untuk database :memory: (via backup()).
+    Returns:
+        sqlite3.Connection: Koneksi ke salinan (foreign_keys ON).
+    """
+    if path is None:
+        conn = sqlite3.connect(":memory:")
+        _source(scale).backup(conn)
+    else:
+        shutil.copyfile(build_template(scale), path)
+        conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+@contextmanager
+def fixture(scale=0, in_memory=True):
+    """ Context manager untuk pengujian: salinan baru dari template yang dibuang setelah selesai.
+    Args:
+        scale (int): Skala template.
+        in_memory (bool): True untuk :memory:, False untuk salinan file di direktori sementara
+            (perlu jika kode yang diuji membuka database lewat path, mis. beberapa proses).
+    Yields:
+        sqlite3.Connection: Koneksi ke salinan. Path file tersedia lewat PRAGMA database_list.
+    """
+    if in_memory:
+        conn = clone(scale)
+        try:
+            yield conn
+        finally:
+            conn.close()
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = clone(scale, os.path.join(tmp_dir, "fixture.db"))
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+def list_templates():
+    """ Template di direktori cache beserta ukurannya dan apakah cocok dengan skema saat ini.
+    Returns:
+        list: Tuple (nama file, ukuran byte, cocok dengan skema saat ini).
+    """
+    current = f"template-{schema_hash()}-"
+    directory = fixture_dir()
+    return [(name, os.path.getsize(os.path.join(directory, name)), name.startswith(current))
+            for name in sorted(os.listdir(directory)) if name.startswith("template-") and name.endswith(".db")]
+
+def clean_templates():
+    """ Menghapus template untuk skema lama (dan sisa file sementara). Mengembalikan jumlah file yang dihapus. """
+    current = f"template-{schema_hash()}-"
+    directory = fixture_dir()
+    removed = 0
+    for name in os.listdir(directory):
+        if name.startswith("template-") and (name.endswith(".tmp") or not name.startswith(current)):
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+def benchmark(scale=20):
+    """ Membandingkan waktu menyiapkan fixture: create_tables + pengisian dari nol, backup() template
+        ke :memory:, dan salinan file template.
+    """
+    build_template(0)
+    start_time = time.perf_counter()
+    build_template(scale)
+    first_build = time.perf_counter() - start_time
+    rows = sum(count * scale for count in SCALE_UNIT.values())
+    print(f"Template skala {scale} (~{rows:,} baris): {os.path.getsize(template_path(scale)) / 1e6:.1f} MB, "
+          f"siap dalam {first_build:.2f} s (0 jika sudah ada di cache)")
+
+    def timed(label, make, repeats=3):
+        samples = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            conn = make()
+            conn.execute("SELECT COUNT(*) FROM likes;").fetchone()
+            samples.append(time.perf_counter() - start_time)
+            conn.close()
+        print(f"  {label:36} {min(samples) * 1000:10.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        def from_scratch(target_scale):
+            def make():
+                conn = sqlite3.connect(":memory:")
+                with redirect_stdout(StringIO()):
+                    create_tables(conn)
+                if target_scale:
+                    with conn:
+                        seed(conn, target_scale)
+                return conn
+            return make
+
+        def file_copy(target_scale):
+            def make():
+                return clone(target_scale, os.path.join(tmp_dir, f"copy-{uuid.uuid4().hex}.db"))
+            return make
+
+        print("Skema saja:")
+        timed("create_tables", from_scratch(0))
+        timed("backup() template -> :memory:", lambda: clone(0))
+        timed("salinan file template", file_copy(0))
+        print(f"Skala {scale}:")
+        timed("create_tables + isi data", from_scratch(scale), repeats=1)
+        timed("backup() template -> :memory:", lambda: clone(scale))
+        timed("salinan file template", file_copy(scale))
+
+def main():
+    parser = argparse.ArgumentParser(description="Fixture database dari template yang di-cache per hash skema.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Bangun template (jika belum ada).")
+    build_parser.add_argument("--scales", default="0,1", help="Daftar skala dipisah koma (0 = skema saja)")
+    build_parser.add_argument("--force", action="store_true")
+    subparsers.add_parser("list", help="Tampilkan template di cache.")
+    subparsers.add_parser("clean", help="Hapus template skema lama.")
+    bench_parser = subparsers.add_parser("benchmark", help="Bandingkan dengan membangun fixture dari nol.")
+    bench_parser.add_argument("--scale", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        for scale in (int(s) for s in args.scales.split(",")):
+            start_time = time.perf_counter()
+            path = build_template(scale, args.force)
+            print(f"skala {scale}: {path} ({time.perf_counter() - start_time:.2f} s)")
+    elif args.command == "list":
+        print(f"Direktori: {fixture_dir()}  (hash skema saat ini: {schema_hash()})")
+        for name, size, current in list_templates():
+            print(f"  {name:48} {size / 1e6:9.1f} MB" + ("" if current else "  (skema lama)"))
+    elif args.command == "clean":
+        print(f"{clean_templates()} file dihapus.")
+    else:
+        benchmark(args.scale)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+# db_maintenance.py
+# Daemon pemeliharaan database: statistik planner (ANALYZE / PRAGMA optimize), checkpoint WAL,
+# incremental_vacuum dan metrik fragmentasi. Semua tugas dibatasi waktu agar kunci tulis tidak
+# pernah ditahan cukup lama untuk merusak p99 aplikasi:
+#   - ANALYZE per tabel dengan PRAGMA analysis_limit (sampel per indeks), satu tabel per tick.
+#     Progress handler membatalkan statement yang melewati --task-budget; analysis_limit lalu
+#     diperkecil untuk putaran berikutnya. Tabel dianalisis ulang jika belum punya sqlite_stat1
+#     atau max(rowid)-nya tumbuh lebih dari --reanalyze-growth sejak ANALYZE terakhir.
+#   - wal_checkpoint(TRUNCATE) hanya di periode sepi (PRAGMA data_version tidak berubah selama
+#     --quiet-seconds) dengan busy_timeout pendek: checkpoint TRUNCATE memegang kunci tulis sambil
+#     menunggu pembaca, jadi penulis paling lama tertahan sebesar busy_timeout tersebut. Di luar
+#     periode sepi hanya PASSIVE (tidak pernah memblokir).
+#     Jika WalArchiver dari backup_tool.py berjalan, pakai --passive-only: arsiper menahan transaksi
+#     baca sehingga TRUNCATE tidak akan pernah selesai dan hanya membuat penulis menunggu.
+#   - incremental_vacuum per beberapa halaman (transaksi kecil) jika freelist melewati
+#     --vacuum-free-ratio. Butuh auto_vacuum=INCREMENTAL (sekali saja: enable-incremental-vacuum,
+#     menjalankan VACUUM penuh sehingga harus di jadwal maintenance).
+#
+# Pemakaian:
+#   python db_maintenance.py run [--db social_media_app.db] [--passive-only] [--analysis-limit 400]
+#   python db_maintenance.py once [--db social_media_app.db]        # semua tugas sekali (cron)
+#   python db_maintenance.py status [--db social_media_app.db] [--fragmentation]
+#   python db_maintenance.py enable-incremental-vacuum [--db social_media_app.db]
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from c import DB_FILE
+
+class TaskTimeout(Exception):
+    """ Tugas dibatalkan karena melewati batas waktunya. """
+
+def _log(message):
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}")
+
+def wal_size(db_path):
+    try:
+        return os.path.getsize(db_path + "-wal")
+    except OSError:
+        return 0
+
+def database_metrics(conn, db_path):
+    """ Metrik ukuran dan ruang kosong database.
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+        db_path (str): Path database (untuk ukuran file WAL).
+    Returns:
+        dict: page_size, page_count, freelist_count, free_ratio, wal_bytes, auto_vacuum, tabel tanpa statistik.
+    """
+    page_size = conn.execute("PRAGMA page_size;").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count;").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count;").fetchone()[0]
+    auto_vacuum = {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}[conn.execute("PRAGMA auto_vacuum;").fetchone()[0]]
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "file_bytes": page_size * page_count,
+        "freelist_count": freelist_count,
+        "free_ratio": freelist_count / page_count if page_count else 0.0,
+        "wal_bytes": wal_size(db_path),
+        "auto_vacuum": auto_vacuum,
+        "tables_without_stats": tables_needing_analyze(conn, {}),
+    }
+
+def fragmentation_metrics(conn, budget=10.0):
+    """ Fragmentasi per b-tree dari virtual table dbstat: porsi halaman yang tidak bersebelahan
+        dengan halaman sebelumnya (urutan traversal) dan porsi byte yang tidak terpakai di halaman.
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+        budget (float): Batas waktu (detik); dbstat membaca seluruh file.
+    Returns:
+        dict: nama b-tree -> {pages, fragmented_ratio, unused_ratio}, atau None jika dbstat tidak tersedia.
+    """
+    results = {}
+    previous = {}
+    try:
+        with _time_box(conn, budget):
+            for name, pageno, unused, page_size in conn.execute("SELECT name, pageno, unused, pgsize FROM dbstat ORDER BY name, path;"):
+                stats = results.get(name)
+                if stats is None:
+                    stats = results[name] = {"pages": 0, "jumps": 0, "unused": 0, "bytes": 0}
+                elif pageno != previous[name] + 1:
+                    stats["jumps"] += 1
+                previous[name] = pageno
+                stats["pages"] += 1
+                stats["unused"] += unused
+                stats["bytes"] += page_size
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            return None
+        raise
+    return {name: {"pages": stats["pages"],
+                   "fragmented_ratio": stats["jumps"] / max(1, stats["pages"] - 1),
+                   "unused_ratio": stats["unused"] / stats["bytes"]}
+            for name, stats in results.items()}
+
+class _time_box:
+    """ Context manager: progress handler yang membatalkan statement (SQLITE_INTERRUPT) setelah
+        `budget` detik. Pembatalan diubah menjadi TaskTimeout; transaksi statement itu di-rollback SQLite.
+    """
+
+    def __init__(self, conn, budget):
+        self.conn = conn
+        self.budget = budget
+        self.timed_out = False
+
+    def __enter__(self):
+        deadline = time.perf_counter() + self.budget
+
+        def check():
+            if time.perf_counter() > deadline:
+                self.timed_out = True
+                return 1
+            return 0
+        self.conn.set_progress_handler(check, 1000)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.set_progress_handler(None, 0)
+        if self.timed_out and exc_type is sqlite3.OperationalError:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK;")
+            raise TaskTimeout(f"melewati batas {self.budget * 1000:.0f} ms") from exc
+        return False
+
+def tables_needing_analyze(conn, analyzed_rowids, growth=0.2):
+    """ Tabel yang belum punya baris sqlite_stat1, atau yang max(rowid)-nya tumbuh lebih dari
+        `growth` sejak ANALYZE terakhir oleh daemon ini.
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+        analyzed_rowids (dict): nama tabel -> max(rowid) saat ANALYZE terakhir.
+        growth (float): Ambang pertumbuhan relatif.
+    Returns:
+        list: Nama tabel.
+    """
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name;")]
+    has_stat1 = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1';").fetchone() is not None
+    with_stats = set()
+    if has_stat1:
+        with_stats = {row[0] for row in conn.execute("SELECT DISTINCT tbl FROM sqlite_stat1;")}
+    indexed = {row[0] for row in conn.execute("SELECT DISTINCT tbl_name FROM sqlite_master WHERE type = 'index';")}
+    due = []
+    for table in tables:
+        if table not in indexed:
+            continue  # Statistik hanya dipakai untuk memilih indeks
+        if table not in with_stats:
+            # Tabel kosong tidak menghasilkan baris sqlite_stat1; tidak perlu dianalisis berulang-ulang
+            if conn.execute(f'SELECT 1 FROM "{table}" LIMIT 1;').fetchone() is not None:
+                due.append(table)
+            continue
+        if table in analyzed_rowids:
+            try:
+                max_rowid = conn.execute(f'SELECT max(rowid) FROM "{table}";').fetchone()[0] or 0
+            except sqlite3.OperationalError:
+                continue  # WITHOUT ROWID
+            if max_rowid > analyzed_rowids[table] * (1 + growth):
+                due.append(table)
+    return due
+
+class MaintenanceDaemon:
+    """ Menjalankan tugas pemeliharaan secara periodik di satu koneksi khusus. """
+
+    def __init__(self, db_path, analysis_limit=400, analyze_interval=3600, reanalyze_growth=0.2,
+                 quiet_seconds=5, wal_truncate_bytes=64 * 1024 * 1024, wal_passive_bytes=4 * 1024 * 1024,
+                 truncate_busy_ms=50, passive_only=False, vacuum_free_ratio=0.1, vacuum_pages_per_step=256,
+                 task_budget=0.1):
+        self.db_path = db_path
+        self.analysis_limit = analysis_limit
+        self.analyze_interval = analyze_interval
+        self.reanalyze_growth = reanalyze_growth
+        self.quiet_seconds = quiet_seconds
+        self.wal_truncate_bytes = wal_truncate_bytes
+        self.wal_passive_bytes = wal_passive_bytes
+        self.truncate_busy_ms = truncate_busy_ms
+        self.passive_only = passive_only
+        self.vacuum_free_ratio = vacuum_free_ratio
+        self.vacuum_pages_per_step = vacuum_pages_per_step
+        self.task_budget = task_budget
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.execute(f"PRAGMA busy_timeout = {truncate_busy_ms};")
+        self._data_version = None
+        self._last_change = time.monotonic()
+        self._analyzed_rowids = {}
+        self._analyze_queue = []
+        self._next_analyze = 0.0
+        self.history = []
+
+    def _record(self, task, **details):
+        entry = {"task": task, "at": time.time(), **details}
+        self.history.append(entry)
+        del self.history[:-1000]
+        _log(f"{task}: " + ", ".join(f"{key}={value}" for key, value in details.items()))
+
+    def is_quiet(self):
+        """ True jika tidak ada commit dari koneksi lain selama quiet_seconds. """
+        data_version = self.conn.execute("PRAGMA data_version;").fetchone()[0]
+        now = time.monotonic()
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self._last_change = now
+        return now - self._last_change >= self.quiet_seconds
+
+    # ---- ANALYZE / optimize ----
+
+    def analyze_step(self, force=False):
+        """ Menjalankan ANALYZE untuk satu tabel yang jatuh tempo. Returns: nama tabel atau None. """
+        now = time.monotonic()
+        if not self._analyze_queue:
+            if not force and now < self._next_analyze:
+                return None
+            self._analyze_queue = tables_needing_analyze(self.conn, self._analyzed_rowids, self.reanalyze_growth)
+            self._next_analyze = now + self.analyze_interval
+            if not self._analyze_queue:
+                # Tidak ada yang basi; PRAGMA optimize tetap murah dan menangani kasus lain
+                self.conn.execute(f"PRAGMA analysis_limit = {self.analysis_limit};")
+                self.conn.execute("PRAGMA optimize;").fetchall()
+                return None
+        table = self._analyze_queue.pop(0)
+        try:
+            max_rowid = self.conn.execute(f'SELECT max(rowid) FROM "{table}";').fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            max_rowid = None
+        self.conn.execute(f"PRAGMA analysis_limit = {self.analysis_limit};")
+        start_time = time.perf_counter()
+        try:
+            with _time_box(self.conn, self.task_budget):
+                self.conn.execute(f'ANALYZE "{table}";')
+        except TaskTimeout as e:
+            # Coba lagi nanti dengan sampel lebih kecil
+            self.analysis_limit = max(50, self.analysis_limit // 2)
+            self._analyze_queue.append(table)
+            self._record("analyze", table=table, status=f"dibatalkan ({e})", next_analysis_limit=self.analysis_limit)
+            return None
+        except sqlite3.OperationalError as e:
+            self._analyze_queue.append(table)
+            self._record("analyze", table=table, status=f"ditunda ({e})")
+            return None
+        if max_rowid is not None:
+            self._analyzed_rowids[table] = max_rowid
+        self._record("analyze", table=table, ms=round((time.perf_counter() - start_time) * 1000, 1),
+                     analysis_limit=self.analysis_limit)
+        return table
+
+    # ---- Checkpoint ----
+
+    def checkpoint_step(self, quiet, force=False):
+        """ TRUNCATE di periode sepi (busy_timeout pendek), PASSIVE jika WAL sudah besar. """
+        size = wal_size(self.db_path)
+        if size == 0:
+            return None
+        mode = None
+        if not self.passive_only and quiet and (force or size >= self.wal_truncate_bytes):
+            mode = "TRUNCATE"
+        elif force or size >= self.wal_passive_bytes:
+            mode = "PASSIVE"
+        if mode is None:
+            return None
+        start_time = time.perf_counter()
+        try:
+            busy, log_frames, checkpointed = self.conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+        except sqlite3.OperationalError as e:
+            self._record("checkpoint", mode=mode, status=f"ditunda ({e})")
+            return None
+        self._record("checkpoint", mode=mode, busy=busy, frames=log_frames, checkpointed=checkpointed,
+                     wal_before=size, wal_after=wal_size(self.db_path), ms=round((time.perf_counter() - start_time) * 1000, 1))
+        return mode
+
+    # ---- incremental_vacuum ----
+
+    def vacuum_step(self, force=False):
+        """ incremental_vacuum per vacuum_pages_per_step halaman sampai freelist di bawah ambang atau
+            batas waktu tugas habis. Setiap langkah adalah transaksi sendiri sehingga kunci tulis
+            dilepas di antara langkah.
+        """
+        if self.conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2:
+            return None
+        page_count = self.conn.execute("PRAGMA page_count;").fetchone()[0]
+        freelist_before = self.conn.execute("PRAGMA freelist_count;").fetchone()[0]
+        if not page_count or (not force and freelist_before / page_count < self.vacuum_free_ratio):
+            return None
+        target = 0 if force else int(page_count * self.vacuum_free_ratio / 2)
+        deadline = time.perf_counter() + self.task_budget
+        freelist = freelist_before
+        steps = 0
+        while freelist > target and time.perf_counter() < deadline:
+            try:
+                with _time_box(self.conn, max(0.001, deadline - time.perf_counter())):
+                    # execute() hanya menjalankan satu langkah (= satu halaman) untuk pragma tanpa kolom hasil
+                    self.conn.executescript(f"PRAGMA incremental_vacuum({self.vacuum_pages_per_step});")
+            except (TaskTimeout, sqlite3.OperationalError):
+                break
+            steps += 1
+            freelist = self.conn.execute("PRAGMA freelist_count;").fetchone()[0]
+        self._record("incremental_vacuum", freed_pages=freelist_before - freelist, freelist=freelist, steps=steps)
+        return freelist_before - freelist
+
+    def run_once(self, force=False):
+        """ Satu putaran semua tugas. force=True menjalankan semua tugas tanpa menunggu jadwal/ambang. """
+        quiet = self.is_quiet() or force
+        if force:
+            self._next_analyze = 0.0
+            self.analyze_step(force=True)
+            # Tabel yang dibatalkan masuk antrean lagi dengan analysis_limit lebih kecil; dibatasi 3 kali percobaan
+            for _ in range(3 * len(self._analyze_queue)):
+                if not self._analyze_queue:
+                    break
+                self.analyze_step(force=True)
+        else:
+            self.analyze_step()
+        self.checkpoint_step(quiet, force)
+        if quiet:
+            self.vacuum_step(force)
+
+    def run(self, interval=1.0, stop_event=None):
+        """ Loop daemon; berhenti jika stop_event di-set. """
+        stop_event = stop_event or threading.Event()
+        _log(f"Maintenance untuk {os.path.abspath(self.db_path)} berjalan (interval {interval}s, "
+             f"{'PASSIVE saja' if self.passive_only else 'TRUNCATE di periode sepi'}).")
+        while not stop_event.is_set():
+            try:
+                self.run_once()
+            except sqlite3.Error as e:
+                _log(f"Error maintenance: {e}")
+            stop_event.wait(interval)
+
+    def close(self):
+        self.conn.close()
+
+def enable_incremental_vacuum(db_path):
+    """ Mengubah auto_vacuum ke INCREMENTAL. Butuh VACUUM penuh (menulis ulang seluruh file dan
+        memegang kunci eksklusif), jadi jalankan di jadwal maintenance, bukan saat trafik tinggi.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    if conn.execute("PRAGMA auto_vacuum;").fetchone()[0] == 2:
+        print("auto_vacuum sudah INCREMENTAL.")
+    else:
+        start_time = time.perf_counter()
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+        conn.execute("VACUUM;")
+        print(f"auto_vacuum = INCREMENTAL diaktifkan (VACUUM {time.perf_counter() - start_time:.1f} s).")
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon pemeliharaan database SQLite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("run", "Jalankan daemon."), ("once", "Jalankan semua tugas sekali.")):
+        task_parser = subparsers.add_parser(name, help=help_text)
+        task_parser.add_argument("--db", default=DB_FILE)
+        task_parser.add_argument("--passive-only", action="store_true", help="Jangan pernah TRUNCATE (mis. saat WalArchiver berjalan)")
+        task_parser.add_argument("--analysis-limit", type=int, default=400)
+        task_parser.add_argument("--analyze-interval", type=int, default=3600)
+        task_parser.add_argument("--reanalyze-growth", type=float, default=0.2)
+        task_parser.add_argument("--quiet-seconds", type=float, default=5)
+        task_parser.add_argument("--wal-truncate-mb", type=float, default=64)
+        task_parser.add_argument("--truncate-busy-ms", type=int, default=50)
+        task_parser.add_argument("--vacuum-free-ratio", type=float, default=0.1)
+        task_parser.add_argument("--task-budget", type=float, default=0.1, help="Batas waktu per langkah tugas (detik)")
+        task_parser.add_argument("--interval", type=float, default=1.0)
+    status_parser = subparsers.add_parser("status", help="Cetak metrik database.")
+    status_parser.add_argument("--db", default=DB_FILE)
+    status_parser.add_argument("--fragmentation", action="store_true", help="Hitung fragmentasi per b-tree (dbstat)")
+    vacuum_parser = subparsers.add_parser("enable-incremental-vacuum", help="Aktifkan auto_vacuum=INCREMENTAL (VACUUM penuh).")
+    vacuum_parser.add_argument("--db", default=DB_FILE)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database '{args.db}' tidak ditemukan.")
+        return
+    if args.command == "status":
+        conn = sqlite3.connect(args.db)
+        metrics = database_metrics(conn, args.db)
+        if args.fragmentation:
+            metrics["fragmentation"] = fragmentation_metrics(conn)
+        conn.close()
+        print(json.dumps(metrics, indent=2))
+    elif args.command == "enable-incremental-vacuum":
+        enable_incremental_vacuum(args.db)
+    else:
+        daemon = MaintenanceDaemon(args.db, analysis_limit=args.analysis_limit, analyze_interval=args.analyze_interval,
+                                   reanalyze_growth=args.reanalyze_growth, quiet_seconds=args.quiet_seconds,
+                                   wal_truncate_bytes=int(args.wal_truncate_mb * 1024 * 1024),
+                                   truncate_busy_ms=args.truncate_busy_ms, passive_only=args.passive_only,
+                                   vacuum_free_ratio=args.vacuum_free_ratio, task_budget=args.task_budget)
+        try:
+            if args.command == "once":
+                daemon.run_once(force=True)
+            else:
+                daemon.run(args.interval)
+        except KeyboardInterrupt:
+            print("Daemon dihentikan.")
+        finally:
+            daemon.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+# db_transfer.py
+# Export/import seluruh database sebagai NDJSON secara streaming (memori konstan), untuk memindahkan
+# data antar mesin atau antar versi skema tanpa menyalin file .db mentah.
+#
+# Format export (satu direktori):
+#   manifest.json                    -> daftar tabel, kolom, jumlah baris, SQL skema, isi sqlite_sequence
+#   <tabel>.<part>.ndjson.gz         -> baris pertama header {"table", "columns"}, lalu satu array JSON per baris
+# Tabel besar dipecah per rentang rowid sehingga part bisa diexport paralel oleh beberapa proses. Batas part
+# diambil dari data (setiap part_rows baris), jadi id yang jarang (mis. blok id shard 2^40) tidak menghasilkan
+# jutaan part kosong.
+# BLOB ditulis sebagai {"$b64": "..."}.
+#
+# Import: tabel dibuat lebih dulu tanpa indeks dan trigger, data dimuat dengan executemany per batch
+# besar (journal_mode OFF, synchronous OFF) dan indeks/trigger baru dibuat setelah semua data masuk.
+# Kolom dicocokkan berdasarkan nama, jadi export dari skema lama bisa diimport ke skema c.py terbaru
+# (--schema canonical); kolom yang tidak ada di tujuan dilewati. Export dari database yang sudah dimigrasi
+# epoch_timestamps.py berisi <kolom>_ms (kolom teks generated tidak ikut); jika tujuan masih memakai kolom
+# teks, nilai _ms diubah kembali ke teks 'YYYY-MM-DD HH:MM:SS' (presisi detik, sama dengan CURRENT_TIMESTAMP).
+# Kolom turunan yang biasanya dijaga trigger (comments.path/depth/reply_count, counter di users, baris
+# live_sessions) tidak ada di export dari skema lama; pada --schema canonical kolom itu diisi ulang dari
+# data sumber setelah indeks dibuat dan sebelum trigger dipasang kembali.
+#
+# Catatan konsistensi: tiap part dibaca dalam transaksinya sendiri. Untuk export yang konsisten
+# di seluruh tabel, export dari salinan (mis. hasil backup_tool.py restore) atau pakai --workers 1.
+#
+# Pemakaian:
+#   python db_transfer.py export --out export_dir [--workers 4] [--part-rows 1000000]
+#   python db_transfer.py import --src export_dir --target rebuilt.db [--schema canonical] [--batch-size 50000]
+#   python db_transfer.py benchmark [--rows 200000]
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from c import DB_FILE, EPOCH_MS_COLUMNS, create_tables
+from comment_threads import backfill_comment_paths
+from live_viewers import backfill_live_sessions
+from user_counters import repair_counters
+
+FETCH_SIZE = 10000
+
+def _encode_value(value):
+    if isinstance(value, bytes):
+        return {"$b64": base64.b64encode(value).decode("ascii")}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return base64.b64decode(value["$b64"])
+    return value
+
+def _user_tables(conn):
+    return [(name, sql) for name, sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name;")]
+
+def _has_rowid(conn, table):
+    try:
+        conn.execute(f'SELECT rowid FROM "{table}" LIMIT 0;')
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def iter_rows(conn, table, columns, rowid_range=None):
+    """ Generator baris sebuah tabel (atau satu rentang rowid), dibaca per FETCH_SIZE baris.
+    Args:
+        conn (sqlite3.Connection): Koneksi sumber.
+        table (str): Nama tabel.
+        columns (list): Kolom yang dibaca.
+        rowid_range (tuple): (awal, akhir) inklusif-eksklusif, atau None untuk seluruh tabel.
+    Yields:
+        tuple: Satu baris.
+    """
+    column_sql = ", ".join(f'"{column}"' for column in columns)
+    if rowid_range is None:
+        cursor = conn.execute(f'SELECT {column_sql} FROM "{table}";')
+    else:
+        cursor = conn.execute(f'SELECT {column_sql} FROM "{table}" WHERE rowid >= ? AND rowid < ? ORDER BY rowid;', rowid_range)
+    while True:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        if not rows:
+            break
+        yield from rows
+
+def _part_ranges(conn, table, part_rows):
+    """ Rentang rowid [awal, akhir) yang masing-masing berisi part_rows baris (part terakhir bisa lebih sedikit).
+        Setiap batas dicari dengan OFFSET dari batas sebelumnya, jadi total hanya satu kali scan rowid.
+    Returns:
+        list: Rentang rowid; satu rentang kosong (0, 0) jika tabel kosong.
+    """
+    low, high = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table}";').fetchone()
+    if low is None:
+        return [(0, 0)]
+    ranges = []
+    start = low
+    while True:
+        boundary = conn.execute(f'SELECT rowid FROM "{table}" WHERE rowid >= ? ORDER BY rowid LIMIT 1 OFFSET ?;',
+                                (start, part_rows)).fetchone()
+        if boundary is None:
+            ranges.append((start, high + 1))
+            return ranges
+        ranges.append((start, boundary[0]))
+        start = boundary[0]
+
+def _export_part(db_path, out_dir, table, columns, part, rowid_range):
+    """ Dijalankan di proses worker: menulis satu part tabel ke file NDJSON gzip. """
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    path = os.path.join(out_dir, f"{table}.{part:04d}.ndjson.gz")
+    count = 0
+    has_blob = False
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=1) as f:
+        f.write(json.dumps({"table": table, "columns": columns}) + "\n")
+        for row in iter_rows(conn, table, columns, rowid_range):
+            if any(isinstance(value, bytes) for value in row):
+                has_blob = True
+                row = [_encode_value(value) for value in row]
+            f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    conn.close()
+    return table, part, os.path.basename(path), count, has_blob
+
+def export_database(db_path, out_dir, workers=4, part_rows=1000000):
+    """ Mengexport semua tabel ke out_dir secara paralel.
+    Args:
+        db_path (str): Database sumber.
+        out_dir (str): Direktori tujuan (dibuat jika belum ada).
+        workers (int): Jumlah proses export.
+        part_rows (int): Jumlah baris per part.
+    Returns:
+        dict: Manifest export.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start_time = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    tasks = []
+    manifest = {"source": os.path.abspath(db_path), "sqlite_version": sqlite3.sqlite_version, "tables": {}}
+    for table, sql in _user_tables(conn):
+        columns = [info[1] for info in conn.execute(f'PRAGMA table_info("{table}");')]
+        manifest["tables"][table] = {"sql": sql, "columns": columns, "parts": []}
+        if _has_rowid(conn, table):
+            for part, rowid_range in enumerate(_part_ranges(conn, table, part_rows)):
+                tasks.append((table, columns, part, rowid_range))
+        else:
+            tasks.append((table, columns, 0, None))
+    manifest["schema"] = [sql for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger', 'view') AND sql IS NOT NULL ORDER BY type, name;")]
+    has_sequence = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence';").fetchone()
+    manifest["sqlite_sequence"] = conn.execute("SELECT name, seq FROM sqlite_sequence;").fetchall() if has_sequence else []
+    conn.close()
+
+    total_rows = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_export_part, db_path, out_dir, table, columns, part, rowid_range)
+                   for table, columns, part, rowid_range in tasks]
+        for future in futures:
+            table, part, file_name, count, has_blob = future.result()
+            manifest["tables"][table]["parts"].append({"part": part, "file": file_name, "rows": count, "has_blob": has_blob})
+            total_rows += count
+    for info in manifest["tables"].values():
+        info["rows"] = sum(part["rows"] for part in info["parts"])
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    elapsed = time.perf_counter() - start_time
+    print(f"Export {len(manifest['tables'])} tabel, {total_rows} baris ke {out_dir} dalam {elapsed:.2f} s.")
+    return manifest
+
+def iter_export_rows(src_dir, part):
+    """ Generator baris dari satu file part (nilai BLOB sudah didecode). """
+    with gzip.open(os.path.join(src_dir, part["file"]), "rt", encoding="utf-8") as f:
+        next(f)
+        if part["has_blob"]:
+            for line in f:
+                yield [_decode_value(value) for value in json.loads(line)]
+        else:
+            yield from map(json.loads, f)
+
+def _target_columns(table, columns, target_columns):
+    """ Memetakan kolom export ke kolom tujuan.
+    Args:
+        table (str): Nama tabel.
+        columns (list): Kolom di export.
+        target_columns (set): Kolom (non-generated) di tabel tujuan.
+    Returns:
+        list: (indeks kolom export, kolom tujuan, placeholder SQL) untuk kolom yang dimuat.
+    """
+    mapped = []
+    epoch_columns = EPOCH_MS_COLUMNS.get(table, ())
+    for i, column in enumerate(columns):
+        if column in target_columns:
+            mapped.append((i, column, "?"))
+        elif column.endswith("_ms") and column[:-3] in epoch_columns and column[:-3] in target_columns:
+            mapped.append((i, column[:-3], "strftime('%Y-%m-%d %H:%M:%S', ? / 1000, 'unixepoch')"))
+    return mapped
+
+def _take(rows, n):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, n))
+        if not batch:
+            break
+        yield batch
+
+def import_database(src_dir, target_path, schema="export", batch_size=50000):
+    """ Membangun database baru dari hasil export.
+    Args:
+        src_dir (str): Direktori hasil export.
+        target_path (str): Database tujuan (tidak boleh sudah ada).
+        schema (str): "export" memakai SQL skema dari manifest, "canonical" memakai create_tables (c.py).
+        batch_size (int): Jumlah baris per executemany.
+    Returns:
+        int: Jumlah baris yang dimuat.
+    """
+    if os.path.exists(target_path):
+        raise FileExistsError(f"'{target_path}' sudah ada")
+    with open(os.path.join(src_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    start_time = time.perf_counter()
+    conn = sqlite3.connect(target_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = OFF;")
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute("PRAGMA cache_size = -262144;")
+
+    if schema == "canonical":
+        create_tables(conn)
+        conn.execute("PRAGMA foreign_keys = OFF;")
+    else:
+        for info in manifest["tables"].values():
+            conn.execute(info["sql"])
+        for sql in manifest["schema"]:
+            conn.execute(sql)
+    # Indeks dan trigger dilepas selama load lalu dibuat ulang sekali di akhir
+    deferred = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL;").fetchall()
+    for object_type, name, _ in deferred:
+        conn.execute(f'DROP {object_type.upper()} "{name}";')
+    target_tables = {name for name, _ in _user_tables(conn)}
+
+    total_rows = 0
+    conn.execute("BEGIN;")
+    for table, info in manifest["tables"].items():
+        if table not in target_tables:
+            print(f"Tabel '{table}' tidak ada di skema tujuan, dilewati.")
+            continue
+        target_columns = {column[1] for column in conn.execute(f'PRAGMA table_info("{table}");')}
+        mapped = _target_columns(table, info["columns"], target_columns)
+        keep = [i for i, _, _ in mapped]
+        column_sql = ", ".join(f'"{column}"' for _, column, _ in mapped)
+        insert_sql = f'INSERT INTO "{table}" ({column_sql}) VALUES ({", ".join(value for _, _, value in mapped)});'
+        all_columns = len(keep) == len(info["columns"])
+        for part in sorted(info["parts"], key=lambda p: p["part"]):
+            rows = iter_export_rows(src_dir, part)
+            if not all_columns:
+                rows = ([row[i] for i in keep] for row in rows)
+            for batch in _take(rows, batch_size):
+                conn.executemany(insert_sql, batch)
+                total_rows += len(batch)
+        print(f"{table}: {info['rows']} baris dimuat.")
+    loaded_time = time.perf_counter()
+    for object_type, _, sql in sorted(deferred, key=lambda item: item[0] != "index"):
+        if object_type == "index":
+            conn.execute(sql)
+    if schema == "canonical":
+        # Diisi tanpa trigger (tidak ada changelog/updated_at untuk backfill); fungsi ini meng-commit sendiri
+        conn.execute("COMMIT;")
+        backfill_comment_paths(conn)
+        repair_counters(conn)
+        backfill_live_sessions(conn)
+        conn.execute("BEGIN;")
+    for object_type, _, sql in deferred:
+        if object_type == "trigger":
+            conn.execute(sql)
+    if manifest["sqlite_sequence"] and conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence';").fetchone():
+        conn.execute("DELETE FROM sqlite_sequence;")
+        conn.executemany("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?);", manifest["sqlite_sequence"])
+    conn.execute("COMMIT;")
+    conn.execute("PRAGMA journal_mode = DELETE;")
+    conn.close()
+    elapsed = time.perf_counter() - start_time
+    print(f"Import {total_rows} baris dalam {elapsed:.2f} s "
+          f"(load {loaded_time - start_time:.2f} s, indeks dan trigger {time.perf_counter() - loaded_time:.2f} s).")
+    return total_rows
+
+def _import_row_by_row(src_dir, target_path):
+    """ Pembanding: skema lengkap (indeks dan trigger aktif) lalu INSERT satu per satu. """
+    with open(os.path.join(src_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    conn = sqlite3.connect(target_path)
+    for info in manifest["tables"].values():
+        conn.execute(info["sql"])
+    for sql in manifest["schema"]:
+        conn.execute(sql)
+    for table, info in manifest["tables"].items():
+        insert_sql = f'INSERT INTO "{table}" ({", ".join(info["columns"])}) VALUES ({", ".join("?" * len(info["columns"]))});'
+        for part in info["parts"]:
+            for row in iter_export_rows(src_dir, part):
+                conn.execute(insert_sql, row)
+        conn.commit()
+    conn.close()
+
+def benchmark(n_rows=200000, workers=4):
+    """ Membandingkan import batch (indeks/trigger ditunda) dengan INSERT baris per baris. """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "source.db")
+        conn = sqlite3.connect(db_path)
+        create_tables(conn)
+        n_users = max(n_rows // 20, 10)
+        conn.executemany("INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x');",
+                         ((f"user{i}", f"user{i}@example.com") for i in range(n_users)))
+        conn.executemany("INSERT INTO posts (user_id, content) VALUES (?, ?);",
+                         ((i % n_users + 1, f"post {i}") for i in range(n_rows // 2)))
+        conn.executemany("INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);",
+                         ((i % n_users + 1, i // 3 % (n_rows // 2) + 1) for i in range(n_rows // 4)))
+        conn.executemany("INSERT INTO comments (user_id, post_id, content) VALUES (?, ?, ?);",
+                         ((i % n_users + 1, i % (n_rows // 2) + 1, f"komentar {i}") for i in range(n_rows // 4)))
+        conn.commit()
+        conn.close()
+
+        export_dir = os.path.join(tmp_dir, "export")
+        start = time.perf_counter()
+        export_database(db_path, export_dir, workers=workers, part_rows=max(n_rows // 8, 1000))
+        export_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        import_database(export_dir, os.path.join(tmp_dir, "batch.db"))
+        batch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _import_row_by_row(export_dir, os.path.join(tmp_dir, "row_by_row.db"))
+        row_time = time.perf_counter() - start
+
+        def table_counts(path):
+            conn = sqlite3.connect(path)
+            counts = {table: conn.execute(f'SELECT COUNT(*) FROM "{table}";').fetchone()[0] for table, _ in _user_tables(conn)}
+            post_counts = conn.execute("SELECT SUM(post_count) FROM users;").fetchone()[0]
+            conn.close()
+            return counts, post_counts
+        source_counts = table_counts(db_path)
+        batch_same = table_counts(os.path.join(tmp_dir, "batch.db")) == source_counts
+        row_same = table_counts(os.path.join(tmp_dir, "row_by_row.db")) == source_counts
+
+    print()
+    print(f"Export paralel ({workers} proses): {export_time:.2f} s")
+    print(f"Import batch, indeks/trigger ditunda: {batch_time:.2f} s")
+    print(f"Import baris per baris: {row_time:.2f} s ({row_time / batch_time:.1f}x lebih lambat)")
+    # Dengan trigger aktif, data turunan (changelog, counter) ikut ditulis ulang sehingga berbeda dari sumber
+    print(f"Hasil import batch sama dengan sumber: {'OK' if batch_same else 'TIDAK'}")
+    print(f"Hasil import baris per baris sama dengan sumber: {'OK' if row_same else 'TIDAK (trigger berjalan dua kali)'}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export/import NDJSON streaming.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Export semua tabel ke NDJSON.")
+    export_parser.add_argument("--db", default=DB_FILE)
+    export_parser.add_argument("--out", required=True)
+    export_parser.add_argument("--workers", type=int, default=4)
+    export_parser.add_argument("--part-rows", type=int, default=1000000)
+    import_parser = subparsers.add_parser("import", help="Bangun database baru dari export.")
+    import_parser.add_argument("--src", required=True)
+    import_parser.add_argument("--target", required=True)
+    import_parser.add_argument("--schema", choices=["export", "canonical"], default="export")
+    import_parser.add_argument("--batch-size", type=int, default=50000)
+    bench_parser = subparsers.add_parser("benchmark", help="Import batch vs baris per baris.")
+    bench_parser.add_argument("--rows", type=int, default=200000)
+    bench_parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_database(args.db, args.out, args.workers, args.part_rows)
+    elif args.command == "import":
+        import_database(args.src, args.target, args.schema, args.batch_size)
+    else:
+        benchmark(args.rows, args.workers)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+# engagement_analytics.py
+# Analitik engagement di atas snapshot kolumnar dari columnar_export.py (tidak menyentuh database produksi).
+# Semua metrik dihitung dengan operasi vektor NumPy di atas kolom yang di-mmap:
+#   - DAU (user unik yang posting/like/komentar/share per hari)
+#   - jumlah post per hari
+#   - distribusi like dan komentar per post (persentil, porsi post tanpa engagement)
+#   - top kreator berdasarkan like + komentar + share yang diterima
+#
+# Subperintah `check` mencocokkan DAU, post per hari dan top kreator hasil NumPy dengan agregat SQL
+# langsung di database sumber snapshot. Jalankan tepat setelah export (sebelum ada tulisan baru),
+# karena snapshot adalah salinan beku dan database terus berubah.
+#
+# Butuh NumPy: pip install numpy
+#
+# Pemakaian:
+#   python columnar_export.py --out analytics_snapshot
+#   python engagement_analytics.py report [--snapshot analytics_snapshot] [--days 30] [--top 10]
+#   python engagement_analytics.py check [--snapshot analytics_snapshot] [--db social_media_app.db] [--days 30] [--top 10]
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+ACTIVITY_TABLES = ("posts", "likes", "comments", "shares")
+
+class Snapshot:
+    """ Akses kolom-kolom snapshot; file .npy dibuka dengan mmap_mode="r" saat pertama dipakai. """
+
+    def __init__(self, snapshot_dir):
+        manifest_path = os.path.join(snapshot_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"Manifest snapshot tidak ditemukan di '{snapshot_dir}'.")
+        with open(manifest_path) as f:
+            self.manifest = json.load(f)
+        self.snapshot_dir = snapshot_dir
+        self._columns = {}
+
+    def column(self, table, name):
+        """ Mengembalikan satu kolom sebagai array NumPy (memory-mapped).
+        Args:
+            table (str): Nama tabel.
+            name (str): Nama kolom.
+        Returns:
+            numpy.ndarray: Nilai kolom, urut berdasarkan id.
+        """
+        key = (table, name)
+        if key not in self._columns:
+            self._columns[key] = np.load(os.path.join(self.snapshot_dir, table, f"{name}.npy"), mmap_mode="r")
+        return self._columns[key]
+
+    def rows(self, table):
+        return self.manifest["tables"][table]["rows"]
+
+def _day_index(timestamps, start_day):
+    return timestamps // SECONDS_PER_DAY - start_day
+
+def daily_active_users(snapshot, start_day, n_days):
+    """ Menghitung DAU: user unik dengan aktivitas apa pun per hari.
+    Args:
+        snapshot (Snapshot): Snapshot kolumnar.
+        start_day (int): Hari pertama (epoch // 86400).
+        n_days (int): Jumlah hari.
+    Returns:
+        numpy.ndarray: Jumlah user aktif per hari (panjang n_days).
+    """
+    keys = []
+    for table in ACTIVITY_TABLES:
+        day = _day_index(snapshot.column(table, "created_at"), start_day)
+        in_range = (day >= 0) & (day < n_days)
+        # Satu kunci int64 per (hari, user); np.unique membuang duplikat lintas tabel
+        keys.append(day[in_range] * (1 << 40) + snapshot.column(table, "user_id")[in_range])
+    unique_keys = np.unique(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+    return np.bincount(unique_keys >> 40, minlength=n_days)[:n_days]
+
+def posts_per_day(snapshot, start_day, n_days):
+    """ Menghitung jumlah post baru per hari.
+    Args:
+        snapshot (Snapshot): Snapshot kolumnar.
+        start_day (int): Hari pertama (epoch // 86400).
+        n_days (int): Jumlah hari.
+    Returns:
+        numpy.ndarray: Jumlah post per hari (panjang n_days).
+    """
+    day = _day_index(snapshot.column("posts", "created_at"), start_day)
+    day = day[(day >= 0) & (day < n_days)]
+    return np.bincount(day, minlength=n_days)[:n_days]
+
+def _per_post_counts(snapshot, table, post_column):
+    """ Jumlah baris `table` per post, sejajar dengan kolom posts.id (yang sudah terurut). """
+    post_ids = snapshot.column("posts", "id")
+    targets = snapshot.column(table, post_column)
+    positions = np.searchsorted(post_ids, targets)
+    positions = np.minimum(positions, max(len(post_ids) - 1, 0))
+    valid = post_ids[positions] == targets if len(post_ids) else np.zeros(len(targets), dtype=bool)
+    return np.bincount(positions[valid], minlength=len(post_ids))
+
+def engagement_distribution(snapshot, table, post_column="post_id"):
+    """ Ringkasan distribusi engagement (like/komentar) per post.
+    Args:
+        snapshot (Snapshot): Snapshot kolumnar.
+        table (str): 'likes' atau 'comments'.
+        post_column (str): Kolom yang menunjuk ke posts.id.
+    Returns:
+        dict: mean, persentil (p50, p90, p99), max dan porsi post tanpa engagement.
+    """
+    counts = _per_post_counts(snapshot, table, post_column)
+    if len(counts) == 0:
+        return {"posts": 0, "mean": 0.0, "p50": 0, "p90": 0, "p99": 0, "max": 0, "zero_share": 0.0}
+    p50, p90, p99 = np.percentile(counts, [50, 90, 99])
+    return {
+        "posts": int(len(counts)),
+        "mean": float(counts.mean()),
+        "p50": float(p50),
+        "p90": float(p90),
+        "p99": float(p99),
+        "max": int(counts.max()),
+        "zero_share": float((counts == 0).mean()),
+    }
+
+def top_creators(snapshot, top_n=10):
+    """ Kreator dengan engagement terbanyak (like + komentar + share yang diterima post-nya).
+    Args:
+        snapshot (Snapshot): Snapshot kolumnar.
+        top_n (int): Jumlah kreator.
+    Returns:
+        list: Daftar (user_id, engagement, jumlah post) terurut menurun.
+    """
+    authors = np.asarray(snapshot.column("posts", "user_id"))
+    if len(authors) == 0:
+        return []
+    engagement = (_per_post_counts(snapshot, "likes", "post_id")
+                  + _per_post_counts(snapshot, "comments", "post_id")
+                  + _per_post_counts(snapshot, "shares", "original_post_id"))
+    per_author = np.bincount(authors, weights=engagement)
+    post_counts = np.bincount(authors)
+    top_n = min(top_n, np.count_nonzero(post_counts))
+    if top_n == 0:
+        return []
+    candidates = np.argpartition(-per_author, top_n - 1)[:top_n]
+    ordered = candidates[np.lexsort((candidates, -per_author[candidates]))]
+    return [(int(user_id), int(per_author[user_id]), int(post_counts[user_id])) for user_id in ordered]
+
+def _latest_day(snapshot):
+    latest = [int(snapshot.column(table, "created_at").max()) for table in ACTIVITY_TABLES if snapshot.rows(table)]
+    return max(latest) // SECONDS_PER_DAY if latest else int(time.time()) // SECONDS_PER_DAY
+
+def build_report(snapshot, days=30, top_n=10):
+    """ Menyusun laporan engagement untuk `days` hari terakhir dalam snapshot.
+    Args:
+        snapshot (Snapshot): Snapshot kolumnar.
+        days (int): Panjang jendela harian.
+        top_n (int): Jumlah top kreator.
+    Returns:
+        dict: Laporan (per hari, distribusi, top kreator, waktu hitung).
+    """
+    start_time = time.perf_counter()
+    start_day = _latest_day(snapshot) - days + 1
+    dau = daily_active_users(snapshot, start_day, days)
+    posts = posts_per_day(snapshot, start_day, days)
+    report = {
+        "days": [
+            {"day": datetime.fromtimestamp((start_day + i) * SECONDS_PER_DAY, timezone.utc).strftime("%Y-%m-%d"),
+             "dau": int(dau[i]), "posts": int(posts[i])}
+            for i in range(days)
+        ],
+        "likes_per_post": engagement_distribution(snapshot, "likes"),
+        "comments_per_post": engagement_distribution(snapshot, "comments"),
+        "top_creators": top_creators(snapshot, top_n),
+    }
+    report["elapsed_seconds"] = time.perf_counter() - start_time
+    return report
+
+# Hari epoch dari kolom TEXT, sama dengan konversi di columnar_export.py (NULL tidak masuk hitungan)
+_SQL_DAY = f"CAST(strftime('%s', created_at) AS INTEGER) / {SECONDS_PER_DAY}"
+
+def _sql_per_day(conn, sql, start_day, n_days):
+    counts = np.zeros(n_days, dtype=np.int64)
+    for day, count in conn.execute(sql, (start_day, start_day + n_days)):
+        counts[day - start_day] = count
+    return counts
+
+def _sql_creators(conn):
+    """ Engagement dan jumlah post per penulis langsung dari SQL: {user_id: (engagement, jumlah post)}. """
+    rows = conn.execute(
+        "SELECT p.user_id, SUM(COALESCE(l.n, 0) + COALESCE(c.n, 0) + COALESCE(s.n, 0)), COUNT(*) FROM posts p "
+        "LEFT JOIN (SELECT post_id, COUNT(*) AS n FROM likes GROUP BY post_id) l ON l.post_id = p.id "
+        "LEFT JOIN (SELECT post_id, COUNT(*) AS n FROM comments GROUP BY post_id) c ON c.post_id = p.id "
+        "LEFT JOIN (SELECT original_post_id, COUNT(*) AS n FROM shares GROUP BY original_post_id) s "
+        "ON s.original_post_id = p.id GROUP BY p.user_id;"
+    )
+    return {user_id: (engagement, n_posts) for user_id, engagement, n_posts in rows}
+
+def check_report(snapshot, conn, days=30, top_n=10):
+    """ Mencocokkan DAU, post per hari dan top kreator dari snapshot dengan agregat SQL di database.
+    Args:
+        snapshot (Snapshot): Snapshot kolumnar.
+        conn (sqlite3.Connection): Koneksi ke database sumber snapshot.
+        days (int): Panjang jendela harian (sama dengan `report`).
+        top_n (int): Jumlah top kreator.
+    Returns:
+        list: Deskripsi setiap selisih; kosong jika semua cocok.
+    """
+    start_day = _latest_day(snapshot) - days + 1
+    activity_sql = " UNION ".join(f"SELECT {_SQL_DAY} AS day, user_id FROM {table}" for table in ACTIVITY_TABLES)
+    # Satu transaksi baca: ketiga agregat melihat isi database yang sama
+    conn.execute("BEGIN;")
+    try:
+        sql_dau = _sql_per_day(conn, f"SELECT day, COUNT(*) FROM ({activity_sql}) "
+                                     "WHERE day >= ? AND day < ? GROUP BY day;", start_day, days)
+        sql_posts = _sql_per_day(conn, f"SELECT {_SQL_DAY} AS day, COUNT(*) FROM posts "
+                                       "WHERE day >= ? AND day < ? GROUP BY day;", start_day, days)
+        sql_creators = _sql_creators(conn)
+    finally:
+        conn.execute("COMMIT;")
+
+    mismatches = []
+    for label, numpy_counts, sql_counts in (("DAU", daily_active_users(snapshot, start_day, days), sql_dau),
+                                            ("Post", posts_per_day(snapshot, start_day, days), sql_posts)):
+        for i in np.flatnonzero(numpy_counts != sql_counts):
+            day = datetime.fromtimestamp((start_day + int(i)) * SECONDS_PER_DAY, timezone.utc).strftime("%Y-%m-%d")
+            mismatches.append(f"{label} {day}: NumPy {int(numpy_counts[i])}, SQL {int(sql_counts[i])}")
+
+    creators = top_creators(snapshot, top_n)
+    sql_top = sorted(sql_creators.items(), key=lambda item: (-item[1][0], item[0]))[:top_n]
+    # Pada engagement yang seri di batas top_n, pilihan user boleh berbeda; urutan nilai engagement harus sama
+    if [engagement for _, engagement, _ in creators] != [engagement for _, (engagement, _) in sql_top]:
+        mismatches.append(f"Top kreator: NumPy {[(u, e) for u, e, _ in creators]}, "
+                          f"SQL {[(u, e) for u, (e, _) in sql_top]}")
+    for user_id, engagement, n_posts in creators:
+        expected = sql_creators.get(user_id, (0, 0))
+        if (engagement, n_posts) != expected:
+            mismatches.append(f"Kreator {user_id}: NumPy {engagement} engagement/{n_posts} post, "
+                              f"SQL {expected[0]} engagement/{expected[1]} post")
+    return mismatches
+
+def print_report(report):
+    print("Hari        DAU      Post")
+    for entry in report["days"]:
+        print(f"{entry['day']}  {entry['dau']:>7}  {entry['posts']:>7}")
+    for label, key in (("Like per post", "likes_per_post"), ("Komentar per post", "comments_per_post")):
+        dist = report[key]
+        print(f"{label}: rata-rata {dist['mean']:.2f}, p50 {dist['p50']:.0f}, p90 {dist['p90']:.0f}, "
+              f"p99 {dist['p99']:.0f}, max {dist['max']}, tanpa engagement {dist['zero_share'] * 100:.1f}%")
+    print("Top kreator (user_id, engagement, post):")
+    for user_id, engagement, n_posts in report["top_creators"]:
+        print(f"  {user_id}: {engagement} engagement dari {n_posts} post")
+    print(f"Dihitung dalam {report['elapsed_seconds']:.3f} s.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan engagement dari snapshot kolumnar.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Cetak DAU, post per hari, distribusi engagement dan top kreator")
+    report_parser.add_argument("--snapshot", default="analytics_snapshot")
+    report_parser.add_argument("--days", type=int, default=30)
+    report_parser.add_argument("--top", type=int, default=10)
+    report_parser.add_argument("--json", action="store_true", help="Cetak laporan sebagai JSON")
+    check_parser = subparsers.add_parser("check", help="Cocokkan DAU, post per hari dan top kreator dengan agregat SQL")
+    check_parser.add_argument("--snapshot", default="analytics_snapshot")
+    check_parser.add_argument("--db", help="Database sumber (default: sumber yang tercatat di manifest snapshot)")
+    check_parser.add_argument("--days", type=int, default=30)
+    check_parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    snapshot = Snapshot(args.snapshot)
+    if args.command == "check":
+        db_path = args.db or snapshot.manifest["source"]
+        conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True, isolation_level=None)
+        mismatches = check_report(snapshot, conn, args.days, args.top)
+        conn.close()
+        for mismatch in mismatches:
+            print(mismatch)
+        if mismatches:
+            print(f"{len(mismatches)} selisih antara snapshot dan SQL.")
+            raise SystemExit(1)
+        print(f"Snapshot cocok dengan SQL untuk {args.days} hari terakhir dan top {args.top} kreator.")
+        return
+    report = build_report(snapshot, args.days, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == '__main__':
+    main()
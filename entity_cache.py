@@ -0,0 +1,360 @@
+# entity_cache.py
+# Cache in-process untuk kartu pengguna (username, nama, foto profil) dan header post (isi, media,
+# jumlah like/komentar) yang dibaca berulang kali oleh route daftar dan halaman profil.
+#   - LRU terbatas jumlah entri dan perkiraan ukuran byte, dengan TTL sebagai jaring pengaman
+#   - Sebelum setiap pembacaan, PRAGMA data_version (dan total_changes untuk tulisan koneksi sendiri)
+#     dibandingkan dengan nilai terakhir: jika tidak ada commit baru, semua entri masih valid tanpa query lain.
+#     Jika ada commit, entri changelog sejak id terakhir dibaca dan hanya kunci yang berubah yang dibuang
+#     (users -> kartu; posts/likes/comments -> header post). Terlalu banyak perubahan atau changelog yang
+#     sudah di-prune melewati id terakhir -> seluruh cache dikosongkan.
+#   - Dengan begitu hit tidak pernah menyajikan data yang lebih lama dari commit terakhir saat pemeriksaan.
+# Satu EntityCache per koneksi (per thread / proses worker).
+#
+# Pemakaian:
+#   python entity_cache.py get --user-id 1 --post-id 1
+#   python entity_cache.py bench [--scale 2] [--pages 20000] [--write-every 20]
+
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+from c import DB_FILE, create_connection
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_TTL = 300.0
+FULL_RESET_THRESHOLD = 2000   # entri changelog sekaligus; di atas ini lebih murah mengosongkan cache
+
+USER_CARD_COLUMNS = ("id", "username", "full_name", "profile_picture_url")
+POST_HEADER_COLUMNS = ("id", "user_id", "content", "image_url", "video_url", "created_at", "visibility_status",
+                       "like_count", "comment_count")
+SQL_USER_CARDS = "SELECT id, username, full_name, profile_picture_url FROM users WHERE id IN ({})"
+SQL_POST_HEADERS = """
+    SELECT p.id, p.user_id, p.content, p.image_url, p.video_url, p.created_at, p.visibility_status,
+           (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id),
+           (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id)
+    FROM posts p WHERE p.id IN ({})
+"""
+# Kunci yang harus dibuang untuk setiap entri changelog: users -> kartu, lainnya -> header post
+SQL_CHANGED_KEYS = """
+    SELECT table_name, CASE WHEN table_name IN ('users', 'posts') THEN row_id
+                            ELSE json_extract(data, '$.post_id') END
+    FROM changelog
+    WHERE id > ? AND id <= ? AND table_name IN ('users', 'posts', 'likes', 'comments')
+"""
+
+_MISSING = object()
+
+class LRUCache:
+    """ LRU dengan batas jumlah entri, batas perkiraan ukuran byte, dan TTL per entri.
+    Args:
+        max_entries (int): Jumlah entri maksimum.
+        max_bytes (int): Total perkiraan ukuran entri maksimum.
+        ttl (float): Umur maksimum entri dalam detik (None = tanpa TTL).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()   # kunci -> (nilai, ukuran, kedaluwarsa)
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """ Mengembalikan nilai atau _MISSING; entri yang dipakai dipindah ke posisi paling baru. """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return _MISSING
+        if entry[2] is not None and entry[2] < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return _MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size):
+        """ Menyimpan nilai, lalu mengeluarkan entri paling lama tidak dipakai sampai kembali di bawah batas. """
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, size, expires_at)
+        self.bytes += size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def discard(self, key):
+        if key in self._entries:
+            self._remove(key)
+            self.invalidations += 1
+
+    def clear(self):
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self.bytes = 0
+
+    def _remove(self, key):
+        self.bytes -= self._entries.pop(key)[1]
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+def _row_size(row):
+    """ Perkiraan ukuran memori satu baris (dict + nilainya). """
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+
+class EntityCache:
+    """ Cache kartu pengguna dan header post di atas satu koneksi SQLite.
+    Args:
+        conn (sqlite3.Connection): Koneksi yang dipakai untuk membaca (tidak dibagi antar thread).
+        max_entries (int): Jumlah entri maksimum per jenis entitas.
+        max_bytes (int): Perkiraan ukuran maksimum per jenis entitas.
+        ttl (float): Umur maksimum entri dalam detik.
+        full_reset_threshold (int): Jumlah entri changelog yang membuat cache dikosongkan seluruhnya.
+    """
+
+    def __init__(self, conn, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL,
+                 full_reset_threshold=FULL_RESET_THRESHOLD):
+        self.conn = conn
+        self.full_reset_threshold = full_reset_threshold
+        self.users = LRUCache(max_entries, max_bytes, ttl)
+        self.posts = LRUCache(max_entries, max_bytes, ttl)
+        self.validations = self.changelog_reads = self.resets = 0
+        self._version = None
+        self._changelog_id = self._last_changelog_id()
+
+    def _last_changelog_id(self):
+        return self.conn.execute(
+            """SELECT COALESCE(MAX(id), (SELECT seq FROM sqlite_sequence WHERE name = 'changelog'), 0)
+               FROM changelog;""").fetchone()[0]
+
+    def _reset(self):
+        self.users.clear()
+        self.posts.clear()
+        self.resets += 1
+
+    def validate(self):
+        """ Membuang entri yang berubah sejak pemeriksaan terakhir. Dipanggil otomatis oleh semua getter. """
+        self.validations += 1
+        # data_version berubah jika koneksi LAIN melakukan commit; total_changes untuk tulisan koneksi ini
+        version = (self.conn.execute("PRAGMA data_version;").fetchone()[0], self.conn.total_changes)
+        if version == self._version:
+            return
+        self._version = version
+        high_id = self._last_changelog_id()
+        if high_id == self._changelog_id:
+            return
+        self.changelog_reads += 1
+        low_id = self.conn.execute("SELECT MIN(id) FROM changelog;").fetchone()[0]
+        if high_id - self._changelog_id > self.full_reset_threshold or low_id is None or low_id > self._changelog_id + 1:
+            self._reset()
+        else:
+            for table_name, key in self.conn.execute(SQL_CHANGED_KEYS, (self._changelog_id, high_id)):
+                (self.users if table_name == "users" else self.posts).discard(key)
+        self._changelog_id = high_id
+
+    def _get_many(self, cache, ids, sql, columns):
+        found, missing = {}, []
+        for entity_id in dict.fromkeys(ids):
+            value = cache.get(entity_id)
+            if value is _MISSING:
+                missing.append(entity_id)
+            else:
+                found[entity_id] = value
+        if missing:
+            for row in self.conn.execute(sql.format(",".join("?" * len(missing))), missing):
+                value = dict(zip(columns, row))
+                cache.put(value["id"], value, _row_size(value))
+                found[value["id"]] = value
+        return found
+
+    def get_user_cards(self, user_ids):
+        """ Kartu pengguna untuk beberapa id sekaligus (satu query untuk semua miss).
+        Args:
+            user_ids (iterable): ID pengguna.
+        Returns:
+            dict: id -> dict kartu (USER_CARD_COLUMNS); id yang tidak ada tidak dikembalikan.
+        """
+        self.validate()
+        return self._get_many(self.users, user_ids, SQL_USER_CARDS, USER_CARD_COLUMNS)
+
+    def get_post_headers(self, post_ids):
+        """ Header post untuk beberapa id sekaligus (satu query untuk semua miss).
+        Args:
+            post_ids (iterable): ID post.
+        Returns:
+            dict: id -> dict header (POST_HEADER_COLUMNS); id yang tidak ada tidak dikembalikan.
+        """
+        self.validate()
+        return self._get_many(self.posts, post_ids, SQL_POST_HEADERS, POST_HEADER_COLUMNS)
+
+    def get_post_list(self, post_ids):
+        """ Header post beserta kartu penulisnya, urut sesuai post_ids; satu pemeriksaan staleness untuk keduanya.
+        Args:
+            post_ids (list): ID post (mis. hasil query halaman feed).
+        Returns:
+            list: Tuple (header, kartu penulis) untuk post yang ada.
+        """
+        self.validate()
+        headers = self._get_many(self.posts, post_ids, SQL_POST_HEADERS, POST_HEADER_COLUMNS)
+        cards = self._get_many(self.users, (header["user_id"] for header in headers.values()),
+                               SQL_USER_CARDS, USER_CARD_COLUMNS)
+        return [(headers[i], cards[headers[i]["user_id"]]) for i in post_ids
+                if i in headers and headers[i]["user_id"] in cards]
+
+    def get_user_card(self, user_id):
+        return self.get_user_cards((user_id,)).get(user_id)
+
+    def get_post_header(self, post_id):
+        return self.get_post_headers((post_id,)).get(post_id)
+
+    def metrics(self):
+        """ Metrik hit/miss/eviction per jenis entitas dan jumlah pemeriksaan staleness. """
+        return {
+            "users": self.users.metrics(),
+            "posts": self.posts.metrics(),
+            "validations": self.validations,
+            "changelog_reads": self.changelog_reads,
+            "resets": self.resets,
+        }
+
+SQL_DIRECT_PAGE = """
+    SELECT p.id, p.user_id, p.content, p.image_url, p.video_url, p.created_at, p.visibility_status,
+           (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id),
+           (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id),
+           u.username, u.full_name, u.profile_picture_url
+    FROM posts p JOIN users u ON u.id = p.user_id
+    WHERE p.id IN ({})
+"""
+
+def benchmark(scale=2, pages=20000, page_size=10, write_every=20, max_entries=DEFAULT_MAX_ENTRIES, seed=7):
+    """ Halaman daftar post (header + kartu penulis) lewat cache vs langsung SQL pada fixture sintetis,
+        dengan koneksi lain yang menulis like/komentar/profil di sela-sela bacaan.
+    """
+    from db_fixtures import clone
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench_cache.db")
+        clone(scale, db_path).close()
+        reader = sqlite3.connect(db_path)
+        writer = sqlite3.connect(db_path)
+        max_post = reader.execute("SELECT MAX(id) FROM posts;").fetchone()[0]
+        max_user = reader.execute("SELECT MAX(id) FROM users;").fetchone()[0]
+        # Popularitas post mengikuti distribusi Zipf: sebagian kecil post muncul di banyak halaman
+        cum_weights = list(itertools.accumulate(1 / rank ** 1.1 for rank in range(1, max_post + 1)))
+        workload = [rng.choices(range(1, max_post + 1), cum_weights=cum_weights, k=page_size) for _ in range(pages)]
+
+        def write(step):
+            post_id, user_id = rng.randint(1, max_post), rng.randint(1, max_user)
+            if step % 3 == 0:
+                writer.execute("UPDATE users SET full_name = ? WHERE id = ?;", (f"Nama {step}", user_id))
+            elif step % 3 == 1:
+                writer.execute("INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);", (user_id, post_id))
+            else:
+                writer.execute("INSERT INTO comments (post_id, user_id, content) VALUES (?, ?, 'bench');", (post_id, user_id))
+            writer.commit()
+
+        cache = EntityCache(reader, max_entries=max_entries)
+        results = {}
+        for label in ("langsung", "cache"):
+            timings, hit_timings = [], []
+            for step, post_ids in enumerate(workload):
+                if write_every and step % write_every == 0:
+                    write(step)
+                start_time = time.perf_counter()
+                if label == "cache":
+                    misses = cache.posts.misses + cache.users.misses
+                    cache.get_post_list(post_ids)
+                    elapsed = time.perf_counter() - start_time
+                    if cache.posts.misses + cache.users.misses == misses:
+                        hit_timings.append(elapsed)
+                else:
+                    reader.execute(SQL_DIRECT_PAGE.format(",".join("?" * len(post_ids))), post_ids).fetchall()
+                    elapsed = time.perf_counter() - start_time
+                timings.append(elapsed)
+            timings.sort()
+            results[label] = timings
+            print(f"  {label:>8}: p50 {timings[len(timings) // 2] * 1e6:.0f} us, p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us, "
+                  f"total {sum(timings):.2f} s untuk {pages} halaman")
+            if hit_timings:
+                hit_timings.sort()
+                print(f"  {'':>8}  halaman tanpa miss ({len(hit_timings)}): p50 {hit_timings[len(hit_timings) // 2] * 1e6:.0f} us")
+
+        # Verifikasi: setelah tulisan terakhir, hasil cache harus sama dengan query langsung
+        write(pages)
+        stale = 0
+        for post_ids in workload[:500]:
+            direct = {row[0]: row for row in reader.execute(SQL_DIRECT_PAGE.format(",".join("?" * len(post_ids))), post_ids)}
+            for header, card in cache.get_post_list(post_ids):
+                expected = direct[header["id"]]
+                if tuple(header[c] for c in POST_HEADER_COLUMNS) + (card["username"], card["full_name"], card["profile_picture_url"]) != expected:
+                    stale += 1
+        metrics = cache.metrics()
+        print(f"  percepatan p50: {results['langsung'][pages // 2] / results['cache'][pages // 2]:.1f}x, entri basi: {stale}")
+        for name in ("posts", "users"):
+            m = metrics[name]
+            print(f"  {name}: hit ratio {m['hit_ratio']}, hit {m['hits']}, miss {m['misses']}, eviction {m['evictions']}, "
+                  f"invalidasi {m['invalidations']}, {m['entries']} entri / {m['bytes'] / 1024:.0f} KiB")
+        print(f"  pemeriksaan data_version {metrics['validations']}, pembacaan changelog {metrics['changelog_reads']}, "
+              f"reset {metrics['resets']}")
+        reader.close()
+        writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache kartu pengguna dan header post.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    get_parser = subparsers.add_parser("get", help="Baca lewat cache (dua kali, untuk melihat hit).")
+    get_parser.add_argument("--db", default=DB_FILE)
+    get_parser.add_argument("--user-id", type=int, action="append", default=[])
+    get_parser.add_argument("--post-id", type=int, action="append", default=[])
+    bench_parser = subparsers.add_parser("bench", help="Benchmark cache vs query langsung.")
+    bench_parser.add_argument("--scale", type=int, default=2)
+    bench_parser.add_argument("--pages", type=int, default=20000)
+    bench_parser.add_argument("--write-every", type=int, default=20, help="Satu commit dari koneksi lain tiap N halaman (0 = tanpa tulisan)")
+    bench_parser.add_argument("--max-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.scale, args.pages, write_every=args.write_every, max_entries=args.max_entries)
+        return
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    cache = EntityCache(conn)
+    for _ in range(2):
+        for user_id, card in cache.get_user_cards(args.user_id).items():
+            print(f"user {user_id}: {card}")
+        for post_id, header in cache.get_post_headers(args.post_id).items():
+            print(f"post {post_id}: {header}")
+    print(cache.metrics())
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,496 @@
+# epoch_timestamps.py
+# Migrasi kolom timestamp (created_at, updated_at, last_message_at) dari teks DATETIME 19 byte
+# ke INTEGER Unix epoch milidetik, lihat EPOCH_MS_COLUMNS di c.py.
+#   - Nilai disimpan di <kolom>_ms; <kolom> lama tetap ada sebagai generated column VIRTUAL
+#     (strftime dari _ms, format sama dengan CURRENT_TIMESTAMP), jadi route dan tool yang hanya
+#     MEMBACA created_at tidak perlu diubah. Kolom generated tidak bisa ditulis: route tidak lagi
+#     mengisi timestamp sendiri, nilainya dari DEFAULT dan trigger updated_at.
+#   - Indeks berurutan waktu (idx_chat_messages_room_time, idx_notifications_recipient_id,
+#     idx_posts_visibility_status, idx_chat_rooms_last_message) dibuat ulang di atas kolom _ms.
+#   - Per tabel: tabel <nama>__v2 + trigger penangkap perubahan di tabel lama, lalu salin per batch
+#     rowid (transaksi pendek, INSERT OR IGNORE agar baris yang sudah ditangkap trigger menang) dan
+#     verifikasi tiap batch (nilai _ms dan teks hasil generated column harus sama dengan aslinya).
+#     Terakhir swap dalam satu transaksi: DROP tabel lama, RENAME, buat ulang indeks dan trigger.
+#     Swap ikut membangun ulang indeks tabel tersebut, jadi penulis lain tertahan selama itu.
+#   - Aman dijalankan ulang setelah terhenti: tabel yang sudah dikonversi dilewati, salinan
+#     yang belum selesai dilanjutkan (baris yang sudah ada diabaikan).
+# Timestamp yang tidak bisa dibaca julianday() menggagalkan migrasi (tidak ada nilai yang dibuang).
+# Urutan dengan compact_tables.py bebas: tabel yang sudah WITHOUT ROWID (likes, user_blocks, post_reports)
+# disalin dan dicocokkan per primary key, bukan per rowid. Kedua urutan menghasilkan skema dan data yang sama.
+# live_sessions, friend_suggestions dan tabel changelog tetap memakai DATETIME teks.
+#
+# Pemakaian:
+#   python epoch_timestamps.py status [--db social_media_app.db]
+#   python epoch_timestamps.py migrate [--db social_media_app.db] [--tables posts,likes] [--batch-size 5000] [--pause 0.01]
+#   python epoch_timestamps.py benchmark [--rows 200000] [--db salinan.db]
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from c import (DB_FILE, EPOCH_MS_COLUMNS, NOW_MS_SQL, WITHOUT_ROWID_TABLES, create_tables, epoch_ms_expr, epoch_ms_sql,
+               epoch_ms_tables, without_rowid_tables)
+
+V2_SUFFIX = "__v2"
+CAPTURE_TRIGGER_PREFIX = "epoch_ms_capture_"
+TEXT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class MigrationError(Exception):
+    """ Migrasi tabel dihentikan karena data atau skema tidak bisa dikonversi tanpa kehilangan nilai. """
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    return conn
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (name,)).fetchone() is not None
+
+def _columns(conn, table):
+    return [info[1] for info in conn.execute(f'PRAGMA table_info("{table}");')]
+
+def v2_table_sql(create_sql, table):
+    """ Mengubah CREATE TABLE versi teks menjadi versi epoch milidetik dengan nama <tabel>__v2.
+    Args:
+        create_sql (str): SQL tabel dari sqlite_master.
+        table (str): Nama tabel di EPOCH_MS_COLUMNS.
+    Returns:
+        str: CREATE TABLE untuk tabel baru.
+    """
+    sql, replaced = re.subn(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[\"`]?\w+[\"`]?\s*\(",
+                            f'CREATE TABLE "{table}{V2_SUFFIX}" (', create_sql, count=1, flags=re.IGNORECASE)
+    if not replaced:
+        raise MigrationError(f"Definisi tabel {table} tidak dikenali.")
+    for column in EPOCH_MS_COLUMNS[table]:
+        definition = (f"{column}_ms INTEGER DEFAULT ({NOW_MS_SQL}), "
+                      f"{column} TEXT GENERATED ALWAYS AS (strftime('{TEXT_FORMAT}', {column}_ms / 1000, 'unixepoch')) VIRTUAL")
+        sql, replaced = re.subn(rf"\b{column}\s+DATETIME\s+DEFAULT\s+CURRENT_TIMESTAMP\b", definition, sql,
+                                count=1, flags=re.IGNORECASE)
+        if not replaced:
+            raise MigrationError(f"Kolom {table}.{column} bukan 'DATETIME DEFAULT CURRENT_TIMESTAMP'.")
+    return sql
+
+def _key_columns(conn, table):
+    """ Kolom kunci untuk menyalin per batch: rowid, atau primary key untuk tabel WITHOUT ROWID (compact_tables.py). """
+    if table in without_rowid_tables(conn.cursor()):
+        return list(WITHOUT_ROWID_TABLES[table][0])
+    return ["rowid"]
+
+def _key_match(key, left, right):
+    """ Kondisi SQL kunci left sama dengan kunci right, mis. "n.post_id = o.post_id AND n.user_id = o.user_id". """
+    return " AND ".join(f"{left}{column} = {right}{column}" for column in key)
+
+def _copy_lists(columns, table, row=None):
+    """ Daftar kolom tujuan (tabel __v2) dan ekspresi nilainya dari tabel lama (atau NEW.* di trigger). """
+    timestamps = EPOCH_MS_COLUMNS[table]
+    prefix = f"{row}." if row else ""
+    targets = [f"{column}_ms" if column in timestamps else column for column in columns]
+    values = [epoch_ms_expr(prefix + column) if column in timestamps else prefix + column for column in columns]
+    return ", ".join(targets), ", ".join(values)
+
+def invalid_timestamps(conn, table, limit=5):
+    """ Mencari timestamp yang tidak bisa dikonversi (bukan teks tanggal yang dikenali julianday()).
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+        table (str): Nama tabel.
+        limit (int): Jumlah contoh per kolom.
+    Returns:
+        list: (kolom, kunci, nilai) untuk nilai yang tidak valid; kunci berupa rowid atau tuple primary key.
+    """
+    key = _key_columns(conn, table)
+    invalid = []
+    for column in EPOCH_MS_COLUMNS[table]:
+        invalid.extend((column, row[0] if len(key) == 1 else row[:-1], row[-1]) for row in conn.execute(
+            f"""SELECT {", ".join(key)}, {column} FROM {table}
+                WHERE {column} IS NOT NULL AND (typeof({column}) <> 'text' OR julianday({column}) IS NULL)
+                LIMIT ?;""", (limit,)))
+    return invalid
+
+def prepare_table(conn, table):
+    """ Membuat <tabel>__v2 dan trigger yang meneruskan setiap perubahan di tabel lama ke tabel baru.
+    Args:
+        conn (sqlite3.Connection): Koneksi autocommit (isolation_level=None).
+        table (str): Nama tabel.
+    """
+    invalid = invalid_timestamps(conn, table)
+    if invalid:
+        examples = ", ".join(f"{column} kunci={key} nilai={value!r}" for column, key, value in invalid)
+        raise MigrationError(f"Timestamp di {table} tidak bisa dikonversi: {examples}")
+    if _table_exists(conn, table + V2_SUFFIX):
+        return
+    create_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)).fetchone()[0]
+    targets, values = _copy_lists(_columns(conn, table), table, row="NEW")
+    key = _key_columns(conn, table)
+    old_key, new_key = (", ".join(f"{row}.{column}" for column in key) for row in ("OLD", "NEW"))
+    v2 = f'"{table}{V2_SUFFIX}"'
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        conn.execute(v2_table_sql(create_sql, table))
+        conn.execute(f"""CREATE TRIGGER {CAPTURE_TRIGGER_PREFIX}{table}_i AFTER INSERT ON {table} FOR EACH ROW BEGIN
+                         INSERT OR REPLACE INTO {v2} ({targets}) VALUES ({values}); END;""")
+        conn.execute(f"""CREATE TRIGGER {CAPTURE_TRIGGER_PREFIX}{table}_u AFTER UPDATE ON {table} FOR EACH ROW BEGIN
+                         DELETE FROM {v2} WHERE {_key_match(key, "", "OLD.")} AND ({old_key}) IS NOT ({new_key});
+                         INSERT OR REPLACE INTO {v2} ({targets}) VALUES ({values}); END;""")
+        conn.execute(f"""CREATE TRIGGER {CAPTURE_TRIGGER_PREFIX}{table}_d AFTER DELETE ON {table} FOR EACH ROW BEGIN
+                         DELETE FROM {v2} WHERE {_key_match(key, "", "OLD.")}; END;""")
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+
+def copy_table(conn, table, batch_size=5000, pause=0.0):
+    """ Menyalin isi tabel lama ke <tabel>__v2 per batch kunci (rowid atau primary key), satu transaksi pendek per batch.
+    Args:
+        conn (sqlite3.Connection): Koneksi autocommit.
+        table (str): Nama tabel.
+        batch_size (int): Jumlah baris per batch.
+        pause (float): Jeda antar batch (detik) agar penulis lain mendapat giliran.
+    Returns:
+        int: Jumlah baris yang diperiksa.
+    """
+    columns = _columns(conn, table)
+    targets, values = _copy_lists(columns, table)
+    key = _key_columns(conn, table)
+    key_sql = ", ".join(key)
+    placeholders = ", ".join("?" * len(key))
+    v2 = f'"{table}{V2_SUFFIX}"'
+
+    def in_batch(alias, first):
+        # Batch pertama tanpa batas bawah; berikutnya (kunci terakhir batch sebelumnya, kunci terakhir batch ini]
+        columns_sql = ", ".join(alias + column for column in key)
+        lower = "" if first else f"({columns_sql}) > ({placeholders}) AND "
+        return f"{lower}({columns_sql}) <= ({placeholders})"
+
+    # Lossless: _ms harus sama dengan konversi nilai asli, dan untuk format CURRENT_TIMESTAMP (19 karakter)
+    # teks dari generated column harus identik dengan teks aslinya.
+    mismatch = " OR ".join(
+        f"n.{column}_ms IS NOT {epoch_ms_expr('o.' + column)} OR (length(o.{column}) = 19 AND n.{column} IS NOT o.{column})"
+        for column in EPOCH_MS_COLUMNS[table])
+    last_key, copied, start = None, 0, time.perf_counter()
+    total = conn.execute(f"SELECT count(*) FROM {table};").fetchone()[0]
+    while True:
+        first = last_key is None
+        bounds = [] if first else list(last_key)
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            lower = "" if first else f"WHERE ({key_sql}) > ({placeholders})"
+            keys = conn.execute(f"SELECT {key_sql} FROM {table} {lower} ORDER BY {key_sql} LIMIT ?;",
+                                bounds + [batch_size]).fetchall()
+            if not keys:
+                conn.execute("COMMIT;")
+                break
+            bounds += list(keys[-1])
+            conn.execute(f"INSERT OR IGNORE INTO {v2} ({targets}) SELECT {values} FROM {table} WHERE {in_batch('', first)};",
+                         bounds)
+            bad = conn.execute(f"""SELECT count(*) FROM {table} o LEFT JOIN {v2} n ON {_key_match(key, "n.", "o.")}
+                                   WHERE {in_batch("o.", first)} AND (n.{key[0]} IS NULL OR {mismatch});""",
+                               bounds).fetchone()[0]
+            if bad:
+                raise MigrationError(f"{bad} baris {table} di kunci ({last_key}, {tuple(keys[-1])}] tidak sama setelah disalin.")
+            conn.execute("COMMIT;")
+        except Exception:
+            conn.execute("ROLLBACK;")
+            raise
+        last_key, copied = tuple(keys[-1]), copied + len(keys)
+        elapsed = time.perf_counter() - start
+        print(f"  {table}: {copied}/{total} baris ({copied / elapsed if elapsed else 0:.0f} baris/s)", end="\r")
+        if pause:
+            time.sleep(pause)
+    if copied:
+        print()
+    return copied
+
+def _generated_writes(conn, converted):
+    """ Trigger yang masih menulis ke kolom timestamp lama (sekarang generated) dari tabel yang sudah dikonversi. """
+    problems = []
+    for name, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger';"):
+        for table in converted:
+            set_clauses = re.findall(rf"\bUPDATE\s+(?:OR\s+\w+\s+)?[\"`]?{table}[\"`]?\s+SET\s+(.*?)(?:\bWHERE\b|\bFROM\b|;|\bEND\b)",
+                                     sql, re.IGNORECASE | re.DOTALL)
+            insert_lists = re.findall(rf"\bINSERT\s+(?:OR\s+\w+\s+)?INTO\s+[\"`]?{table}[\"`]?\s*\(([^)]*)\)", sql, re.IGNORECASE)
+            for column in EPOCH_MS_COLUMNS[table]:
+                if (any(re.search(rf"(?<![.\w]){column}\s*=", clause) for clause in set_clauses)
+                        or any(re.search(rf"\b{column}\b", columns) for columns in insert_lists)):
+                    problems.append(f"{name} ({table}.{column})")
+    return problems
+
+def swap_table(conn, table):
+    """ Mengganti tabel lama dengan <tabel>__v2 dalam satu transaksi, lalu membuat ulang indeks dan trigger.
+    Args:
+        conn (sqlite3.Connection): Koneksi autocommit.
+        table (str): Nama tabel.
+    """
+    # Keduanya hanya bisa diubah di luar transaksi. legacy_alter_table: RENAME tidak mem-parse ulang
+    # trigger tabel lain yang sementara menunjuk ke tabel yang sudah di-DROP.
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("PRAGMA legacy_alter_table = ON;")
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        old_rows = conn.execute(f"SELECT count(*) FROM {table};").fetchone()[0]
+        new_rows = conn.execute(f'SELECT count(*) FROM "{table}{V2_SUFFIX}";').fetchone()[0]
+        if old_rows != new_rows:
+            raise MigrationError(f"Jumlah baris {table} ({old_rows}) dan salinannya ({new_rows}) berbeda; jalankan migrate lagi.")
+        objects = conn.execute(
+            """SELECT type, sql FROM sqlite_master
+               WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL AND name NOT LIKE ?
+               ORDER BY type;""", (table, CAPTURE_TRIGGER_PREFIX + "%")).fetchall()
+        has_sequence = _table_exists(conn, "sqlite_sequence")
+        sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?;", (table,)).fetchone() if has_sequence else None
+
+        conn.execute(f"DROP TABLE {table};")
+        conn.execute(f'ALTER TABLE "{table}{V2_SUFFIX}" RENAME TO {table};')
+        converted = epoch_ms_tables(conn.cursor())
+        for _, sql in objects:
+            conn.execute(epoch_ms_sql(sql, converted))
+        # Trigger di tabel lain yang menulis ke tabel ini (mis. last_message_at dari chat_messages)
+        for name, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name <> ?;",
+                                      (table,)).fetchall():
+            rewritten = epoch_ms_sql(sql, converted)
+            if rewritten != sql:
+                conn.execute(f"DROP TRIGGER {name};")
+                conn.execute(rewritten)
+        # AUTOINCREMENT: id yang pernah dipakai (termasuk yang sudah dihapus) tidak boleh dipakai ulang
+        if sequence:
+            if conn.execute("UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = ?;", (sequence[0], table)).rowcount == 0:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?);", (table, sequence[0]))
+
+        problems = _generated_writes(conn, converted)
+        if problems:
+            raise MigrationError("Trigger masih menulis ke kolom generated: " + ", ".join(problems))
+        violations = conn.execute(f"PRAGMA foreign_key_check({table});").fetchall()
+        if violations:
+            raise MigrationError(f"{len(violations)} pelanggaran foreign key di {table} setelah swap.")
+        conn.execute("COMMIT;")
+    except Exception:
+        conn.execute("ROLLBACK;")
+        raise
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+
+def migration_status(conn):
+    """ Status migrasi per tabel.
+    Args:
+        conn (sqlite3.Connection): Koneksi database.
+    Returns:
+        dict: tabel -> 'epoch_ms', 'menyalin (x/y)', 'teks' atau 'tidak ada'.
+    """
+    converted = epoch_ms_tables(conn.cursor())
+    status = {}
+    for table in EPOCH_MS_COLUMNS:
+        if not _table_exists(conn, table):
+            status[table] = "tidak ada"
+        elif table in converted:
+            status[table] = "epoch_ms"
+        elif _table_exists(conn, table + V2_SUFFIX):
+            copied = conn.execute(f'SELECT count(*) FROM "{table}{V2_SUFFIX}";').fetchone()[0]
+            total = conn.execute(f"SELECT count(*) FROM {table};").fetchone()[0]
+            status[table] = f"menyalin ({copied}/{total})"
+        else:
+            status[table] = "teks"
+    return status
+
+def migrate(db_path, tables=None, batch_size=5000, pause=0.0):
+    """ Memigrasikan tabel-tabel ke timestamp epoch milidetik (urutan EPOCH_MS_COLUMNS).
+    Args:
+        db_path (str): Path database.
+        tables (list): Subset tabel; None = semua tabel di EPOCH_MS_COLUMNS.
+        batch_size (int): Baris per batch salin.
+        pause (float): Jeda antar batch (detik).
+    Returns:
+        dict: tabel -> durasi migrasi (detik) untuk tabel yang dikonversi pada pemanggilan ini.
+    """
+    conn = _connect(db_path)
+    durations = {}
+    try:
+        converted = epoch_ms_tables(conn.cursor())
+        for table in EPOCH_MS_COLUMNS:
+            if (tables and table not in tables) or table in converted or not _table_exists(conn, table):
+                continue
+            start = time.perf_counter()
+            print(f"Migrasi {table}...")
+            prepare_table(conn, table)
+            copy_table(conn, table, batch_size, pause)
+            swap_table(conn, table)
+            durations[table] = time.perf_counter() - start
+            print(f"  {table} selesai dalam {durations[table]:.2f} s.")
+        violations = conn.execute("PRAGMA foreign_key_check;").fetchall()
+        if violations:
+            print(f"Peringatan: {len(violations)} pelanggaran foreign key di database.")
+    finally:
+        conn.close()
+    return durations
+
+# Index berurutan waktu yang dibandingkan, dan query range scan yang memakainya
+BENCHMARK_INDEXES = ("idx_chat_messages_room_time", "idx_notifications_recipient_id",
+                     "idx_posts_visibility_status", "idx_chat_rooms_last_message")
+
+def _index_sizes(conn):
+    return {name: size for name, size in conn.execute(
+        f"""SELECT name, sum(pgsize) FROM dbstat WHERE name IN ({", ".join("?" * len(BENCHMARK_INDEXES))})
+            GROUP BY name;""", BENCHMARK_INDEXES)}
+
+def _range_scans(conn, epoch, n_queries=2000, seed=7):
+    """ Mengukur query yang dilayani indeks waktu; parameter waktu mengikuti versi skema. """
+    column = (lambda name: f"{name}_ms") if epoch else (lambda name: name)
+    n_rooms = conn.execute("SELECT max(id) FROM chat_rooms;").fetchone()[0] or 1
+    n_users = conn.execute("SELECT max(id) FROM users;").fetchone()[0] or 1
+    low, high = conn.execute(f"SELECT min({column('created_at')}), max({column('created_at')}) FROM posts;").fetchone()
+    low_ms, high_ms = (low, high) if epoch else (
+        conn.execute(f"SELECT {epoch_ms_expr('?')}, {epoch_ms_expr('?')};", (low, high)).fetchone())
+    queries = {
+        "chat 50 pesan terbaru": (
+            f"SELECT id, sender_id FROM chat_messages WHERE chat_room_id = ? ORDER BY {column('created_at')} DESC LIMIT 50;",
+            lambda rng: (rng.randint(1, n_rooms),)),
+        "notifikasi belum dibaca": (
+            f"""SELECT id, type FROM notifications WHERE recipient_user_id = ? AND is_read = 0
+                ORDER BY {column('created_at')} DESC LIMIT 20;""",
+            lambda rng: (rng.randint(1, n_users),)),
+        "post dalam rentang 1 jam": (
+            f"""SELECT count(*) FROM posts WHERE visibility_status = 'VISIBLE'
+                AND {column('created_at')} BETWEEN ? AND ?;""",
+            None),
+        "room dengan pesan terbaru": (
+            f"SELECT id FROM chat_rooms ORDER BY {column('last_message_at')} DESC LIMIT 20;",
+            lambda rng: ()),
+    }
+    results = {}
+    for label, (sql, make_params) in queries.items():
+        rng = random.Random(seed)
+        if make_params is None:
+            def make_params(rng):
+                start_ms = rng.randint(low_ms, max(low_ms, high_ms - 3600000))
+                if epoch:
+                    return start_ms, start_ms + 3600000
+                return tuple(time.strftime(TEXT_FORMAT, time.gmtime(ms / 1000)) for ms in (start_ms, start_ms + 3600000))
+        params = [make_params(rng) for _ in range(n_queries)]
+        for p in params[:50]:
+            conn.execute(sql, p).fetchall()
+        start = time.perf_counter()
+        for p in params:
+            conn.execute(sql, p).fetchall()
+        results[label] = (time.perf_counter() - start) / n_queries * 1e6
+    return results
+
+def _seed(db_path, n_rows):
+    """ Database sintetis versi teks: n_rows pesan chat, n_rows/2 notifikasi dan post, tersebar satu tahun. """
+    conn = sqlite3.connect(db_path)
+    with redirect_stdout(StringIO()):
+        create_tables(conn)
+    rng = random.Random(1)
+    n_users = max(n_rows // 100, 10)
+    n_rooms = max(n_rows // 50, 1)
+    year_start = time.time() - 365 * 86400
+    stamp = lambda: time.strftime(TEXT_FORMAT, time.gmtime(year_start + rng.random() * 365 * 86400))
+    conn.executemany("INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, 'x', ?);",
+                     ((f"user{i}", f"user{i}@example.com", stamp()) for i in range(n_users)))
+    rooms = {(min(a, b), max(a, b)) for a, b in ((rng.randint(1, n_users), rng.randint(1, n_users)) for _ in range(n_rooms * 2)) if a != b}
+    conn.executemany("INSERT INTO chat_rooms (user1_id, user2_id, created_at) VALUES (?, ?, ?);",
+                     ((a, b, stamp()) for a, b in list(rooms)[:n_rooms]))
+    n_rooms = conn.execute("SELECT count(*) FROM chat_rooms;").fetchone()[0]
+    conn.executemany("INSERT INTO chat_messages (chat_room_id, sender_id, message_content, created_at) VALUES (?, ?, 'halo', ?);",
+                     ((rng.randint(1, n_rooms), rng.randint(1, n_users), stamp()) for _ in range(n_rows)))
+    conn.executemany("INSERT INTO posts (user_id, content, created_at) VALUES (?, 'post', ?);",
+                     ((rng.randint(1, n_users), stamp()) for _ in range(n_rows // 2)))
+    conn.executemany(
+        "INSERT INTO notifications (recipient_user_id, actor_user_id, type, is_read, created_at) VALUES (?, ?, 'POST_LIKED', ?, ?);",
+        ((rng.randint(1, n_users), rng.randint(1, n_users), rng.random() < 0.7, stamp()) for _ in range(n_rows // 2)))
+    conn.commit()
+    conn.execute("ANALYZE;")
+    conn.close()
+
+def benchmark(n_rows=200000, source_db=None, batch_size=5000):
+    """ Membandingkan ukuran indeks waktu dan kecepatan range scan sebelum dan sesudah migrasi.
+    Args:
+        n_rows (int): Jumlah pesan chat sintetis (dipakai jika source_db tidak diberikan).
+        source_db (str): Database yang disalin sebagai bahan uji (tidak diubah).
+        batch_size (int): Baris per batch salin.
+    Returns:
+        dict: Ukuran indeks, waktu query dan durasi migrasi.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.db")
+        if source_db:
+            shutil.copyfile(source_db, db_path)
+        else:
+            _seed(db_path, n_rows)
+        conn = sqlite3.connect(db_path)
+        before = {"file_bytes": os.path.getsize(db_path), "index_bytes": _index_sizes(conn),
+                  "query_us": _range_scans(conn, epoch=False)}
+        conn.close()
+
+        with redirect_stdout(StringIO()):
+            durations = migrate(db_path, batch_size=batch_size)
+        conn = sqlite3.connect(db_path)
+        conn.execute("VACUUM;")  # ukuran file dibandingkan tanpa halaman bebas sisa tabel lama
+        conn.execute("ANALYZE;")
+        after = {"file_bytes": os.path.getsize(db_path), "index_bytes": _index_sizes(conn),
+                 "query_us": _range_scans(conn, epoch=True)}
+        conn.close()
+    return {"before": before, "after": after, "migration_seconds": durations}
+
+def print_benchmark(result):
+    before, after = result["before"], result["after"]
+    print(f"{'Indeks':<34}{'teks (KiB)':>12}{'epoch (KiB)':>13}{'hemat':>8}")
+    for name in BENCHMARK_INDEXES:
+        old, new = before["index_bytes"].get(name, 0), after["index_bytes"].get(name, 0)
+        print(f"{name:<34}{old / 1024:>12.0f}{new / 1024:>13.0f}{(1 - new / old) * 100 if old else 0:>7.0f}%")
+    print(f"{'File database':<34}{before['file_bytes'] / 1024:>12.0f}{after['file_bytes'] / 1024:>13.0f}"
+          f"{(1 - after['file_bytes'] / before['file_bytes']) * 100:>7.0f}%")
+    print()
+    print(f"{'Query':<34}{'teks (us)':>12}{'epoch (us)':>13}")
+    for label, old in before["query_us"].items():
+        print(f"{label:<34}{old:>12.1f}{after['query_us'][label]:>13.1f}")
+    print()
+    total = sum(result["migration_seconds"].values())
+    print(f"Durasi migrasi: {total:.2f} s (" + ", ".join(f"{t} {s:.2f} s" for t, s in result["migration_seconds"].items()) + ")")
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrasi timestamp teks ke epoch milidetik.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    status_parser = subparsers.add_parser("status", help="Status migrasi per tabel.")
+    status_parser.add_argument("--db", default=DB_FILE)
+    migrate_parser = subparsers.add_parser("migrate", help="Jalankan (atau lanjutkan) migrasi.")
+    migrate_parser.add_argument("--db", default=DB_FILE)
+    migrate_parser.add_argument("--tables", help="Daftar tabel dipisah koma (default semua)")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000)
+    migrate_parser.add_argument("--pause", type=float, default=0.0, help="Jeda antar batch (detik)")
+    bench_parser = subparsers.add_parser("benchmark", help="Ukuran indeks dan range scan sebelum/sesudah.")
+    bench_parser.add_argument("--rows", type=int, default=200000)
+    bench_parser.add_argument("--db", help="Salin database ini sebagai bahan uji (tidak diubah)")
+    bench_parser.add_argument("--batch-size", type=int, default=5000)
+    bench_parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        result = benchmark(args.rows, args.db, args.batch_size)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_benchmark(result)
+        return
+    if not os.path.exists(args.db):
+        print(f"Database '{args.db}' tidak ditemukan.")
+        return
+    if args.command == "status":
+        conn = _connect(args.db)
+        for table, state in migration_status(conn).items():
+            print(f"{table:<16}{state}")
+        conn.close()
+    else:
+        tables = [t.strip() for t in args.tables.split(",")] if args.tables else None
+        try:
+            migrate(args.db, tables, args.batch_size, args.pause)
+        except MigrationError as e:
+            print(f"Migrasi dihentikan: {e}")
+
+if __name__ == '__main__':
+    main()
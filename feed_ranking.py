@@ -0,0 +1,346 @@
+# feed_ranking.py
+# Peringkat feed personal. Feed saat ini murni ORDER BY created_at DESC atas post teman, dan trending
+# hanya jumlah like+komentar global. Modul ini:
+#   1. memuat snapshot jendela waktu ke array NumPy sekali (post terbaru beserta jumlah like/komentar,
+#      graf pertemanan, blokir, dan interaksi pengguna -> penulis) dalam bentuk CSR
+#   2. per pengguna membentuk kandidat: post terbaru milik sendiri dan teman + TRENDING_CANDIDATES post
+#      global dengan engagement tertinggi, tanpa penulis yang diblokir / memblokir
+#   3. menyusun fitur (afinitas like/komentar ke penulis, pertemanan, usia post, engagement, jenis media)
+#      dan menghitung skor semua kandidat dalam satu operasi vektor
+#   4. menyimpan PAGE_CACHE_SIZE teratas ke ranked_feed, yang dibaca /api/feed?sort=ranked
+# Mode batch menghitung ulang cache untuk pengguna yang aktif dalam beberapa hari terakhir.
+#
+# Butuh NumPy: pip install numpy
+#
+# Pemakaian:
+#   python feed_ranking.py rank --user-id 42 [--explain]
+#   python feed_ranking.py precompute [--active-days 7] [--size 100]
+#   python feed_ranking.py bench [--scale 5]
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from c import DB_FILE, create_connection, create_tables, epoch_ms_tables
+
+RECENT_DAYS = 7             # jendela post kandidat
+AFFINITY_DAYS = 90          # jendela interaksi untuk afinitas
+TRENDING_CANDIDATES = 1000
+PAGE_CACHE_SIZE = 100
+COMMENT_WEIGHT = 2          # sama dengan route trending
+COMMENT_AFFINITY = 3        # satu komentar ke penulis setara tiga like
+HALF_LIFE_HOURS = 24.0
+
+# Bobot fitur: skor = (dasar + sum(bobot * fitur)) * 0.5 ^ (usia / HALF_LIFE_HOURS)
+WEIGHTS = {
+    "base": 1.0,
+    "affinity": 1.5,        # log1p(like + COMMENT_AFFINITY * komentar ke penulis)
+    "friend": 2.0,          # penulis adalah teman (atau diri sendiri)
+    "engagement": 0.8,      # log1p(like + COMMENT_WEIGHT * komentar pada post)
+    "image": 0.5,
+    "video": 0.7,           # video atau live
+}
+FEATURES = ("affinity", "friend", "engagement", "image", "video")
+
+def _since(table, column_alias, converted, since_epoch):
+    """ Potongan WHERE yang bisa memakai indeks waktu, untuk kolom created_at teks maupun epoch ms. """
+    if table in converted:
+        return f"{column_alias}.created_at_ms >= ?", int(since_epoch * 1000)
+    return f"{column_alias}.created_at >= ?", datetime.fromtimestamp(since_epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def _epoch_seconds(table, column_alias, converted):
+    if table in converted:
+        return f"{column_alias}.created_at_ms / 1000"
+    return f"CAST(strftime('%s', {column_alias}.created_at) AS INTEGER)"
+
+def _csr(src, dst, n_nodes, weight=None):
+    """ Array CSR (indptr, indices[, bobot]) dari pasangan sisi; indices urut per node. """
+    order = np.lexsort((dst, src))
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n_nodes), out=indptr[1:])
+    if weight is None:
+        return indptr, dst[order]
+    return indptr, dst[order], weight[order]
+
+def _gather_ranges(indptr, nodes):
+    """ Posisi semua elemen milik node-node tersebut di array CSR, tanpa loop Python. """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+class FeedSnapshot:
+    """ Data yang dibutuhkan untuk meranking, dimuat sekali dari database ke array NumPy.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        now (float): Waktu acuan (epoch detik); default waktu sekarang.
+        recent_days (int): Jendela post kandidat.
+        affinity_days (int): Jendela interaksi untuk afinitas.
+    """
+
+    def __init__(self, conn, now=None, recent_days=RECENT_DAYS, affinity_days=AFFINITY_DAYS):
+        self.now = time.time() if now is None else now
+        converted = epoch_ms_tables(conn.cursor())
+        self.n_nodes = (conn.execute("SELECT MAX(id) FROM users;").fetchone()[0] or 0) + 1
+
+        since_sql, since_value = _since("posts", "p", converted, self.now - recent_days * 86400)
+        rows = conn.execute(f"""
+            SELECT p.id, p.user_id, {_epoch_seconds('posts', 'p', converted)},
+                   p.image_url IS NOT NULL, p.video_url IS NOT NULL OR COALESCE(p.is_live, 0),
+                   (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id),
+                   (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id)
+            FROM posts p
+            WHERE {since_sql} AND (p.visibility_status IS NULL OR p.visibility_status = 'VISIBLE')
+            ORDER BY p.user_id, p.id;""", (since_value,)).fetchall()
+        posts = np.array(rows, dtype=np.int64).reshape(-1, 7)
+        self.post_id, self.author, self.created = posts[:, 0], posts[:, 1], posts[:, 2].astype(np.float64)
+        self.has_image, self.has_video = posts[:, 3].astype(np.float64), posts[:, 4].astype(np.float64)
+        self.engagement = np.log1p(posts[:, 5] + COMMENT_WEIGHT * posts[:, 6])
+        self.post_ptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.author, minlength=self.n_nodes), out=self.post_ptr[1:])
+
+        # Trending global: engagement yang diluruhkan usia, dihitung sekali untuk semua pengguna
+        decay = 0.5 ** ((self.now - self.created) / 3600 / HALF_LIFE_HOURS)
+        top = min(TRENDING_CANDIDATES, len(self.post_id))
+        self.trending = np.sort(np.argpartition(-self.engagement * decay, top - 1)[:top]) if top else np.empty(0, np.int64)
+
+        pairs = np.array(conn.execute(
+            "SELECT sender_id, receiver_id FROM friendships WHERE status = 'ACCEPTED';").fetchall(), dtype=np.int64).reshape(-1, 2)
+        self.friend_ptr, self.friends = _csr(np.concatenate([pairs[:, 0], pairs[:, 1]]),
+                                             np.concatenate([pairs[:, 1], pairs[:, 0]]), self.n_nodes)
+        pairs = np.array(conn.execute("SELECT blocker_id, blocked_user_id FROM user_blocks;").fetchall(),
+                         dtype=np.int64).reshape(-1, 2)
+        self.block_ptr, self.blocks = _csr(np.concatenate([pairs[:, 0], pairs[:, 1]]),
+                                           np.concatenate([pairs[:, 1], pairs[:, 0]]), self.n_nodes)
+
+        # Afinitas: like dan komentar pengguna ke post milik penulis lain dalam jendela afinitas
+        since_epoch = self.now - affinity_days * 86400
+        interactions = []
+        for table, alias, weight in (("likes", "l", 1), ("comments", "l", COMMENT_AFFINITY)):
+            since_sql, since_value = _since(table, alias, converted, since_epoch)
+            interactions += conn.execute(f"""
+                SELECT l.user_id, p.user_id, COUNT(*) * {weight} FROM {table} l JOIN posts p ON p.id = l.post_id
+                WHERE {since_sql} AND l.user_id != p.user_id GROUP BY l.user_id, p.user_id;""", (since_value,)).fetchall()
+        edges = np.array(interactions, dtype=np.int64).reshape(-1, 3)
+        keys, inverse = np.unique(edges[:, 0] * self.n_nodes + edges[:, 1], return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=edges[:, 2], minlength=len(keys))
+        self.affinity_ptr, self.affinity_author, self.affinity = _csr(
+            keys // self.n_nodes, keys % self.n_nodes, self.n_nodes, np.log1p(totals))
+
+    def candidates(self, user_id):
+        """ Posisi post kandidat (di array snapshot) untuk satu pengguna, beserta array penulis teman + diri sendiri. """
+        if user_id >= self.n_nodes:
+            return np.empty(0, dtype=np.int64), np.array([user_id])
+        blocked = self.blocks[self.block_ptr[user_id]:self.block_ptr[user_id + 1]]
+        circle = np.append(self.friends[self.friend_ptr[user_id]:self.friend_ptr[user_id + 1]], user_id)
+        circle = circle[~np.isin(circle, blocked)]
+        positions = np.union1d(_gather_ranges(self.post_ptr, circle), self.trending)
+        if len(blocked):
+            positions = positions[~np.isin(self.author[positions], blocked)]
+        return positions, circle
+
+    def features(self, user_id, positions, circle):
+        """ Matriks fitur (kandidat x FEATURES) dan usia post dalam jam. """
+        authors = self.author[positions]
+        start, end = self.affinity_ptr[user_id], self.affinity_ptr[user_id + 1]
+        known, values = self.affinity_author[start:end], self.affinity[start:end]
+        affinity = np.zeros(len(positions))
+        if len(known):
+            slot = np.minimum(np.searchsorted(known, authors), len(known) - 1)
+            hit = known[slot] == authors
+            affinity[hit] = values[slot[hit]]
+        matrix = np.column_stack((affinity, np.isin(authors, circle), self.engagement[positions],
+                                  self.has_image[positions], self.has_video[positions]))
+        age_hours = (self.now - self.created[positions]) / 3600
+        return matrix, age_hours
+
+def score(matrix, age_hours, weights=WEIGHTS):
+    """ Skor semua kandidat dalam satu operasi vektor.
+    Args:
+        matrix (np.ndarray): Fitur berbentuk (kandidat, len(FEATURES)).
+        age_hours (np.ndarray): Usia post dalam jam.
+        weights (dict): Bobot per fitur dan "base".
+    Returns:
+        np.ndarray: Skor per kandidat.
+    """
+    vector = np.array([weights[name] for name in FEATURES])
+    return (weights["base"] + matrix @ vector) * np.exp2(-np.maximum(age_hours, 0) / HALF_LIFE_HOURS)
+
+def rank_user(snapshot, user_id, size=PAGE_CACHE_SIZE):
+    """ Meranking kandidat satu pengguna.
+    Args:
+        snapshot (FeedSnapshot): Data yang sudah dimuat.
+        user_id (int): ID pengguna.
+        size (int): Jumlah post teratas yang dikembalikan.
+    Returns:
+        tuple: (post_id terurut, skor, jumlah kandidat).
+    """
+    positions, circle = snapshot.candidates(user_id)
+    if not len(positions):
+        return np.empty(0, dtype=np.int64), np.empty(0), 0
+    scores = score(*snapshot.features(user_id, positions, circle))
+    top = min(size, len(positions))
+    best = np.argpartition(-scores, top - 1)[:top]
+    # Skor sama: post yang lebih baru lebih dulu
+    best = best[np.lexsort((-snapshot.post_id[positions[best]], -scores[best]))]
+    return snapshot.post_id[positions[best]], scores[best], len(positions)
+
+def write_ranked(conn, user_id, post_ids, scores):
+    """ Mengganti cache halaman feed berperingkat satu pengguna (dipanggil di dalam transaksi). """
+    conn.execute("DELETE FROM ranked_feed WHERE user_id = ?;", (user_id,))
+    conn.executemany("INSERT INTO ranked_feed (user_id, rank, post_id, score) VALUES (?, ?, ?, ?);",
+                     ((user_id, rank, post_id, round(value, 6))
+                      for rank, (post_id, value) in enumerate(zip(post_ids.tolist(), scores.tolist()))))
+
+def active_users(conn, days=7, now=None):
+    """ Pengguna yang membuat post, like, atau komentar dalam `days` hari terakhir. """
+    converted = epoch_ms_tables(conn.cursor())
+    since_epoch = (time.time() if now is None else now) - days * 86400
+    parts, params = [], []
+    for table in ("posts", "likes", "comments"):
+        since_sql, since_value = _since(table, "t", converted, since_epoch)
+        parts.append(f"SELECT user_id FROM {table} t WHERE {since_sql}")
+        params.append(since_value)
+    return [row[0] for row in conn.execute(" UNION ".join(parts) + " ORDER BY 1;", params)]
+
+def precompute(conn, user_ids=None, active_days=7, size=PAGE_CACHE_SIZE, chunk_users=500, now=None):
+    """ Menghitung ulang ranked_feed untuk banyak pengguna dengan satu snapshot.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        user_ids (list): Pengguna yang dihitung; None untuk pengguna aktif.
+        active_days (int): Jendela keaktifan jika user_ids None.
+        size (int): Jumlah post per cache.
+        chunk_users (int): Jumlah pengguna per transaksi tulis.
+        now (float): Waktu acuan (epoch detik).
+    Returns:
+        dict: Ringkasan jumlah pengguna, baris, dan waktu.
+    """
+    start_time = time.perf_counter()
+    snapshot = FeedSnapshot(conn, now)
+    load_seconds = time.perf_counter() - start_time
+    if user_ids is None:
+        user_ids = active_users(conn, active_days, snapshot.now)
+    rank_times, candidate_counts, written = [], [], 0
+    for offset in range(0, len(user_ids), chunk_users):
+        results = []
+        for user_id in user_ids[offset:offset + chunk_users]:
+            rank_start = time.perf_counter()
+            post_ids, scores, n_candidates = rank_user(snapshot, user_id, size)
+            rank_times.append(time.perf_counter() - rank_start)
+            candidate_counts.append(n_candidates)
+            results.append((user_id, post_ids, scores))
+        with conn:
+            for user_id, post_ids, scores in results:
+                write_ranked(conn, user_id, post_ids, scores)
+                written += len(post_ids)
+    rank_times.sort()
+    summary = {
+        "users": len(user_ids),
+        "rows": written,
+        "snapshot_seconds": round(load_seconds, 2),
+        "total_seconds": round(time.perf_counter() - start_time, 2),
+        "mean_candidates": round(float(np.mean(candidate_counts)), 1) if candidate_counts else 0,
+        "rank_p50_ms": round(rank_times[len(rank_times) // 2] * 1000, 3) if rank_times else None,
+        "rank_p99_ms": round(rank_times[int(len(rank_times) * 0.99)] * 1000, 3) if rank_times else None,
+    }
+    print(f"Feed berperingkat: {summary['users']} pengguna, {written} baris (snapshot {load_seconds:.2f} s, "
+          f"total {summary['total_seconds']:.2f} s, rata-rata {summary['mean_candidates']} kandidat, "
+          f"ranking p50 {summary['rank_p50_ms']} ms / p99 {summary['rank_p99_ms']} ms per pengguna).")
+    return summary
+
+def explain(snapshot, user_id, size=20):
+    """ Mencetak post teratas beserta nilai fiturnya. """
+    positions, circle = snapshot.candidates(user_id)
+    if not len(positions):
+        print("Tidak ada kandidat.")
+        return
+    matrix, age_hours = snapshot.features(user_id, positions, circle)
+    scores = score(matrix, age_hours)
+    order = np.lexsort((-snapshot.post_id[positions], -scores))[:size]
+    print(f"{len(positions)} kandidat untuk pengguna {user_id}")
+    print(f"{'post':>8} {'penulis':>8} {'skor':>8} {'usia j':>7} " + " ".join(f"{name:>10}" for name in FEATURES))
+    for i in order:
+        print(f"{snapshot.post_id[positions[i]]:8d} {snapshot.author[positions[i]]:8d} {scores[i]:8.3f} {age_hours[i]:7.1f} "
+              + " ".join(f"{value:10.2f}" for value in matrix[i]))
+
+def benchmark(scale=5, sample_users=1000):
+    """ Mengukur snapshot, ranking per pengguna, dan precompute pada fixture sintetis (db_fixtures.py). """
+    from db_fixtures import clone
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = clone(scale, os.path.join(tmp_dir, "bench_feed.db"))
+        # Data fixture memakai timestamp tetap; waktu acuan = sesaat setelah post terakhir
+        now = conn.execute("SELECT CAST(strftime('%s', MAX(created_at)) AS INTEGER) + 60 FROM posts;").fetchone()[0]
+        start_time = time.perf_counter()
+        snapshot = FeedSnapshot(conn, now)
+        print(f"Skala {scale}: {len(snapshot.post_id)} post dalam jendela, snapshot {time.perf_counter() - start_time:.2f} s")
+
+        user_ids = list(range(1, min(sample_users, snapshot.n_nodes - 1) + 1))
+        full, scoring, counts = [], [], []
+        for user_id in user_ids:
+            start_time = time.perf_counter()
+            _, _, n_candidates = rank_user(snapshot, user_id)
+            full.append(time.perf_counter() - start_time)
+            counts.append(n_candidates)
+            positions, circle = snapshot.candidates(user_id)
+            matrix, age_hours = snapshot.features(user_id, positions, circle)
+            start_time = time.perf_counter()
+            score(matrix, age_hours)
+            scoring.append(time.perf_counter() - start_time)
+        full.sort()
+        scoring.sort()
+        print(f"  kandidat per pengguna: rata-rata {np.mean(counts):.0f}, maks {max(counts)}")
+        print(f"  ranking lengkap (kandidat + fitur + skor + top-k): p50 {full[len(full) // 2] * 1000:.3f} ms, "
+              f"p99 {full[int(len(full) * 0.99)] * 1000:.3f} ms")
+        print(f"  skor saja: p50 {scoring[len(scoring) // 2] * 1000:.3f} ms")
+        summary = precompute(conn, user_ids, now=now)
+        print(f"  precompute: {summary['users'] / summary['total_seconds']:,.0f} pengguna/s termasuk penulisan")
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Peringkat feed personal.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rank_parser = subparsers.add_parser("rank", help="Ranking dan simpan cache untuk satu pengguna.")
+    rank_parser.add_argument("--db", default=DB_FILE)
+    rank_parser.add_argument("--user-id", type=int, required=True)
+    rank_parser.add_argument("--size", type=int, default=PAGE_CACHE_SIZE)
+    rank_parser.add_argument("--explain", action="store_true", help="Tampilkan fitur post teratas")
+    pre_parser = subparsers.add_parser("precompute", help="Hitung ulang cache untuk pengguna aktif.")
+    pre_parser.add_argument("--db", default=DB_FILE)
+    pre_parser.add_argument("--active-days", type=int, default=7)
+    pre_parser.add_argument("--size", type=int, default=PAGE_CACHE_SIZE)
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pada fixture sintetis.")
+    bench_parser.add_argument("--scale", type=int, default=5)
+    bench_parser.add_argument("--users", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.scale, args.users)
+        return
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    create_tables(conn)
+    if args.command == "rank":
+        snapshot = FeedSnapshot(conn)
+        start_time = time.perf_counter()
+        post_ids, scores, n_candidates = rank_user(snapshot, args.user_id, args.size)
+        elapsed = time.perf_counter() - start_time
+        with conn:
+            write_ranked(conn, args.user_id, post_ids, scores)
+        print(f"{len(post_ids)} dari {n_candidates} kandidat disimpan ({elapsed * 1000:.2f} ms).")
+        if args.explain:
+            explain(snapshot, args.user_id)
+    else:
+        precompute(conn, active_days=args.active_days, size=args.size)
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
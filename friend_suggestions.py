@@ -0,0 +1,263 @@
+# friend_suggestions.py
+# Batch job "orang yang mungkin Anda kenal".
+# Graf pertemanan ACCEPTED diekspor sekali ke array CSR (NumPy) di direktori kerja,
+# lalu worker di process pool memetakan file tersebut (mmap) dan menghitung kandidat
+# teman-dari-teman per rentang user_id. Hasil top-K ditulis massal ke tabel friend_suggestions.
+#
+# Butuh NumPy: pip install numpy
+#
+# Pemakaian:
+#   python friend_suggestions.py run [--top-k 20] [--workers 4] [--chunk-users 5000]
+#   python friend_suggestions.py bench [--users 100000] [--degree 20]
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from c import DB_FILE, create_connection, create_tables
+
+GRAPH_FILES = ("friends_indptr", "friends_indices", "excluded_indptr", "excluded_indices")
+
+# Array CSR milik proses worker (diisi oleh _init_worker)
+_graph = {}
+
+def _build_csr(src, dst, n_nodes):
+    """ Membuat representasi CSR (indptr, indices) dari daftar edge berarah.
+        Indeks tetangga per node diurutkan agar bisa dicari dengan np.searchsorted.
+    Args:
+        src (np.ndarray): Node asal.
+        dst (np.ndarray): Node tujuan.
+        n_nodes (int): Jumlah node (user_id maksimum + 1).
+    Returns:
+        tuple: (indptr int64, indices int32)
+    """
+    order = np.lexsort((dst, src))
+    indices = dst[order].astype(np.int32)
+    counts = np.bincount(src, minlength=n_nodes)
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, indices
+
+def _fetch_pairs(conn, sql):
+    """ Membaca pasangan (a, b) dari query sebagai dua array int64 tanpa membuat list tuple besar. """
+    flat = np.fromiter(
+        (value for row in conn.execute(sql) for value in row), dtype=np.int64
+    )
+    return flat[0::2], flat[1::2]
+
+def export_graph(conn, out_dir):
+    """ Mengekspor graf pertemanan ACCEPTED dan daftar pengecualian ke file .npy (CSR).
+        Pengecualian mencakup permintaan PENDING dan blokir, keduanya berlaku dua arah.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        out_dir (str): Direktori tujuan file .npy.
+    Returns:
+        int: Jumlah node (user_id maksimum + 1).
+    """
+    max_user_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM users;").fetchone()[0]
+    n_nodes = max_user_id + 1
+
+    a, b = _fetch_pairs(conn, "SELECT sender_id, receiver_id FROM friendships WHERE status = 'ACCEPTED';")
+    friends_indptr, friends_indices = _build_csr(np.concatenate([a, b]), np.concatenate([b, a]), n_nodes)
+
+    p_a, p_b = _fetch_pairs(conn, "SELECT sender_id, receiver_id FROM friendships WHERE status = 'PENDING';")
+    b_a, b_b = _fetch_pairs(conn, "SELECT blocker_id, blocked_user_id FROM user_blocks;")
+    ex_src = np.concatenate([p_a, p_b, b_a, b_b])
+    ex_dst = np.concatenate([p_b, p_a, b_b, b_a])
+    excluded_indptr, excluded_indices = _build_csr(ex_src, ex_dst, n_nodes)
+
+    arrays = dict(zip(GRAPH_FILES, (friends_indptr, friends_indices, excluded_indptr, excluded_indices)))
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+    print(f"Graf diekspor: {n_nodes} node, {len(friends_indices)} edge berarah, {len(excluded_indices)} pengecualian.")
+    return n_nodes
+
+def _init_worker(graph_dir):
+    """ Initializer process pool: memetakan file CSR (read-only) agar memori dibagi antar proses. """
+    for name in GRAPH_FILES:
+        _graph[name] = np.load(os.path.join(graph_dir, f"{name}.npy"), mmap_mode="r")
+
+def _gather_neighbors(indptr, indices, nodes):
+    """ Menggabungkan daftar tetangga dari banyak node sekaligus tanpa loop Python. """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int32)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+    return indices[offsets]
+
+def suggest_for_user(user_id, top_k, graph=None):
+    """ Menghitung top-K kandidat teman untuk satu pengguna berdasarkan jumlah teman bersama.
+    Args:
+        user_id (int): ID pengguna.
+        top_k (int): Jumlah kandidat maksimum.
+        graph (dict): Array CSR; default memakai graf milik worker.
+    Returns:
+        tuple: (candidate_ids, mutual_counts), terurut dari teman bersama terbanyak.
+    """
+    graph = graph if graph is not None else _graph
+    friends_indptr = graph["friends_indptr"]
+    friends_indices = graph["friends_indices"]
+    friends = np.asarray(friends_indices[friends_indptr[user_id]:friends_indptr[user_id + 1]])
+    if len(friends) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+
+    candidates, counts = np.unique(
+        _gather_neighbors(friends_indptr, friends_indices, friends), return_counts=True
+    )
+    excluded = np.asarray(graph["excluded_indices"][graph["excluded_indptr"][user_id]:graph["excluded_indptr"][user_id + 1]])
+    keep = (candidates != user_id) & ~np.isin(candidates, friends)
+    if len(excluded):
+        keep &= ~np.isin(candidates, excluded)
+    candidates, counts = candidates[keep], counts[keep]
+
+    if len(candidates) > top_k:
+        part = np.argpartition(-counts, top_k - 1)[:top_k]
+        candidates, counts = candidates[part], counts[part]
+    # Urutkan berdasarkan teman bersama terbanyak, lalu user_id terkecil agar hasil deterministik
+    order = np.lexsort((candidates, -counts))
+    return candidates[order], counts[order]
+
+def _compute_range(args):
+    """ Tugas worker: menghitung saran untuk user_id dalam [start, end). """
+    start, end, top_k = args
+    user_ids, suggested_ids, mutual_counts = [], [], []
+    indptr = _graph["friends_indptr"]
+    for user_id in range(start, min(end, len(indptr) - 1)):
+        if indptr[user_id] == indptr[user_id + 1]:
+            continue
+        candidates, counts = suggest_for_user(user_id, top_k)
+        if len(candidates):
+            user_ids.append(np.full(len(candidates), user_id, dtype=np.int64))
+            suggested_ids.append(candidates.astype(np.int64))
+            mutual_counts.append(counts.astype(np.int64))
+    if not user_ids:
+        return start, end, None
+    return start, end, (np.concatenate(user_ids), np.concatenate(suggested_ids), np.concatenate(mutual_counts))
+
+def _write_range(conn, start, end, result):
+    """ Mengganti saran untuk rentang user_id dalam satu transaksi. """
+    with conn:
+        conn.execute("DELETE FROM friend_suggestions WHERE user_id >= ? AND user_id < ?;", (start, end))
+        if result is not None:
+            conn.executemany(
+                "INSERT INTO friend_suggestions (user_id, suggested_user_id, mutual_count) VALUES (?, ?, ?);",
+                zip(*(column.tolist() for column in result))
+            )
+    return 0 if result is None else len(result[0])
+
+def run(conn, top_k=20, workers=None, chunk_users=5000, work_dir=None):
+    """ Menjalankan seluruh batch: ekspor graf, hitung paralel, tulis hasil.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database (dipakai untuk ekspor dan penulisan).
+        top_k (int): Jumlah saran per pengguna.
+        workers (int): Jumlah proses worker (default: jumlah CPU).
+        chunk_users (int): Jumlah user_id per tugas worker / transaksi tulis.
+        work_dir (str): Direktori untuk file CSR (default: direktori sementara).
+    Returns:
+        int: Jumlah baris saran yang ditulis.
+    """
+    graph_dir = work_dir or tempfile.mkdtemp(prefix="friend_graph_")
+    try:
+        start_time = time.perf_counter()
+        n_nodes = export_graph(conn, graph_dir)
+        export_seconds = time.perf_counter() - start_time
+
+        tasks = [(start, start + chunk_users, top_k) for start in range(1, n_nodes, chunk_users)]
+        written = 0
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph_dir,)) as pool:
+            # Penulisan hanya dilakukan proses utama (satu writer), worker hanya membaca file CSR
+            for start, end, result in pool.map(_compute_range, tasks):
+                written += _write_range(conn, start, end, result)
+        total_seconds = time.perf_counter() - start_time
+        print(f"Saran teman selesai: {written} baris ditulis "
+              f"(ekspor {export_seconds:.2f} s, total {total_seconds:.2f} s).")
+        return written
+    finally:
+        if work_dir is None:
+            shutil.rmtree(graph_dir, ignore_errors=True)
+
+def _seed_graph(conn, n_users, degree, seed=7):
+    """ Mengisi database benchmark dengan graf acak: n_users pengguna, rata-rata `degree` teman. """
+    rng = random.Random(seed)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, password_hash) VALUES (?, ?, ?, 'x');",
+            ((i, f"user{i}", f"user{i}@example.com") for i in range(1, n_users + 1))
+        )
+    pairs = set()
+    target = n_users * degree // 2
+    while len(pairs) < target:
+        a = rng.randint(1, n_users)
+        # Sebagian besar teman berada di "lingkungan" yang sama agar ada banyak teman bersama
+        b = a + rng.randint(1, 200) if rng.random() < 0.8 else rng.randint(1, n_users)
+        if b > n_users or a == b:
+            continue
+        pairs.add((min(a, b), max(a, b)))
+    rows = [(a, b, 'ACCEPTED' if rng.random() < 0.9 else 'PENDING') for a, b in pairs]
+    with conn:
+        conn.executemany("INSERT INTO friendships (sender_id, receiver_id, status) VALUES (?, ?, ?);", rows)
+        conn.executemany(
+            "INSERT OR IGNORE INTO user_blocks (blocker_id, blocked_user_id) VALUES (?, ?);",
+            ((rng.randint(1, n_users), rng.randint(1, n_users)) for _ in range(n_users // 100))
+        )
+    return len(rows)
+
+def benchmark(n_users=100000, degree=20, top_k=20, workers=None):
+    """ Mengukur waktu batch pada graf sintetis di database sementara.
+    Args:
+        n_users (int): Jumlah pengguna.
+        degree (int): Rata-rata jumlah teman per pengguna.
+        top_k (int): Jumlah saran per pengguna.
+        workers (int): Jumlah proses worker.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = sqlite3.connect(os.path.join(tmp_dir, "bench_friends.db"))
+        create_tables(conn)
+        start = time.perf_counter()
+        n_edges = _seed_graph(conn, n_users, degree)
+        print(f"Seed: {n_users} pengguna, {n_edges} friendships ({time.perf_counter() - start:.1f} s)")
+
+        for n_workers in sorted({1, workers or os.cpu_count() or 1}):
+            start = time.perf_counter()
+            written = run(conn, top_k=top_k, workers=n_workers)
+            elapsed = time.perf_counter() - start
+            print(f"  workers={n_workers:<3} {elapsed:8.2f} s  ({n_users / elapsed:,.0f} pengguna/s, {written} baris)")
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch saran teman berdasarkan teman bersama.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Hitung ulang tabel friend_suggestions.")
+    run_parser.add_argument("--db", default=DB_FILE)
+    run_parser.add_argument("--top-k", type=int, default=20)
+    run_parser.add_argument("--workers", type=int, default=None)
+    run_parser.add_argument("--chunk-users", type=int, default=5000)
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pada graf sintetis.")
+    bench_parser.add_argument("--users", type=int, default=100000)
+    bench_parser.add_argument("--degree", type=int, default=20)
+    bench_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        conn = create_connection(args.db)
+        if conn is None:
+            print("Gagal membuat koneksi ke database.")
+            return
+        create_tables(conn)
+        run(conn, args.top_k, args.workers, args.chunk_users)
+        conn.close()
+        print("Koneksi database ditutup.")
+    else:
+        benchmark(args.users, args.degree, workers=args.workers)
+
+if __name__ == '__main__':
+    main()
@@ -19,11 +19,88 @@ if (!fs.existsSync(dbFilePath)) {
   }
 }
 
+// =============================================
+// Log query (lihat slow_query_log.py), diaktifkan lewat SQLITE_QUERY_LOG:
+//   verbose : opsi verbose better-sqlite3, satu baris "[sql] <statement>" per statement (nilai parameter ikut tercetak)
+//   timed   : satu baris "[sql] <durasi>ms <statement>" per run/get/all dari statement hasil prepare()
+// =============================================
+const queryLogMode = process.env.SQLITE_QUERY_LOG || '';
+
+function databaseOptions(): Database.Options {
+  if (queryLogMode === 'verbose') {
+    return { verbose: (message?: unknown) => console.log(`[sql] ${String(message).replace(/\s+/g, ' ').trim()}`) };
+  }
+  return {};
+}
+
+function logStatementTiming(db: Database.Database): Database.Database {
+  if (queryLogMode !== 'timed') {
+    return db;
+  }
+  const prepare = db.prepare.bind(db);
+  db.prepare = ((source: string) => {
+    // eslint-disable-next-line @typescript-eslint/no-explicit-any
+    const stmt = prepare(source) as any;
+    const sql = source.replace(/\s+/g, ' ').trim();
+    for (const method of ['run', 'get', 'all'] as const) {
+      const original = stmt[method].bind(stmt);
+      stmt[method] = (...params: unknown[]) => {
+        const start = process.hrtime.bigint();
+        try {
+          return original(...params);
+        } finally {
+          const elapsedMs = Number(process.hrtime.bigint() - start) / 1e6;
+          console.log(`[sql] ${elapsedMs.toFixed(3)}ms ${sql}`);
+        }
+      };
+    }
+    return stmt;
+  }) as typeof db.prepare;
+  return db;
+}
+
+// =============================================
+// Timestamp epoch (lihat epoch_timestamps.py): setelah migrasi, <kolom>_ms berisi epoch milidetik dan
+// indeks waktu dibuat di atas kolom itu; <kolom> tetap bisa dibaca sebagai generated column teks.
+// Pakai timeColumn() di ORDER BY / range scan agar indeks terpakai di kedua versi skema.
+// Hasilnya di-cache per koneksi dan dicek ulang tiap menit (migrasi bisa berjalan saat aplikasi hidup).
+// UPDATE dari route mengisi updated_at lewat touchTimestamp() di statement yang sama, sehingga trigger
+// updated_at (WHEN NEW.updated_at IS OLD.updated_at, lihat c.py) tidak menulis baris itu sekali lagi.
+// =============================================
+const TIME_COLUMN_CHECK_MS = 60_000;
+const timeColumnCache = new WeakMap<Database.Database, Map<string, { name: string; checkedAt: number }>>();
+
+export function timeColumn(db: Database.Database, table: string, column = 'created_at'): string {
+  let cache = timeColumnCache.get(db);
+  if (!cache) {
+    cache = new Map();
+    timeColumnCache.set(db, cache);
+  }
+  const key = `${table}.${column}`;
+  const cached = cache.get(key);
+  const now = Date.now();
+  if (cached && now - cached.checkedAt < TIME_COLUMN_CHECK_MS) {
+    return cached.name;
+  }
+  const columns = db.pragma(`table_info(${table})`) as { name: string }[];
+  const name = columns.some((info) => info.name === `${column}_ms`) ? `${column}_ms` : column;
+  cache.set(key, { name, checkedAt: now });
+  return name;
+}
+
+// Sama dengan NOW_MS_SQL di c.py
+const NOW_MS_SQL = "CAST(round((julianday('now') - 2440587.5) * 86400000) AS INTEGER)";
+
+export function touchTimestamp(db: Database.Database, table: string, column = 'updated_at'): string {
+  const name = timeColumn(db, table, column);
+  return name === column ? `${column} = CURRENT_TIMESTAMP` : `${name} = ${NOW_MS_SQL}`;
+}
+
 let dbInstance: Database.Database;
 
 try {
   console.log(`Mencoba menghubungkan ke database di: ${dbFilePath}`);
-  dbInstance = new Database(dbFilePath, { /* verbose: console.log */ });
+  dbInstance = logStatementTiming(new Database(dbFilePath, databaseOptions()));
   console.log(`Berhasil terhubung ke database: ${DB_FILE_NAME}`);
   dbInstance.pragma('foreign_keys = ON');
   console.log('Foreign key constraints diaktifkan.');
@@ -41,7 +118,7 @@ export function getDbConnection(): Database.Database {
  
     try {
         console.warn('Instance database belum ada, mencoba membuat koneksi baru...');
-        dbInstance = new Database(dbFilePath, { /* verbose: console.log */ });
+        dbInstance = logStatementTiming(new Database(dbFilePath, databaseOptions()));
         dbInstance.pragma('foreign_keys = ON');
         dbInstance.pragma('busy_timeout = 5000');
         console.log(`Koneksi database baru berhasil dibuat untuk ${DB_FILE_NAME}`);
@@ -51,4 +128,51 @@ export function getDbConnection(): Database.Database {
     }
   }
   return dbInstance;
-}
\ No newline at end of file
+}
+
+// =============================================
+// Read replica (lihat read_replica.py)
+// READ_REPLICA_DB_PATHS berisi daftar file replica dipisah koma, mis.
+// READ_REPLICA_DB_PATHS=/srv/node1/social_media_app.db,/srv/node2/social_media_app.db
+// Replica diganti secara atomik (rename) oleh read_replica.py, jadi koneksi dibuka ulang
+// jika inode file berubah. Jika tidak ada replica yang bisa dibuka, dipakai database utama.
+// =============================================
+const replicaPaths = (process.env.READ_REPLICA_DB_PATHS || '')
+  .split(',')
+  .map((p) => p.trim())
+  .filter((p) => p.length > 0);
+
+const replicaInstances = new Map<string, { db: Database.Database; ino: number }>();
+let replicaCursor = 0;
+
+function openReplica(replicaPath: string): Database.Database | null {
+  try {
+    const ino = fs.statSync(replicaPath).ino;
+    const cached = replicaInstances.get(replicaPath);
+    if (cached && cached.ino === ino) {
+      return cached.db;
+    }
+    if (cached) {
+      cached.db.close();
+    }
+    const db = logStatementTiming(new Database(replicaPath, { ...databaseOptions(), readonly: true, fileMustExist: true }));
+    db.pragma('busy_timeout = 5000');
+    replicaInstances.set(replicaPath, { db, ino });
+    return db;
+  } catch (error) {
+    console.warn(`Replica ${replicaPath} tidak bisa dibuka, memakai database utama:`, error);
+    return null;
+  }
+}
+
+// Untuk route yang hanya membaca (feed, pencarian, profil). Jangan dipakai untuk INSERT/UPDATE/DELETE.
+export function getReadDbConnection(): Database.Database {
+  for (let i = 0; i < replicaPaths.length; i++) {
+    const replicaPath = replicaPaths[replicaCursor++ % replicaPaths.length];
+    const db = openReplica(replicaPath);
+    if (db) {
+      return db;
+    }
+  }
+  return getDbConnection();
+}
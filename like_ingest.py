@@ -0,0 +1,474 @@
+# like_ingest.py
+# Layanan write-behind untuk like/unlike dan notifikasi.
+# Klien mengirim event lewat Unix socket lokal (satu JSON per baris). Event ditampung di memori,
+# di-dedupe/coalesce (aksi terakhir per pasangan user-post yang berlaku), lalu di-commit bersama
+# dalam SATU transaksi setiap beberapa milidetik. Balasan (ack) baru dikirim setelah COMMIT
+# selesai dengan synchronous=FULL, jadi ack berarti data sudah durable.
+#
+# Format event:
+#   {"id": 1, "op": "like",   "user_id": 5, "post_id": 9, "actor_username": "budi"}
+#   {"id": 2, "op": "unlike", "user_id": 5, "post_id": 9}
+#   {"id": 3, "op": "notify", "recipient_user_id": 9, "actor_user_id": 5, "type": "...",
+#    "target_entity_type": "POST", "target_entity_id": 9, "message": "..."}
+# Balasan:
+#   {"id": 1, "ok": true, "liked": true, "like_count": 12}
+#   {"id": 1, "ok": false, "error": "..."}
+#
+# Pemakaian:
+#   python like_ingest.py serve [--socket /tmp/like_ingest.sock] [--commit-ms 5]
+#   python like_ingest.py bench [--clients 200] [--seconds 5]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from c import DB_FILE, create_tables
+
+DEFAULT_SOCKET_PATH = "/tmp/like_ingest.sock"
+
+NOTIFICATION_FIELDS = ("recipient_user_id", "actor_user_id", "type", "target_entity_type", "target_entity_id", "message")
+
+def _open_writer_connection(db_file):
+    """ Koneksi writer layanan: WAL + synchronous=FULL agar ack setelah COMMIT berarti durable. """
+    conn = sqlite3.connect(db_file, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute("PRAGMA synchronous = FULL;")
+    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    return conn
+
+def apply_batch(conn, events):
+    """ Menerapkan sekumpulan event dalam satu transaksi.
+        Like/unlike pada pasangan (user_id, post_id) yang sama di-coalesce: aksi terakhir yang berlaku.
+        Notifikasi identik dalam satu batch hanya ditulis sekali.
+        Setiap pasangan like (beserta notifikasinya) dan setiap notifikasi dibungkus SAVEPOINT sendiri,
+        sehingga satu event yang gagal (mis. user_id tidak ada) tidak membatalkan event lain di batch.
+    Args:
+        conn (sqlite3.Connection): Koneksi writer (isolation_level=None).
+        events (list): Event yang sudah divalidasi.
+    Returns:
+        list: Hasil (dict balasan tanpa "id") untuk setiap event, urutannya sama dengan events.
+    """
+    final_like_ops = {}
+    notifications = {}
+    for event in events:
+        if event["op"] in ("like", "unlike"):
+            final_like_ops[(event["user_id"], event["post_id"])] = event
+        else:
+            notifications[tuple(event.get(field) for field in NOTIFICATION_FIELDS)] = None
+
+    pair_errors = {}
+    notification_errors = {}
+    insert_notification_sql = f"INSERT INTO notifications ({', '.join(NOTIFICATION_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?);"
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        for (user_id, post_id), event in final_like_ops.items():
+            conn.execute("SAVEPOINT like_pair;")
+            try:
+                error = _apply_like_pair(conn, user_id, post_id, event, insert_notification_sql)
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO like_pair;")
+                error = f"Error database: {e}"
+            conn.execute("RELEASE like_pair;")
+            if error:
+                pair_errors[(user_id, post_id)] = error
+        for notification in notifications:
+            conn.execute("SAVEPOINT notification;")
+            try:
+                conn.execute(insert_notification_sql, notification)
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO notification;")
+                notification_errors[notification] = f"Error database: {e}"
+            conn.execute("RELEASE notification;")
+        conn.execute("COMMIT;")
+    except Exception:
+        # Bukan hanya sqlite3.Error: koneksi tidak boleh tertinggal di dalam transaksi yang terbuka
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        raise
+
+    # Setelah commit: hitung state akhir untuk ack
+    like_counts = {}
+    liked = {}
+    for user_id, post_id in final_like_ops:
+        if post_id not in like_counts:
+            like_counts[post_id] = conn.execute("SELECT COUNT(*) FROM likes WHERE post_id = ?;", (post_id,)).fetchone()[0]
+        liked[(user_id, post_id)] = conn.execute(
+            "SELECT 1 FROM likes WHERE user_id = ? AND post_id = ?;", (user_id, post_id)
+        ).fetchone() is not None
+
+    results = []
+    for event in events:
+        if event["op"] == "notify":
+            error = notification_errors.get(tuple(event.get(field) for field in NOTIFICATION_FIELDS))
+            results.append({"ok": False, "error": error} if error else {"ok": True})
+            continue
+        pair = (event["user_id"], event["post_id"])
+        if pair in pair_errors and final_like_ops[pair] is event:
+            results.append({"ok": False, "error": pair_errors[pair]})
+        else:
+            results.append({"ok": True, "liked": liked[pair], "like_count": like_counts[event["post_id"]]})
+    return results
+
+def _apply_like_pair(conn, user_id, post_id, event, insert_notification_sql):
+    """ Menerapkan aksi akhir satu pasangan (user_id, post_id) beserta notifikasi likenya.
+    Returns:
+        str: Pesan error validasi, atau None jika berhasil.
+    """
+    if event["op"] == "unlike":
+        conn.execute("DELETE FROM likes WHERE user_id = ? AND post_id = ?;", (user_id, post_id))
+        return None
+    post = conn.execute("SELECT user_id, visibility_status FROM posts WHERE id = ?;", (post_id,)).fetchone()
+    if post is None:
+        return "Postingan tidak ditemukan."
+    author_id, visibility_status = post
+    if visibility_status != "VISIBLE":
+        return "Tidak dapat menyukai postingan ini karena status visibilitasnya."
+    if author_id != user_id and conn.execute(
+        """SELECT 1 FROM user_blocks
+           WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?);""",
+        (user_id, author_id, author_id, user_id)
+    ).fetchone():
+        return "Tidak dapat berinteraksi dengan postingan ini karena status blokir."
+    inserted = conn.execute(
+        "INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);", (user_id, post_id)
+    ).rowcount
+    if inserted and author_id != user_id:
+        actor_name = event.get("actor_username") or "Seseorang"
+        conn.execute(insert_notification_sql, (author_id, user_id, "POST_LIKED", "POST", post_id,
+                                               f"{actor_name} menyukai postingan Anda."))
+    return None
+
+def _is_id(value):
+    # bool adalah subclass int di Python; true/false dari JSON bukan id
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _validate_event(event):
+    """ Memeriksa bentuk event, termasuk tipe setiap field yang dibaca apply_batch
+        (nilai list/dict tidak bisa di-hash dan tidak bisa diikat ke parameter SQL).
+        Mengembalikan pesan error atau None jika valid.
+    """
+    if not isinstance(event, dict):
+        return "Event harus berupa objek JSON."
+    op = event.get("op")
+    if op in ("like", "unlike"):
+        if not _is_id(event.get("user_id")) or not _is_id(event.get("post_id")):
+            return "user_id dan post_id wajib berupa integer."
+        if not isinstance(event.get("actor_username"), (str, type(None))):
+            return "actor_username harus berupa string."
+    elif op == "notify":
+        if not _is_id(event.get("recipient_user_id")) or not isinstance(event.get("type"), str) or not event["type"]:
+            return "recipient_user_id (integer) dan type (string) wajib diisi."
+        for field in ("actor_user_id", "target_entity_id"):
+            if event.get(field) is not None and not _is_id(event[field]):
+                return f"{field} harus berupa integer."
+        for field in ("target_entity_type", "message"):
+            if not isinstance(event.get(field), (str, type(None))):
+                return f"{field} harus berupa string."
+    else:
+        return f"op tidak dikenal: {op!r}"
+    return None
+
+class LikeIngestServer:
+    """ Server asyncio yang mengumpulkan event dan melakukan group commit.
+    Args:
+        db_file (str): Path ke file database.
+        socket_path (str): Path Unix socket.
+        commit_interval (float): Jeda maksimum antar group commit (detik).
+        max_batch (int): Commit lebih awal jika jumlah event tertunda mencapai angka ini.
+    """
+
+    def __init__(self, db_file, socket_path=DEFAULT_SOCKET_PATH, commit_interval=0.005, max_batch=5000):
+        self.db_file = db_file
+        self.socket_path = socket_path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._wake = None
+        self._server = None
+        self._committer = None
+        # Satu thread khusus memegang koneksi writer agar event loop tidak pernah terblokir I/O database
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="like-ingest-writer")
+        self._conn = None
+        self.commits = 0
+        self.events_committed = 0
+
+    async def start(self):
+        """ Membuka socket dan menjalankan task group commit. """
+        loop = asyncio.get_running_loop()
+        self._conn = await loop.run_in_executor(self._executor, _open_writer_connection, self.db_file)
+        self._wake = asyncio.Event()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        self._committer = asyncio.create_task(self._commit_loop())
+
+    async def close(self):
+        """ Menutup socket, meng-commit event yang tersisa, lalu menutup koneksi. """
+        self._server.close()
+        await self._server.wait_closed()
+        self._committer.cancel()
+        try:
+            await self._committer
+        except asyncio.CancelledError:
+            pass
+        await self._flush()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._conn.close)
+        self._executor.shutdown()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    async def _handle_client(self, reader, writer):
+        """ Membaca event per baris; balasan dikirim begitu batch yang memuat event tersebut ter-commit. """
+        loop = asyncio.get_running_loop()
+        responders = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    writer.write(b'{"id": null, "ok": false, "error": "JSON tidak valid."}\n')
+                    continue
+                error = _validate_event(event)
+                if error:
+                    request_id = event.get("id") if isinstance(event, dict) else None
+                    writer.write(json.dumps({"id": request_id, "ok": False, "error": error}).encode() + b"\n")
+                    continue
+                future = loop.create_future()
+                self._pending.append((event, future))
+                if len(self._pending) >= self.max_batch:
+                    self._wake.set()
+                task = asyncio.create_task(self._respond(writer, event.get("id"), future))
+                responders.add(task)
+                task.add_done_callback(responders.discard)
+            if responders:
+                await asyncio.gather(*responders)
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, request_id, future):
+        try:
+            result = await future
+        except sqlite3.Error as e:
+            result = {"ok": False, "error": f"Error database: {e}"}
+        except Exception as e:
+            result = {"ok": False, "error": f"Batch gagal diproses: {e}"}
+        writer.write(json.dumps({"id": request_id, **result}).encode() + b"\n")
+        await writer.drain()
+
+    async def _commit_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.commit_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush()
+
+    async def _flush(self):
+        """ Mengambil semua event tertunda dan meng-commit-nya sebagai satu batch. """
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        events = [event for event, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, apply_batch, self._conn, events)
+        except Exception as e:
+            # Hanya batch ini yang gagal; _commit_loop harus tetap hidup untuk batch berikutnya
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.commits += 1
+        self.events_committed += len(events)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+class LikeIngestClient:
+    """ Klien asyncio sederhana dengan pipelining: banyak request boleh menunggu ack bersamaan.
+    Args:
+        socket_path (str): Path Unix socket server.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+        self._reader = None
+        self._writer = None
+        self._waiters = {}
+        self._next_id = 0
+        self._reader_task = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._reader_task.cancel()
+
+    async def _read_responses(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._waiters.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+
+    async def send(self, event):
+        """ Mengirim satu event dan menunggu ack (setelah data durable). """
+        self._next_id += 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[request_id] = future
+        self._writer.write(json.dumps({**event, "id": request_id}).encode() + b"\n")
+        return await future
+
+    async def like(self, user_id, post_id, actor_username=None):
+        return await self.send({"op": "like", "user_id": user_id, "post_id": post_id, "actor_username": actor_username})
+
+    async def unlike(self, user_id, post_id):
+        return await self.send({"op": "unlike", "user_id": user_id, "post_id": post_id})
+
+def _seed_bench_db(db_path, n_users, n_posts):
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    create_tables(conn)
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, password_hash) VALUES (?, ?, ?, 'x');",
+            ((i, f"user{i}", f"user{i}@example.com") for i in range(1, n_users + 1))
+        )
+        conn.executemany(
+            "INSERT INTO posts (user_id, content) VALUES (?, 'post');",
+            ((random.randint(1, n_users),) for _ in range(n_posts))
+        )
+    conn.close()
+
+def _per_request_like(conn, user_id, post_id):
+    """ Pembanding: alur route likes saat ini, setiap statement di transaksi implisitnya sendiri. """
+    post = conn.execute("SELECT id, user_id, visibility_status FROM posts WHERE id = ?;", (post_id,)).fetchone()
+    author_id = post[1]
+    if author_id != user_id and conn.execute(
+        "SELECT 1 FROM user_blocks WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?);",
+        (user_id, author_id, author_id, user_id)
+    ).fetchone():
+        return
+    if conn.execute("SELECT 1 FROM likes WHERE user_id = ? AND post_id = ?;", (user_id, post_id)).fetchone():
+        return
+    conn.execute("INSERT INTO likes (user_id, post_id) VALUES (?, ?);", (user_id, post_id))
+    conn.execute("SELECT COUNT(*) FROM likes WHERE post_id = ?;", (post_id,)).fetchone()
+    if author_id != user_id:
+        conn.execute(
+            "INSERT INTO notifications (recipient_user_id, actor_user_id, type, target_entity_type, target_entity_id, message) VALUES (?, ?, 'POST_LIKED', 'POST', ?, 'x');",
+            (author_id, user_id, post_id)
+        )
+
+async def _run_group_commit_bench(db_path, socket_path, n_clients, seconds, n_users, n_posts, commit_interval):
+    server = LikeIngestServer(db_path, socket_path, commit_interval=commit_interval)
+    await server.start()
+    clients = [LikeIngestClient(socket_path) for _ in range(min(n_clients, 32))]
+    for client in clients:
+        await client.connect()
+    deadline = time.monotonic() + seconds
+    acked = 0
+
+    async def user_loop(index):
+        nonlocal acked
+        rng = random.Random(index)
+        client = clients[index % len(clients)]
+        while time.monotonic() < deadline:
+            response = await client.like(rng.randint(1, n_users), rng.randint(1, n_posts))
+            if response.get("ok"):
+                acked += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_loop(i) for i in range(n_clients)))
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+    await server.close()
+    return acked / elapsed, server.commits, server.events_committed
+
+def benchmark(n_clients=200, seconds=5.0, n_users=10000, n_posts=5000, commit_ms=5.0):
+    """ Membandingkan like/detik yang di-ack durable: group commit vs commit per request.
+    Args:
+        n_clients (int): Jumlah pengguna simulasi yang mengirim like bersamaan.
+        seconds (float): Durasi tiap skenario.
+        n_users (int): Jumlah pengguna di database benchmark.
+        n_posts (int): Jumlah postingan di database benchmark.
+        commit_ms (float): Interval group commit (milidetik).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench_likes.db")
+        _seed_bench_db(db_path, n_users, n_posts)
+
+        conn = _open_writer_connection(db_path)
+        rng = random.Random(1)
+        count = 0
+        start = time.perf_counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            _per_request_like(conn, rng.randint(1, n_users), rng.randint(1, n_posts))
+            count += 1
+        per_request_rate = count / (time.perf_counter() - start)
+        conn.close()
+
+        socket_path = os.path.join(tmp_dir, "like_ingest.sock")
+        group_rate, commits, events = asyncio.run(
+            _run_group_commit_bench(db_path, socket_path, n_clients, seconds, n_users, n_posts, commit_ms / 1000)
+        )
+
+    print()
+    print(f"Benchmark like (synchronous=FULL, WAL), {seconds:.0f} s per skenario")
+    group_label = f"Group commit ({n_clients} klien, {commit_ms:.0f} ms)"
+    print(f"  {'Commit per request (alur route)':<36}: {per_request_rate:12,.0f} like/s")
+    print(f"  {group_label:<36}: {group_rate:12,.0f} like/s "
+          f"({commits} commit, rata-rata {events / max(commits, 1):.0f} event/commit)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Layanan write-behind untuk like dan notifikasi.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Jalankan server Unix socket.")
+    serve_parser.add_argument("--db", default=DB_FILE)
+    serve_parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH)
+    serve_parser.add_argument("--commit-ms", type=float, default=5.0)
+    bench_parser = subparsers.add_parser("bench", help="Benchmark group commit vs commit per request.")
+    bench_parser.add_argument("--clients", type=int, default=200)
+    bench_parser.add_argument("--seconds", type=float, default=5.0)
+    bench_parser.add_argument("--commit-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.clients, args.seconds, commit_ms=args.commit_ms)
+        return
+
+    async def serve():
+        server = LikeIngestServer(args.db, args.socket, commit_interval=args.commit_ms / 1000)
+        await server.start()
+        print(f"Layanan like berjalan di {args.socket} (group commit tiap {args.commit_ms} ms).")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+            print("Layanan like dihentikan.")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+# live_viewers.py
+# Agregator jumlah penonton live stream.
+# Heartbeat penonton hanya disimpan di memori (dict per sesi). Thread flusher menghitung
+# penonton aktif per sesi dan menulis hanya sesi yang berubah ke live_sessions dalam SATU
+# transaksi setiap beberapa detik, sehingga writer tunggal SQLite tidak dibanjiri update.
+#
+# Pemakaian:
+#   python live_viewers.py migrate                   -> buat live_sessions dari posts live yang sudah ada
+#   python live_viewers.py live                      -> tampilkan sesi yang sedang live
+#   python live_viewers.py bench [--viewers 5000] [--sessions 50] [--seconds 5]
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from c import DB_FILE, create_connection, create_tables
+
+class ViewerCountAggregator:
+    """ Menampung heartbeat penonton di memori dan mem-flush jumlahnya secara berkala.
+    Args:
+        db_file (str): Path ke file database.
+        flush_interval (float): Jeda antar flush (detik).
+        heartbeat_ttl (float): Penonton dianggap pergi jika tidak mengirim heartbeat selama ini (detik).
+    """
+
+    def __init__(self, db_file, flush_interval=3.0, heartbeat_ttl=15.0):
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.heartbeat_ttl = heartbeat_ttl
+        self._viewers = {}          # session_id -> {viewer_id: waktu heartbeat terakhir}
+        self._last_flushed = {}     # session_id -> viewer_count terakhir yang ditulis
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.flush_count = 0
+        self.rows_written = 0
+        self.max_flush_seconds = 0.0
+
+    def heartbeat(self, session_id, viewer_id, now=None):
+        """ Mencatat bahwa viewer_id masih menonton session_id. Tidak menyentuh database. """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            viewers = self._viewers.get(session_id)
+            if viewers is None:
+                viewers = self._viewers[session_id] = {}
+            viewers[viewer_id] = now
+
+    def leave(self, session_id, viewer_id):
+        """ Menghapus penonton yang menutup stream secara eksplisit. """
+        with self._lock:
+            viewers = self._viewers.get(session_id)
+            if viewers is not None:
+                viewers.pop(viewer_id, None)
+
+    def snapshot(self, now=None):
+        """ Membuang penonton kedaluwarsa lalu mengembalikan {session_id: jumlah penonton aktif}. """
+        now = time.monotonic() if now is None else now
+        cutoff = now - self.heartbeat_ttl
+        counts = {}
+        with self._lock:
+            for session_id in list(self._viewers):
+                viewers = self._viewers[session_id]
+                expired = [viewer_id for viewer_id, seen_at in viewers.items() if seen_at < cutoff]
+                for viewer_id in expired:
+                    del viewers[viewer_id]
+                counts[session_id] = len(viewers)
+                if not viewers:
+                    del self._viewers[session_id]
+        return counts
+
+    def flush(self, conn):
+        """ Menulis jumlah penonton yang berubah sejak flush terakhir dalam satu transaksi.
+        Args:
+            conn (sqlite3.Connection): Koneksi milik thread pemanggil.
+        Returns:
+            int: Jumlah sesi yang benar-benar ditulis (baris live_sessions yang berubah).
+        """
+        counts = self.snapshot()
+        # Sesi yang sudah tidak punya penonton tetap ditulis sekali dengan nilai 0
+        for session_id in self._last_flushed:
+            counts.setdefault(session_id, 0)
+        changed = [
+            (count, count, session_id) for session_id, count in counts.items()
+            if self._last_flushed.get(session_id) != count
+        ]
+        start = time.perf_counter()
+        written = set()
+        if changed:
+            with conn:
+                # Satu execute per sesi agar rowcount bisa dicek: sesi yang belum LIVE (atau belum ada)
+                # tidak dicatat sebagai sudah ditulis, jadi jumlahnya dicoba lagi di flush berikutnya
+                for params in changed:
+                    if conn.execute(
+                        """UPDATE live_sessions SET
+                               viewer_count = ?,
+                               peak_viewer_count = MAX(peak_viewer_count, ?),
+                               viewer_count_updated_at = CURRENT_TIMESTAMP
+                           WHERE id = ? AND status = 'LIVE';""",
+                        params
+                    ).rowcount:
+                        written.add(params[2])
+        self.max_flush_seconds = max(self.max_flush_seconds, time.perf_counter() - start)
+        for count, _, session_id in changed:
+            if not count:
+                # Tanpa penonton: tidak perlu dicoba lagi walaupun sesinya sudah tidak LIVE
+                self._last_flushed.pop(session_id, None)
+            elif session_id in written:
+                self._last_flushed[session_id] = count
+        self.flush_count += 1
+        self.rows_written += len(written)
+        return len(written)
+
+    def _run(self):
+        """ Loop thread flusher. Koneksi dibuat di thread ini karena koneksi sqlite3 terikat thread. """
+        conn = sqlite3.connect(self.db_file, timeout=5.0)
+        try:
+            while not self._stop_event.wait(self.flush_interval):
+                try:
+                    self.flush(conn)
+                except sqlite3.Error as e:
+                    print(f"Error saat flush jumlah penonton: {e}")
+            self.flush(conn)
+        finally:
+            conn.close()
+
+    def start(self):
+        """ Menjalankan thread flusher di background. """
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="viewer-count-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Menghentikan thread flusher setelah satu flush terakhir. """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def migrate(conn):
+    """ Memasang tabel live_sessions dan mengisinya dari postingan live yang sudah ada.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+    Returns:
+        int: Jumlah sesi yang dibuat.
+    """
+    create_tables(conn)
+    return backfill_live_sessions(conn)
+
+def backfill_live_sessions(conn):
+    """ Membuat sesi live_sessions untuk postingan live yang belum punya sesi (tanpa mengubah skema).
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+    Returns:
+        int: Jumlah sesi yang dibuat.
+    """
+    with conn:
+        cursor = conn.execute("""
+            INSERT INTO live_sessions (post_id, user_id, status, stream_playback_url, started_at, ended_at)
+            SELECT id, user_id, COALESCE(live_status, 'PENDING'), stream_playback_url,
+                   CASE WHEN live_status IN ('LIVE', 'ENDED') THEN created_at END,
+                   CASE WHEN live_status = 'ENDED' THEN updated_at END
+            FROM posts WHERE is_live
+            ON CONFLICT(post_id) DO NOTHING;
+        """)
+    print(f"{cursor.rowcount} sesi live dibuat dari tabel posts.")
+    return cursor.rowcount
+
+def list_live_sessions(conn, limit=20):
+    """ Mengambil sesi yang sedang live, terbaru lebih dulu (memakai partial index idx_live_sessions_active).
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        limit (int): Jumlah sesi maksimum.
+    Returns:
+        list: (id, post_id, user_id, viewer_count, peak_viewer_count, started_at)
+    """
+    return conn.execute("""
+        SELECT id, post_id, user_id, viewer_count, peak_viewer_count, started_at
+        FROM live_sessions WHERE status = 'LIVE'
+        ORDER BY started_at DESC LIMIT ?;
+    """, (limit,)).fetchall()
+
+def _seed_sessions(conn, n_sessions):
+    """ Membuat n_sessions postingan live (masing-masing satu sesi LIVE) untuk benchmark. """
+    with conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, email, password_hash) VALUES (?, ?, ?, 'x');",
+            ((i, f"streamer{i}", f"streamer{i}@example.com") for i in range(1, n_sessions + 1))
+        )
+        conn.executemany(
+            "INSERT INTO posts (user_id, is_live, live_status) VALUES (?, TRUE, 'LIVE');",
+            ((i,) for i in range(1, n_sessions + 1))
+        )
+    return [row[0] for row in conn.execute("SELECT id FROM live_sessions ORDER BY id;")]
+
+def _simulate_viewers(send, session_ids, n_viewers, n_threads, seconds, heartbeat_interval):
+    """ Menjalankan n_viewers penonton simulasi di n_threads thread selama `seconds` detik.
+        Setiap penonton mengirim heartbeat tiap heartbeat_interval detik.
+    Returns:
+        tuple: (jumlah heartbeat, jumlah error)
+    """
+    totals = {"heartbeats": 0, "errors": 0}
+    totals_lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker(worker_index):
+        rng = random.Random(worker_index)
+        viewers = [(viewer_id, rng.choice(session_ids)) for viewer_id in range(worker_index, n_viewers, n_threads)]
+        heartbeats = errors = 0
+        while time.monotonic() < deadline:
+            round_start = time.monotonic()
+            for viewer_id, session_id in viewers:
+                try:
+                    send(session_id, viewer_id)
+                    heartbeats += 1
+                except sqlite3.Error:
+                    errors += 1
+                if time.monotonic() >= deadline:
+                    break
+            # Sisa waktu ronde dipakai tidur, seperti klien yang mengirim heartbeat berkala
+            time.sleep(max(0.0, heartbeat_interval - (time.monotonic() - round_start)))
+        with totals_lock:
+            totals["heartbeats"] += heartbeats
+            totals["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return totals["heartbeats"], totals["errors"]
+
+def benchmark(n_viewers=5000, n_sessions=50, seconds=5.0, n_threads=8, heartbeat_interval=1.0):
+    """ Membandingkan agregator in-memory dengan tulis langsung per heartbeat.
+    Args:
+        n_viewers (int): Jumlah penonton simulasi.
+        n_sessions (int): Jumlah sesi live.
+        seconds (float): Durasi tiap skenario.
+        n_threads (int): Jumlah thread pengirim heartbeat.
+        heartbeat_interval (float): Interval heartbeat per penonton (detik).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench_live.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        create_tables(conn)
+        session_ids = _seed_sessions(conn, n_sessions)
+
+        aggregator = ViewerCountAggregator(db_path, flush_interval=1.0)
+        aggregator.start()
+        agg_heartbeats, agg_errors = _simulate_viewers(
+            aggregator.heartbeat, session_ids, n_viewers, n_threads, seconds, heartbeat_interval
+        )
+        aggregator.stop()
+        total_viewers = conn.execute("SELECT SUM(viewer_count) FROM live_sessions;").fetchone()[0]
+
+        # Pembanding: setiap heartbeat langsung menjadi UPDATE + commit sendiri
+        local = threading.local()
+
+        def direct_write(session_id, viewer_id):
+            if not hasattr(local, "conn"):
+                local.conn = sqlite3.connect(db_path, timeout=5.0, isolation_level=None)
+            local.conn.execute(
+                "UPDATE live_sessions SET viewer_count_updated_at = CURRENT_TIMESTAMP WHERE id = ?;", (session_id,)
+            )
+
+        direct_heartbeats, direct_errors = _simulate_viewers(
+            direct_write, session_ids, n_viewers, n_threads, seconds, heartbeat_interval
+        )
+        conn.close()
+
+    print()
+    if heartbeat_interval > 0:
+        load = f"heartbeat tiap {heartbeat_interval:.1f} s (~{n_viewers / heartbeat_interval:,.0f} heartbeat/s ditawarkan)"
+    else:
+        load = "heartbeat tanpa jeda (throughput maksimum)"
+    print(f"Benchmark penonton live: {n_viewers} penonton, {n_sessions} sesi, {seconds:.0f} s, {load}")
+    print(f"  Agregator in-memory : {agg_heartbeats / seconds:12,.0f} heartbeat/s, {agg_errors} error, "
+          f"{aggregator.flush_count} flush, {aggregator.rows_written} baris ditulis, "
+          f"flush terlama {aggregator.max_flush_seconds * 1000:.2f} ms")
+    print(f"  Total viewer_count setelah flush: {total_viewers} (diharapkan {n_viewers})")
+    print(f"  Tulis per heartbeat : {direct_heartbeats / seconds:12,.0f} heartbeat/s, {direct_errors} error, "
+          f"{direct_heartbeats} baris ditulis")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sesi live stream dan agregator jumlah penonton.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="Buat live_sessions dari posts live yang ada.")
+    migrate_parser.add_argument("--db", default=DB_FILE)
+    live_parser = subparsers.add_parser("live", help="Tampilkan sesi yang sedang live.")
+    live_parser.add_argument("--db", default=DB_FILE)
+    live_parser.add_argument("--limit", type=int, default=20)
+    bench_parser = subparsers.add_parser("bench", help="Benchmark dengan penonton simulasi.")
+    bench_parser.add_argument("--viewers", type=int, default=5000)
+    bench_parser.add_argument("--sessions", type=int, default=50)
+    bench_parser.add_argument("--seconds", type=float, default=5.0)
+    bench_parser.add_argument("--threads", type=int, default=8)
+    bench_parser.add_argument("--interval", type=float, default=1.0,
+                              help="Interval heartbeat per penonton; 0 untuk mengukur throughput maksimum.")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.viewers, args.sessions, args.seconds, args.threads, args.interval)
+        return
+
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    if args.command == "migrate":
+        migrate(conn)
+    else:
+        for row in list_live_sessions(conn, args.limit):
+            print(row)
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
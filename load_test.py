@@ -0,0 +1,523 @@
+# load_test.py
+# Generator beban multi-proses untuk mengukur contention SQLite pada pola akses aplikasi.
+# lib/db.ts hanya mengandalkan busy_timeout = 5000: saat banyak proses menulis bersamaan,
+# statement menunggu di busy handler tanpa terlihat di log mana pun. Skrip ini menjalankan
+# N proses worker, masing-masing dengan koneksinya sendiri (seperti satu instance Next.js),
+# yang mengeksekusi campuran operasi dengan statement yang sama dengan route:
+#   feed          : GET /api/feed (teman, blokir, halaman post)
+#   like          : POST/DELETE /api/posts/[postId]/likes (+ notifikasi)
+#   comment       : POST /api/posts/[postId]/comments (+ notifikasi)
+#   chat          : POST /api/chat/rooms/[roomId]/messages
+#   notifications : GET /api/notifications (daftar + jumlah belum dibaca)
+# Busy handler bawaan SQLite diganti dengan loop retry berjadwal sama (1, 2, 5, 10, ... ms,
+# dibatasi --busy-timeout) agar setiap SQLITE_BUSY dan lama menunggunya bisa dihitung.
+# Per jenis operasi dilaporkan throughput, persentil latensi, jumlah SQLITE_BUSY, total waktu
+# tunggu, dan operasi yang gagal karena melewati batas busy_timeout (di aplikasi: HTTP 500).
+# Database sumber (--db) selalu disalin; file aslinya tidak pernah ditulisi.
+#
+# Pemakaian:
+#   python load_test.py run [--db social_media_app.db] [--processes 4] [--seconds 10]
+#                           [--mix feed=40,like=20,comment=10,chat=15,notifications=15]
+#                           [--journal-mode WAL] [--synchronous NORMAL] [--json]
+#   python load_test.py sweep [--processes 1,2,4,8] [--settings WAL:NORMAL,WAL:FULL,DELETE:FULL]
+#                             [--seconds 5] [--per-op] [--json]
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from c import create_tables
+
+DEFAULT_MIX = (("feed", 40), ("like", 20), ("comment", 10), ("chat", 15), ("notifications", 15))
+DEFAULT_SETTINGS = (("WAL", "NORMAL"), ("WAL", "FULL"), ("DELETE", "FULL"))
+DEFAULT_BUSY_TIMEOUT_MS = 5000  # sama dengan lib/db.ts
+WRITE_OPS = ("like", "comment", "chat")
+
+# Jadwal tunggu busy handler bawaan SQLite (sqliteDefaultBusyCallback), dalam milidetik
+BUSY_DELAYS_MS = (1, 2, 5, 10, 15, 20, 25, 25, 25, 50, 50, 100)
+
+class BusyTimeout(Exception):
+    """ Statement masih SQLITE_BUSY setelah menunggu selama busy_timeout. """
+
+def parse_mix(text):
+    """ Mengurai campuran operasi dari bentuk "feed=40,like=20,...".
+    Args:
+        text (str): Daftar nama=bobot dipisah koma.
+    Returns:
+        tuple: Pasangan (nama operasi, bobot).
+    """
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Operasi tidak dikenal: {name} (pilihan: {', '.join(OPERATIONS)})")
+        mix.append((name, float(weight or 1)))
+    if not any(weight > 0 for _, weight in mix):
+        raise ValueError("Minimal satu operasi harus berbobot lebih dari 0.")
+    return tuple(mix)
+
+def parse_settings(text):
+    """ Mengurai daftar "JOURNAL:SYNCHRONOUS" dipisah koma, mis. "WAL:NORMAL,DELETE:FULL". """
+    settings = []
+    for part in text.split(","):
+        journal_mode, _, synchronous = part.strip().upper().partition(":")
+        settings.append((journal_mode, synchronous or "FULL"))
+    return tuple(settings)
+
+def _is_busy(error):
+    message = str(error)
+    return "database is locked" in message or "database is busy" in message
+
+class _OpStats:
+    """ Statistik satu jenis operasi di satu worker. """
+
+    def __init__(self):
+        self.latencies = []
+        self.busy = 0
+        self.busy_wait = 0.0
+        self.timeouts = 0
+        self.errors = 0
+
+class _Session:
+    """ Koneksi worker dengan busy handler terukur. """
+
+    def __init__(self, db_path, journal_mode, synchronous, busy_timeout_ms):
+        self.conn = sqlite3.connect(db_path, isolation_level=None, timeout=0, check_same_thread=False)
+        self.busy_timeout = busy_timeout_ms / 1000
+        self.stats = None
+        self.lastrowid = None
+        self.conn.execute("PRAGMA busy_timeout = 0;")
+        self.run(f"PRAGMA journal_mode = {journal_mode};")
+        self.conn.execute(f"PRAGMA synchronous = {synchronous};")
+        self.conn.execute("PRAGMA foreign_keys = ON;")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(posts);")}
+        # Setara timeColumn() di lib/db.ts
+        self.time_suffix = "_ms" if "created_at_ms" in columns else ""
+
+    def run(self, sql, params=()):
+        """ Menjalankan satu statement autocommit; SQLITE_BUSY diulang dengan jadwal busy handler
+            SQLite sampai busy_timeout habis.
+        Args:
+            sql (str): Statement SQL.
+            params (tuple): Parameter statement.
+        Returns:
+            list: Baris hasil.
+        """
+        waited = 0.0
+        attempt = 0
+        while True:
+            try:
+                cursor = self.conn.execute(sql, params)
+                self.lastrowid = cursor.lastrowid
+                return cursor.fetchall()
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e):
+                    raise
+                if self.stats is not None:
+                    self.stats.busy += 1
+                if waited >= self.busy_timeout:
+                    raise BusyTimeout(sql) from e
+                delay = min(BUSY_DELAYS_MS[min(attempt, len(BUSY_DELAYS_MS) - 1)] / 1000, self.busy_timeout - waited)
+                start_time = time.perf_counter()
+                time.sleep(delay)
+                slept = time.perf_counter() - start_time
+                waited += slept
+                if self.stats is not None:
+                    self.stats.busy_wait += slept
+                attempt += 1
+
+    def close(self):
+        self.conn.close()
+
+def _notify(session, recipient_id, actor_id, notification_type, post_id, message):
+    session.run("""INSERT INTO notifications (recipient_user_id, actor_user_id, type, target_entity_type, target_entity_id, message)
+        VALUES (?, ?, ?, 'POST', ?, ?)""", (recipient_id, actor_id, notification_type, post_id, message))
+
+def op_feed(session, rng, world):
+    user_id = rng.choice(world["user_ids"])
+    friend_ids = [row[0] for row in session.run("""
+        SELECT CASE WHEN sender_id = ? THEN receiver_id ELSE sender_id END as friend_id
+        FROM friendships
+        WHERE (sender_id = ? OR receiver_id = ?) AND status = 'ACCEPTED'""", (user_id, user_id, user_id))]
+    blocked = {row[0] for row in session.run("SELECT blocked_user_id FROM user_blocks WHERE blocker_id = ?", (user_id,))}
+    blocked |= {row[0] for row in session.run("SELECT blocker_id FROM user_blocks WHERE blocked_user_id = ?", (user_id,))}
+    feed_ids = list(dict.fromkeys([user_id] + [i for i in friend_ids if i not in blocked]))
+    placeholders = ",".join("?" * len(feed_ids))
+    session.run(f"""
+        SELECT
+          p.id, p.content, p.image_url, p.video_url, p.created_at, p.updated_at,
+          u.id as author_id, u.username as author_username,
+          COALESCE(u.full_name, '') as author_full_name,
+          u.profile_picture_url as author_profile_picture_url,
+          (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.id) as like_count,
+          (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id) as comment_count,
+          EXISTS(SELECT 1 FROM likes l_me WHERE l_me.post_id = p.id AND l_me.user_id = ?) as is_liked_by_me
+        FROM posts p
+        JOIN users u ON p.user_id = u.id
+        WHERE p.user_id IN ({placeholders})
+        ORDER BY p.created_at{session.time_suffix} DESC
+        LIMIT ? OFFSET ?""", (user_id, *feed_ids, 10, 0))
+
+def _post_for_interaction(session, rng, world, user_id):
+    post_id = rng.randint(1, world["max_post_id"])
+    post = session.run("SELECT id, user_id as authorId, visibility_status FROM posts WHERE id = ?", (post_id,))
+    if not post:
+        return None
+    author_id = post[0][1]
+    blocked = session.run("""
+        SELECT 1 FROM user_blocks
+        WHERE (blocker_id = ? AND blocked_user_id = ?) OR (blocker_id = ? AND blocked_user_id = ?)""",
+        (user_id, author_id, author_id, user_id))
+    return None if blocked else (post_id, author_id)
+
+def op_like(session, rng, world):
+    user_id = rng.choice(world["user_ids"])
+    target = _post_for_interaction(session, rng, world, user_id)
+    if target is None:
+        return
+    post_id, author_id = target
+    if session.run("SELECT 1 FROM likes WHERE user_id = ? AND post_id = ?", (user_id, post_id)):
+        # Sudah disukai: jalankan unlike agar tabel tidak hanya tumbuh
+        session.run("DELETE FROM likes WHERE user_id = ? AND post_id = ?", (user_id, post_id))
+        session.run("SELECT COUNT(*) as likeCount FROM likes WHERE post_id = ?", (post_id,))
+        return
+    session.run("INSERT INTO likes (user_id, post_id) VALUES (?, ?)", (user_id, post_id))
+    session.run("SELECT COUNT(*) as likeCount FROM likes WHERE post_id = ?", (post_id,))
+    if author_id != user_id:
+        _notify(session, author_id, user_id, "POST_LIKED", post_id, "Seseorang menyukai postingan Anda.")
+
+def op_comment(session, rng, world):
+    user_id = rng.choice(world["user_ids"])
+    target = _post_for_interaction(session, rng, world, user_id)
+    if target is None:
+        return
+    post_id, author_id = target
+    session.run("INSERT INTO comments (user_id, post_id, parent_comment_id, content) VALUES (?, ?, ?, ?)",
+                (user_id, post_id, None, f"komentar uji beban {rng.random():.6f}"))
+    comment_id = session.lastrowid
+    session.run("""
+        SELECT c.id, c.post_id, c.user_id, c.parent_comment_id, c.content, c.created_at, c.updated_at,
+               u.username as author_username, u.profile_picture_url as author_profile_picture_url
+        FROM comments c JOIN users u ON c.user_id = u.id WHERE c.id = ?""", (comment_id,))
+    if author_id != user_id:
+        _notify(session, author_id, user_id, "NEW_COMMENT", post_id, "Seseorang mengomentari postingan Anda.")
+
+def op_chat(session, rng, world):
+    room_id, user1_id, user2_id = rng.choice(world["rooms"])
+    sender_id = rng.choice((user1_id, user2_id))
+    room = session.run("SELECT id, user1_id, user2_id FROM chat_rooms WHERE id = ? AND (user1_id = ? OR user2_id = ?)",
+                       (room_id, sender_id, sender_id))
+    if not room:
+        return
+    session.run("""INSERT INTO chat_messages (chat_room_id, sender_id, message_content, attachment_url, attachment_type)
+        VALUES (?, ?, ?, ?, ?)""", (room_id, sender_id, f"pesan uji beban {rng.random():.6f}", None, None))
+    message_id = session.lastrowid
+    session.run("""
+        SELECT cm.*, u.username as sender_username, u.profile_picture_url as sender_profile_picture_url
+        FROM chat_messages cm JOIN users u ON cm.sender_id = u.id WHERE cm.id = ?""", (message_id,))
+
+def op_notifications(session, rng, world):
+    user_id = rng.choice(world["user_ids"])
+    session.run(f"""
+        SELECT
+          n.id, n.recipient_user_id, n.actor_user_id,
+          u_actor.username as actor_username, u_actor.profile_picture_url as actor_profile_picture_url,
+          n.type, n.target_entity_type, n.target_entity_id, n.is_read, n.message, n.created_at
+        FROM notifications n
+        LEFT JOIN users u_actor ON n.actor_user_id = u_actor.id
+        WHERE n.recipient_user_id = ?
+        ORDER BY n.is_read ASC, n.created_at{session.time_suffix} DESC
+        LIMIT ? OFFSET ?""", (user_id, 15, 0))
+    session.run("SELECT COUNT(*) as count FROM notifications WHERE recipient_user_id = ? AND is_read = FALSE", (user_id,))
+
+OPERATIONS = {
+    "feed": op_feed,
+    "like": op_like,
+    "comment": op_comment,
+    "chat": op_chat,
+    "notifications": op_notifications,
+}
+
+def _load_world(conn):
+    """ Id yang dipakai worker untuk memilih target operasi secara acak. """
+    return {
+        "user_ids": [row[0] for row in conn.execute("SELECT id FROM users;")],
+        "max_post_id": conn.execute("SELECT COALESCE(MAX(id), 0) FROM posts;").fetchone()[0],
+        "rooms": conn.execute("SELECT id, user1_id, user2_id FROM chat_rooms;").fetchall(),
+    }
+
+def _worker(db_path, journal_mode, synchronous, busy_timeout_ms, mix, seconds, seed, ready, start, result_queue):
+    """ Proses worker: menjalankan operasi acak sesuai bobot mix selama `seconds` detik. """
+    session = _Session(db_path, journal_mode, synchronous, busy_timeout_ms)
+    world = _load_world(session.conn)
+    rng = random.Random(seed)
+    stats = {name: _OpStats() for name, _ in mix}
+    # Database tanpa ruang chat: operasi chat tidak bisa dijalankan, jangan dihitung sebagai 0 ms
+    runnable = [(name, weight) for name, weight in mix if name != "chat" or world["rooms"]]
+    names = [name for name, _ in runnable]
+    weights = [weight for _, weight in runnable]
+    ready.release()
+    start.wait()
+    try:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            session.stats = op_stats = stats[name]
+            start_time = time.perf_counter()
+            try:
+                OPERATIONS[name](session, rng, world)
+            except BusyTimeout:
+                op_stats.timeouts += 1
+                continue
+            except sqlite3.Error:
+                # Mis. UNIQUE saat dua worker menyukai post yang sama bersamaan (di aplikasi: HTTP 500)
+                op_stats.errors += 1
+                continue
+            op_stats.latencies.append(time.perf_counter() - start_time)
+    finally:
+        session.close()
+        result_queue.put({name: (s.latencies, s.busy, s.busy_wait, s.timeouts, s.errors) for name, s in stats.items()})
+
+def _percentiles_ms(latencies):
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(latencies)
+    def pick(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 3)
+    return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(ordered[-1] * 1000, 3)}
+
+def _summarize(latencies, busy, busy_wait, timeouts, errors, seconds):
+    return {
+        "ops": len(latencies),
+        "ops_per_second": round(len(latencies) / seconds, 1),
+        **_percentiles_ms(latencies),
+        "busy": busy,
+        "busy_wait_ms": round(busy_wait * 1000, 1),
+        "timeouts": timeouts,
+        "errors": errors,
+    }
+
+def run_load(db_path, processes=4, seconds=10, mix=DEFAULT_MIX, journal_mode="WAL", synchronous="NORMAL",
+             busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS):
+    """ Menjalankan satu putaran beban terhadap db_path (file ini akan ditulisi).
+    Args:
+        db_path (str): Path database yang sudah berisi data.
+        processes (int): Jumlah proses worker.
+        seconds (float): Lama putaran.
+        mix (tuple): Pasangan (nama operasi, bobot).
+        journal_mode (str): journal_mode database selama putaran.
+        synchronous (str): synchronous setiap koneksi worker.
+        busy_timeout_ms (int): Batas total tunggu SQLITE_BUSY per statement.
+    Returns:
+        dict: Ringkasan per operasi dan total.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    actual_mode = conn.execute(f"PRAGMA journal_mode = {journal_mode};").fetchone()[0]
+    conn.close()
+    if actual_mode.upper() != journal_mode.upper():
+        raise ValueError(f"journal_mode {journal_mode} tidak bisa diterapkan (tetap {actual_mode}).")
+
+    ready = multiprocessing.Semaphore(0)
+    start = multiprocessing.Event()
+    result_queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_worker, args=(db_path, journal_mode, synchronous, busy_timeout_ms,
+                                                             mix, seconds, seed, ready, start, result_queue))
+               for seed in range(processes)]
+    for worker in workers:
+        worker.start()
+    for _ in workers:
+        if not ready.acquire(timeout=60):
+            for worker in workers:
+                worker.terminate()
+            raise RuntimeError("Worker gagal membuka database dalam 60 detik.")
+    start.set()
+    results = [result_queue.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    per_op = {}
+    totals = ([], 0, 0.0, 0, 0)
+    writes = ([], 0, 0.0, 0, 0)
+    for name, _ in mix:
+        merged = ([value for result in results for value in result[name][0]],
+                  *(sum(result[name][i] for result in results) for i in range(1, 5)))
+        per_op[name] = _summarize(*merged, seconds)
+        totals = tuple(a + b for a, b in zip(totals, merged))
+        if name in WRITE_OPS:
+            writes = tuple(a + b for a, b in zip(writes, merged))
+    return {
+        "processes": processes,
+        "journal_mode": journal_mode.upper(),
+        "synchronous": synchronous.upper(),
+        "seconds": seconds,
+        "busy_timeout_ms": busy_timeout_ms,
+        "operations": per_op,
+        "writes": _summarize(*writes, seconds),
+        "total": _summarize(*totals, seconds),
+    }
+
+def seed_database(db_path, n_users=2000, n_posts=20000, friends_per_user=20, n_rooms=2000, seed=7):
+    """ Membuat database sintetis untuk uji beban: pengguna, pertemanan ACCEPTED, post, like,
+        komentar, ruang chat, dan notifikasi.
+    Args:
+        db_path (str): Path database baru.
+        n_users (int): Jumlah pengguna.
+        n_posts (int): Jumlah post.
+        friends_per_user (int): Rata-rata pertemanan yang dikirim per pengguna.
+        n_rooms (int): Jumlah ruang chat.
+        seed (int): Seed acak.
+    """
+    rng = random.Random(seed)
+    conn = sqlite3.connect(db_path)
+    with redirect_stdout(StringIO()):
+        create_tables(conn)
+    with conn:
+        conn.executemany("INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x');",
+                         ((f"user{i}", f"user{i}@example.com") for i in range(n_users)))
+        conn.executemany("INSERT OR IGNORE INTO friendships (sender_id, receiver_id, status) VALUES (?, ?, 'ACCEPTED');",
+                         ((sender_id, rng.randint(1, n_users)) for sender_id in range(1, n_users + 1)
+                          for _ in range(friends_per_user)))
+        conn.execute("DELETE FROM friendships WHERE sender_id = receiver_id;")
+        conn.executemany("INSERT INTO posts (user_id, content) VALUES (?, ?);",
+                         ((rng.randint(1, n_users), f"post {i}") for i in range(n_posts)))
+        conn.executemany("INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);",
+                         ((rng.randint(1, n_users), rng.randint(1, n_posts)) for _ in range(n_posts * 3)))
+        conn.executemany("INSERT INTO comments (user_id, post_id, content) VALUES (?, ?, 'komentar');",
+                         ((rng.randint(1, n_users), rng.randint(1, n_posts)) for _ in range(n_posts)))
+        pairs = {tuple(sorted(rng.sample(range(1, n_users + 1), 2))) for _ in range(n_rooms)}
+        conn.executemany("INSERT INTO chat_rooms (user1_id, user2_id) VALUES (?, ?);", sorted(pairs))
+        conn.executemany("""INSERT INTO notifications (recipient_user_id, actor_user_id, type, target_entity_type, target_entity_id, message)
+            VALUES (?, ?, 'POST_LIKED', 'POST', ?, 'Seseorang menyukai postingan Anda.');""",
+                         ((rng.randint(1, n_users), rng.randint(1, n_users), rng.randint(1, n_posts)) for _ in range(n_posts)))
+    conn.close()
+
+def _fmt(value, width, digits=1):
+    return f"{'-':>{width}}" if value is None else f"{value:{width}.{digits}f}"
+
+def print_run(result):
+    """ Tabel per operasi untuk satu putaran. """
+    print(f"{result['journal_mode']}/{result['synchronous']}, {result['processes']} proses, "
+          f"{result['seconds']} detik, busy_timeout {result['busy_timeout_ms']} ms")
+    print(f"  {'operasi':14} {'ops':>8} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>9} "
+          f"{'BUSY':>7} {'tunggu ms':>10} {'timeout':>8} {'error':>6}")
+    rows = list(result["operations"].items()) + [("(tulis)", result["writes"]), ("(total)", result["total"])]
+    for name, stats in rows:
+        print(f"  {name:14} {stats['ops']:8d} {stats['ops_per_second']:9.1f} {_fmt(stats['p50_ms'], 8, 2)} "
+              f"{_fmt(stats['p95_ms'], 8, 2)} {_fmt(stats['p99_ms'], 8, 2)} {_fmt(stats['max_ms'], 9)} "
+              f"{stats['busy']:7d} {stats['busy_wait_ms']:10.1f} {stats['timeouts']:8d} {stats['errors']:6d}")
+
+def print_comparison(results):
+    """ Tabel perbandingan antar putaran sweep (satu baris per konfigurasi). """
+    print(f"{'journal':8} {'sync':7} {'proses':>6} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'tulis/s':>8} "
+          f"{'tulis p99':>10} {'max ms':>9} {'BUSY':>7} {'tunggu ms':>10} {'timeout':>8} {'error':>6}")
+    for result in results:
+        total, writes = result["total"], result["writes"]
+        print(f"{result['journal_mode']:8} {result['synchronous']:7} {result['processes']:6d} "
+              f"{total['ops_per_second']:9.1f} {_fmt(total['p50_ms'], 8, 2)} {_fmt(total['p99_ms'], 8, 2)} "
+              f"{writes['ops_per_second']:8.1f} {_fmt(writes['p99_ms'], 10, 2)} {_fmt(total['max_ms'], 9)} "
+              f"{total['busy']:7d} {total['busy_wait_ms']:10.1f} {total['timeouts']:8d} {total['errors']:6d}")
+
+def sweep(source_path, process_counts, settings, seconds=5, mix=DEFAULT_MIX, busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS,
+          on_result=None):
+    """ Menjalankan run_load untuk setiap kombinasi (journal_mode, synchronous) x jumlah proses.
+        Setiap putaran memakai salinan baru dari source_path sehingga hasilnya sebanding.
+    Args:
+        source_path (str): Database sumber (tidak diubah).
+        process_counts (list): Jumlah proses yang dicoba.
+        settings (tuple): Pasangan (journal_mode, synchronous).
+        seconds (float): Lama setiap putaran.
+        mix (tuple): Pasangan (nama operasi, bobot).
+        busy_timeout_ms (int): Batas tunggu SQLITE_BUSY per statement.
+        on_result (callable): Dipanggil dengan hasil setiap putaran segera setelah selesai.
+    Returns:
+        list: Hasil run_load per putaran.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for journal_mode, synchronous in settings:
+            for processes in process_counts:
+                run_path = os.path.join(tmp_dir, f"run_{journal_mode}_{synchronous}_{processes}.db")
+                shutil.copyfile(source_path, run_path)
+                result = run_load(run_path, processes, seconds, mix, journal_mode, synchronous, busy_timeout_ms)
+                results.append(result)
+                if on_result:
+                    on_result(result)
+                for suffix in ("", "-wal", "-shm", "-journal"):
+                    if os.path.exists(run_path + suffix):
+                        os.remove(run_path + suffix)
+    return results
+
+def _source_db(args, tmp_dir):
+    """ Database sumber: --db jika diberikan, selain itu database sintetis baru. """
+    if args.db:
+        if not os.path.exists(args.db):
+            raise FileNotFoundError(f"Database tidak ditemukan: {args.db}")
+        return args.db
+    path = os.path.join(tmp_dir, "seed.db")
+    if not args.json:
+        print(f"Membuat database sintetis ({args.users} pengguna, {args.posts} post)...")
+    seed_database(path, args.users, args.posts)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator beban multi-proses untuk contention SQLite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", help="Database sumber (disalin). Default: database sintetis baru")
+    common.add_argument("--users", type=int, default=2000)
+    common.add_argument("--posts", type=int, default=20000)
+    common.add_argument("--seconds", type=float, default=5)
+    common.add_argument("--mix", default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX))
+    common.add_argument("--busy-timeout", type=int, default=DEFAULT_BUSY_TIMEOUT_MS, help="Milidetik")
+    common.add_argument("--json", action="store_true")
+    run_parser = subparsers.add_parser("run", parents=[common], help="Satu putaran beban.")
+    run_parser.add_argument("--processes", type=int, default=4)
+    run_parser.add_argument("--journal-mode", default="WAL")
+    run_parser.add_argument("--synchronous", default="NORMAL")
+    sweep_parser = subparsers.add_parser("sweep", parents=[common], help="Bandingkan jumlah proses dan pengaturan journal.")
+    sweep_parser.add_argument("--processes", default="1,2,4,8", help="Daftar jumlah proses, dipisah koma")
+    sweep_parser.add_argument("--settings", default=",".join(f"{j}:{s}" for j, s in DEFAULT_SETTINGS),
+                              help="Daftar JOURNAL:SYNCHRONOUS, dipisah koma")
+    sweep_parser.add_argument("--per-op", action="store_true", help="Cetak juga tabel per operasi tiap putaran")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_path = _source_db(args, tmp_dir)
+        if args.command == "run":
+            run_path = os.path.join(tmp_dir, "run.db")
+            shutil.copyfile(source_path, run_path)
+            result = run_load(run_path, args.processes, args.seconds, mix, args.journal_mode, args.synchronous,
+                              args.busy_timeout)
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                print_run(result)
+        else:
+            process_counts = [int(n) for n in args.processes.split(",")]
+            settings = parse_settings(args.settings)
+
+            def report(result):
+                if not args.json and args.per_op:
+                    print_run(result)
+                    print()
+                elif not args.json:
+                    print(f"  {result['journal_mode']}/{result['synchronous']} x {result['processes']} proses selesai")
+
+            results = sweep(source_path, process_counts, settings, args.seconds, mix, args.busy_timeout, report)
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                print()
+                print_comparison(results)
+
+if __name__ == '__main__':
+    main()
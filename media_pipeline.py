@@ -0,0 +1,345 @@
+# media_pipeline.py
+# Pipeline metadata dan varian gambar unggahan.
+# Unggahan disimpan apa adanya di public/uploads dan kolom posts.image_url, users.profile_picture_url,
+# chat_messages.attachment_url hanya berisi string URL, sehingga setiap kartu feed mengunduh file asli
+# berukuran penuh dan tidak ada dimensi untuk layout. Pipeline ini:
+#   1. mengumpulkan URL gambar dari ketiga kolom tersebut dan dari file di public/uploads
+#   2. meng-hash isi file (SHA-256) di process pool -> media_urls; file identik cukup satu baris media
+#      (file yang ukuran dan mtime-nya tidak berubah tidak di-hash ulang)
+#   3. untuk media berstatus PENDING: membaca dimensi, membuat varian WebP (VARIANTS, hanya jika
+#      memperkecil) dan placeholder data URI kecil, juga di process pool; hasil ditulis proses utama
+# File varian dinamai berdasarkan hash dan ditulis atomik (file sementara + rename), status media baru
+# READY setelah semua variannya ada, jadi menjalankan ulang (atau melanjutkan setelah crash) aman.
+# GIF animasi hanya dicatat dimensi dan placeholder-nya (varian statis akan menghilangkan animasi).
+#
+# Butuh Pillow: pip install Pillow
+#
+# Pemakaian:
+#   python media_pipeline.py run [--workers 4] [--retry-failed]
+#   python media_pipeline.py add /uploads/posts/abc.jpg [...]   -> proses unggahan baru langsung
+#   python media_pipeline.py status
+#   python media_pipeline.py bench [--images 200] [--workers 4]
+
+import argparse
+import base64
+import hashlib
+import io
+import math
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from PIL import Image, ImageOps
+
+from c import DB_FILE, create_connection, create_tables
+
+PUBLIC_DIR = "public"
+UPLOAD_PREFIX = "/uploads/"
+VARIANT_PREFIX = "/uploads/variants/"
+# Nama varian -> lebar maksimum (px); tinggi mengikuti rasio asli
+VARIANTS = (("thumb", 320), ("feed", 1080))
+WEBP_QUALITY = 80
+PLACEHOLDER_WIDTH = 16
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".ico", ".tif", ".tiff")
+# Kolom yang berisi URL unggahan
+URL_COLUMNS = (("posts", "image_url"), ("users", "profile_picture_url"), ("chat_messages", "attachment_url"))
+FEED_PAGE_SIZE = 10
+EXIF_ORIENTATION = 0x0112
+
+def _is_image_url(url):
+    return url.startswith(UPLOAD_PREFIX) and not url.startswith(VARIANT_PREFIX) and url.lower().endswith(IMAGE_EXTENSIONS)
+
+def url_to_path(public_dir, url):
+    """ Path file untuk URL publik, atau None jika URL keluar dari public_dir. """
+    path = os.path.normpath(os.path.join(public_dir, url.lstrip("/")))
+    root = os.path.normpath(public_dir)
+    return path if path.startswith(root + os.sep) else None
+
+def collect_urls(conn, public_dir):
+    """ Semua URL gambar unggahan: yang dirujuk database dan yang ada di disk.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        public_dir (str): Direktori public aplikasi Next.js.
+    Returns:
+        list: URL terurut.
+    """
+    urls = set()
+    for table, column in URL_COLUMNS:
+        for (url,) in conn.execute(f"SELECT DISTINCT {column} FROM {table} WHERE {column} LIKE '/uploads/%';"):
+            urls.add(url)
+    upload_dir = os.path.join(public_dir, UPLOAD_PREFIX.strip("/"))
+    variant_dir = os.path.join(public_dir, VARIANT_PREFIX.strip("/"))
+    for root, dirs, files in os.walk(upload_dir):
+        if os.path.normpath(root) == os.path.normpath(variant_dir):
+            dirs[:] = []
+            continue
+        for name in files:
+            relative = os.path.relpath(os.path.join(root, name), public_dir)
+            urls.add("/" + relative.replace(os.sep, "/"))
+    return sorted(url for url in urls if _is_image_url(url))
+
+def _hash_file(args):
+    """ Tugas worker: (url, hash, ukuran, mtime_ns) atau (url, None, ...) jika file tidak ada. """
+    public_dir, url = args
+    path = url_to_path(public_dir, url)
+    try:
+        stat = os.stat(path)
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except (OSError, TypeError):
+        return url, None, 0, 0
+    return url, digest.hexdigest(), stat.st_size, stat.st_mtime_ns
+
+def _variant_url(content_hash, variant):
+    return f"{VARIANT_PREFIX}{content_hash[:2]}/{content_hash}_{variant}.webp"
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _encode_webp(image, quality=WEBP_QUALITY):
+    buffer = io.BytesIO()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+    image.save(buffer, "WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+def _process_media(args):
+    """ Tugas worker: dimensi, varian, dan placeholder untuk satu media.
+    Returns:
+        tuple: (content_hash, metadata dict, list varian, error).
+    """
+    public_dir, content_hash, url = args
+    try:
+        with Image.open(url_to_path(public_dir, url)) as source:
+            mime_type = source.get_format_mimetype()
+            animated = getattr(source, "n_frames", 1) > 1
+            # Dimensi setelah orientasi EXIF, dibaca dari header tanpa mendekode piksel
+            rotated = source.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+            width, height = source.size[::-1] if rotated else source.size
+            targets = [(name, max_width) for name, max_width in sorted(VARIANTS, key=lambda v: -v[1])
+                       if max_width < width and not animated]
+            # JPEG didekode langsung pada skala 1/2, 1/4 atau 1/8 yang masih cukup untuk varian terbesar
+            needed = targets[0][1] if targets else PLACEHOLDER_WIDTH
+            source.draft(source.mode, (math.ceil(source.size[0] * needed / width), math.ceil(source.size[1] * needed / width)))
+            image = ImageOps.exif_transpose(source)
+            image.load()
+        variants = []
+        # Dari varian terbesar ke terkecil; tiap varian diperkecil dari varian sebelumnya
+        for name, max_width in targets:
+            image = image.resize((max_width, max(1, round(height * max_width / width))), Image.Resampling.LANCZOS)
+            data = _encode_webp(image)
+            variant_url = _variant_url(content_hash, name)
+            _write_atomic(url_to_path(public_dir, variant_url), data)
+            variants.append((name, variant_url, image.width, image.height, len(data)))
+        tiny = image.copy()
+        tiny.thumbnail((PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+        placeholder = "data:image/webp;base64," + base64.b64encode(_encode_webp(tiny, quality=30)).decode("ascii")
+        return content_hash, {"mime_type": mime_type, "width": width, "height": height, "placeholder": placeholder}, variants, None
+    except Exception as e:
+        return content_hash, None, [], f"{type(e).__name__}: {e}"
+
+def _record_hashes(conn, hashed):
+    """ Menyimpan hasil hash ke media_urls dan membuat baris media PENDING untuk isi yang baru. """
+    missing = 0
+    with conn:
+        for url, content_hash, size, mtime_ns in hashed:
+            if content_hash is None:
+                missing += 1
+                continue
+            conn.execute("""INSERT INTO media (content_hash, original_url, byte_size) VALUES (?, ?, ?)
+                ON CONFLICT(content_hash) DO NOTHING;""", (content_hash, url, size))
+            conn.execute("""INSERT INTO media_urls (url, content_hash, file_size, file_mtime_ns) VALUES (?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET content_hash = excluded.content_hash, file_size = excluded.file_size,
+                    file_mtime_ns = excluded.file_mtime_ns;""", (url, content_hash, size, mtime_ns))
+        # Isi yang tidak lagi dirujuk URL mana pun (file diganti) tidak perlu dipertahankan
+        conn.execute("DELETE FROM media WHERE NOT EXISTS (SELECT 1 FROM media_urls u WHERE u.content_hash = media.content_hash);")
+    return missing
+
+def _record_result(conn, content_hash, metadata, variants, error):
+    with conn:
+        if error:
+            conn.execute("""UPDATE media SET status = 'FAILED', error = ?, processed_at = CURRENT_TIMESTAMP
+                WHERE content_hash = ?;""", (error[:500], content_hash))
+            return
+        conn.execute("DELETE FROM media_variants WHERE content_hash = ?;", (content_hash,))
+        conn.executemany("""INSERT INTO media_variants (content_hash, variant, url, width, height, byte_size)
+            VALUES (?, ?, ?, ?, ?, ?);""", ((content_hash, *variant) for variant in variants))
+        conn.execute("""UPDATE media SET mime_type = ?, width = ?, height = ?, placeholder = ?, status = 'READY',
+                error = NULL, processed_at = CURRENT_TIMESTAMP WHERE content_hash = ?;""",
+                     (metadata["mime_type"], metadata["width"], metadata["height"], metadata["placeholder"], content_hash))
+
+def run(conn, public_dir=PUBLIC_DIR, urls=None, workers=None, retry_failed=False):
+    """ Menjalankan pipeline: hash file baru/berubah, lalu proses semua media PENDING.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        public_dir (str): Direktori public aplikasi.
+        urls (list): Hanya URL ini (mis. unggahan baru); None untuk memindai semuanya.
+        workers (int): Jumlah proses worker (default: jumlah CPU).
+        retry_failed (bool): Proses ulang media berstatus FAILED.
+    Returns:
+        dict: Ringkasan jumlah file yang di-hash, media yang diproses, gagal, dan varian.
+    """
+    start_time = time.perf_counter()
+    urls = collect_urls(conn, public_dir) if urls is None else [url for url in urls if _is_image_url(url)]
+    known = {row[0]: (row[1], row[2]) for row in conn.execute("SELECT url, file_size, file_mtime_ns FROM media_urls;")}
+    to_hash = []
+    for url in urls:
+        path = url_to_path(public_dir, url)
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            continue
+        if known.get(url) != (stat.st_size, stat.st_mtime_ns):
+            to_hash.append((public_dir, url))
+
+    statuses = ("PENDING", "FAILED") if retry_failed else ("PENDING",)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashed = list(pool.map(_hash_file, to_hash, chunksize=16))
+        missing = _record_hashes(conn, hashed)
+        pending = conn.execute(
+            f"SELECT content_hash, original_url FROM media WHERE status IN ({','.join('?' * len(statuses))}) ORDER BY content_hash;",
+            statuses).fetchall()
+        processed = failed = variant_count = 0
+        # Hasil ditulis segera per media (bukan di akhir) sehingga pekerjaan yang selesai tidak hilang jika terhenti
+        for content_hash, metadata, variants, error in pool.map(_process_media, ((public_dir, h, u) for h, u in pending)):
+            _record_result(conn, content_hash, metadata, variants, error)
+            processed += 1
+            failed += error is not None
+            variant_count += len(variants)
+    summary = {"hashed": len(hashed) - missing, "processed": processed, "failed": failed, "variants": variant_count,
+               "seconds": round(time.perf_counter() - start_time, 2)}
+    print(f"Media: {summary['hashed']} file di-hash, {processed} media diproses ({failed} gagal), "
+          f"{variant_count} varian dibuat ({summary['seconds']} s).")
+    return summary
+
+def media_status(conn):
+    """ Jumlah media per status, jumlah URL, dan total byte asli vs varian. """
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM media GROUP BY status;").fetchall())
+    n_urls, url_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(file_size), 0) FROM media_urls;").fetchone()
+    media_bytes = conn.execute("SELECT COALESCE(SUM(byte_size), 0) FROM media;").fetchone()[0]
+    variant_bytes = dict(conn.execute("SELECT variant, SUM(byte_size) FROM media_variants GROUP BY variant;").fetchall())
+    return {"status": counts, "urls": n_urls, "url_bytes": url_bytes, "unique_bytes": media_bytes,
+            "variant_bytes": variant_bytes}
+
+def feed_page_bytes(conn, variant="feed", page_size=FEED_PAGE_SIZE):
+    """ Rata-rata byte gambar per halaman feed: file asli vs varian (jatuh ke asli jika tidak ada varian).
+    Returns:
+        tuple: (byte asli per halaman, byte varian per halaman).
+    """
+    original, resized, n_images = conn.execute("""
+        SELECT COALESCE(SUM(m.byte_size), 0), COALESCE(SUM(COALESCE(v.byte_size, m.byte_size)), 0), COUNT(*)
+        FROM posts p
+        JOIN media_urls u ON u.url = p.image_url
+        JOIN media m ON m.content_hash = u.content_hash
+        LEFT JOIN media_variants v ON v.content_hash = m.content_hash AND v.variant = ?;""", (variant,)).fetchone()
+    n_posts = conn.execute("SELECT COUNT(*) FROM posts;").fetchone()[0]
+    if not n_posts:
+        return 0, 0
+    return original * page_size / n_posts, resized * page_size / n_posts
+
+def _synthetic_image(rng, width, height):
+    """ Foto sintetis: gradien halus + derau ringan, agar ukuran JPEG mirip foto kamera ponsel. """
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), rng.randint(10, 40))
+    channels = [Image.blend(base.rotate(rng.randint(0, 359)), noise, 0.3) for _ in range(3)]
+    return Image.merge("RGB", channels)
+
+def benchmark(n_images=200, workers=None, duplicate_rate=0.1, image_rate=0.6):
+    """ Mengukur pipeline pada unggahan sintetis dan byte gambar per halaman feed sebelum/sesudah. """
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        public_dir = os.path.join(tmp_dir, "public")
+        upload_dir = os.path.join(public_dir, "uploads", "posts")
+        os.makedirs(upload_dir)
+        conn = sqlite3.connect(os.path.join(tmp_dir, "bench_media.db"))
+        with redirect_stdout(io.StringIO()):
+            create_tables(conn)
+        conn.execute("INSERT INTO users (username, email, password_hash) VALUES ('bench', 'bench@example.com', 'x');")
+        image_urls = []
+        for i in range(n_images):
+            url = f"/uploads/posts/{uuid.uuid4()}.jpg"
+            if image_urls and rng.random() < duplicate_rate:
+                # Unggahan ulang file yang sama dengan nama berbeda
+                shutil.copyfile(url_to_path(public_dir, rng.choice(image_urls)), url_to_path(public_dir, url))
+            else:
+                width, height = rng.choice(((4032, 3024), (3024, 4032), (1920, 1080), (1280, 960), (800, 600)))
+                _synthetic_image(rng, width, height).save(url_to_path(public_dir, url), "JPEG", quality=90)
+            image_urls.append(url)
+        n_posts = int(n_images / image_rate)
+        posts = [(1, f"post {i}", image_urls[i] if i < n_images else None) for i in range(n_posts)]
+        with conn:
+            conn.executemany("INSERT INTO posts (user_id, content, image_url) VALUES (?, ?, ?);", posts)
+        print(f"Seed: {n_images} gambar ({sum(1 for _ in os.scandir(upload_dir))} file), {n_posts} post")
+
+        with redirect_stdout(io.StringIO()):
+            first = run(conn, public_dir, workers=workers)
+            second = run(conn, public_dir, workers=workers)
+        print(f"  run pertama : {first['seconds']:.2f} s ({first['hashed']} di-hash, {first['processed']} diproses, "
+              f"{first['variants']} varian, {n_images / first['seconds']:.1f} gambar/s)")
+        print(f"  run ulang   : {second['seconds']:.2f} s ({second['hashed']} di-hash, {second['processed']} diproses)")
+        status = media_status(conn)
+        print(f"  dedupe      : {status['urls']} URL -> {sum(status['status'].values())} media unik "
+              f"({(status['url_bytes'] - status['unique_bytes']) / 1e6:.1f} MB duplikat)")
+        placeholder = conn.execute("SELECT AVG(LENGTH(placeholder)) FROM media;").fetchone()[0]
+        print(f"  placeholder : rata-rata {placeholder:.0f} byte per gambar (inline di respons feed)")
+        for variant, _ in VARIANTS:
+            original, resized = feed_page_bytes(conn, variant)
+            print(f"  per halaman feed ({FEED_PAGE_SIZE} post), varian {variant:5}: {original / 1e6:6.2f} MB -> "
+                  f"{resized / 1e6:6.2f} MB ({1 - resized / original:.1%} lebih kecil)")
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Metadata, dedupe, dan varian gambar unggahan.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Pindai semua unggahan dan proses yang belum.")
+    run_parser.add_argument("--db", default=DB_FILE)
+    run_parser.add_argument("--public-dir", default=PUBLIC_DIR)
+    run_parser.add_argument("--workers", type=int, default=None)
+    run_parser.add_argument("--retry-failed", action="store_true")
+    add_parser = subparsers.add_parser("add", help="Proses URL unggahan tertentu (mis. dari route upload).")
+    add_parser.add_argument("urls", nargs="+")
+    add_parser.add_argument("--db", default=DB_FILE)
+    add_parser.add_argument("--public-dir", default=PUBLIC_DIR)
+    status_parser = subparsers.add_parser("status", help="Ringkasan media.")
+    status_parser.add_argument("--db", default=DB_FILE)
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pada unggahan sintetis.")
+    bench_parser.add_argument("--images", type=int, default=200)
+    bench_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.images, args.workers)
+        return
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    create_tables(conn)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    if args.command == "run":
+        run(conn, args.public_dir, workers=args.workers, retry_failed=args.retry_failed)
+    elif args.command == "add":
+        run(conn, args.public_dir, urls=args.urls, workers=1)
+    else:
+        status = media_status(conn)
+        print(f"Status media: {status['status'] or '-'}")
+        print(f"URL: {status['urls']} ({status['url_bytes'] / 1e6:.1f} MB), isi unik: {status['unique_bytes'] / 1e6:.1f} MB")
+        for variant, size in status["variant_bytes"].items():
+            print(f"  varian {variant:6} {size / 1e6:8.1f} MB")
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,420 @@
+# near_duplicates.py
+# Deteksi post hampir-duplikat (spam copy-paste) dengan MinHash + LSH.
+# Moderasi selama ini hanya mengandalkan laporan pengguna (post_reports -> HIDDEN_BY_REPORTS), padahal
+# spam salinan sudah membanjiri feed sebelum laporan cukup. Membandingkan setiap post dengan semua post
+# lain tidak mungkin, jadi:
+#   1. posts.content dinormalisasi lalu dipecah menjadi shingle karakter (SHINGLE_SIZE byte)
+#   2. signature MinHash (NUM_PERM permutasi) dihitung tervektorisasi dengan NumPy
+#   3. signature dibagi menjadi BANDS band; hash tiap band menjadi bucket di tabel post_lsh_buckets
+#   4. post baru hanya dibandingkan dengan post yang berbagi bucket di salah satu band, lalu
+#      kemiripannya (estimasi Jaccard) dihitung dari signature yang tersimpan di post_minhash
+# Dengan 16 band x 8 baris, pasangan ber-Jaccard 0.7 menjadi kandidat ~61%, 0.8 ~95%, 0.9 ~100%.
+# Mode batch mengindeks korpus lama per rentang id di process pool (worker hanya membaca,
+# penulisan dilakukan proses utama). Mode watch mengikuti changelog sebagai consumer.
+#
+# Butuh NumPy: pip install numpy
+#
+# Pemakaian:
+#   python near_duplicates.py index [--workers 4] [--chunk-size 5000] [--reindex]
+#   python near_duplicates.py check --post-id 123        (atau --text "isi post")
+#   python near_duplicates.py watch [--from-start]        -> indeks + cek setiap post baru/diedit
+#   python near_duplicates.py bench [--posts 100000] [--workers 4]
+
+import argparse
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+
+import numpy as np
+
+from c import DB_FILE, create_connection, create_tables
+from changelog_consumer import ChangelogConsumer
+
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+MIN_SHINGLES = 8            # post yang lebih pendek (mis. "wkwk") tidak diindeks
+DEFAULT_THRESHOLD = 0.8     # estimasi Jaccard minimum untuk dianggap hampir-duplikat
+MAX_CANDIDATES = 32         # kandidat yang diverifikasi per cek; cukup untuk menandai banjir spam
+CONSUMER_NAME = "near_duplicates"
+
+# Parameter hash permutasi multiply-shift h(x) = ((a * x + b) mod 2^64) >> 32 (a ganjil), tanpa operasi
+# modulo yang lambat; seed tetap agar signature yang sudah tersimpan tetap valid
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 1 << 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 1 << 62, ROWS_PER_BAND, dtype=np.uint64) | np.uint64(1)
+_SHINGLE_WEIGHTS = np.uint64(256) ** np.arange(SHINGLE_SIZE, dtype=np.uint64)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+_URL_RE = re.compile(r"https?://\S+")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+_worker_conn = None
+
+def normalize(text):
+    """ Menormalkan isi post sebelum di-shingle: huruf kecil, tanpa aksen, URL, tanda baca, dan
+        spasi berlebih, sehingga variasi kecil khas spam ("BELI!!!" vs "beli") tidak mengubah shingle.
+    Args:
+        text (str): Isi post.
+    Returns:
+        str: Teks ternormalisasi.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = _URL_RE.sub(" ", text)
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+def shingle_hashes(text):
+    """ Hash 32-bit unik dari semua shingle SHINGLE_SIZE byte (UTF-8) pada teks ternormalisasi.
+    Args:
+        text (str): Isi post (belum dinormalisasi).
+    Returns:
+        np.ndarray: uint64 berisi nilai < 2^32, terurut dan unik.
+    """
+    data = np.frombuffer(normalize(text).encode("utf-8"), dtype=np.uint8)
+    if len(data) < SHINGLE_SIZE:
+        return np.empty(0, dtype=np.uint64)
+    windows = np.lib.stride_tricks.sliding_window_view(data, SHINGLE_SIZE).astype(np.uint64)
+    values = windows @ _SHINGLE_WEIGHTS
+    return np.unique((values * _GOLDEN) >> np.uint64(32))
+
+def minhash(hashes):
+    """ Signature MinHash dari hash shingle.
+    Args:
+        hashes (np.ndarray): Hasil shingle_hashes.
+    Returns:
+        np.ndarray: uint32 sepanjang NUM_PERM.
+    """
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+    return permuted.min(axis=1).astype(np.uint32)
+
+def band_buckets(signatures):
+    """ Hash 64-bit (bertanda, agar muat di INTEGER SQLite) untuk setiap band.
+    Args:
+        signatures (np.ndarray): Satu signature (NUM_PERM,) atau beberapa (n, NUM_PERM).
+    Returns:
+        np.ndarray: int64 berbentuk (BANDS,) atau (n, BANDS).
+    """
+    rows = signatures.reshape(-1, BANDS, ROWS_PER_BAND).astype(np.uint64)
+    mixed = (rows * _BAND_MIX).sum(axis=2)
+    mixed ^= mixed >> np.uint64(31)
+    buckets = (mixed * _GOLDEN).view(np.int64)
+    return buckets[0] if signatures.ndim == 1 else buckets
+
+def signature_for(content):
+    """ Signature MinHash untuk isi post, atau None jika terlalu pendek untuk dibandingkan. """
+    if not content:
+        return None
+    hashes = shingle_hashes(content)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return minhash(hashes)
+
+def _buckets_sql():
+    """ Satu statement untuk semua band: lookup primary key (band, bucket) per band (dibatasi
+        MAX_CANDIDATES per bucket), kandidat diurutkan dari yang berbagi band terbanyak (signature yang
+        lebih mirip berbagi lebih banyak band).
+    """
+    lookup = f"SELECT * FROM (SELECT post_id FROM post_lsh_buckets WHERE band = ? AND bucket = ? LIMIT {MAX_CANDIDATES})"
+    lookups = " UNION ALL ".join([lookup] * BANDS)
+    return f"SELECT post_id FROM ({lookups}) GROUP BY post_id ORDER BY COUNT(*) DESC, post_id DESC LIMIT ?;"
+
+_BUCKETS_SQL = _buckets_sql()
+
+class NearDuplicateIndex:
+    """ Indeks LSH di tabel post_minhash / post_lsh_buckets.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        threshold (float): Estimasi Jaccard minimum untuk dianggap hampir-duplikat.
+    """
+
+    def __init__(self, conn, threshold=DEFAULT_THRESHOLD):
+        self.conn = conn
+        self.threshold = threshold
+
+    def matches(self, signature, exclude_post_id=None):
+        """ Post terindeks yang hampir-duplikat dengan signature.
+        Args:
+            signature (np.ndarray): Hasil signature_for.
+            exclude_post_id (int): Post yang diabaikan (biasanya post itu sendiri).
+        Returns:
+            list: Tuple (post_id, estimasi Jaccard), terurut dari yang paling mirip. Paling banyak
+                MAX_CANDIDATES kandidat (yang berbagi band terbanyak) yang diverifikasi, agar cek tetap cepat saat
+                satu teks spam sudah memiliki ribuan salinan.
+        """
+        params = []
+        for band, bucket in enumerate(band_buckets(signature).tolist()):
+            params += (band, bucket)
+        params.append(MAX_CANDIDATES + 1)
+        candidate_ids = [row[0] for row in self.conn.execute(_BUCKETS_SQL, params) if row[0] != exclude_post_id]
+        candidate_ids = candidate_ids[:MAX_CANDIDATES]
+        if not candidate_ids:
+            return []
+        placeholders = ",".join("?" * len(candidate_ids))
+        rows = self.conn.execute(f"SELECT post_id, signature FROM post_minhash WHERE post_id IN ({placeholders});",
+                                 candidate_ids).fetchall()
+        stored = np.frombuffer(b"".join(row[1] for row in rows), dtype="<u4").reshape(len(rows), NUM_PERM)
+        similarity = (stored == signature).mean(axis=1)
+        found = [(row[0], round(float(score), 3)) for row, score in zip(rows, similarity) if score >= self.threshold]
+        return sorted(found, key=lambda item: (-item[1], item[0]))
+
+    def add(self, post_id, signature):
+        """ Menyimpan (atau mengganti) signature dan bucket satu post dalam satu transaksi. """
+        with self.conn:
+            self.conn.execute("DELETE FROM post_lsh_buckets WHERE post_id = ?;", (post_id,))
+            self.conn.execute("""INSERT INTO post_minhash (post_id, signature) VALUES (?, ?)
+                ON CONFLICT(post_id) DO UPDATE SET signature = excluded.signature, indexed_at = CURRENT_TIMESTAMP;""",
+                              (post_id, signature.astype("<u4").tobytes()))
+            self.conn.executemany("INSERT INTO post_lsh_buckets (band, bucket, post_id) VALUES (?, ?, ?);",
+                                  ((band, bucket, post_id) for band, bucket in enumerate(band_buckets(signature).tolist())))
+
+    def remove(self, post_id):
+        """ Menghapus post dari indeks (juga terjadi otomatis lewat cascade saat post dihapus). """
+        with self.conn:
+            self.conn.execute("DELETE FROM post_lsh_buckets WHERE post_id = ?;", (post_id,))
+            self.conn.execute("DELETE FROM post_minhash WHERE post_id = ?;", (post_id,))
+
+    def check_text(self, content, exclude_post_id=None):
+        """ Mencari hampir-duplikat untuk teks bebas tanpa mengubah indeks. """
+        signature = signature_for(content)
+        return [] if signature is None else self.matches(signature, exclude_post_id)
+
+    def check_post(self, post_id):
+        """ Jalur post baru/diedit: cari hampir-duplikat lalu masukkan post ke indeks.
+        Args:
+            post_id (int): ID post.
+        Returns:
+            list: Tuple (post_id, estimasi Jaccard) untuk post lain yang hampir-duplikat.
+        """
+        row = self.conn.execute("SELECT content FROM posts WHERE id = ?;", (post_id,)).fetchone()
+        signature = signature_for(row[0]) if row else None
+        if signature is None:
+            self.remove(post_id)
+            return []
+        found = self.matches(signature, exclude_post_id=post_id)
+        self.add(post_id, signature)
+        return found
+
+def _init_worker(db_path):
+    global _worker_conn
+    _worker_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+
+def _signature_range(args):
+    """ Tugas worker: signature untuk post dengan id dalam [start, end) yang perlu diindeks. """
+    start, end, reindex = args
+    rows = _worker_conn.execute(
+        """SELECT p.id, p.content FROM posts p
+           WHERE p.id >= ? AND p.id < ? AND p.content IS NOT NULL
+             AND (? OR NOT EXISTS (SELECT 1 FROM post_minhash m WHERE m.post_id = p.id));""",
+        (start, end, reindex)).fetchall()
+    post_ids, signatures = [], []
+    for post_id, content in rows:
+        signature = signature_for(content)
+        if signature is not None:
+            post_ids.append(post_id)
+            signatures.append(signature)
+    if not post_ids:
+        return start, end, None
+    return start, end, (post_ids, np.vstack(signatures))
+
+def _write_range(conn, result):
+    """ Menulis signature dan bucket satu rentang dalam satu transaksi. """
+    if result is None:
+        return 0
+    post_ids, signatures = result
+    buckets = band_buckets(signatures).tolist()
+    blobs = [signature.astype("<u4").tobytes() for signature in signatures]
+    with conn:
+        conn.executemany("DELETE FROM post_lsh_buckets WHERE post_id = ?;", ((post_id,) for post_id in post_ids))
+        conn.executemany("""INSERT INTO post_minhash (post_id, signature) VALUES (?, ?)
+            ON CONFLICT(post_id) DO UPDATE SET signature = excluded.signature, indexed_at = CURRENT_TIMESTAMP;""",
+                         zip(post_ids, blobs))
+        conn.executemany("INSERT INTO post_lsh_buckets (band, bucket, post_id) VALUES (?, ?, ?);",
+                         ((band, bucket, post_id) for post_id, post_buckets in zip(post_ids, buckets)
+                          for band, bucket in enumerate(post_buckets)))
+    return len(post_ids)
+
+def index_corpus(conn, db_path, workers=None, chunk_size=5000, reindex=False):
+    """ Mengindeks semua post yang belum terindeks (atau semuanya jika reindex) di process pool.
+    Args:
+        conn (sqlite3.Connection): Koneksi untuk menulis hasil.
+        db_path (str): Path database yang sama, dibuka baca-saja oleh worker.
+        workers (int): Jumlah proses worker (default: jumlah CPU).
+        chunk_size (int): Jumlah id post per tugas worker / transaksi tulis.
+        reindex (bool): Hitung ulang post yang sudah terindeks.
+    Returns:
+        int: Jumlah post yang diindeks.
+    """
+    start_time = time.perf_counter()
+    min_id, max_id = conn.execute("SELECT MIN(id), MAX(id) FROM posts;").fetchone()
+    if min_id is None:
+        return 0
+    tasks = [(start, start + chunk_size, reindex) for start in range(min_id, max_id + 1, chunk_size)]
+    indexed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path,)) as pool:
+        for _, _, result in pool.map(_signature_range, tasks):
+            indexed += _write_range(conn, result)
+    print(f"Indeks near-duplicate: {indexed} post diindeks ({time.perf_counter() - start_time:.2f} s).")
+    return indexed
+
+def watch(conn, threshold=DEFAULT_THRESHOLD, from_start=False):
+    """ Consumer changelog: setiap post baru/diedit dicek lalu diindeks; post yang dihapus dikeluarkan. """
+    index = NearDuplicateIndex(conn, threshold)
+    consumer = ChangelogConsumer(conn, CONSUMER_NAME, from_start=from_start)
+
+    def handle(batch):
+        for record in batch:
+            if record.table_name != "posts":
+                continue
+            if record.op == "D":
+                index.remove(record.row_id)
+                continue
+            found = index.check_post(record.row_id)
+            if found:
+                print(f"Post {record.row_id} hampir-duplikat dengan {len(found)} post "
+                      f"(maks {found[0][1]:.2f}): {', '.join(str(post_id) for post_id, _ in found[:10])}")
+
+    print(f"Mengikuti changelog sebagai consumer '{CONSUMER_NAME}' (Ctrl+C untuk berhenti)...")
+    try:
+        consumer.tail(handle)
+    except KeyboardInterrupt:
+        pass
+
+_SPAM_TEMPLATES = [
+    "PROMO GILA!!! Dapatkan saldo gratis 500rb hanya hari ini, klik link di bio dan daftar sekarang juga",
+    "Mau penghasilan tambahan jutaan per hari tanpa modal? Gabung grup investasi kami, dijamin untung",
+    "Jual followers murah meriah, 1000 followers cuma 10 ribu, proses cepat, hubungi admin via DM ya kak",
+]
+_WORDS = ("hari ini aku pergi ke pasar beli sayur dan buah bersama keluarga di kota yang ramai sekali "
+          "cuaca cerah jadi semangat kerja kuliah main bola nonton film makan bakso enak bareng teman lama").split()
+
+def _seed_posts(conn, n_posts, spam_rate, seed=11):
+    """ Post sintetis: teks acak biasa, dan sebagian varian spam (template + sedikit mutasi).
+    Returns:
+        dict: post_id -> indeks template spam (hanya untuk post spam).
+    """
+    rng = random.Random(seed)
+    conn.executemany("INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x');",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(100)))
+    spam = {}
+    rows = []
+    for post_id in range(1, n_posts + 1):
+        if rng.random() < spam_rate:
+            template = rng.randrange(len(_SPAM_TEMPLATES))
+            words = _SPAM_TEMPLATES[template].split()
+            # Mutasi ringan ala spammer: satu kata diganti dan emoji/nomor di akhir
+            words[rng.randrange(len(words))] = rng.choice(_WORDS)
+            rows.append((rng.randint(1, 100), " ".join(words) + f" {rng.choice(['🔥', '💰', '✅'])} {rng.randint(1, 999)}"))
+            spam[post_id] = template
+        else:
+            rows.append((rng.randint(1, 100), " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 30)))))
+    with conn:
+        conn.executemany("INSERT INTO posts (user_id, content) VALUES (?, ?);", rows)
+    return spam
+
+def benchmark(n_posts=100000, spam_rate=0.05, workers=None, n_checks=2000):
+    """ Mengukur indeks batch, latensi cek per post baru, serta presisi/recall terhadap spam sintetis. """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench_near_duplicates.db")
+        conn = sqlite3.connect(db_path)
+        with redirect_stdout(StringIO()):
+            create_tables(conn)
+        spam = _seed_posts(conn, n_posts, spam_rate)
+        print(f"Seed: {n_posts} post, {len(spam)} spam dari {len(_SPAM_TEMPLATES)} template")
+
+        for n_workers in sorted({1, workers or os.cpu_count() or 1}):
+            start_time = time.perf_counter()
+            with redirect_stdout(StringIO()):
+                indexed = index_corpus(conn, db_path, workers=n_workers, reindex=True)
+            elapsed = time.perf_counter() - start_time
+            print(f"  index workers={n_workers:<3} {elapsed:8.2f} s  ({indexed / elapsed:,.0f} post/s)")
+
+        index = NearDuplicateIndex(conn)
+        rng = random.Random(5)
+        sample = rng.sample(range(1, n_posts + 1), min(n_checks, n_posts))
+        contents = dict(conn.execute(f"SELECT id, content FROM posts WHERE id IN ({','.join(map(str, sample))});"))
+        latencies = []
+        true_positive = false_positive = false_negative = 0
+        for post_id in sample:
+            start_time = time.perf_counter()
+            found = index.check_text(contents[post_id], exclude_post_id=post_id)
+            latencies.append(time.perf_counter() - start_time)
+            flagged = bool(found)
+            is_spam = post_id in spam
+            true_positive += flagged and is_spam
+            false_positive += flagged and not is_spam
+            false_negative += is_spam and not flagged
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        print(f"  cek per post: p50 {p50:.3f} ms, p99 {p99:.3f} ms ({len(sample)} post)")
+        precision = true_positive / max(true_positive + false_positive, 1)
+        recall = true_positive / max(true_positive + false_negative, 1)
+        print(f"  spam tertandai: presisi {precision:.1%}, recall {recall:.1%} (ambang {index.threshold})")
+        size = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name IN ('post_minhash', 'post_lsh_buckets', "
+                            "'idx_post_lsh_buckets_post_id');").fetchone()[0]
+        print(f"  ukuran indeks: {size / 1e6:.1f} MB ({size / n_posts:.0f} byte/post)")
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Deteksi post hampir-duplikat dengan MinHash + LSH.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    index_parser = subparsers.add_parser("index", help="Indeks post yang belum terindeks (batch).")
+    index_parser.add_argument("--db", default=DB_FILE)
+    index_parser.add_argument("--workers", type=int, default=None)
+    index_parser.add_argument("--chunk-size", type=int, default=5000)
+    index_parser.add_argument("--reindex", action="store_true", help="Hitung ulang semua post")
+    check_parser = subparsers.add_parser("check", help="Cari hampir-duplikat satu post atau teks.")
+    check_parser.add_argument("--db", default=DB_FILE)
+    group = check_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--post-id", type=int)
+    group.add_argument("--text")
+    check_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    watch_parser = subparsers.add_parser("watch", help="Cek dan indeks post baru dari changelog.")
+    watch_parser.add_argument("--db", default=DB_FILE)
+    watch_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    watch_parser.add_argument("--from-start", action="store_true")
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pada post sintetis.")
+    bench_parser.add_argument("--posts", type=int, default=100000)
+    bench_parser.add_argument("--spam-rate", type=float, default=0.05)
+    bench_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.posts, args.spam_rate, args.workers)
+        return
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    create_tables(conn)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    if args.command == "index":
+        index_corpus(conn, args.db, args.workers, args.chunk_size, args.reindex)
+    elif args.command == "check":
+        index = NearDuplicateIndex(conn, args.threshold)
+        if args.post_id is not None:
+            row = conn.execute("SELECT content FROM posts WHERE id = ?;", (args.post_id,)).fetchone()
+            found = index.check_text(row[0], exclude_post_id=args.post_id) if row else []
+        else:
+            found = index.check_text(args.text)
+        if not found:
+            print("Tidak ada post hampir-duplikat.")
+        for post_id, score in found:
+            print(f"  post {post_id:<10} kemiripan {score:.2f}")
+    else:
+        watch(conn, args.threshold, args.from_start)
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
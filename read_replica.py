@@ -0,0 +1,386 @@
+# read_replica.py
+# Replica baca (read replica) berbasis pengiriman halaman yang berubah (page shipping) untuk database utama.
+# Setiap "node" adalah sebuah direktori yang berisi salinan read-only social_media_app.db.
+# Setiap sinkronisasi (hanya jika database utama berubah, PRAGMA data_version):
+#   1. snapshot konsisten database utama diambil ke memori memakai sqlite3.Connection.backup per
+#      rentang halaman (beberapa halaman per langkah, dengan jeda di antaranya), lalu serialize()
+#   2. snapshot dibandingkan per halaman dengan snapshot sebelumnya; hanya halaman yang berubah
+#      yang ditulis ke file staging tiap node
+#   3. staging menggantikan replica secara atomik (os.replace) sehingga pembaca selalu melihat snapshot
+#      yang konsisten; file replica lama dipertahankan (hard link) sebagai staging berikutnya
+# Biaya: pembacaan database utama tetap penuh setiap sinkronisasi (lokal, ke memori; shipper memegang
+# sekitar 2x ukuran database di memori), tetapi tulisan ke node sebanding dengan jumlah halaman yang
+# berubah. Node yang belum dikenal shipper (node baru, shipper baru dijalankan ulang) dikirimi salinan penuh.
+# Ini bukan pengiriman frame WAL: replica selalu berupa file database utuh dalam mode rollback journal.
+# Slot lama baru ditimpa pada sinkronisasi berikutnya; pembaca (lib/db.ts) membuka ulang koneksi begitu
+# inode replica berubah, jadi query yang berjalan lebih lama dari --interval tidak boleh memakai replica.
+# Lag replica dihitung dari id changelog (lihat c.py / changelog_consumer.py): jumlah entri
+# yang belum ada di replica dan umur entri tertua yang belum tereplikasi.
+# Route baca di Next.js memakai replica lewat getReadDbConnection() di lib/db.ts
+# (env READ_REPLICA_DB_PATHS).
+#
+# Pemakaian:
+#   python read_replica.py sync --node replicas/node1 --node replicas/node2 [--interval 1] [--pages 1024]
+#   python read_replica.py status --node replicas/node1 --node replicas/node2
+#   python read_replica.py demo [--seconds 10] [--nodes 2]   -> uji lokal dengan direktori sementara
+
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from c import DB_FILE, create_tables
+
+REPLICA_DB_NAME = os.path.basename(DB_FILE)
+STATE_FILE_NAME = "replica_state.json"
+
+class _BackupRestarted(Exception):
+    """ Backup per langkah terus diulang dari awal karena database utama berubah di tengah jalan. """
+
+def replica_db_path(node_dir):
+    """ Path file database replica di sebuah node. """
+    return os.path.join(node_dir, REPLICA_DB_NAME)
+
+def open_replica(node_dir):
+    """ Membuka replica dalam mode read-only.
+    Args:
+        node_dir (str): Direktori node replica.
+    Returns:
+        sqlite3.Connection: Koneksi read-only ke replica.
+    """
+    return sqlite3.connect(f"file:{os.path.abspath(replica_db_path(node_dir))}?mode=ro", uri=True)
+
+def read_replica_state(node_dir):
+    """ Membaca metadata sinkronisasi terakhir sebuah node (None jika belum pernah disinkronkan). """
+    try:
+        with open(os.path.join(node_dir, STATE_FILE_NAME)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _fsync_path(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class ReplicaShipper:
+    """ Menjaga satu atau lebih node replica tetap sinkron dengan database utama.
+    Args:
+        primary_path (str): Path database utama.
+        node_dirs (list): Direktori node replica (dibuat jika belum ada).
+        pages (int): Jumlah halaman yang dibaca per langkah backup snapshot.
+        step_sleep (float): Jeda antar langkah backup (detik) agar penulis di database utama tidak tertahan.
+        max_restarts (int): Batas backup diulang dari awal sebelum beralih ke salinan satu langkah.
+    """
+
+    def __init__(self, primary_path, node_dirs, pages=1024, step_sleep=0.005, max_restarts=3):
+        self.primary_path = primary_path
+        self.node_dirs = list(node_dirs)
+        self.pages = pages
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        # Koneksi tetap: PRAGMA data_version hanya bermakna dibandingkan pada koneksi yang sama
+        self.source = sqlite3.connect(primary_path, check_same_thread=False)
+        self.source.execute("PRAGMA busy_timeout = 5000;")
+        self._shipped_data_version = None
+        # Versi snapshot: image terakhir, set halaman yang berubah per versi, dan versi isi file tiap node
+        self._version = 0
+        self._image = None
+        self._page_size = None
+        self._changes = {}
+        self._published_versions = {}
+        self._staging_versions = {}
+        for node_dir in self.node_dirs:
+            os.makedirs(node_dir, exist_ok=True)
+
+    def close(self):
+        self.source.close()
+
+    def primary_changed(self):
+        """ True jika ada commit di database utama sejak pengiriman terakhir. """
+        data_version = self.source.execute("PRAGMA data_version;").fetchone()[0]
+        return data_version != self._shipped_data_version
+
+    def _backup(self, dest, pages):
+        restarts = 0
+        last_remaining = None
+
+        def progress(status, remaining, total):
+            nonlocal restarts, last_remaining
+            # remaining yang naik lagi berarti backup diulang dari awal
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+                if restarts > self.max_restarts:
+                    raise _BackupRestarted()
+            last_remaining = remaining
+            # Argumen sleep milik backup() hanya dipakai saat SQLITE_BUSY/LOCKED, jadi jeda antar langkah di sini
+            if remaining and self.step_sleep:
+                time.sleep(self.step_sleep)
+
+        self.source.backup(dest, pages=pages, progress=progress)
+
+    def snapshot(self):
+        """ Snapshot konsisten database utama sebagai image file database.
+        Returns:
+            tuple: (bytearray image, ukuran halaman, id changelog tertinggi di snapshot).
+        """
+        memory = sqlite3.connect(":memory:")
+        try:
+            try:
+                self._backup(memory, self.pages)
+            except _BackupRestarted:
+                # Database utama terlalu sibuk untuk salinan bertahap: salin dalam satu transaksi baca
+                print("Backup bertahap terus diulang, beralih ke salinan satu langkah.")
+                self._backup(memory, -1)
+            changelog_id = memory.execute("SELECT COALESCE(MAX(id), 0) FROM changelog;").fetchone()[0]
+            page_size = memory.execute("PRAGMA page_size;").fetchone()[0]
+            image = bytearray(memory.serialize())
+        finally:
+            memory.close()
+        # Replica dibuka read-only; format WAL (byte 18-19 = 2) akan butuh file -shm yang bisa ditulis
+        image[18] = image[19] = 1
+        return image, page_size, changelog_id
+
+    def _changed_pages(self, image, page_size):
+        """ Nomor halaman (mulai 0) yang berbeda dari snapshot sebelumnya; None jika tidak bisa dibandingkan. """
+        previous = self._image
+        if previous is None or self._page_size != page_size:
+            return None
+        old, new = memoryview(previous), memoryview(image)
+        changed = set()
+        for offset in range(0, len(image), page_size):
+            if new[offset:offset + page_size] != old[offset:offset + page_size]:
+                changed.add(offset // page_size)
+        return changed
+
+    def ship(self, node_dir, image, page_size, changelog_id):
+        """ Memperbarui staging satu node dengan halaman yang berubah lalu menggantikan replica secara atomik.
+        Args:
+            node_dir (str): Direktori node replica.
+            image (bytearray): Snapshot versi self._version dari snapshot().
+            page_size (int): Ukuran halaman snapshot.
+            changelog_id (int): Id changelog tertinggi di snapshot.
+        Returns:
+            dict: Metadata sinkronisasi yang juga disimpan di replica_state.json.
+        """
+        start = time.perf_counter()
+        replica_path = replica_db_path(node_dir)
+        staging_path = replica_path + ".staging"
+        staging_version = self._staging_versions.get(node_dir)
+        pages = None
+        if staging_version is not None and os.path.exists(staging_path):
+            # Staging tertinggal satu atau beberapa versi: gabungan halaman yang berubah sejak versinya
+            versions = range(staging_version + 1, self._version + 1)
+            if all(version in self._changes for version in versions):
+                pages = set().union(*(self._changes[version] for version in versions))
+        if pages is None:
+            with open(staging_path, "wb") as f:
+                f.write(image)
+            pages_written = len(image) // page_size
+        else:
+            with open(staging_path, "r+b") as f:
+                for page in sorted(pages):
+                    f.seek(page * page_size)
+                    f.write(image[page * page_size:(page + 1) * page_size])
+                f.truncate(len(image))
+            pages_written = len(pages)
+        _fsync_path(staging_path)
+
+        # Replica lama (versi yang sedang dipublikasikan) menjadi staging berikutnya lewat hard link
+        kept_path = staging_path + ".next"
+        if os.path.exists(kept_path):
+            os.remove(kept_path)
+        published_version = self._published_versions.get(node_dir)
+        keep_previous = os.path.exists(replica_path)
+        if keep_previous:
+            os.link(replica_path, kept_path)
+        os.replace(staging_path, replica_path)
+        if keep_previous:
+            os.replace(kept_path, staging_path)
+        _fsync_path(node_dir)
+        self._published_versions[node_dir] = self._version
+        self._staging_versions[node_dir] = published_version if keep_previous else None
+
+        state = {
+            "changelog_id": changelog_id,
+            "synced_at": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "page_count": len(image) // page_size,
+            "pages_written": pages_written,
+            "bytes": len(image),
+        }
+        state_path = os.path.join(node_dir, STATE_FILE_NAME)
+        with open(state_path + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(state_path + ".tmp", state_path)
+        return state
+
+    def sync_once(self, force=False):
+        """ Mengirim halaman yang berubah ke semua node jika database utama berubah.
+        Returns:
+            list: Metadata per node yang dikirim (kosong jika tidak ada perubahan).
+        """
+        missing = [d for d in self.node_dirs if not os.path.exists(replica_db_path(d))]
+        if not force and not missing and not self.primary_changed():
+            return []
+        # Dibaca sebelum menyalin: commit yang masuk selama penyalinan akan memicu pengiriman berikutnya
+        data_version = self.source.execute("PRAGMA data_version;").fetchone()[0]
+        image, page_size, changelog_id = self.snapshot()
+        changed = self._changed_pages(image, page_size)
+        self._version += 1
+        if changed is None:
+            self._changes.clear()
+        else:
+            self._changes[self._version] = changed
+        self._image, self._page_size = image, page_size
+        states = [self.ship(node_dir, image, page_size, changelog_id) for node_dir in self.node_dirs]
+        # Set halaman berubah hanya dibutuhkan selama masih ada staging yang tertinggal di versi tersebut
+        oldest = min((v for v in self._staging_versions.values() if v is not None), default=self._version)
+        for version in [v for v in self._changes if v <= oldest]:
+            del self._changes[version]
+        self._shipped_data_version = data_version
+        return states
+
+    def run(self, interval=1.0, stop_event=None):
+        """ Loop sinkronisasi sampai stop_event di-set (atau Ctrl+C). """
+        while stop_event is None or not stop_event.is_set():
+            for node_dir, state in zip(self.node_dirs, self.sync_once()):
+                print(f"{node_dir}: changelog id {state['changelog_id']}, {state['pages_written']}/{state['page_count']} "
+                      f"halaman ditulis, {state['duration_ms']} ms")
+            if stop_event is None:
+                time.sleep(interval)
+            else:
+                stop_event.wait(interval)
+
+def replica_lag(primary_conn, node_dir):
+    """ Metrik lag sebuah replica terhadap database utama.
+    Args:
+        primary_conn (sqlite3.Connection): Koneksi ke database utama.
+        node_dir (str): Direktori node replica.
+    Returns:
+        dict: entries_behind (entri changelog yang belum ada di replica), seconds_behind (umur entri
+              tertua yang belum tereplikasi, 0 jika up to date) dan synced_at.
+    """
+    state = read_replica_state(node_dir)
+    if state is None:
+        return {"entries_behind": None, "seconds_behind": None, "synced_at": None}
+    primary_id = primary_conn.execute("SELECT COALESCE(MAX(id), 0) FROM changelog;").fetchone()[0]
+    seconds_behind = 0.0
+    if primary_id > state["changelog_id"]:
+        oldest = primary_conn.execute(
+            "SELECT created_at FROM changelog WHERE id > ? ORDER BY id LIMIT 1;", (state["changelog_id"],)
+        ).fetchone()
+        if oldest is not None:
+            oldest_at = datetime.strptime(oldest[0], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+            seconds_behind = max(0.0, (datetime.now(timezone.utc) - oldest_at).total_seconds())
+    return {
+        "entries_behind": primary_id - state["changelog_id"],
+        "seconds_behind": round(seconds_behind, 1),
+        "synced_at": state["synced_at"],
+    }
+
+def _demo_writer(primary_path, seconds):
+    """ Proses penulis untuk demo: terus membuat post selama beberapa detik. """
+    conn = sqlite3.connect(primary_path)
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    deadline = time.time() + seconds
+    i = 0
+    while time.time() < deadline:
+        with conn:
+            conn.execute("INSERT INTO posts (user_id, content) VALUES (1, ?);", (f"post demo {i}",))
+        i += 1
+        time.sleep(0.001)
+    conn.close()
+
+def demo(seconds=10, n_nodes=2, interval=0.5):
+    """ Uji lokal: database utama dan node replica di direktori sementara, satu proses penulis,
+        satu shipper, dan pembaca yang mencetak lag. Di akhir isi replica dibandingkan dengan utama.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        primary_path = os.path.join(tmp_dir, "primary", REPLICA_DB_NAME)
+        os.makedirs(os.path.dirname(primary_path))
+        conn = sqlite3.connect(primary_path)
+        conn.execute("PRAGMA journal_mode = WAL;")
+        create_tables(conn)
+        conn.execute("INSERT INTO users (username, email, password_hash) VALUES ('demo', 'demo@example.com', 'x');")
+        conn.commit()
+
+        node_dirs = [os.path.join(tmp_dir, f"node{i + 1}") for i in range(n_nodes)]
+        shipper = ReplicaShipper(primary_path, node_dirs)
+        stop_event = threading.Event()
+        shipper_thread = threading.Thread(target=shipper.run, args=(interval, stop_event), daemon=True)
+        writer = multiprocessing.Process(target=_demo_writer, args=(primary_path, seconds))
+        writer.start()
+        shipper_thread.start()
+
+        while writer.is_alive():
+            time.sleep(1)
+            for node_dir in node_dirs:
+                lag = replica_lag(conn, node_dir)
+                print(f"{os.path.basename(node_dir)}: {lag['entries_behind']} entri tertinggal, "
+                      f"{lag['seconds_behind']} s, sinkron terakhir {lag['synced_at']}")
+        writer.join()
+        stop_event.set()
+        shipper_thread.join()
+        shipper.sync_once()
+        shipper.close()
+
+        primary_posts = conn.execute("SELECT COUNT(*) FROM posts;").fetchone()[0]
+        for node_dir in node_dirs:
+            replica_conn = open_replica(node_dir)
+            replica_posts = replica_conn.execute("SELECT COUNT(*) FROM posts;").fetchone()[0]
+            replica_conn.close()
+            status = "OK" if replica_posts == primary_posts else "TIDAK SAMA"
+            print(f"{os.path.basename(node_dir)}: {replica_posts} post di replica, {primary_posts} di utama -> {status}")
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Replica baca berbasis pengiriman halaman yang berubah.")
+    parser.add_argument("--db", default=DB_FILE)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="Jaga node replica tetap sinkron.")
+    sync_parser.add_argument("--node", action="append", required=True)
+    sync_parser.add_argument("--interval", type=float, default=1.0)
+    sync_parser.add_argument("--pages", type=int, default=1024)
+    sync_parser.add_argument("--once", action="store_true", help="Sinkronkan sekali lalu keluar.")
+    status_parser = subparsers.add_parser("status", help="Tampilkan lag tiap node.")
+    status_parser.add_argument("--node", action="append", required=True)
+    demo_parser = subparsers.add_parser("demo", help="Uji lokal dengan direktori sementara sebagai node.")
+    demo_parser.add_argument("--seconds", type=int, default=10)
+    demo_parser.add_argument("--nodes", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.command == "demo":
+        demo(args.seconds, args.nodes)
+        return
+    if not os.path.exists(args.db):
+        print(f"Database utama '{args.db}' tidak ditemukan.")
+        return
+    if args.command == "sync":
+        shipper = ReplicaShipper(args.db, args.node, pages=args.pages)
+        try:
+            if args.once:
+                shipper.sync_once(force=True)
+            else:
+                shipper.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            shipper.close()
+    else:
+        conn = sqlite3.connect(args.db)
+        for node_dir in args.node:
+            lag = replica_lag(conn, node_dir)
+            print(f"{node_dir}: entries_behind={lag['entries_behind']} seconds_behind={lag['seconds_behind']} "
+                  f"synced_at={lag['synced_at']}")
+        conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,591 @@
+# shard_router.py
+# Sharding berdasarkan user_id: data dibagi ke N file database (shard_00.db, shard_01.db, ...)
+# yang masing-masing dibuat dengan skema kanonik c.py, sehingga ada N penulis paralel.
+# Direktori (shard_directory.db) mencatat shard setiap pengguna dan membagikan id pengguna.
+#
+# Penempatan data (pemilik menentukan shard):
+#   users                               -> shard pengguna itu sendiri
+#   posts, comments pada post tersebut,
+#   live_sessions                       -> shard penulis post
+#   likes, shares                       -> shard pengguna yang memberi like / membagikan
+#   notifications                       -> shard penerima
+#   user_blocks                         -> shard pemblokir
+#   chat_rooms, chat_messages           -> shard user1_id (id pengguna yang lebih kecil)
+#   friendships                         -> disalin ke shard kedua pihak dengan id yang sama (daftar teman selalu
+#                                          lokal); tulis hanya lewat request/accept/delete_friendship
+# Referensi lintas shard (mis. like ke post di shard lain) tidak bisa dijaga foreign key, jadi
+# koneksi shard berjalan dengan foreign_keys OFF. UNIQUE username/email di tabel users hanya berlaku per shard,
+# jadi keunikan global dijaga direktori (shard_user_names) saat pengguna dibuat. Tiap shard memakai blok id sendiri
+# (shard i mulai dari i * 2^40) agar id post/komentar/dll unik secara global dan tetap sama saat dipindah.
+# AUTOINCREMENT melanjutkan dari rowid terbesar di tabel, yang setelah resharding atau salinan friendships bisa
+# berasal dari blok shard lain, jadi insert ke tabel ID_BLOCK_TABLES memakai id eksplisit dari allocate_id().
+# Pengecualian: baris yang dibuat trigger (changelog, live_sessions dari posts) tetap memakai AUTOINCREMENT;
+# bentrok id live_sessions saat pemindahan membatalkan move_users tanpa kehilangan data.
+#
+# Pemakaian:
+#   python shard_router.py init --dir shards --shards 4
+#   python shard_router.py reshard --dir shards --shards 8 [--batch-size 200]
+#   python shard_router.py status --dir shards
+#   python shard_router.py benchmark [--max-shards 8] [--workers 8] [--seconds 5]
+
+import argparse
+import heapq
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from c import create_tables
+
+DIRECTORY_DB_NAME = "shard_directory.db"
+SHARD_ID_BLOCK = 1 << 40
+
+# Tabel dengan id AUTOINCREMENT yang dibagikan per blok id shard
+ID_BLOCK_TABLES = ("posts", "likes", "comments", "shares", "user_blocks", "post_reports",
+                   "notifications", "chat_rooms", "chat_messages", "friendships", "live_sessions", "changelog")
+
+class ShardMovingError(Exception):
+    """ Pengguna sedang dipindah ke shard lain; tulis ulang setelah batch pemindahan selesai. """
+
+class ShardCopyError(Exception):
+    """ Salinan baris di shard lain tidak sama dengan sumbernya; operasi dibatalkan. """
+
+def shard_db_path(shard_dir, shard_id):
+    return os.path.join(shard_dir, f"shard_{shard_id:02d}.db")
+
+def allocate_id(conn, table):
+    """ Id berikutnya dari blok id shard untuk tabel di ID_BLOCK_TABLES (dipanggil di dalam transaksi tulis). """
+    return conn.execute("UPDATE sqlite_sequence SET seq = seq + 1 WHERE name = ? RETURNING seq;", (table,)).fetchone()[0]
+
+def _connect(path, synchronous="NORMAL"):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.execute(f"PRAGMA synchronous = {synchronous};")
+    # Referensi lintas shard tidak bisa dijaga foreign key (lihat header)
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    return conn
+
+def create_shard(shard_dir, shard_id):
+    """ Membuat satu shard dengan skema kanonik dan blok id miliknya. """
+    conn = sqlite3.connect(shard_db_path(shard_dir, shard_id))
+    conn.execute("PRAGMA journal_mode = WAL;")
+    create_tables(conn)
+    with conn:
+        for table in ID_BLOCK_TABLES:
+            if conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = ?;", (table,)).fetchone() is None:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?);", (table, shard_id * SHARD_ID_BLOCK))
+    conn.close()
+
+def init_cluster(shard_dir, n_shards):
+    """ Membuat direktori shard, file direktori pengguna dan N shard. """
+    os.makedirs(shard_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(shard_dir, DIRECTORY_DB_NAME))
+    conn.execute("PRAGMA journal_mode = WAL;")
+    with conn:
+        conn.execute("""CREATE TABLE IF NOT EXISTS shard_users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            shard_id INTEGER NOT NULL,
+            moving INTEGER NOT NULL DEFAULT 0
+        );""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_shard_users_shard_id ON shard_users(shard_id);")
+        conn.execute("""CREATE TABLE IF NOT EXISTS shard_user_names (
+            user_id INTEGER PRIMARY KEY,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL
+        );""")
+        conn.execute("CREATE TABLE IF NOT EXISTS shard_config (key TEXT PRIMARY KEY, value INTEGER NOT NULL);")
+        conn.execute("INSERT INTO shard_config (key, value) VALUES ('n_shards', ?) ON CONFLICT(key) DO NOTHING;", (n_shards,))
+    for shard_id in range(n_shards):
+        create_shard(shard_dir, shard_id)
+    # Cluster lama (sebelum shard_user_names ada): isi dari tabel users tiap shard
+    duplicates = 0
+    for shard_id in range(n_shards):
+        conn.execute("ATTACH DATABASE ? AS shard;", (shard_db_path(shard_dir, shard_id),))
+        unregistered = "FROM shard.users WHERE id NOT IN (SELECT user_id FROM main.shard_user_names)"
+        with conn:
+            pending = conn.execute(f"SELECT COUNT(*) {unregistered};").fetchone()[0]
+            inserted = conn.execute(f"""INSERT OR IGNORE INTO shard_user_names (user_id, username, email)
+                                         SELECT id, username, email {unregistered};""").rowcount
+        duplicates += pending - inserted
+        conn.execute("DETACH DATABASE shard;")
+    conn.close()
+    if duplicates:
+        print(f"Peringatan: {duplicates} pengguna memakai username/email yang sudah dipakai di shard lain.")
+    print(f"Cluster {n_shards} shard siap di {shard_dir}.")
+
+class ShardRouter:
+    """ Memetakan user_id ke shard dan menyediakan koneksi serta helper scatter-gather.
+        Koneksi dibuat per thread, jadi satu router bisa dipakai bersama oleh beberapa thread.
+    Args:
+        shard_dir (str): Direktori yang dibuat oleh init_cluster.
+        synchronous (str): Nilai PRAGMA synchronous untuk koneksi shard.
+    """
+
+    def __init__(self, shard_dir, synchronous="NORMAL"):
+        self.shard_dir = shard_dir
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._executor = None
+
+    @property
+    def directory(self):
+        if not hasattr(self._local, "directory"):
+            self._local.directory = _connect(os.path.join(self.shard_dir, DIRECTORY_DB_NAME))
+        return self._local.directory
+
+    @property
+    def n_shards(self):
+        return self.directory.execute("SELECT value FROM shard_config WHERE key = 'n_shards';").fetchone()[0]
+
+    def shard(self, shard_id):
+        """ Koneksi (per thread) ke sebuah shard. """
+        shards = self._local.__dict__.setdefault("shards", {})
+        if shard_id not in shards:
+            shards[shard_id] = _connect(shard_db_path(self.shard_dir, shard_id), self.synchronous)
+        return shards[shard_id]
+
+    def close(self):
+        for conn in self._local.__dict__.pop("shards", {}).values():
+            conn.close()
+        if hasattr(self._local, "directory"):
+            self._local.directory.close()
+            del self._local.directory
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _lookup(self, user_id):
+        row = self.directory.execute("SELECT shard_id, moving FROM shard_users WHERE user_id = ?;", (user_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Pengguna {user_id} tidak terdaftar di direktori shard")
+        return row
+
+    def shard_for(self, user_id):
+        """ Nomor shard tempat data milik user_id berada. """
+        return self._lookup(user_id)[0]
+
+    def shards_for(self, user_ids):
+        """ Mengelompokkan user_id per shard.
+        Returns:
+            dict: {shard_id: [user_id, ...]}
+        """
+        groups = {}
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for user_id, shard_id in self.directory.execute(
+                    f"SELECT user_id, shard_id FROM shard_users WHERE user_id IN ({placeholders});", chunk):
+                groups.setdefault(shard_id, []).append(user_id)
+        return groups
+
+    def create_user(self, username, email, password_hash):
+        """ Mendaftarkan pengguna baru: id dari direktori, baris users di shard user_id % N.
+            Username/email dicatat di direktori lebih dulu sehingga yang sudah dipakai di shard mana pun
+            ditolak dengan sqlite3.IntegrityError sebelum apa pun ditulis ke shard.
+        """
+        with self.directory:
+            self.directory.execute("BEGIN IMMEDIATE;")
+            user_id = self.directory.execute("INSERT INTO shard_users (shard_id) VALUES (-1) RETURNING user_id;").fetchone()[0]
+            self.directory.execute("INSERT INTO shard_user_names (user_id, username, email) VALUES (?, ?, ?);",
+                                   (user_id, username, email))
+            shard_id = user_id % self.n_shards
+            self.directory.execute("UPDATE shard_users SET shard_id = ? WHERE user_id = ?;", (shard_id, user_id))
+        with self.write(user_id) as conn:
+            conn.execute("INSERT INTO users (id, username, email, password_hash) VALUES (?, ?, ?, ?);",
+                         (user_id, username, email, password_hash))
+        return user_id
+
+    def write(self, user_id):
+        """ Transaksi tulis (BEGIN IMMEDIATE) di shard pemilik user_id.
+            Setelah kunci shard didapat, direktori diperiksa ulang; jika pengguna sedang/sudah
+            dipindah, transaksi dibatalkan dan ShardMovingError dilempar.
+        Returns:
+            _ShardWrite: Context manager yang menghasilkan koneksi shard.
+        """
+        return _ShardWrite(self, [user_id], single=True)
+
+    def write_pair(self, first_id, second_id):
+        """ Transaksi tulis di shard kedua pengguna sekaligus (satu shard jika keduanya di shard yang sama).
+            COMMIT dijalankan per shard, jadi gangguan di antara dua COMMIT bisa meninggalkan salinan
+            yang hanya ada di satu shard.
+        Returns:
+            _ShardWrite: Context manager yang menghasilkan daftar koneksi, shard first_id lebih dulu.
+        """
+        return _ShardWrite(self, [first_id, second_id])
+
+    def _map(self, fn, items):
+        # sqlite3 melepas GIL selama query, jadi thread cukup untuk query paralel ke beberapa shard
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=8)
+        return list(self._executor.map(fn, items))
+
+    def scatter_gather(self, sql, params=(), shard_ids=None):
+        """ Menjalankan query yang sama di beberapa shard secara paralel dan menggabungkan barisnya. """
+        shard_ids = range(self.n_shards) if shard_ids is None else shard_ids
+        results = self._map(lambda shard_id: self.shard(shard_id).execute(sql, params).fetchall(), shard_ids)
+        return [row for rows in results for row in rows]
+
+    def friend_ids(self, user_id):
+        """ Teman (ACCEPTED) seorang pengguna; friendships selalu ada di shard pengguna itu sendiri. """
+        return [row[0] for row in self.shard(self.shard_for(user_id)).execute(
+            """SELECT CASE WHEN sender_id = ? THEN receiver_id ELSE sender_id END FROM friendships
+               WHERE (sender_id = ? OR receiver_id = ?) AND status = 'ACCEPTED';""",
+            (user_id, user_id, user_id))]
+
+    def request_friendship(self, sender_id, receiver_id):
+        """ Permintaan pertemanan: baris dibuat di shard pengirim (id dari blok id shard itu),
+            lalu disalin apa adanya ke shard penerima.
+        Returns:
+            int: id friendship, sama di kedua shard.
+        """
+        with self.write_pair(sender_id, receiver_id) as conns:
+            friendship_id = allocate_id(conns[0], "friendships")
+            conns[0].execute("INSERT INTO friendships (id, sender_id, receiver_id, status) VALUES (?, ?, ?, 'PENDING');",
+                             (friendship_id, sender_id, receiver_id))
+            names = _table_columns(conns[0], "friendships")
+            row = conns[0].execute(f"SELECT {', '.join(names)} FROM friendships WHERE id = ?;", (friendship_id,)).fetchone()
+            for conn in conns[1:]:
+                # Id eksplisit dari blok shard lain menaikkan sqlite_sequence; kembalikan ke blok id shard ini
+                seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'friendships';").fetchone()[0]
+                conn.execute(f"INSERT INTO friendships ({', '.join(names)}) VALUES ({', '.join('?' * len(names))});", row)
+                conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = 'friendships';", (seq,))
+        return friendship_id
+
+    def accept_friendship(self, friendship_id, sender_id, receiver_id):
+        """ Menerima permintaan PENDING di shard kedua pihak.
+        Returns:
+            bool: False jika permintaan tidak ada atau sudah diterima.
+        """
+        return self._write_friendship(
+            "UPDATE friendships SET status = 'ACCEPTED' WHERE id = ? AND sender_id = ? AND receiver_id = ? AND status = 'PENDING';",
+            friendship_id, sender_id, receiver_id)
+
+    def delete_friendship(self, friendship_id, sender_id, receiver_id):
+        """ Menolak/membatalkan permintaan atau memutus pertemanan di shard kedua pihak.
+        Returns:
+            bool: False jika friendship tidak ada.
+        """
+        return self._write_friendship(
+            "DELETE FROM friendships WHERE id = ? AND sender_id = ? AND receiver_id = ?;",
+            friendship_id, sender_id, receiver_id)
+
+    def _write_friendship(self, sql, friendship_id, sender_id, receiver_id):
+        with self.write_pair(sender_id, receiver_id) as conns:
+            changed = [conn.execute(sql, (friendship_id, sender_id, receiver_id)).rowcount for conn in conns]
+            if len(set(changed)) > 1:
+                raise ShardCopyError(f"friendship {friendship_id} tidak sama di shard kedua pihak")
+        return changed[0] > 0
+
+    def friend_feed(self, user_id, limit=20, before=None):
+        """ Feed teman lintas shard: query per shard berisi teman di shard itu, lalu merge terurut.
+        Args:
+            user_id (int): Pengguna yang melihat feed.
+            limit (int): Jumlah post.
+            before (tuple): Kursor (created_at, id) dari post terakhir halaman sebelumnya.
+        Returns:
+            list: (id, user_id, content, created_at) terbaru lebih dulu.
+        """
+        groups = self.shards_for(self.friend_ids(user_id) + [user_id])
+        cursor_sql, cursor_params = "", []
+        if before is not None:
+            cursor_sql, cursor_params = "AND (created_at, id) < (?, ?)", list(before)
+
+        def query(item):
+            shard_id, authors = item
+            placeholders = ",".join("?" * len(authors))
+            return self.shard(shard_id).execute(
+                f"""SELECT id, user_id, content, created_at FROM posts
+                    WHERE user_id IN ({placeholders}) AND visibility_status = 'VISIBLE' {cursor_sql}
+                    ORDER BY created_at DESC, id DESC LIMIT ?;""",
+                authors + cursor_params + [limit]).fetchall()
+
+        per_shard = self._map(query, groups.items())
+        merged = heapq.merge(*per_shard, key=lambda row: (row[3], row[0]), reverse=True)
+        return [row for _, row in zip(range(limit), merged)]
+
+    def search_users(self, term, limit=20):
+        """ Pencarian username/nama lintas semua shard. """
+        pattern = f"%{term}%"
+        rows = self.scatter_gather(
+            "SELECT id, username, full_name FROM users WHERE username LIKE ? OR full_name LIKE ? ORDER BY username LIMIT ?;",
+            (pattern, pattern, limit))
+        return sorted(rows, key=lambda row: row[1])[:limit]
+
+class _ShardWrite:
+    def __init__(self, router, user_ids, single=False):
+        self.router = router
+        self.user_ids = user_ids
+        self.single = single
+
+    def __enter__(self):
+        placement = [self.router._lookup(user_id) for user_id in self.user_ids]
+        for user_id, (_, moving) in zip(self.user_ids, placement):
+            if moving:
+                raise ShardMovingError(user_id)
+        shard_ids = [shard_id for shard_id, _ in placement]
+        self.conns = []
+        try:
+            # Kunci diambil berurutan nomor shard agar dua transaksi lintas shard tidak saling menunggu
+            for shard_id in sorted(set(shard_ids)):
+                conn = self.router.shard(shard_id)
+                conn.execute("BEGIN IMMEDIATE;")
+                self.conns.append(conn)
+            # Cek ulang di bawah kunci tulis shard: pemindah menandai moving sebelum mengunci shard sumber
+            for user_id, shard_id in zip(self.user_ids, shard_ids):
+                if self.router._lookup(user_id) != (shard_id, 0):
+                    raise ShardMovingError(user_id)
+        except Exception:
+            for conn in self.conns:
+                conn.execute("ROLLBACK;")
+            raise
+        conns = list(dict.fromkeys(self.router.shard(shard_id) for shard_id in shard_ids))
+        return conns[0] if self.single else conns
+
+    def __exit__(self, exc_type, exc, tb):
+        for conn in self.conns:
+            conn.execute("COMMIT;" if exc_type is None else "ROLLBACK;")
+        return False
+
+def _table_columns(conn, table):
+    return [info[1] for info in conn.execute(f"PRAGMA main.table_info({table});")]
+
+def _copy(conn, table, where, columns=None, order_by="id", skip_existing=False):
+    """ Menyalin baris main.<table> ke dst.<table> dengan INSERT biasa: bentrok UNIQUE/PRIMARY KEY
+        melempar IntegrityError dan jumlah baris tersalin dibandingkan dengan jumlah baris sumber.
+    Args:
+        skip_existing (bool): Lewati id yang sudah ada di tujuan (salinan friendships milik pihak lain).
+    Returns:
+        int: Jumlah baris yang disalin.
+    """
+    columns = columns or {}
+    names = _table_columns(conn, table)
+    select = ", ".join(columns.get(name, name) for name in names)
+    if skip_existing:
+        where = f"({where}) AND id NOT IN (SELECT id FROM dst.{table})"
+    expected = conn.execute(f"SELECT COUNT(*) FROM main.{table} WHERE {where};").fetchone()[0]
+    copied = conn.execute(f"""INSERT INTO dst.{table} ({", ".join(names)})
+                              SELECT {select} FROM main.{table} WHERE {where} ORDER BY {order_by};""").rowcount
+    if copied != expected:
+        raise ShardCopyError(f"{table}: {copied} dari {expected} baris tersalin")
+    return copied
+
+def _delete_moving(conn, schema):
+    """ Menghapus data pengguna di temp.moving_users dari satu database (main atau dst). """
+    mine = "{} IN (SELECT user_id FROM temp.moving_users)"
+    moved_posts = f"post_id IN (SELECT id FROM {schema}.posts WHERE {mine.format('user_id')})"
+    moved_rooms = mine.format("user1_id")
+    # Baris users dihapus lebih dulu agar trigger counter tidak mengubah apa pun
+    conn.execute(f"DELETE FROM {schema}.users WHERE {mine.format('id')};")
+    conn.execute(f"DELETE FROM {schema}.comments WHERE {moved_posts};")
+    conn.execute(f"DELETE FROM {schema}.live_sessions WHERE {mine.format('user_id')};")
+    conn.execute(f"DELETE FROM {schema}.posts WHERE {mine.format('user_id')};")
+    conn.execute(f"DELETE FROM {schema}.likes WHERE {mine.format('user_id')};")
+    conn.execute(f"DELETE FROM {schema}.shares WHERE {mine.format('user_id')};")
+    conn.execute(f"DELETE FROM {schema}.notifications WHERE {mine.format('recipient_user_id')};")
+    conn.execute(f"DELETE FROM {schema}.user_blocks WHERE {mine.format('blocker_id')};")
+    conn.execute(f"DELETE FROM {schema}.chat_messages WHERE chat_room_id IN (SELECT id FROM {schema}.chat_rooms WHERE {moved_rooms});")
+    conn.execute(f"DELETE FROM {schema}.chat_rooms WHERE {moved_rooms};")
+    # Salinan friendships tetap ada selama pihak lainnya masih tinggal di database ini
+    conn.execute(f"""DELETE FROM {schema}.friendships
+                     WHERE ({mine.format('sender_id')} OR {mine.format('receiver_id')})
+                       AND NOT EXISTS (SELECT 1 FROM {schema}.users u WHERE u.id IN (sender_id, receiver_id));""")
+
+def move_users(router, user_ids, source_id, target_id):
+    """ Memindahkan sekumpulan pengguna (dan datanya) dari satu shard ke shard lain secara online.
+        Urutan: tandai moving di direktori -> salin ke target dalam satu transaksi yang mengunci
+        shard sumber -> pindahkan entri direktori -> hapus dari sumber. Salinan memakai INSERT biasa
+        dan jumlah baris tiap tabel dicek; bentrok (mis. username yang sama di kedua shard) atau
+        selisih jumlah membatalkan seluruh salinan sebelum apa pun dihapus, lalu tanda moving dilepas.
+        Sisa salinan dari pemindahan yang terhenti (direktori masih menunjuk sumber) dibuang lebih dulu,
+        jadi pemindahan aman diulang.
+    Args:
+        router (ShardRouter): Router cluster.
+        user_ids (list): Pengguna yang saat ini berada di source_id.
+        source_id (int): Shard asal.
+        target_id (int): Shard tujuan.
+    Raises:
+        ShardCopyError, sqlite3.IntegrityError: Salinan tidak lengkap; data tetap di shard asal.
+    """
+    placeholders = ",".join("?" * len(user_ids))
+    with router.directory:
+        router.directory.execute(f"UPDATE shard_users SET moving = 1 WHERE user_id IN ({placeholders});", user_ids)
+
+    conn = router.shard(source_id)
+    conn.execute("ATTACH DATABASE ? AS dst;", (shard_db_path(router.shard_dir, target_id),))
+    try:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS moving_users (user_id INTEGER PRIMARY KEY);")
+        conn.execute("DELETE FROM temp.moving_users;")
+        conn.executemany("INSERT INTO temp.moving_users (user_id) VALUES (?);", [(u,) for u in user_ids])
+        moved_posts = "post_id IN (SELECT id FROM main.posts WHERE user_id IN (SELECT user_id FROM temp.moving_users))"
+        moved_rooms = "user1_id IN (SELECT user_id FROM temp.moving_users)"
+        mine = "{} IN (SELECT user_id FROM temp.moving_users)"
+
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            sequences = conn.execute("SELECT name, seq FROM dst.sqlite_sequence;").fetchall()
+            _delete_moving(conn, "dst")
+            # Urutan salin disusun agar trigger di target tidak menghitung dua kali:
+            # live_sessions sebelum posts (trigger sync ON CONFLICT DO NOTHING), data sebelum baris users
+            # (trigger counter tidak mengenai pengguna yang belum ada), pesan sebelum room.
+            _copy(conn, "live_sessions", mine.format("user_id"))
+            _copy(conn, "posts", mine.format("user_id"))
+            # reply_count dibangun ulang oleh trigger komentar saat balasan disalin berurutan id
+            _copy(conn, "comments", moved_posts, columns={"reply_count": "0"})
+            _copy(conn, "likes", mine.format("user_id"))
+            _copy(conn, "shares", mine.format("user_id"))
+            _copy(conn, "notifications", mine.format("recipient_user_id"))
+            _copy(conn, "user_blocks", mine.format("blocker_id"))
+            _copy(conn, "chat_messages", f"chat_room_id IN (SELECT id FROM main.chat_rooms WHERE {moved_rooms})")
+            _copy(conn, "chat_rooms", moved_rooms)
+            # Pertemanan dengan pengguna yang sudah tinggal di target sudah punya salinan dengan id yang sama
+            _copy(conn, "friendships", f"{mine.format('sender_id')} OR {mine.format('receiver_id')}", skip_existing=True)
+            _copy(conn, "users", mine.format("id"))
+            # Id eksplisit dari shard lain menaikkan sqlite_sequence target; kembalikan ke blok id target
+            conn.executemany("UPDATE dst.sqlite_sequence SET seq = ? WHERE name = ?;", [(seq, name) for name, seq in sequences])
+            conn.execute("COMMIT;")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            with router.directory:
+                router.directory.execute(f"UPDATE shard_users SET moving = 0 WHERE user_id IN ({placeholders});", user_ids)
+            raise
+
+        with router.directory:
+            router.directory.execute(
+                f"UPDATE shard_users SET shard_id = ?, moving = 0 WHERE user_id IN ({placeholders});",
+                [target_id] + list(user_ids))
+
+        conn.execute("BEGIN IMMEDIATE;")
+        _delete_moving(conn, "main")
+        conn.execute("COMMIT;")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK;")
+        raise
+    finally:
+        conn.execute("DETACH DATABASE dst;")
+
+def reshard(shard_dir, new_n_shards, batch_size=200):
+    """ Menambah/mengurangi jumlah shard secara online: pengguna yang shard tujuannya
+        (user_id % new_n_shards) berbeda dipindah per batch.
+    Args:
+        shard_dir (str): Direktori cluster.
+        new_n_shards (int): Jumlah shard baru.
+        batch_size (int): Jumlah pengguna per batch pemindahan.
+    """
+    router = ShardRouter(shard_dir)
+    for shard_id in range(new_n_shards):
+        if not os.path.exists(shard_db_path(shard_dir, shard_id)):
+            create_shard(shard_dir, shard_id)
+    with router.directory:
+        router.directory.execute("UPDATE shard_config SET value = ? WHERE key = 'n_shards';", (max(new_n_shards, router.n_shards),))
+
+    start_time = time.perf_counter()
+    moved = 0
+    while True:
+        rows = router.directory.execute(
+            "SELECT user_id, shard_id FROM shard_users WHERE shard_id != user_id % ? LIMIT ?;",
+            (new_n_shards, batch_size)).fetchall()
+        if not rows:
+            break
+        batches = {}
+        for user_id, shard_id in rows:
+            batches.setdefault((shard_id, user_id % new_n_shards), []).append(user_id)
+        for (source_id, target_id), user_ids in batches.items():
+            move_users(router, user_ids, source_id, target_id)
+            moved += len(user_ids)
+        print(f"{moved} pengguna dipindahkan...")
+
+    with router.directory:
+        router.directory.execute("UPDATE shard_config SET value = ? WHERE key = 'n_shards';", (new_n_shards,))
+    router.close()
+    print(f"Resharding ke {new_n_shards} shard selesai dalam {time.perf_counter() - start_time:.2f} s ({moved} pengguna dipindah).")
+
+def cluster_status(shard_dir):
+    """ Jumlah pengguna dan post per shard. """
+    router = ShardRouter(shard_dir)
+    counts = dict(router.directory.execute("SELECT shard_id, COUNT(*) FROM shard_users GROUP BY shard_id;").fetchall())
+    for shard_id in range(router.n_shards):
+        posts = router.shard(shard_id).execute("SELECT COUNT(*) FROM posts;").fetchone()[0]
+        print(f"shard {shard_id:02d}: {counts.get(shard_id, 0)} pengguna, {posts} post")
+    router.close()
+
+def _benchmark_worker(shard_dir, user_ids, seconds, result_queue):
+    """ Proses penulis: membuat post dan like untuk pengguna acak selama beberapa detik. """
+    router = ShardRouter(shard_dir, synchronous="FULL")
+    rng = random.Random(os.getpid())
+    ops = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        user_id = rng.choice(user_ids)
+        with router.write(user_id) as conn:
+            post_id = allocate_id(conn, "posts")
+            conn.execute("INSERT INTO posts (id, user_id, content) VALUES (?, ?, 'benchmark');", (post_id, user_id))
+            conn.execute("INSERT INTO likes (id, user_id, post_id) VALUES (?, ?, ?);", (allocate_id(conn, "likes"), user_id, post_id))
+        ops += 1
+    router.close()
+    result_queue.put(ops)
+
+def benchmark(max_shards=8, n_workers=8, seconds=5, n_users=2000):
+    """ Throughput tulis (transaksi post+like per detik) untuk 1, 2, 4, ... shard dengan
+        sejumlah proses penulis yang sama. Semua shard berada di satu mesin.
+    """
+    shard_counts = []
+    n = 1
+    while n <= max_shards:
+        shard_counts.append(n)
+        n *= 2
+    print(f"{'shard':>6} {'tx/s':>10} {'speedup':>9}")
+    baseline = None
+    for n_shards in shard_counts:
+        with tempfile.TemporaryDirectory() as shard_dir:
+            init_cluster(shard_dir, n_shards)
+            router = ShardRouter(shard_dir)
+            user_ids = [router.create_user(f"user{i}", f"user{i}@example.com", "x") for i in range(n_users)]
+            router.close()
+            result_queue = multiprocessing.Queue()
+            workers = [multiprocessing.Process(target=_benchmark_worker, args=(shard_dir, user_ids, seconds, result_queue))
+                       for _ in range(n_workers)]
+            for worker in workers:
+                worker.start()
+            total_ops = sum(result_queue.get() for _ in workers)
+            for worker in workers:
+                worker.join()
+        throughput = total_ops / seconds
+        baseline = baseline or throughput
+        print(f"{n_shards:6d} {throughput:10.0f} {throughput / baseline:8.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharding berdasarkan user_id.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    init_parser = subparsers.add_parser("init", help="Buat cluster shard baru.")
+    init_parser.add_argument("--dir", required=True)
+    init_parser.add_argument("--shards", type=int, default=4)
+    reshard_parser = subparsers.add_parser("reshard", help="Ubah jumlah shard secara online.")
+    reshard_parser.add_argument("--dir", required=True)
+    reshard_parser.add_argument("--shards", type=int, required=True)
+    reshard_parser.add_argument("--batch-size", type=int, default=200)
+    status_parser = subparsers.add_parser("status", help="Jumlah data per shard.")
+    status_parser.add_argument("--dir", required=True)
+    bench_parser = subparsers.add_parser("benchmark", help="Throughput tulis vs jumlah shard.")
+    bench_parser.add_argument("--max-shards", type=int, default=8)
+    bench_parser.add_argument("--workers", type=int, default=8)
+    bench_parser.add_argument("--seconds", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "init":
+        init_cluster(args.dir, args.shards)
+    elif args.command == "reshard":
+        reshard(args.dir, args.shards, args.batch_size)
+    elif args.command == "status":
+        cluster_status(args.dir)
+    else:
+        benchmark(args.max_shards, args.workers, args.seconds)
+
+if __name__ == '__main__':
+    main()
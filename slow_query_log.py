@@ -0,0 +1,410 @@
+# slow_query_log.py
+# Analyzer log query dari aplikasi Next.js (lib/db.ts dengan SQLITE_QUERY_LOG=verbose atau timed).
+# Log dibaca baris per baris dalam satu lintasan (file biasa, .gz, atau stdin '-'); baris yang bukan
+# baris "[sql] ..." (log aplikasi lain) dilewati.
+#   [sql] SELECT ... WHERE id = 42                -> verbose: statement dengan nilai literal, tanpa durasi
+#   [sql] 1.234ms SELECT ... WHERE id = ?          -> timed: durasi eksekusi run/get/all
+#
+# Setiap statement dinormalkan menjadi fingerprint (literal dan daftar IN diganti '?'), lalu dihitung
+# jumlah, total/rata-rata/maks durasi dan histogram per fingerprint. Fingerprint diurutkan berdasarkan
+# total biaya; untuk fingerprint tanpa durasi (verbose) biaya bisa diperkirakan dengan --replay, yaitu
+# menjalankan ulang contoh SELECT-nya beberapa kali di database snapshot (dibuka read-only).
+# Fingerprint teratas dilengkapi EXPLAIN QUERY PLAN dari snapshot skema dan saran indeks untuk tabel
+# yang di-SCAN penuh atau yang butuh TEMP B-TREE untuk ORDER BY.
+#
+# Memori konstan: jumlah fingerprint yang disimpan dibatasi --max-fingerprints; jika penuh, fingerprint
+# dengan biaya terkecil dibuang (dicatat sebagai "lainnya"), jadi log multi-GB tetap aman.
+#
+# Pemakaian:
+#   SQLITE_QUERY_LOG=timed npm start > app.log
+#   python slow_query_log.py app.log [--db social_media_app.db] [--top 20] [--json report.json]
+#   python slow_query_log.py app.log.gz --db snapshot.db --replay 5
+#   python slow_query_log.py app.log --schema schema.sql     # snapshot skema berupa file CREATE ...
+
+import argparse
+import bisect
+import gzip
+import json
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+
+from sql_profiler import LATENCY_BUCKETS, fingerprint
+
+LOG_PREFIX = "[sql] "
+MAX_EXAMPLE_LENGTH = 4000
+_TIMED_RE = re.compile(r"(\d+(?:\.\d+)?)ms ")
+_SKIP_EXPLAIN_RE = re.compile(r"^(BEGIN|COMMIT|END|ROLLBACK|SAVEPOINT|RELEASE|PRAGMA|VACUUM|ANALYZE|CREATE|DROP|ALTER|ATTACH|DETACH)\b", re.I)
+
+class FingerprintStats:
+    """ Statistik satu fingerprint selama membaca log. """
+    __slots__ = ("count", "timed_count", "total_ms", "max_ms", "buckets", "example", "replay_ms")
+
+    def __init__(self, example):
+        self.count = 0
+        self.timed_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.example = example[:MAX_EXAMPLE_LENGTH]
+        self.replay_ms = None
+
+    def add(self, elapsed_ms):
+        self.count += 1
+        if elapsed_ms is not None:
+            self.timed_count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms > self.max_ms:
+                self.max_ms = elapsed_ms
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed_ms / 1000)] += 1
+
+    def avg_ms(self):
+        if self.timed_count:
+            return self.total_ms / self.timed_count
+        return self.replay_ms
+
+    def cost_ms(self):
+        """ Perkiraan total biaya: durasi terukur, atau jumlah x durasi replay untuk baris tanpa durasi. """
+        avg_ms = self.avg_ms()
+        if avg_ms is None:
+            return 0.0
+        return self.total_ms + (self.count - self.timed_count) * avg_ms
+
+    def p99_ms(self):
+        if not self.timed_count:
+            return None
+        rank = 0.99 * self.timed_count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= rank:
+                # Batas atas bucket bisa melebihi latensi terbesar yang benar-benar tercatat
+                return min(LATENCY_BUCKETS[i] * 1000, self.max_ms) if i < len(LATENCY_BUCKETS) else self.max_ms
+        return self.max_ms
+
+def _open_log(path):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+def _parse_line(line):
+    """ Mengembalikan (statement, durasi ms atau None), atau None jika bukan baris log SQL. """
+    start = line.find(LOG_PREFIX)
+    if start < 0:
+        return None
+    text = line[start + len(LOG_PREFIX):].strip()
+    match = _TIMED_RE.match(text)
+    if match:
+        return text[match.end():], float(match.group(1))
+    return text, None
+
+def scan_log(path, max_fingerprints=10000):
+    """ Membaca log dalam satu lintasan dan mengumpulkan statistik per fingerprint.
+    Args:
+        path (str): Path log (.gz didukung, '-' untuk stdin).
+        max_fingerprints (int): Batas jumlah fingerprint yang disimpan.
+    Returns:
+        tuple: (dict fingerprint -> FingerprintStats, ringkasan pembacaan).
+    """
+    table = {}
+    summary = {"lines": 0, "statements": 0, "timed": 0, "evicted_fingerprints": 0, "evicted_statements": 0}
+    start_time = time.perf_counter()
+    with _open_log(path) as log_file:
+        for line in log_file:
+            summary["lines"] += 1
+            parsed = _parse_line(line)
+            if parsed is None:
+                continue
+            statement, elapsed_ms = parsed
+            summary["statements"] += 1
+            if elapsed_ms is not None:
+                summary["timed"] += 1
+            key = fingerprint(statement)
+            stats = table.get(key)
+            if stats is None:
+                if len(table) >= max_fingerprints:
+                    _evict(table, summary, max_fingerprints)
+                stats = table[key] = FingerprintStats(statement)
+            stats.add(elapsed_ms)
+    summary["seconds"] = time.perf_counter() - start_time
+    return table, summary
+
+def _evict(table, summary, max_fingerprints):
+    """ Membuang seperlima fingerprint termurah (total durasi, lalu jumlah) agar memori tetap terbatas. """
+    ranked = sorted(table.items(), key=lambda item: (item[1].total_ms, item[1].count))
+    for key, stats in ranked[:max(1, max_fingerprints // 5)]:
+        summary["evicted_fingerprints"] += 1
+        summary["evicted_statements"] += stats.count
+        del table[key]
+
+# =============================================
+# Snapshot skema: EXPLAIN QUERY PLAN, replay, saran indeks
+# =============================================
+
+def open_snapshot(db_path=None, schema_path=None):
+    """ Membuka snapshot: file database (read-only) atau file skema SQL yang dimuat ke :memory:. """
+    if db_path:
+        return sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    conn = sqlite3.connect(":memory:")
+    statement = ""
+    with open(schema_path) as f:
+        for line in f:
+            statement += line
+            if not sqlite3.complete_statement(statement):
+                continue
+            # Tabel internal (sqlite_sequence dari output .schema) tidak boleh dibuat manual
+            if not re.match(r"\s*CREATE TABLE\s+[\"']?sqlite_", statement, re.I):
+                conn.execute(statement)
+            statement = ""
+    return conn
+
+_BIND_RE = re.compile(r"'(?:[^']|'')*'|\?\d*|(?<![\w:])[:@$][A-Za-z_]\w*")
+
+def _bindable(sql):
+    """ Mengganti placeholder (?, ?NNN, :nama, @nama, $nama) di luar string dengan NULL agar
+        statement dari log timed bisa di-EXPLAIN tanpa nilai parameter.
+    """
+    return _BIND_RE.sub(lambda m: m.group(0) if m.group(0).startswith("'") else "NULL", sql)
+
+def explain(conn, sql):
+    """ Menjalankan EXPLAIN QUERY PLAN.
+    Returns:
+        list: Baris detail rencana (dengan indentasi sesuai kedalaman), atau None jika gagal.
+    """
+    if _SKIP_EXPLAIN_RE.match(sql):
+        return None
+    try:
+        rows = conn.execute("EXPLAIN QUERY PLAN " + _bindable(sql)).fetchall()
+    except sqlite3.Error as e:
+        return [f"(gagal: {e})"]
+    depth = {0: -1}
+    lines = []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+def replay(conn, sql, repeat):
+    """ Median durasi (ms) menjalankan SELECT contoh `repeat` kali; None untuk statement lain. """
+    if not re.match(r"\s*(SELECT|WITH)\b", sql, re.I) or "?" in sql:
+        return None
+    timings = []
+    try:
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            conn.execute(sql).fetchall()
+            timings.append((time.perf_counter() - start_time) * 1000)
+    except sqlite3.Error:
+        return None
+    return statistics.median(timings)
+
+_IDENT = r"[A-Za-z_]\w*"
+_TABLE_REF_RE = re.compile(rf"\b(?:FROM|JOIN|UPDATE|INTO)\s+({_IDENT})(?:\s+(?:AS\s+)?({_IDENT}))?", re.I)
+_NOT_ALIAS = {"WHERE", "JOIN", "LEFT", "RIGHT", "INNER", "OUTER", "CROSS", "NATURAL", "ON", "USING", "ORDER", "GROUP",
+              "LIMIT", "HAVING", "SET", "VALUES", "UNION", "EXCEPT", "INTERSECT", "WINDOW", "INDEXED", "NOT", "DEFAULT", "SELECT"}
+_PREDICATE_RE = re.compile(rf"(?:({_IDENT})\.)?({_IDENT})\s*(==|=|IN\b|IS\b|<=|>=|<|>|BETWEEN\b)", re.I)
+_REVERSED_PREDICATE_RE = re.compile(rf"(?:=|==|<=|>=|<|>)\s*(?:({_IDENT})\.)({_IDENT})\b")
+_ORDER_BY_RE = re.compile(r"\bORDER\s+BY\s+(.+?)(?:\bLIMIT\b|\bOFFSET\b|\)|$)", re.I | re.S)
+_PLAN_TABLE_RE = re.compile(rf"^(SCAN|SEARCH) ({_IDENT})(?: USING (?:COVERING )?INDEX ({_IDENT})| USING INTEGER PRIMARY KEY)?")
+
+def _table_aliases(conn, sql):
+    """ alias (atau nama tabel) -> nama tabel, hanya untuk tabel yang ada di snapshot. """
+    known = {row[0].lower(): row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+    aliases = {}
+    for table, alias in _TABLE_REF_RE.findall(sql):
+        if table.lower() not in known:
+            continue
+        table = known[table.lower()]
+        aliases[table.lower()] = table
+        if alias and alias.upper() not in _NOT_ALIAS:
+            aliases[alias.lower()] = table
+    return aliases
+
+def _table_columns(conn, table):
+    return {row[1].lower(): row[1] for row in conn.execute(f'PRAGMA table_info("{table}");')}
+
+def _existing_index_prefixes(conn, table):
+    prefixes = []
+    for index in conn.execute(f'PRAGMA index_list("{table}");'):
+        prefixes.append([row[2].lower() for row in conn.execute(f'PRAGMA index_info("{index[1]}");') if row[2]])
+    return prefixes
+
+def suggest_indexes(conn, sql, plan):
+    """ Saran CREATE INDEX untuk tabel yang di-SCAN tanpa indeks pencarian, atau yang urutannya
+        dibuat dengan TEMP B-TREE padahal bisa diambil dari indeks (kolom kesamaan + ORDER BY).
+    Args:
+        conn (sqlite3.Connection): Snapshot skema.
+        sql (str): Contoh statement.
+        plan (list): Hasil explain().
+    Returns:
+        list: String CREATE INDEX yang disarankan.
+    """
+    if not plan:
+        return []
+    aliases = _table_aliases(conn, sql)
+    if not aliases:
+        return []
+    multi_table = len(set(aliases.values())) > 1
+    temp_order = any("USE TEMP B-TREE FOR ORDER BY" in line for line in plan)
+    order_match = _ORDER_BY_RE.search(sql)
+    suggestions = []
+    for line in plan:
+        match = _PLAN_TABLE_RE.match(line.strip())
+        if not match:
+            continue
+        access, alias, _ = match.groups()
+        table = aliases.get(alias.lower())
+        if table is None:
+            continue
+        columns = _table_columns(conn, table)
+
+        def owned(qualifier, column):
+            if column.lower() not in columns:
+                return False
+            if qualifier:
+                return aliases.get(qualifier.lower()) == table and (qualifier.lower() == alias.lower() or not multi_table)
+            return not multi_table
+
+        equality, ranges = [], []
+        for qualifier, column, operator in _PREDICATE_RE.findall(sql):
+            if not owned(qualifier, column):
+                continue
+            target = equality if operator.upper() in ("=", "==", "IN", "IS") else ranges
+            if columns[column.lower()] not in target:
+                target.append(columns[column.lower()])
+        for qualifier, column in _REVERSED_PREDICATE_RE.findall(sql):
+            if owned(qualifier, column) and columns[column.lower()] not in equality:
+                equality.append(columns[column.lower()])
+        ranges = [column for column in ranges if column not in equality]
+        order_columns = []
+        if temp_order and order_match:
+            for term in order_match.group(1).split(","):
+                parts = term.strip().split()
+                if not parts:
+                    continue
+                qualifier, _, column = parts[0].rpartition(".")
+                if owned(qualifier, column):
+                    direction = " DESC" if len(parts) > 1 and parts[1].upper() == "DESC" else ""
+                    order_columns.append(columns[column.lower()] + direction)
+                else:
+                    order_columns = []
+                    break
+
+        if access == "SCAN":
+            index_columns = equality + (order_columns if order_columns and not ranges else ranges[:1])
+        elif order_columns:
+            index_columns = equality + order_columns
+        else:
+            continue
+        if not index_columns:
+            continue
+        key_columns = [column.split()[0].lower() for column in index_columns]
+        if any(prefix[:len(key_columns)] == key_columns for prefix in _existing_index_prefixes(conn, table)):
+            continue
+        name = f"idx_{table}_" + "_".join(key_columns)
+        statement = f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(index_columns)});"
+        if statement not in suggestions:
+            suggestions.append(statement)
+    return suggestions
+
+# =============================================
+# Laporan
+# =============================================
+
+def analyze(path, db_path=None, schema_path=None, top=20, replay_repeat=0, max_fingerprints=10000):
+    """ Membaca log, memperkirakan biaya, lalu melengkapi fingerprint teratas dengan rencana query
+        dan saran indeks.
+    Returns:
+        dict: Laporan (ringkasan + daftar fingerprint teratas).
+    """
+    table, summary = scan_log(path, max_fingerprints)
+    snapshot = open_snapshot(db_path, schema_path) if (db_path or schema_path) else None
+
+    if snapshot is not None and replay_repeat and db_path:
+        # Replay hanya untuk fingerprint tanpa durasi; diurutkan berdasarkan jumlah agar yang sering dulu
+        untimed = sorted((stats for stats in table.values() if not stats.timed_count), key=lambda s: -s.count)
+        for stats in untimed[:top * 5]:
+            stats.replay_ms = replay(snapshot, stats.example, replay_repeat)
+
+    priced = [item for item in table.items() if item[1].avg_ms() is not None]
+    ranked = sorted(priced, key=lambda item: (item[1].cost_ms(), item[1].count), reverse=True)[:top]
+    # Tanpa durasi dan tanpa replay (mis. INSERT dari log verbose): hanya bisa diurutkan berdasarkan jumlah
+    unpriced = sorted((item for item in table.items() if item[1].avg_ms() is None), key=lambda item: -item[1].count)[:top]
+    total_cost = sum(stats.cost_ms() for stats in table.values()) or 1.0
+    entries = []
+    for key, stats in ranked + unpriced:
+        entry = {
+            "fingerprint": key,
+            "count": stats.count,
+            "timed_count": stats.timed_count,
+            "total_ms": round(stats.cost_ms(), 3),
+            "share": round(stats.cost_ms() / total_cost, 4),
+            "avg_ms": None if stats.avg_ms() is None else round(stats.avg_ms(), 3),
+            "p99_ms": stats.p99_ms(),
+            "max_ms": round(stats.max_ms, 3) if stats.timed_count else None,
+            "replay_ms": stats.replay_ms,
+            "priced": stats.avg_ms() is not None,
+            "example": stats.example,
+        }
+        if snapshot is not None:
+            plan = explain(snapshot, stats.example)
+            entry["plan"] = plan
+            entry["suggested_indexes"] = suggest_indexes(snapshot, stats.example, plan)
+        entries.append(entry)
+    if snapshot is not None:
+        snapshot.close()
+    summary["fingerprints"] = len(table)
+    return {"summary": summary, "top": entries}
+
+def print_report(report):
+    summary = report["summary"]
+    print(f"{summary['lines']} baris, {summary['statements']} statement ({summary['timed']} dengan durasi), "
+          f"{summary['fingerprints']} fingerprint, dibaca dalam {summary['seconds']:.1f} s.")
+    if summary["evicted_fingerprints"]:
+        print(f"Lainnya: {summary['evicted_fingerprints']} fingerprint murah ({summary['evicted_statements']} statement) dibuang dari memori.")
+    priced = [entry for entry in report["top"] if entry["priced"]]
+    unpriced = [entry for entry in report["top"] if not entry["priced"]]
+    for rank, entry in enumerate(priced, 1):
+        avg = f"{entry['avg_ms']:.3f}"
+        print(f"\n#{rank}  total {entry['total_ms']:.1f} ms ({entry['share'] * 100:.1f}%)  jumlah {entry['count']}  avg {avg} ms"
+              + (f"  p99 {entry['p99_ms']:.2f} ms  max {entry['max_ms']:.2f} ms" if entry["timed_count"] else "")
+              + (f"  (replay {entry['replay_ms']:.3f} ms)" if entry["replay_ms"] is not None else ""))
+        print(f"    {entry['fingerprint'][:300]}")
+        _print_plan(entry)
+    if unpriced:
+        print("\nTanpa perkiraan biaya (tidak ada durasi di log; SELECT bisa diperkirakan dengan --replay):")
+        for entry in unpriced:
+            print(f"\n  jumlah {entry['count']}")
+            print(f"    {entry['fingerprint'][:300]}")
+            _print_plan(entry)
+
+def _print_plan(entry):
+    for line in entry.get("plan") or []:
+        print(f"      {line}")
+    for suggestion in entry.get("suggested_indexes") or []:
+        print(f"    Saran: {suggestion}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzer log query better-sqlite3 (SQLITE_QUERY_LOG).")
+    parser.add_argument("log", help="File log (.gz didukung) atau '-' untuk stdin")
+    parser.add_argument("--db", help="Database snapshot untuk EXPLAIN/replay (dibuka read-only)")
+    parser.add_argument("--schema", help="File SQL skema (alternatif --db, hanya untuk EXPLAIN)")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--replay", type=int, default=0, help="Ulangi SELECT tanpa durasi N kali di --db untuk perkiraan biaya")
+    parser.add_argument("--max-fingerprints", type=int, default=10000)
+    parser.add_argument("--json", help="Tulis laporan juga sebagai JSON")
+    args = parser.parse_args()
+
+    report = analyze(args.log, args.db, args.schema, args.top, args.replay, args.max_fingerprints)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
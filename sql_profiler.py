@@ -0,0 +1,533 @@
+# sql_profiler.py
+# Profiler statement SQLite untuk tooling Python. Membungkus koneksi dari create_connection dan mencatat
+# per sidik jari (fingerprint) statement: jumlah eksekusi, latensi total/rata-rata/maks, langkah VM
+# dan histogram latensi. Literal diganti '?' sehingga query yang sama dengan nilai berbeda digabung.
+#
+#   - Latensi: wrapper pada execute/executemany/executescript dan fetch* (SELECT baru selesai saat
+#     baris terakhir diambil, jadi waktu fetch ikut dihitung ke statement yang sama).
+#   - Langkah VM: set_progress_handler dipanggil tiap `progress_interval` instruksi VM; jumlah
+#     panggilan x interval = perkiraan langkah VM statement.
+#   - Statement tersirat: set_trace_callback (dipasang hanya selama statement yang disampel) mencatat
+#     statement yang benar-benar dijalankan SQLite selain statement yang diukur, mis. BEGIN implisit
+#     dari modul sqlite3 atau statement-statement di dalam executescript.
+#   - Histogram bergulir: statistik disimpan per slot waktu (mis. 10 detik); dump JSON memuat
+#     jendela terakhir dan total kumulatif. Dump Prometheus (textfile collector) memakai total kumulatif.
+#   - sample_rate < 1 hanya mengukur sebagian statement; statement lain langsung diteruskan
+#     tanpa biaya fingerprint/timing. Estimasi jumlah sebenarnya = count / sample_rate.
+#
+# Pemakaian sebagai modul:
+#   from sql_profiler import Profiler, create_profiled_connection
+#   profiler = Profiler(sample_rate=0.1)
+#   conn = create_profiled_connection(DB_FILE, profiler)
+#   ...
+#   profiler.write_prometheus("/var/lib/node_exporter/sqlite.prom")
+#   with profiler.span("fanout.batch"):   # hot-path non-SQL juga bisa diukur
+#       ...
+#
+# Pemakaian CLI:
+#   python sql_profiler.py report --json profile.json [--top 20] [--sort total]
+#   python sql_profiler.py overhead [--db social_media_app.db] [--iterations 20000]
+
+import argparse
+import bisect
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+
+from c import DB_FILE, create_connection
+
+# Batas atas bucket histogram latensi (detik)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+MAX_FINGERPRINT_LENGTH = 500
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_BLOB_RE = re.compile(r"[xX]'[0-9a-fA-F]*'")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_PARAM_RE = re.compile(r"\?\d+|[:@$][A-Za-z_]\w*")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_ROWS_RE = re.compile(r"(\(\?\+?\))(?:\s*,\s*\(\?\+?\))+")
+_SPACE_RE = re.compile(r"\s+")
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """ Menormalkan statement SQL menjadi sidik jari: komentar dibuang, literal dan parameter
+        menjadi '?', daftar IN (...) dan baris VALUES berulang diringkas, spasi dirapikan.
+    Args:
+        sql (str): Teks statement.
+    Returns:
+        str: Sidik jari statement.
+    """
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _BLOB_RE.sub("?", text)
+    text = _STRING_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    text = _IN_LIST_RE.sub("(?+)", text)
+    text = _VALUES_ROWS_RE.sub(r"\1, ...", text)
+    text = _SPACE_RE.sub(" ", text).strip().rstrip(";").strip()
+    return text[:MAX_FINGERPRINT_LENGTH]
+
+class _Stats:
+    """ Statistik satu fingerprint dalam satu slot waktu (atau total kumulatif). """
+    __slots__ = ("count", "total", "max", "steps", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.steps = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, elapsed, steps):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        self.steps += steps
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        self.steps += other.steps
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def percentile(self, q):
+        """ Perkiraan persentil dari histogram (batas atas bucket, tidak melebihi max yang teramati). """
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.buckets):
+            cumulative += n
+            if cumulative >= rank:
+                return min(LATENCY_BUCKETS[i], self.max) if i < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "avg_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.max,
+            "p50_seconds": self.percentile(0.5),
+            "p99_seconds": self.percentile(0.99),
+            "vm_steps": self.steps,
+            "buckets": self.buckets,
+        }
+
+class Profiler:
+    """ Penampung statistik yang bisa dibagi banyak koneksi dan thread. """
+
+    def __init__(self, sample_rate=1.0, window_seconds=300, slot_seconds=10, progress_interval=1000, trace_statements=True):
+        self.sample_rate = sample_rate
+        self.slot_seconds = slot_seconds
+        self.progress_interval = progress_interval
+        self.trace_statements = trace_statements
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._slots = deque(maxlen=max(1, window_seconds // slot_seconds))
+        self._traced = {}
+        self.started_at = time.time()
+
+    def sampled(self):
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, key, elapsed, steps=0):
+        """ Mencatat satu eksekusi.
+        Args:
+            key (str): Fingerprint statement atau nama span.
+            elapsed (float): Durasi dalam detik.
+            steps (int): Perkiraan langkah VM.
+        """
+        slot_id = int(time.time() // self.slot_seconds)
+        with self._lock:
+            if not self._slots or self._slots[-1][0] != slot_id:
+                self._slots.append((slot_id, {}))
+            slot = self._slots[-1][1]
+            for table in (self._totals, slot):
+                stats = table.get(key)
+                if stats is None:
+                    stats = table[key] = _Stats()
+                stats.add(elapsed, steps)
+
+    def record_traced(self, key):
+        with self._lock:
+            self._traced[key] = self._traced.get(key, 0) + 1
+
+    @contextmanager
+    def span(self, name):
+        """ Mengukur blok kode sembarang (hot path non-SQL); dicatat dengan kunci 'span:<name>'. """
+        if not self.sampled():
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(f"span:{name}", time.perf_counter() - start_time)
+
+    def snapshot(self):
+        """ Mengembalikan (total kumulatif, statistik jendela bergulir, statement tersirat) sebagai salinan. """
+        min_slot = int(time.time() // self.slot_seconds) - self._slots.maxlen + 1
+        with self._lock:
+            totals = {key: _copy_stats(stats) for key, stats in self._totals.items()}
+            window = {}
+            for slot_id, slot in self._slots:
+                if slot_id < min_slot:
+                    continue
+                for key, stats in slot.items():
+                    window.setdefault(key, _Stats()).merge(stats)
+            traced = dict(self._traced)
+        return totals, window, traced
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._slots.clear()
+            self._traced.clear()
+            self.started_at = time.time()
+
+    def to_json(self):
+        """ Dump statistik sebagai dict yang siap di-json.dump. """
+        totals, window, traced = self.snapshot()
+        return {
+            "generated_at": time.time(),
+            "started_at": self.started_at,
+            "sample_rate": self.sample_rate,
+            "window_seconds": self._slots.maxlen * self.slot_seconds,
+            "bucket_bounds": list(LATENCY_BUCKETS),
+            "statements": {key: stats.to_dict() for key, stats in totals.items()},
+            "window": {key: stats.to_dict() for key, stats in window.items()},
+            "traced_statements": traced,
+        }
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.to_json(), indent=2))
+
+    def to_prometheus(self):
+        """ Format teks eksposisi Prometheus (total kumulatif, cocok untuk textfile collector). """
+        totals, _, traced = self.snapshot()
+        lines = [
+            "# HELP sqlite_statement_duration_seconds Latensi statement SQLite per fingerprint.",
+            "# TYPE sqlite_statement_duration_seconds histogram",
+        ]
+        for key, stats in sorted(totals.items()):
+            label = f'fingerprint="{_escape_label(key)}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += n
+                lines.append(f'sqlite_statement_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'sqlite_statement_duration_seconds_bucket{{{label},le="+Inf"}} {stats.count}')
+            lines.append(f"sqlite_statement_duration_seconds_sum{{{label}}} {stats.total:.6f}")
+            lines.append(f"sqlite_statement_duration_seconds_count{{{label}}} {stats.count}")
+        lines += ["# HELP sqlite_statement_max_seconds Latensi maksimum sejak profiler mulai.",
+                  "# TYPE sqlite_statement_max_seconds gauge"]
+        lines += [f'sqlite_statement_max_seconds{{fingerprint="{_escape_label(key)}"}} {stats.max:.6f}'
+                  for key, stats in sorted(totals.items())]
+        lines += ["# HELP sqlite_statement_vm_steps_total Perkiraan langkah VM SQLite.",
+                  "# TYPE sqlite_statement_vm_steps_total counter"]
+        lines += [f'sqlite_statement_vm_steps_total{{fingerprint="{_escape_label(key)}"}} {stats.steps}'
+                  for key, stats in sorted(totals.items())]
+        lines += ["# HELP sqlite_traced_statements_total Statement tersirat yang dijalankan SQLite (statement yang disampel).",
+                  "# TYPE sqlite_traced_statements_total counter"]
+        lines += [f'sqlite_traced_statements_total{{fingerprint="{_escape_label(key)}"}} {n}' for key, n in sorted(traced.items())]
+        lines += ["# HELP sqlite_profiler_sample_rate Porsi statement yang diukur.",
+                  "# TYPE sqlite_profiler_sample_rate gauge",
+                  f"sqlite_profiler_sample_rate {self.sample_rate}"]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.to_prometheus())
+
+def _copy_stats(stats):
+    copy = _Stats()
+    copy.merge(stats)
+    return copy
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+class _Measurement:
+    """ Satu statement yang sedang diukur: waktu dan langkah VM diakumulasi sampai cursor selesai. """
+    __slots__ = ("key", "elapsed", "steps", "done")
+
+    def __init__(self, key):
+        self.key = key
+        self.elapsed = 0.0
+        self.steps = 0
+        self.done = False
+
+class ProfiledCursor:
+    """ Proxy sqlite3.Cursor; execute dan fetch* diukur, atribut lain diteruskan apa adanya. """
+
+    def __init__(self, connection, cursor):
+        self._connection = connection
+        self._cursor = cursor
+        self._measurement = None
+
+    def _finish(self):
+        measurement = self._measurement
+        if measurement is not None and not measurement.done:
+            measurement.done = True
+            self._connection._profiler.record(measurement.key, measurement.elapsed, measurement.steps)
+        self._measurement = None
+
+    def _run(self, fn, sql, *args):
+        if self._measurement is not None:
+            self._finish()
+        if not self._connection._profiler.sampled():
+            # Jalur cepat: statement tidak disampel, tidak ada fingerprint/timing
+            fn(sql, *args)
+            return self
+        measurement = _Measurement(fingerprint(sql))
+        self._measurement = measurement
+        try:
+            self._connection._timed(measurement, fn, sql, *args)
+        except BaseException:
+            self._finish()
+            raise
+        if self._cursor.description is None:
+            # Bukan SELECT / tidak ada baris untuk diambil: statement sudah selesai
+            self._finish()
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(self._cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._run(self._cursor.executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._run(self._cursor.executescript, sql_script)
+
+    def fetchone(self):
+        if self._measurement is None:
+            return self._cursor.fetchone()
+        row = self._connection._timed(self._measurement, self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        if self._measurement is None:
+            return self._cursor.fetchmany(size if size is not None else self._cursor.arraysize)
+        rows = self._connection._timed(self._measurement, self._cursor.fetchmany, size if size is not None else self._cursor.arraysize)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        if self._measurement is None:
+            return self._cursor.fetchall()
+        rows = self._connection._timed(self._measurement, self._cursor.fetchall)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def close(self):
+        self._finish()
+        self._cursor.close()
+
+    def __del__(self):
+        # Cursor SELECT yang dibuang sebelum semua baris diambil tetap tercatat
+        self._finish()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # row_factory, arraysize, ... harus sampai ke cursor asli
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+class ProfiledConnection:
+    """ Proxy sqlite3.Connection yang mencatat statistik ke Profiler.
+        Dipakai persis seperti koneksi biasa (conn.cursor(), conn.execute(), conn.commit(), ...).
+    """
+
+    def __init__(self, conn, profiler):
+        self._conn = conn
+        self._profiler = profiler
+        self._progress_calls = 0
+        self._measured_key = None
+        conn.set_progress_handler(self._on_progress, profiler.progress_interval)
+
+    def _on_progress(self):
+        self._progress_calls += 1
+        return 0
+
+    def _on_trace(self, statement):
+        key = fingerprint(statement)
+        if key != self._measured_key:
+            self._profiler.record_traced(key)
+
+    def _timed(self, measurement, fn, *args):
+        progress_before = self._progress_calls
+        trace = self._profiler.trace_statements
+        if trace:
+            self._measured_key = measurement.key
+            self._conn.set_trace_callback(self._on_trace)
+        start_time = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            measurement.elapsed += time.perf_counter() - start_time
+            if trace:
+                self._conn.set_trace_callback(None)
+            measurement.steps += (self._progress_calls - progress_before) * self._profiler.progress_interval
+
+    def cursor(self, *args):
+        return ProfiledCursor(self, self._conn.cursor(*args))
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def commit(self):
+        if not self._profiler.sampled():
+            return self._conn.commit()
+        measurement = _Measurement("COMMIT")
+        self._timed(measurement, self._conn.commit)
+        self._profiler.record(measurement.key, measurement.elapsed, measurement.steps)
+
+    def close(self):
+        self._conn.set_progress_handler(None, 0)
+        self._conn.close()
+
+    def unwrap(self):
+        """ Koneksi sqlite3 asli (mis. untuk backup() yang menolak objek proxy). """
+        return self._conn
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # row_factory, isolation_level, text_factory, ... harus sampai ke koneksi asli
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+def profile_connection(conn, profiler):
+    """ Membungkus koneksi yang sudah ada.
+    Args:
+        conn (sqlite3.Connection): Koneksi, mis. dari create_connection.
+        profiler (Profiler): Penampung statistik.
+    Returns:
+        ProfiledConnection: Proxy koneksi, atau None jika conn None.
+    """
+    if conn is None:
+        return None
+    return ProfiledConnection(conn, profiler)
+
+def create_profiled_connection(db_file, profiler):
+    """ create_connection + profile_connection. """
+    return profile_connection(create_connection(db_file), profiler)
+
+# =============================================
+# CLI
+# =============================================
+
+def print_report(dump, top=20, sort="total", use_window=False):
+    """ Mencetak statement teratas dari dump JSON profiler. """
+    statements = dump["window"] if use_window else dump["statements"]
+    sort_keys = {"total": "total_seconds", "avg": "avg_seconds", "max": "max_seconds", "count": "count", "steps": "vm_steps"}
+    ranked = sorted(statements.items(), key=lambda item: item[1][sort_keys[sort]], reverse=True)[:top]
+    print(f"Sample rate: {dump['sample_rate']} (estimasi jumlah = count / sample rate)")
+    print(f"{'count':>9} {'total ms':>10} {'avg ms':>8} {'p99 ms':>8} {'max ms':>8} {'VM steps':>11}  statement")
+    for key, stats in ranked:
+        print(f"{stats['count']:9d} {stats['total_seconds'] * 1000:10.1f} {stats['avg_seconds'] * 1000:8.3f} "
+              f"{stats['p99_seconds'] * 1000:8.2f} {stats['max_seconds'] * 1000:8.2f} {stats['vm_steps']:11d}  {key[:100]}")
+    if dump.get("traced_statements"):
+        print("Statement tersirat:")
+        for key, n in sorted(dump["traced_statements"].items(), key=lambda item: -item[1])[:top]:
+            print(f"{n:9d}  {key[:100]}")
+
+def measure_overhead(db_path, iterations=20000):
+    """ Membandingkan waktu workload kecil (point lookup + insert) tanpa profiler,
+        dengan profiler penuh dan dengan sample_rate 0.1 (waktu terbaik dari 3 putaran).
+    """
+    def workload(conn):
+        return min(_timed_workload(conn) for _ in range(3))
+
+    def _timed_workload(conn):
+        cursor = conn.cursor()
+        start_time = time.perf_counter()
+        for i in range(iterations):
+            cursor.execute("SELECT id, username FROM users WHERE id = ?;", (i % 100 + 1,))
+            cursor.fetchall()
+            if i % 10 == 0:
+                cursor.execute("INSERT INTO bench_events (value) VALUES (?);", (i,))
+        conn.commit()
+        return time.perf_counter() - start_time
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TEMP TABLE bench_events (id INTEGER PRIMARY KEY, value INTEGER);")
+    workload(conn)  # pemanasan cache halaman dan statement
+    baseline = workload(conn)
+    print(f"Tanpa profiler       : {baseline:.3f} s")
+    for sample_rate in (1.0, 0.1):
+        profiled = ProfiledConnection(conn, Profiler(sample_rate=sample_rate))
+        elapsed = workload(profiled)
+        print(f"Profiler sample {sample_rate:<4} : {elapsed:.3f} s ({(elapsed / baseline - 1) * 100:+.1f}%, "
+              f"{(elapsed - baseline) / iterations * 1e6:.1f} us/statement)")
+        conn.set_progress_handler(None, 0)
+    conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Profiler statement SQLite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Cetak statement teratas dari dump JSON.")
+    report_parser.add_argument("--json", required=True)
+    report_parser.add_argument("--top", type=int, default=20)
+    report_parser.add_argument("--sort", choices=["total", "avg", "max", "count", "steps"], default="total")
+    report_parser.add_argument("--window", action="store_true", help="Pakai jendela bergulir, bukan total kumulatif")
+    overhead_parser = subparsers.add_parser("overhead", help="Ukur overhead profiler.")
+    overhead_parser.add_argument("--db", default=DB_FILE)
+    overhead_parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.command == "report":
+        with open(args.json) as f:
+            print_report(json.load(f), args.top, args.sort, args.window)
+    else:
+        measure_overhead(args.db, args.iterations)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# user_counters.py
+# Backfill dan perbaikan counter profil di tabel users
+# (friend_count, post_count, pending_request_count).
+# Dalam operasi normal counter dijaga oleh trigger di c.py; skrip ini dipakai sekali setelah
+# kolom ditambahkan ke database lama, dan sesekali untuk memeriksa/memperbaiki drift.
+#
+# Pemakaian:
+#   python user_counters.py [--db social_media_app.db] [--batch-size 5000] [--check-only]
+
+import argparse
+import time
+
+from c import DB_FILE, create_connection, create_tables
+
+# Nilai counter yang benar, dihitung dari tabel sumber untuk rentang id pengguna
+SQL_EXPECTED_COUNTERS = """
+    SELECT u.id AS id,
+        (SELECT COUNT(*) FROM friendships f WHERE f.sender_id = u.id AND f.status = 'ACCEPTED')
+          + (SELECT COUNT(*) FROM friendships f WHERE f.receiver_id = u.id AND f.status = 'ACCEPTED') AS friend_count,
+        (SELECT COUNT(*) FROM posts p WHERE p.user_id = u.id) AS post_count,
+        (SELECT COUNT(*) FROM friendships f WHERE f.receiver_id = u.id AND f.status = 'PENDING') AS pending_request_count
+    FROM users u
+    WHERE u.id >= ? AND u.id < ?
+"""
+
+def migrate(conn):
+    """ Memasang kolom dan trigger counter pada database lama.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+    """
+    # create_tables juga mengganti trigger updated_at lama dengan versi yang hanya bereaksi
+    # pada kolom profil, sehingga update counter tidak mengubah updated_at.
+    create_tables(conn)
+
+def repair_counters(conn, batch_size=5000, check_only=False):
+    """ Menyamakan counter di users dengan data sumber, per batch rentang id.
+        Hanya baris yang berbeda yang ditulis ulang, sehingga aman dijalankan berulang kali.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        batch_size (int): Jumlah id pengguna per transaksi.
+        check_only (bool): Jika True, hanya menghitung baris yang drift tanpa memperbaiki.
+    Returns:
+        int: Jumlah pengguna yang counternya berbeda dari data sumber.
+    """
+    max_user_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM users;").fetchone()[0]
+    total_drift = 0
+    start_time = time.perf_counter()
+    for start in range(1, max_user_id + 1, batch_size):
+        end = start + batch_size
+        if check_only:
+            drift = conn.execute(f"""
+                SELECT COUNT(*) FROM users u JOIN ({SQL_EXPECTED_COUNTERS}) AS expected ON expected.id = u.id
+                WHERE u.friend_count IS NOT expected.friend_count
+                   OR u.post_count IS NOT expected.post_count
+                   OR u.pending_request_count IS NOT expected.pending_request_count;
+            """, (start, end)).fetchone()[0]
+        else:
+            with conn:
+                drift = conn.execute(f"""
+                    UPDATE users SET
+                        friend_count = expected.friend_count,
+                        post_count = expected.post_count,
+                        pending_request_count = expected.pending_request_count
+                    FROM ({SQL_EXPECTED_COUNTERS}) AS expected
+                    WHERE users.id = expected.id
+                      AND (users.friend_count IS NOT expected.friend_count
+                        OR users.post_count IS NOT expected.post_count
+                        OR users.pending_request_count IS NOT expected.pending_request_count);
+                """, (start, end)).rowcount
+        total_drift += drift
+        if drift:
+            print(f"Pengguna id {start}-{end - 1}: {drift} counter {'berbeda' if check_only else 'diperbaiki'}.")
+
+    elapsed = time.perf_counter() - start_time
+    action = "ditemukan berbeda" if check_only else "diperbaiki"
+    print(f"Selesai dalam {elapsed:.2f} s: {total_drift} pengguna {action} dari {max_user_id} id.")
+    return total_drift
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill/perbaikan counter profil di tabel users.")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--check-only", action="store_true", help="Hanya laporkan drift, jangan perbaiki.")
+    args = parser.parse_args()
+
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    if not args.check_only:
+        migrate(conn)
+    repair_counters(conn, args.batch_size, args.check_only)
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+# user_daily_stats.py
+# Rollup aktivitas harian per pengguna di tabel user_daily_stats
+# (posts, likes_given, likes_received, comments, messages per user_id + hari UTC).
+# Statistik seperti "post minggu ini" atau "like diterima" cukup membaca paling banyak satu baris per hari,
+# jadi rentang satu tahun untuk satu pengguna = paling banyak 365 baris kecil (range scan primary key).
+#
+# Pemeliharaan inkremental memakai changelog (lihat changelog_consumer.py) dengan watermark yang disimpan
+# sebagai consumer "user_daily_stats" di changelog_consumers (entri yang belum diproses tidak ikut di-prune):
+#   - INSERT sejak watermark ditambahkan sebagai delta; hari diambil dari created_at baris aslinya
+#   - DELETE (unlike, hapus post/komentar/pesan) tidak membawa hari baris yang dihapus, jadi pengguna
+#     yang terdampak diagregasi ulang penuh dari tabel sumber (jarang dan murah per pengguna)
+#   - delta, agregasi ulang, dan watermark ditulis dalam satu transaksi IMMEDIATE: kunci tulis menjamin
+#     isi tabel sumber sama persis dengan changelog sampai id tertinggi yang dibaca
+# Agregasi ulang rentang hari (reaggregate) bersifat idempoten: baris pada rentang tersebut diganti dengan
+# hasil hitung ulang dari tabel sumber, jadi aman dijalankan berulang kali (mis. setelah impor atau perbaikan data).
+#
+# Pemakaian:
+#   python user_daily_stats.py sync                                  -> proses changelog sejak watermark
+#   python user_daily_stats.py reaggregate --from 2025-01-01 --to 2025-01-31 [--user-id 42]
+#   python user_daily_stats.py show --user-id 42 [--days 365]
+#   python user_daily_stats.py check [--from 2025-01-01 --to 2025-01-31]
+#   python user_daily_stats.py bench [--scale 2]
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from c import DB_FILE, create_connection, create_tables, epoch_ms_tables
+
+CONSUMER_NAME = "user_daily_stats"
+STAT_COLUMNS = ("posts", "likes_given", "likes_received", "comments", "messages")
+
+# Sumber tiap kolom: kolom -> (tabel aktivitas dengan alias t, join tambahan, pemilik aktivitas,
+# kondisi yang mencocokkan entri changelog 'I' dengan barisnya). Hari selalu dari t.created_at.
+SOURCES = {
+    "posts": ("posts", "", "t.user_id",
+              "t.id = cl.row_id AND t.user_id = json_extract(cl.data, '$.user_id')"),
+    "likes_given": ("likes", "", "t.user_id",
+                    "t.post_id = json_extract(cl.data, '$.post_id') AND t.user_id = json_extract(cl.data, '$.user_id')"),
+    "likes_received": ("likes", "JOIN posts p ON p.id = t.post_id", "p.user_id",
+                       "t.post_id = json_extract(cl.data, '$.post_id') AND t.user_id = json_extract(cl.data, '$.user_id')"),
+    "comments": ("comments", "", "t.user_id",
+                 "t.id = cl.row_id AND t.user_id = json_extract(cl.data, '$.user_id')"),
+    "messages": ("chat_messages", "", "t.sender_id",
+                 "t.id = cl.row_id AND t.sender_id = json_extract(cl.data, '$.sender_id')"),
+}
+
+# Pengguna yang statistiknya berubah karena DELETE (atau UPDATE kunci like) di changelog
+SQL_AFFECTED_USERS = """
+    SELECT json_extract(data, '$.user_id') FROM changelog
+    WHERE id > :low AND id <= :high AND table_name IN ('posts', 'likes', 'comments')
+      AND (op = 'D' OR (table_name = 'likes' AND op = 'U'))
+    UNION
+    SELECT json_extract(data, '$.sender_id') FROM changelog
+    WHERE id > :low AND id <= :high AND table_name = 'chat_messages' AND op = 'D'
+    UNION
+    SELECT p.user_id FROM changelog cl JOIN posts p ON p.id = json_extract(cl.data, '$.post_id')
+    WHERE cl.id > :low AND cl.id <= :high AND cl.table_name = 'likes' AND cl.op != 'I'
+"""
+
+def _day_bounds(table, converted, start_day, end_day):
+    """ Kondisi rentang waktu t.created_at untuk hari start_day..end_day (inklusif) beserta parameternya. """
+    conditions, params = [], []
+    for bound, day, offset in ((">=", start_day, 0), ("<", end_day, 1)):
+        if day is None:
+            continue
+        moment = datetime.combine(date.fromisoformat(day) + timedelta(days=offset), datetime.min.time(), timezone.utc)
+        if table in converted:
+            conditions.append(f"t.created_at_ms {bound} ?")
+            params.append(int(moment.timestamp() * 1000))
+        else:
+            conditions.append(f"t.created_at {bound} ?")
+            params.append(moment.strftime("%Y-%m-%d %H:%M:%S"))
+    return conditions, params
+
+def _aggregate_sql(conn, start_day=None, end_day=None, only_listed_users=False):
+    """ SELECT (user_id, day, kolom statistik...) hasil agregasi langsung dari tabel sumber.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        start_day (str): Hari pertama 'YYYY-MM-DD' (inklusif); None = tanpa batas.
+        end_day (str): Hari terakhir 'YYYY-MM-DD' (inklusif); None = tanpa batas.
+        only_listed_users (bool): Batasi ke pengguna di temp.stats_users.
+    Returns:
+        tuple: (SQL, parameter).
+    """
+    converted = epoch_ms_tables(conn.cursor())
+    parts, params = [], []
+    for column, (table, join, owner, _) in SOURCES.items():
+        conditions, bounds = _day_bounds(table, converted, start_day, end_day)
+        if only_listed_users:
+            conditions.append(f"{owner} IN (SELECT user_id FROM temp.stats_users)")
+        counts = ", ".join("COUNT(*)" if other == column else "0" for other in STAT_COLUMNS)
+        parts.append(f"""SELECT {owner}, substr(t.created_at, 1, 10), {counts}
+            FROM {table} t {join} {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            GROUP BY 1, 2""")
+        params += bounds
+    sums = ", ".join(f"SUM({column})" for column in STAT_COLUMNS)
+    return (f"""SELECT user_id, day, {sums} FROM (
+        SELECT NULL AS user_id, NULL AS day, {', '.join(f'0 AS {column}' for column in STAT_COLUMNS)} WHERE 0
+        UNION ALL {' UNION ALL '.join(parts)}
+    ) GROUP BY user_id, day""", params)
+
+def _replace(conn, start_day=None, end_day=None, user_ids=None):
+    """ Mengganti baris rollup pada rentang hari (dan pengguna) dengan hasil agregasi ulang.
+        Dipanggil di dalam transaksi yang sudah dibuka.
+    Returns:
+        int: Jumlah baris rollup yang ditulis.
+    """
+    conditions, params = [], []
+    if start_day is not None:
+        conditions.append("day >= ?")
+        params.append(start_day)
+    if end_day is not None:
+        conditions.append("day <= ?")
+        params.append(end_day)
+    if user_ids is not None:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS stats_users (user_id INTEGER PRIMARY KEY);")
+        conn.execute("DELETE FROM temp.stats_users;")
+        conn.executemany("INSERT OR IGNORE INTO temp.stats_users (user_id) VALUES (?);", ((u,) for u in user_ids))
+        conditions.append("user_id IN (SELECT user_id FROM temp.stats_users)")
+    conn.execute("DELETE FROM user_daily_stats" + (" WHERE " + " AND ".join(conditions) if conditions else "") + ";", params)
+    select_sql, select_params = _aggregate_sql(conn, start_day, end_day, user_ids is not None)
+    cursor = conn.execute(f"INSERT INTO user_daily_stats (user_id, day, {', '.join(STAT_COLUMNS)}) {select_sql};",
+                          select_params)
+    return cursor.rowcount
+
+def _apply_inserts(conn, low, high):
+    """ Menambahkan delta dari entri changelog 'I' dengan id di (low, high]. """
+    for column, (table, join, owner, match) in SOURCES.items():
+        conn.execute(f"""
+            INSERT INTO user_daily_stats (user_id, day, {column})
+            SELECT {owner}, substr(t.created_at, 1, 10), COUNT(*)
+            FROM changelog cl JOIN {table} t ON {match} {join}
+            WHERE cl.id > ? AND cl.id <= ? AND cl.table_name = '{table}' AND cl.op = 'I'
+            GROUP BY 1, 2
+            ON CONFLICT(user_id, day) DO UPDATE SET {column} = {column} + excluded.{column};""", (low, high))
+
+def _begin(conn):
+    """ Membuka transaksi IMMEDIATE dan mengembalikan (watermark, id changelog tertinggi). """
+    conn.execute("BEGIN IMMEDIATE;")
+    row = conn.execute("SELECT last_id FROM changelog_consumers WHERE name = ?;", (CONSUMER_NAME,)).fetchone()
+    # Changelog kosong (semua sudah di-prune): id terakhir yang pernah dipakai ada di sqlite_sequence
+    low_id, high_id = conn.execute(
+        """SELECT MIN(id), COALESCE(MAX(id), (SELECT seq FROM sqlite_sequence WHERE name = 'changelog'), 0)
+           FROM changelog;""").fetchone()
+    watermark = row[0] if row else None
+    # Entri setelah watermark sudah di-prune (mis. consumer didaftarkan setelah prune): perlu bangun ulang penuh
+    if watermark is not None and low_id is not None and watermark < low_id - 1:
+        watermark = None
+    return watermark, high_id
+
+def _commit(conn, high_id):
+    conn.execute(
+        """INSERT INTO changelog_consumers (name, last_id, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+           ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at;""",
+        (CONSUMER_NAME, high_id))
+    conn.commit()
+
+def _catch_up(conn, watermark, high_id):
+    """ Menerapkan changelog (watermark, high_id]: delta INSERT, lalu agregasi ulang pengguna yang terkena DELETE.
+    Returns:
+        int: Jumlah pengguna yang diagregasi ulang.
+    """
+    _apply_inserts(conn, watermark, high_id)
+    affected = [row[0] for row in conn.execute(SQL_AFFECTED_USERS, {"low": watermark, "high": high_id})
+                if row[0] is not None]
+    if affected:
+        _replace(conn, user_ids=affected)
+    return len(affected)
+
+def sync(conn):
+    """ Memproses changelog sejak watermark. Jalankan pertama kali (atau setelah changelog di-prune melewati
+        watermark) akan membangun ulang seluruh rollup.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+    Returns:
+        dict: Ringkasan (mode, jumlah entri changelog, pengguna yang diagregasi ulang, durasi).
+    """
+    start_time = time.perf_counter()
+    watermark, high_id = _begin(conn)
+    try:
+        if watermark is None:
+            rows = _replace(conn)
+            summary = {"mode": "rebuild", "rows": rows, "recomputed_users": None}
+        else:
+            recomputed = _catch_up(conn, watermark, high_id)
+            summary = {"mode": "incremental", "changes": high_id - watermark, "recomputed_users": recomputed}
+        _commit(conn, high_id)
+    except Exception:
+        conn.rollback()
+        raise
+    summary["watermark"] = high_id
+    summary["seconds"] = round(time.perf_counter() - start_time, 3)
+    return summary
+
+def reaggregate(conn, start_day, end_day, user_ids=None):
+    """ Menghitung ulang rollup untuk rentang hari secara idempoten.
+        Changelog yang tertunda diproses dulu dalam transaksi yang sama, agar baris yang sudah ikut
+        terhitung ulang tidak ditambahkan lagi sebagai delta oleh sync berikutnya.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        start_day (str): Hari pertama 'YYYY-MM-DD' (inklusif).
+        end_day (str): Hari terakhir 'YYYY-MM-DD' (inklusif).
+        user_ids (list): Batasi ke pengguna tertentu; None = semua pengguna.
+    Returns:
+        int: Jumlah baris rollup yang ditulis untuk rentang tersebut.
+    """
+    watermark, high_id = _begin(conn)
+    try:
+        if watermark is None:
+            _replace(conn)
+        else:
+            _catch_up(conn, watermark, high_id)
+        rows = _replace(conn, start_day, end_day, user_ids)
+        _commit(conn, high_id)
+    except Exception:
+        conn.rollback()
+        raise
+    return rows
+
+def user_stats(conn, user_id, start_day, end_day):
+    """ Statistik harian satu pengguna (hanya hari yang ada aktivitasnya) beserta totalnya.
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        user_id (int): ID pengguna.
+        start_day (str): Hari pertama 'YYYY-MM-DD' (inklusif).
+        end_day (str): Hari terakhir 'YYYY-MM-DD' (inklusif).
+    Returns:
+        tuple: (list baris (day, posts, likes_given, likes_received, comments, messages), dict total).
+    """
+    rows = conn.execute(
+        f"""SELECT day, {', '.join(STAT_COLUMNS)} FROM user_daily_stats
+            WHERE user_id = ? AND day >= ? AND day <= ? ORDER BY day;""",
+        (user_id, start_day, end_day)).fetchall()
+    totals = {column: sum(row[i + 1] for row in rows) for i, column in enumerate(STAT_COLUMNS)}
+    return rows, totals
+
+def check(conn, start_day=None, end_day=None):
+    """ Membandingkan rollup dengan agregasi langsung dari tabel sumber (jalankan sync dulu).
+    Args:
+        conn (sqlite3.Connection): Objek koneksi database.
+        start_day (str): Hari pertama 'YYYY-MM-DD' (inklusif); None = tanpa batas.
+        end_day (str): Hari terakhir 'YYYY-MM-DD' (inklusif); None = tanpa batas.
+    Returns:
+        int: Jumlah baris (user_id, day) yang berbeda.
+    """
+    select_sql, params = _aggregate_sql(conn, start_day, end_day)
+    conn.execute("DROP TABLE IF EXISTS temp.stats_expected;")
+    conn.execute(f"CREATE TEMP TABLE stats_expected AS {select_sql};", params)
+    conditions, params = ["1"], []
+    if start_day is not None:
+        conditions.append("day >= ?")
+        params.append(start_day)
+    if end_day is not None:
+        conditions.append("day <= ?")
+        params.append(end_day)
+    stored_sql = f"SELECT user_id, day, {', '.join(STAT_COLUMNS)} FROM user_daily_stats WHERE {' AND '.join(conditions)}"
+    differences = conn.execute(f"""SELECT
+        (SELECT COUNT(*) FROM (SELECT * FROM temp.stats_expected EXCEPT {stored_sql}))
+      + (SELECT COUNT(*) FROM ({stored_sql} EXCEPT SELECT * FROM temp.stats_expected));""", params + params).fetchone()[0]
+    conn.execute("DROP TABLE temp.stats_expected;")
+    return differences
+
+def benchmark(scale=2, new_rows=1000, sample_users=200):
+    """ Mengukur bangun ulang, sync inkremental, dan query satu tahun vs agregasi langsung
+        pada fixture sintetis (db_fixtures.py).
+    """
+    from db_fixtures import clone
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        conn = clone(scale, os.path.join(tmp_dir, "bench_stats.db"))
+        summary = sync(conn)
+        total_rows = conn.execute("SELECT COUNT(*) FROM user_daily_stats;").fetchone()[0]
+        print(f"Skala {scale}: bangun ulang {total_rows} baris rollup dalam {summary['seconds']:.2f} s")
+
+        # Aktivitas baru: post, like, komentar, pesan, lalu sebagian like dihapus
+        max_user = conn.execute("SELECT MAX(id) FROM users;").fetchone()[0]
+        max_post = conn.execute("SELECT MAX(id) FROM posts;").fetchone()[0]
+        with conn:
+            for i in range(new_rows):
+                user_id = i % max_user + 1
+                conn.execute("INSERT INTO posts (user_id, content) VALUES (?, ?);", (user_id, f"bench {i}"))
+                conn.execute("INSERT OR IGNORE INTO likes (user_id, post_id) VALUES (?, ?);",
+                             (user_id, max_post - i % max_post))
+                conn.execute("INSERT INTO comments (post_id, user_id, content) VALUES (?, ?, ?);",
+                             (max_post - i % max_post, user_id, "bench"))
+            conn.execute("DELETE FROM likes WHERE post_id IN (SELECT DISTINCT post_id FROM likes ORDER BY post_id LIMIT 10);")
+        summary = sync(conn)
+        print(f"  sync inkremental: {summary['changes']} entri changelog, {summary['recomputed_users']} pengguna "
+              f"diagregasi ulang, {summary['seconds'] * 1000:.1f} ms")
+        print(f"  selisih rollup vs tabel sumber: {check(conn)} baris")
+
+        # Satu tahun statistik harian pengguna paling aktif: rollup vs agregasi langsung dari tabel sumber
+        end_day = date.fromisoformat(conn.execute("SELECT MAX(day) FROM user_daily_stats;").fetchone()[0])
+        start_day = (end_day - timedelta(days=364)).isoformat()
+        since, until = f"{start_day} 00:00:00", f"{end_day + timedelta(days=1)} 00:00:00"
+        direct_sql = """SELECT day, SUM(a), SUM(b), SUM(c), SUM(d), SUM(e) FROM (
+            SELECT substr(created_at, 1, 10) AS day, 1 AS a, 0 AS b, 0 AS c, 0 AS d, 0 AS e FROM posts
+            WHERE user_id = :u AND created_at >= :since AND created_at < :until
+            UNION ALL SELECT substr(created_at, 1, 10), 0, 1, 0, 0, 0 FROM likes
+            WHERE user_id = :u AND created_at >= :since AND created_at < :until
+            UNION ALL SELECT substr(l.created_at, 1, 10), 0, 0, 1, 0, 0 FROM likes l JOIN posts p ON p.id = l.post_id
+            WHERE p.user_id = :u AND l.created_at >= :since AND l.created_at < :until
+            UNION ALL SELECT substr(created_at, 1, 10), 0, 0, 0, 1, 0 FROM comments
+            WHERE user_id = :u AND created_at >= :since AND created_at < :until
+            UNION ALL SELECT substr(created_at, 1, 10), 0, 0, 0, 0, 1 FROM chat_messages
+            WHERE sender_id = :u AND created_at >= :since AND created_at < :until
+        ) GROUP BY day ORDER BY day;"""
+        active = [row[0] for row in conn.execute(
+            "SELECT user_id FROM user_daily_stats GROUP BY user_id ORDER BY SUM(likes_received) DESC LIMIT ?;",
+            (sample_users,))]
+        for label, query in (
+            ("rollup", lambda u: user_stats(conn, u, start_day, end_day.isoformat())),
+            ("agregasi langsung", lambda u: conn.execute(direct_sql, {"u": u, "since": since, "until": until}).fetchall())):
+            timings = []
+            for user_id in active:
+                query_start = time.perf_counter()
+                query(user_id)
+                timings.append(time.perf_counter() - query_start)
+            timings.sort()
+            print(f"  satu tahun per hari ({label}, {len(active)} pengguna teraktif): "
+                  f"p50 {timings[len(timings) // 2] * 1000:.3f} ms, p99 {timings[int(len(timings) * 0.99)] * 1000:.3f} ms")
+        conn.close()
+
+def _print_stats(rows, totals):
+    print(f"{'hari':<12}" + "".join(f"{column:>16}" for column in STAT_COLUMNS))
+    for row in rows:
+        print(f"{row[0]:<12}" + "".join(f"{value:>16}" for value in row[1:]))
+    print(f"{'total':<12}" + "".join(f"{totals[column]:>16}" for column in STAT_COLUMNS))
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollup aktivitas harian per pengguna.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="Proses changelog sejak watermark.")
+    sync_parser.add_argument("--db", default=DB_FILE)
+    re_parser = subparsers.add_parser("reaggregate", help="Hitung ulang rentang hari (idempoten).")
+    re_parser.add_argument("--db", default=DB_FILE)
+    re_parser.add_argument("--from", dest="start_day", required=True, help="YYYY-MM-DD")
+    re_parser.add_argument("--to", dest="end_day", required=True, help="YYYY-MM-DD")
+    re_parser.add_argument("--user-id", type=int, action="append", help="Bisa diulang; default semua pengguna")
+    show_parser = subparsers.add_parser("show", help="Tampilkan statistik satu pengguna.")
+    show_parser.add_argument("--db", default=DB_FILE)
+    show_parser.add_argument("--user-id", type=int, required=True)
+    show_parser.add_argument("--days", type=int, default=365)
+    check_parser = subparsers.add_parser("check", help="Bandingkan rollup dengan tabel sumber.")
+    check_parser.add_argument("--db", default=DB_FILE)
+    check_parser.add_argument("--from", dest="start_day")
+    check_parser.add_argument("--to", dest="end_day")
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pada fixture sintetis.")
+    bench_parser.add_argument("--scale", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.scale)
+        return
+    conn = create_connection(args.db)
+    if conn is None:
+        print("Gagal membuat koneksi ke database.")
+        return
+    create_tables(conn)
+    if args.command == "sync":
+        summary = sync(conn)
+        if summary["mode"] == "rebuild":
+            print(f"Rollup dibangun ulang: {summary['rows']} baris ({summary['seconds']:.2f} s), watermark {summary['watermark']}.")
+        else:
+            print(f"{summary['changes']} entri changelog diproses, {summary['recomputed_users']} pengguna diagregasi ulang "
+                  f"({summary['seconds'] * 1000:.1f} ms), watermark {summary['watermark']}.")
+    elif args.command == "reaggregate":
+        rows = reaggregate(conn, args.start_day, args.end_day, args.user_id)
+        print(f"{rows} baris rollup ditulis ulang untuk {args.start_day} s/d {args.end_day}.")
+    elif args.command == "show":
+        today = datetime.now(timezone.utc).date()
+        _print_stats(*user_stats(conn, args.user_id, (today - timedelta(days=args.days - 1)).isoformat(), today.isoformat()))
+    else:
+        differences = check(conn, args.start_day, args.end_day)
+        print("Rollup sesuai dengan tabel sumber." if differences == 0 else f"{differences} baris rollup berbeda; jalankan reaggregate.")
+    conn.close()
+    print("Koneksi database ditutup.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# write_amplification.py
+# Audit biaya tulis per tabel: membandingkan trigger updated_at lama (UPDATE kedua tanpa syarat)
+# dengan trigger terjaga di c.py (hanya kolom yang diubah pengguna, dan hanya jika statement
+# aslinya belum mengisi updated_at). Untuk tiap operasi dilaporkan waktu per operasi dan
+# jumlah baris yang benar-benar ditulis (termasuk tulisan dari trigger).
+#
+# Pemakaian:
+#   python write_amplification.py [--rows 20000]
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from c import create_tables
+
+# Definisi trigger updated_at sebelum perubahan (dipakai sebagai pembanding "sebelum")
+LEGACY_UPDATED_AT_TRIGGERS = {
+    "update_users_updated_at": """CREATE TRIGGER update_users_updated_at
+        AFTER UPDATE ON users FOR EACH ROW BEGIN
+        UPDATE users SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
+    "update_friendships_updated_at": """CREATE TRIGGER update_friendships_updated_at
+        AFTER UPDATE ON friendships FOR EACH ROW BEGIN
+        UPDATE friendships SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
+    "update_posts_updated_at": """CREATE TRIGGER update_posts_updated_at
+        AFTER UPDATE ON posts FOR EACH ROW BEGIN
+        UPDATE posts SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
+    "update_comments_updated_at": """CREATE TRIGGER update_comments_updated_at
+        AFTER UPDATE ON comments FOR EACH ROW BEGIN
+        UPDATE comments SET updated_at = CURRENT_TIMESTAMP WHERE id = OLD.id; END;""",
+}
+
+TABLES_WITH_UPDATED_AT = ("users", "posts", "comments", "friendships")
+
+# (tabel, operasi, SQL, fungsi pembuat parameter dari nomor baris 1..n)
+# Statement UPDATE meniru route yang ada (mis. report, edit post, accept friend request).
+WORKLOAD = [
+    ("users", "insert", "INSERT INTO users (username, email, password_hash) VALUES (?, ?, 'x');",
+        lambda i: (f"user{i}", f"user{i}@example.com")),
+    ("users", "update profil (route, set updated_at)", "UPDATE users SET bio = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?;",
+        lambda i: (f"bio {i}", i)),
+    ("users", "update profil (tanpa updated_at)", "UPDATE users SET full_name = ? WHERE id = ?;",
+        lambda i: (f"Nama {i}", i)),
+    ("posts", "insert", "INSERT INTO posts (user_id, content) VALUES (?, ?);",
+        lambda i: (i, f"post {i}")),
+    ("posts", "edit (route, set updated_at)", "UPDATE posts SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND user_id = ?;",
+        lambda i: (f"post {i} diedit", i, i)),
+    ("posts", "hide by reports (route)", "UPDATE posts SET visibility_status = 'HIDDEN_BY_REPORTS', updated_at = CURRENT_TIMESTAMP WHERE id = ? AND visibility_status = 'VISIBLE';",
+        lambda i: (i,)),
+    ("comments", "insert", "INSERT INTO comments (user_id, post_id, content) VALUES (?, ?, ?);",
+        lambda i: (i, i, f"komentar {i}")),
+    ("comments", "edit (route, set updated_at)", "UPDATE comments SET content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ? AND user_id = ?;",
+        lambda i: (f"komentar {i} diedit", i, i)),
+    ("friendships", "insert (request)", "INSERT INTO friendships (sender_id, receiver_id) VALUES (?, ?);",
+        lambda i: (i, i % 1000 + 1 if i % 1000 + 1 != i else i % 1000 + 2)),
+    ("friendships", "accept (route, set updated_at)", "UPDATE friendships SET status = 'ACCEPTED', updated_at = CURRENT_TIMESTAMP WHERE id = ?;",
+        lambda i: (i,)),
+]
+
+def _open_bench_db(path, legacy):
+    """ Membuat database benchmark dengan skema c.py, opsional memakai trigger updated_at lama. """
+    conn = sqlite3.connect(path)
+    create_tables(conn)
+    if legacy:
+        for name, sql in LEGACY_UPDATED_AT_TRIGGERS.items():
+            conn.execute(f"DROP TRIGGER IF EXISTS {name};")
+            conn.execute(sql)
+        conn.commit()
+    return conn
+
+def run_workload(conn, n_rows):
+    """ Menjalankan WORKLOAD pada satu koneksi.
+    Args:
+        conn (sqlite3.Connection): Koneksi database benchmark.
+        n_rows (int): Jumlah operasi per langkah workload.
+    Returns:
+        list: (tabel, operasi, mikrodetik per operasi, baris ditulis per operasi)
+    """
+    results = []
+    for table, operation, sql, make_params in WORKLOAD:
+        params = [make_params(i) for i in range(1, n_rows + 1)]
+        changes_before = conn.total_changes
+        start = time.perf_counter()
+        with conn:
+            for row in params:
+                conn.execute(sql, row)
+        elapsed = time.perf_counter() - start
+        # total_changes ikut menghitung baris yang ditulis oleh trigger
+        rows_written = (conn.total_changes - changes_before) / n_rows
+        results.append((table, operation, elapsed * 1e6 / n_rows, rows_written))
+        if table in TABLES_WITH_UPDATED_AT:
+            # Tanpa diukur: mundurkan updated_at agar UPDATE berikutnya benar-benar mengubah nilainya,
+            # seperti di produksi (edit berikutnya tidak terjadi di detik yang sama).
+            with conn:
+                conn.execute(f"UPDATE {table} SET updated_at = '2000-01-01 00:00:00';")
+    return results
+
+def check_updated_at(conn):
+    """ Memastikan updated_at tetap benar dengan trigger baru.
+    Returns:
+        list: Pesan kegagalan (kosong jika semua benar).
+    """
+    failures = []
+    old_value = "2000-01-01 00:00:00"
+    with conn:
+        conn.execute("UPDATE posts SET updated_at = ? WHERE id = 1;", (old_value,))
+        conn.execute("UPDATE posts SET content = 'tanpa updated_at' WHERE id = 1;")
+    if conn.execute("SELECT updated_at FROM posts WHERE id = 1;").fetchone()[0] == old_value:
+        failures.append("posts.updated_at tidak diperbarui saat statement tidak mengisinya")
+
+    with conn:
+        conn.execute("UPDATE users SET updated_at = ? WHERE id = 2;", (old_value,))
+        conn.execute("INSERT INTO posts (user_id, content) VALUES (2, 'hanya counter');")
+    if conn.execute("SELECT updated_at FROM users WHERE id = 2;").fetchone()[0] != old_value:
+        failures.append("users.updated_at berubah karena update counter")
+
+    explicit_value = "2001-02-03 04:05:06"
+    with conn:
+        conn.execute("UPDATE comments SET content = 'x', updated_at = ? WHERE id = 1;", (explicit_value,))
+    if conn.execute("SELECT updated_at FROM comments WHERE id = 1;").fetchone()[0] != explicit_value:
+        failures.append("comments.updated_at dari statement ditimpa trigger")
+    return failures
+
+def benchmark(n_rows=20000):
+    """ Menjalankan workload dengan trigger lama dan baru lalu mencetak perbandingannya.
+    Args:
+        n_rows (int): Jumlah operasi per langkah workload.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_conn = _open_bench_db(os.path.join(tmp_dir, "legacy.db"), legacy=True)
+        legacy = run_workload(legacy_conn, n_rows)
+        legacy_conn.close()
+
+        current_conn = _open_bench_db(os.path.join(tmp_dir, "current.db"), legacy=False)
+        current = run_workload(current_conn, n_rows)
+        failures = check_updated_at(current_conn)
+        current_conn.close()
+
+    print()
+    print(f"Audit write amplification ({n_rows} operasi per baris tabel)")
+    print(f"{'tabel':<12} {'operasi':<40} {'lama us/op':>11} {'baru us/op':>11} {'lama baris':>11} {'baru baris':>11}")
+    for (table, operation, legacy_us, legacy_rows), (_, _, current_us, current_rows) in zip(legacy, current):
+        print(f"{table:<12} {operation:<40} {legacy_us:11.1f} {current_us:11.1f} {legacy_rows:11.2f} {current_rows:11.2f}")
+    if failures:
+        for failure in failures:
+            print(f"GAGAL: {failure}")
+    else:
+        print("Pemeriksaan updated_at: OK")
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit write amplification trigger updated_at.")
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    benchmark(args.rows)
+
+if __name__ == '__main__':
+    main()